@@ -6,6 +6,8 @@ from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
     AbstractMitmMapper
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
+from mapadroid.data_handler.mitm_data.LatestDataNotifier import \
+    LatestDataNotifier
 from mapadroid.data_handler.mitm_data.MitmDataHandler import MitmDataHandler
 from mapadroid.data_handler.stats.AbstractStatsHandler import \
     AbstractStatsHandler
@@ -28,6 +30,7 @@ class StandaloneMitmMapperAndStatsHandler(AbstractMitmMapper, AbstractStatsHandl
         else:
             self.__stats_handler: Optional[StatsHandler] = None
         self.__mitm_data_handler: MitmDataHandler = MitmDataHandler()
+        self.__latest_data_notifier: LatestDataNotifier = LatestDataNotifier()
 
     async def start(self):
         if self.__stats_handler:
@@ -84,13 +87,19 @@ class StandaloneMitmMapperAndStatsHandler(AbstractMitmMapper, AbstractStatsHandl
     async def update_latest(self, worker: str, key: str, value: Union[list, dict], timestamp_received_raw: float = None,
                             timestamp_received_receiver: float = None, location: Location = None) -> None:
         loop = asyncio.get_running_loop()
-        loop.run_in_executor(None, self.__mitm_data_handler.update_latest, worker, key, value, timestamp_received_raw,
-                             timestamp_received_receiver, location)
+        update = loop.run_in_executor(None, self.__mitm_data_handler.update_latest, worker, key, value,
+                                      timestamp_received_raw, timestamp_received_receiver, location)
+        update.add_done_callback(lambda _: self.__latest_data_notifier.notify(worker, key))
 
     async def request_latest(self, worker: str, key: str,
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
         return self.__mitm_data_handler.request_latest(worker, key, timestamp_earliest)
 
+    async def wait_for_latest(self, worker: str, key: str, timestamp_earliest: Optional[int],
+                              timeout: float) -> Optional[LatestMitmDataEntry]:
+        return await self.__latest_data_notifier.wait(
+            worker, key, lambda: self.request_latest(worker, key, timestamp_earliest), timeout)
+
     async def get_full_latest_data(self, worker: str) -> Dict[str, LatestMitmDataEntry]:
         return self.__mitm_data_handler.get_full_latest_data(worker)
 
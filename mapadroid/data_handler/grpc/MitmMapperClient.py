@@ -3,9 +3,10 @@ from typing import Dict, List, Optional, Union
 
 from aiocache import cached
 from google.protobuf import json_format
-from grpc.aio import AioRpcError
+from grpc.aio import EOF, AioRpcError, UnaryStreamCall
 from loguru import logger
 
+from mapadroid.data_handler.grpc.RpcBatcher import RpcBatcher
 from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
     AbstractMitmMapper
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
@@ -14,12 +15,14 @@ from mapadroid.grpc.compiled.mitm_mapper import mitm_mapper_pb2
 from mapadroid.grpc.compiled.mitm_mapper.mitm_mapper_pb2 import (
     GetQuestsHeldResponse, InjectedRequest, InjectionStatus,
     LastKnownLocationResponse, LastMoved, LatestMitmDataEntryRequest,
-    LatestMitmDataEntryResponse, LevelResponse, PokestopVisitsResponse,
-    SetLevelRequest, SetPokestopVisitsRequest, SetQuestsHeldRequest)
+    LatestMitmDataEntryResponse, LevelResponse, MitmMapperUpdate,
+    MitmMapperUpdateBatch, PokestopVisitsResponse, SetLevelRequest,
+    SetPokestopVisitsRequest, SetQuestsHeldRequest, WaitForLatestRequest)
 from mapadroid.grpc.compiled.shared.Worker_pb2 import Worker
 from mapadroid.grpc.stubs.mitm_mapper.mitm_mapper_pb2_grpc import \
     MitmMapperStub
 from mapadroid.utils.collections import Location
+from mapadroid.utils.madGlobals import MadGlobals
 
 
 class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
@@ -27,6 +30,26 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         super().__init__(channel)
         self._level_cache: Dict[str, int] = {}
         self._pokestop_visits_cache: Dict[str, int] = {}
+        self.__batcher: Optional[RpcBatcher[MitmMapperUpdate]] = None
+        if MadGlobals.application_args.grpc_batch_size > 1:
+            self.__batcher = RpcBatcher("MitmMapper", self.__submit_batch,
+                                        MadGlobals.application_args.grpc_batch_size,
+                                        MadGlobals.application_args.grpc_batch_latency,
+                                        MadGlobals.application_args.grpc_batch_buffer)
+
+    async def shutdown(self) -> None:
+        if self.__batcher is not None:
+            await self.__batcher.stop()
+
+    async def __submit_batch(self, updates: List[MitmMapperUpdate]) -> None:
+        await self.UpdateBatch(MitmMapperUpdateBatch(updates=updates))
+
+    async def __flush_updates(self) -> None:
+        """
+        Submits the updates buffered before requesting data to read the updates of this client
+        """
+        if self.__batcher is not None:
+            await self.__batcher.flush()
 
     # Cache the update parameters to not spam it...
     @cached(ttl=30)
@@ -39,6 +62,9 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         request: SetLevelRequest = SetLevelRequest()
         request.worker.name = worker
         request.level = level
+        if self.__batcher is not None:
+            self.__batcher.add(MitmMapperUpdate(level=request))
+            return
         try:
             await self.SetLevel(request)
         except AioRpcError as e:
@@ -54,12 +80,16 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         request: SetPokestopVisitsRequest = SetPokestopVisitsRequest()
         request.worker.name = worker
         request.pokestop_visits = pokestop_visits
+        if self.__batcher is not None:
+            self.__batcher.add(MitmMapperUpdate(pokestop_visits=request))
+            return
         try:
             await self.SetPokestopVisits(request)
         except AioRpcError as e:
             logger.warning("Failed submitting pokestop visits {}", e)
 
     async def get_last_possibly_moved(self, worker: str) -> int:
+        await self.__flush_updates()
         try:
             response: LastMoved = await self.GetLastPossiblyMoved(name=worker)
             return response.timestamp
@@ -88,6 +118,9 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             request.data.some_dictionary.update(value)
         else:
             raise ValueError("Cannot handle data")
+        if self.__batcher is not None:
+            self.__batcher.add(MitmMapperUpdate(latest=request))
+            return
         try:
             await self.UpdateLatest(request)
         except AioRpcError as e:
@@ -95,6 +128,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
 
     async def request_latest(self, worker: str, key: str,
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
+        await self.__flush_updates()
         request = LatestMitmDataEntryRequest()
         request.worker.name = worker
         request.key = str(key)
@@ -113,6 +147,31 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             None, self.__transform_proto_data_entry, response.entry)
         return latest
 
+    async def wait_for_latest(self, worker: str, key: str, timestamp_earliest: Optional[int],
+                              timeout: float) -> Optional[LatestMitmDataEntry]:
+        await self.__flush_updates()
+        request: WaitForLatestRequest = WaitForLatestRequest()
+        request.worker.name = worker
+        request.key = str(key)
+        if timestamp_earliest:
+            request.timestamp_earliest = int(timestamp_earliest)
+        request.timeout_ms = max(0, int(timeout * 1000))
+        # The server streams data as it arrives, only the first entry is of interest
+        call: UnaryStreamCall = self.WaitForLatest(request)
+        try:
+            response = await call.read()
+        except AioRpcError as e:
+            logger.warning("Failed waiting for latest data {}", e)
+            # Do not have callers retry right away while the server is unavailable
+            await asyncio.sleep(min(timeout, MadGlobals.application_args.wait_for_data_sleep_duration))
+            return None
+        finally:
+            call.cancel()
+        if response is EOF or not response.HasField("entry"):
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.__transform_proto_data_entry, response.entry)
+
     def __transform_proto_data_entry(self, entry: mitm_mapper_pb2.LatestMitmDataEntry) -> LatestMitmDataEntry:
         location: Optional[Location] = None
         if entry.location:
@@ -138,6 +197,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
 
     @cached(ttl=30)
     async def get_poke_stop_visits(self, worker: str) -> int:
+        await self.__flush_updates()
         request: Worker = Worker()
         request.name = worker
         try:
@@ -150,6 +210,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
 
     @cached(ttl=60)
     async def get_level(self, worker: str) -> int:
+        await self.__flush_updates()
         request: Worker = Worker()
         request.name = worker
         try:
@@ -161,6 +222,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             return self._level_cache.get(worker, 0)
 
     async def get_injection_status(self, worker: str) -> bool:
+        await self.__flush_updates()
         request: Worker = Worker()
         request.name = worker
         try:
@@ -175,6 +237,9 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         request: InjectedRequest = InjectedRequest()
         request.worker.name = worker
         request.injected.is_injected = status
+        if self.__batcher is not None:
+            self.__batcher.add(MitmMapperUpdate(injected=request))
+            return
         try:
             await self.SetInjected(request)
         except AioRpcError as e:
@@ -183,6 +248,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
             return
 
     async def get_last_known_location(self, worker: str) -> Optional[Location]:
+        await self.__flush_updates()
         request: Worker = Worker()
         request.name = worker
         try:
@@ -201,6 +267,9 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
         request.worker.name = worker
         if quests_held:
             request.quests_held.quest_ids.extend(quests_held)
+        if self.__batcher is not None:
+            self.__batcher.add(MitmMapperUpdate(quests_held=request))
+            return
         try:
             await self.SetQuestsHeld(request)
         except AioRpcError as e:
@@ -208,6 +277,7 @@ class MitmMapperClient(MitmMapperStub, AbstractMitmMapper):
 
     @cached(ttl=1)
     async def get_quests_held(self, worker: str) -> Optional[List[int]]:
+        await self.__flush_updates()
         request: Worker = Worker()
         request.name = worker
         try:
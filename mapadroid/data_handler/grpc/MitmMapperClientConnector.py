@@ -13,6 +13,8 @@ logger = get_logger(LoggerEnums.mitm_mapper)
 class MitmMapperClientConnector:
     def __init__(self):
         self._channel: Optional[grpc.Channel] = None
+        # Clients buffer updates, the same client is handed out to submit all of them on close
+        self._client: Optional[MitmMapperClient] = None
 
     async def start(self):
         max_message_length = 100 * 1024 * 1024
@@ -41,15 +43,18 @@ class MitmMapperClientConnector:
     async def get_client(self) -> MitmMapperClient:
         if not self._channel:
             await self.start()
-        return MitmMapperClient(self._channel)
+        if not self._client:
+            self._client = MitmMapperClient(self._channel)
+        return self._client
 
     async def close(self):
-        self._channel.close()
+        if self._client:
+            await self._client.shutdown()
+            self._client = None
+        await self._channel.close()
 
     async def __aenter__(self) -> MitmMapperClient:
-        if not self._channel:
-            await self.start()
-        return MitmMapperClient(self._channel)
+        return await self.get_client()
 
     async def __aexit__(self, type_, value, traceback):
         pass
@@ -1,5 +1,6 @@
 import asyncio
-from typing import List, Optional
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 import grpc
 from google.protobuf import json_format
@@ -13,8 +14,9 @@ from mapadroid.grpc.compiled.mitm_mapper.mitm_mapper_pb2 import (
     GetQuestsHeldResponse, InjectedRequest, InjectionStatus,
     LastKnownLocationResponse, LastMoved, LatestMitmDataEntryRequest,
     LatestMitmDataEntryResponse, LatestMitmDataEntryUpdateRequest,
-    LevelResponse, PokestopVisitsResponse, SetLevelRequest,
-    SetPokestopVisitsRequest, SetQuestsHeldRequest)
+    LevelResponse, MitmMapperUpdate, MitmMapperUpdateBatch,
+    PokestopVisitsResponse, SetLevelRequest, SetPokestopVisitsRequest,
+    SetQuestsHeldRequest, WaitForLatestRequest)
 from mapadroid.grpc.compiled.shared.Ack_pb2 import Ack
 from mapadroid.grpc.compiled.shared.Worker_pb2 import Worker
 from mapadroid.grpc.stubs.mitm_mapper.mitm_mapper_pb2_grpc import (
@@ -76,23 +78,56 @@ class MitmMapperServer(MitmMapperServicer, MitmMapper):
 
     async def UpdateLatest(self, request: LatestMitmDataEntryUpdateRequest,
                            context: grpc.aio.ServicerContext) -> Ack:
-        value = None
+        logger.debug("UpdateLatest called")
+        loop = asyncio.get_running_loop()
+        json_formatted = await loop.run_in_executor(None, self.__get_update_value, request)
+        await self.__apply_latest_update(request, json_formatted)
+        return Ack()
+
+    async def UpdateBatch(self, request: MitmMapperUpdateBatch, context: grpc.aio.ServicerContext) -> Ack:
+        logger.debug("UpdateBatch called with {} updates", len(request.updates))
+        latest_updates: List[LatestMitmDataEntryUpdateRequest] = [update.latest for update in request.updates
+                                                                  if update.HasField("latest")]
+        # Transform the data of all latest updates at once rather than passing every update to the executor
+        loop = asyncio.get_running_loop()
+        values: List[Union[List, Dict]] = await loop.run_in_executor(
+            None, lambda: [self.__get_update_value(latest_update) for latest_update in latest_updates])
+        values.reverse()
+        update: MitmMapperUpdate
+        for update in request.updates:
+            update_type: Optional[str] = update.WhichOneof("update")
+            if update_type == "latest":
+                await self.__apply_latest_update(update.latest, values.pop())
+            elif update_type == "quests_held":
+                await self.__apply_quests_held_update(update.quests_held)
+            elif update_type == "level":
+                await self.set_level(worker=update.level.worker.name, level=update.level.level)
+            elif update_type == "pokestop_visits":
+                await self.set_pokestop_visits(worker=update.pokestop_visits.worker.name,
+                                               pokestop_visits=update.pokestop_visits.pokestop_visits)
+            elif update_type == "injected":
+                await self.set_injection_status(worker=update.injected.worker.name,
+                                                status=update.injected.injected.is_injected)
+        return Ack()
+
+    @staticmethod
+    def __get_update_value(request: LatestMitmDataEntryUpdateRequest) -> Union[List, Dict]:
         if request.data.HasField("some_dictionary"):
             value = request.data.some_dictionary
         else:
             value = request.data.some_list
-        logger.debug("UpdateLatest called")
-        loop = asyncio.get_running_loop()
-        json_formatted = await loop.run_in_executor(None, json_format.MessageToDict, value)
+        return json_format.MessageToDict(value)
+
+    async def __apply_latest_update(self, request: LatestMitmDataEntryUpdateRequest,
+                                    value: Union[List, Dict]) -> None:
         await self.update_latest(
             worker=request.worker.name, key=request.key,
             timestamp_received_raw=request.data.timestamp_received,
             timestamp_received_receiver=request.data.timestamp_of_data_retrieval,
             location=Location(request.data.location.latitude,
                               request.data.location.longitude),
-            value=json_formatted
+            value=value
         )
-        return Ack()
 
     async def RequestLatest(self, request: LatestMitmDataEntryRequest,
                             context: grpc.aio.ServicerContext) -> LatestMitmDataEntryResponse:
@@ -108,6 +143,25 @@ class MitmMapperServer(MitmMapperServicer, MitmMapper):
             None, self.__transform_single_response, latest)
         return result
 
+    async def WaitForLatest(self, request: WaitForLatestRequest,
+                            context: grpc.aio.ServicerContext) -> AsyncIterator[LatestMitmDataEntryResponse]:
+        logger.debug("WaitForLatest called")
+        timestamp_earliest: Optional[int] = None
+        if request.HasField("timestamp_earliest"):
+            timestamp_earliest = request.timestamp_earliest
+        deadline: float = time.time() + request.timeout_ms / 1000
+        loop = asyncio.get_running_loop()
+        while True:
+            remaining: float = deadline - time.time()
+            if remaining <= 0:
+                return
+            latest: Optional[LatestMitmDataEntry] = await self.wait_for_latest(
+                request.worker.name, request.key, timestamp_earliest, remaining)
+            if not latest:
+                return
+            yield await loop.run_in_executor(None, self.__transform_single_response, latest)
+            timestamp_earliest = latest.timestamp_of_data_retrieval
+
     def __transform_single_response(self, latest):
         response: LatestMitmDataEntryResponse = LatestMitmDataEntryResponse()
         if not latest:
@@ -182,6 +236,10 @@ class MitmMapperServer(MitmMapperServicer, MitmMapper):
         return response
 
     async def SetQuestsHeld(self, request: SetQuestsHeldRequest, context: grpc.aio.ServicerContext) -> Ack:
+        await self.__apply_quests_held_update(request)
+        return Ack()
+
+    async def __apply_quests_held_update(self, request: SetQuestsHeldRequest) -> None:
         quests_held: Optional[List[int]] = None
         if request.HasField("quests_held"):
             quests_held = [quest_id for quest_id in request.quests_held.quest_ids]
@@ -0,0 +1,90 @@
+import asyncio
+from asyncio import Task
+from collections import deque
+from typing import Awaitable, Callable, Deque, Generic, List, Optional, TypeVar
+
+from mapadroid.utils.logging import LoggerEnums, get_logger
+
+logger = get_logger(LoggerEnums.system)
+
+T = TypeVar("T")
+
+
+class RpcBatcher(Generic[T]):
+    """
+    Buffers requests of gRPC clients to submit them in bulk once max_batch_size requests are buffered or the oldest
+    request buffered waited max_latency seconds. Requests are submitted in the order they were added.
+    At most max_buffered requests are held, the oldest ones are dropped if the server does not keep up.
+    """
+
+    def __init__(self, name: str, submit: Callable[[List[T]], Awaitable[None]], max_batch_size: int,
+                 max_latency: float, max_buffered: int):
+        self._name: str = name
+        self._submit: Callable[[List[T]], Awaitable[None]] = submit
+        self._max_batch_size: int = max(1, max_batch_size)
+        self._max_latency: float = max_latency
+        self._max_buffered: int = max(self._max_batch_size, max_buffered)
+        self._buffer: Deque[T] = deque()
+        self._pending: asyncio.Event = asyncio.Event()
+        self._full: asyncio.Event = asyncio.Event()
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+        self._flush_task: Optional[Task] = None
+        self._dropped: int = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def add(self, request: T) -> None:
+        if len(self._buffer) >= self._max_buffered:
+            self._buffer.popleft()
+            self._dropped += 1
+        self._buffer.append(request)
+        self._pending.set()
+        if len(self._buffer) >= self._max_batch_size:
+            self._full.set()
+        if not self._flush_task:
+            loop = asyncio.get_running_loop()
+            self._flush_task = loop.create_task(self.__flush_periodically())
+
+    async def __flush_periodically(self) -> None:
+        while True:
+            await self._pending.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self._max_latency)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Submits all requests buffered. Waits for a batch being submitted concurrently to be done even if nothing is
+        buffered anymore.
+        """
+        async with self._flush_lock:
+            if self._dropped:
+                logger.warning("Dropped {} {} requests as the buffer was full", self._dropped, self._name)
+                self._dropped = 0
+            while self._buffer:
+                batch: List[T] = [self._buffer.popleft()
+                                  for _ in range(min(self._max_batch_size, len(self._buffer)))]
+                if len(self._buffer) < self._max_batch_size:
+                    self._full.clear()
+                if not self._buffer:
+                    self._pending.clear()
+                logger.debug2("Submitting batch of {} {} requests", len(batch), self._name)
+                try:
+                    await self._submit(batch)
+                except Exception as e:
+                    logger.warning("Failed submitting batch of {} {} requests: {}", len(batch), self._name, e)
+
+    async def stop(self) -> None:
+        """
+        Stops flushing periodically and submits the requests still buffered
+        """
+        if self._flush_task:
+            flush_task: Task = self._flush_task
+            self._flush_task = None
+            # Do not cancel a batch being submitted
+            async with self._flush_lock:
+                flush_task.cancel()
+        await self.flush()
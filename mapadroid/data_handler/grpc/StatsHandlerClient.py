@@ -4,30 +4,50 @@ from typing import List, Optional
 from grpc.aio import AioRpcError
 from loguru import logger
 
+from mapadroid.data_handler.grpc.RpcBatcher import RpcBatcher
 from mapadroid.data_handler.stats.AbstractStatsHandler import \
     AbstractStatsHandler
-from mapadroid.grpc.compiled.stats_handler.stats_handler_pb2 import Stats
+from mapadroid.grpc.compiled.stats_handler.stats_handler_pb2 import (
+    Stats, StatsBatch)
 from mapadroid.grpc.stubs.stats_handler.stats_handler_pb2_grpc import \
     StatsHandlerStub
 from mapadroid.utils.collections import Location
-from mapadroid.utils.madGlobals import (MonSeenTypes, PositionType,
-                                        TransportType)
+from mapadroid.utils.madGlobals import (MadGlobals, MonSeenTypes,
+                                        PositionType, TransportType)
 from mapadroid.worker.WorkerType import WorkerType
 
 
 class StatsHandlerClient(StatsHandlerStub, AbstractStatsHandler):
     def __init__(self, channel):
         super().__init__(channel)
+        self.__batcher: Optional[RpcBatcher[Stats]] = None
+        if MadGlobals.application_args.grpc_batch_size > 1:
+            self.__batcher = RpcBatcher("stats", self.__submit_batch, MadGlobals.application_args.grpc_batch_size,
+                                        MadGlobals.application_args.grpc_batch_latency,
+                                        MadGlobals.application_args.grpc_batch_buffer)
+
+    async def shutdown(self) -> None:
+        if self.__batcher is not None:
+            await self.__batcher.stop()
+
+    async def __submit(self, request: Stats, description: str) -> None:
+        if self.__batcher is not None:
+            self.__batcher.add(request)
+            return
+        try:
+            await self.StatsCollect(request)
+        except AioRpcError as e:
+            logger.warning("Failed submitting {} {}", description, e)
+
+    async def __submit_batch(self, stats: List[Stats]) -> None:
+        await self.StatsCollectBatch(StatsBatch(stats=stats))
 
     async def stats_collect_wild_mon(self, worker: str, encounter_ids: List[int], time_scanned: datetime) -> None:
         request: Stats = Stats()
         request.worker.name = worker
         request.timestamp = int(time_scanned.timestamp())
         request.wild_mons.encounter_ids.extend(encounter_ids)
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting wild mon stats {}", e)
+        await self.__submit(request, "wild mon stats")
 
     async def stats_collect_mon_iv(self, worker: str, encounter_id: int, time_scanned: datetime,
                                    is_shiny: bool) -> None:
@@ -36,30 +56,21 @@ class StatsHandlerClient(StatsHandlerStub, AbstractStatsHandler):
         request.timestamp = int(time_scanned.timestamp())
         request.mon_iv.encounter_id = encounter_id
         request.mon_iv.is_shiny = is_shiny
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting mon IV stats {}", e)
+        await self.__submit(request, "mon IV stats")
 
     async def stats_collect_quest(self, worker: str, time_scanned: datetime) -> None:
         request: Stats = Stats()
         request.worker.name = worker
         request.timestamp = int(time_scanned.timestamp())
         request.quest.SetInParent()
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting quest stats {}", e)
+        await self.__submit(request, "quest stats")
 
     async def stats_collect_raid(self, worker: str, time_scanned: datetime, amount: int = 1) -> None:
         request: Stats = Stats()
         request.worker.name = worker
         request.timestamp = int(time_scanned.timestamp())
         request.raid.amount = amount
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting raid stats {}", e)
+        await self.__submit(request, "raid stats")
 
     async def stats_collect_location_data(self, worker: str, location: Optional[Location], success: bool, fix_timestamp: int,
                                           position_type: PositionType, data_timestamp: int, walker: WorkerType,
@@ -77,10 +88,7 @@ class StatsHandlerClient(StatsHandlerStub, AbstractStatsHandler):
         # TODO: Probably gotta set it some other way...
         request.location_data.position_type = position_type.value
         request.location_data.transport_type = transport_type.value
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting location data {}", e)
+        await self.__submit(request, "location data")
 
     async def stats_collect_seen_type(self, encounter_ids: List[int], type_of_detection: MonSeenTypes,
                                       time_of_scan: datetime) -> None:
@@ -89,7 +97,4 @@ class StatsHandlerClient(StatsHandlerStub, AbstractStatsHandler):
         request.seen_type.encounter_ids.extend(encounter_ids)
         # TODO: Probably gotta set it some other way...
         request.seen_type.type_of_detection = type_of_detection.value
-        try:
-            await self.StatsCollect(request)
-        except AioRpcError as e:
-            logger.warning("Failed submitting seen type stats {}", e)
+        await self.__submit(request, "seen type stats")
@@ -6,7 +6,8 @@ from grpc._cython.cygrpc import CompressionAlgorithm, CompressionLevel
 from mapadroid.data_handler.stats.StatsHandler import StatsHandler
 from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.grpc.compiled.shared.Ack_pb2 import Ack
-from mapadroid.grpc.compiled.stats_handler.stats_handler_pb2 import Stats
+from mapadroid.grpc.compiled.stats_handler.stats_handler_pb2 import (
+    Stats, StatsBatch)
 from mapadroid.grpc.stubs.stats_handler.stats_handler_pb2_grpc import (
     StatsHandlerServicer, add_StatsHandlerServicer_to_server)
 from mapadroid.utils.collections import Location
@@ -66,6 +67,16 @@ class StatsHandlerServer(StatsHandlerServicer, StatsHandler):
 
     async def StatsCollect(self, request: Stats, context: grpc.aio.ServicerContext) -> Ack:
         logger.debug("StatsCollect called")
+        await self.__collect(request)
+        return Ack()
+
+    async def StatsCollectBatch(self, request: StatsBatch, context: grpc.aio.ServicerContext) -> Ack:
+        logger.debug("StatsCollectBatch called with {} stats", len(request.stats))
+        for stats in request.stats:
+            await self.__collect(stats)
+        return Ack()
+
+    async def __collect(self, request: Stats) -> None:
         # depending on the data_to_collect we need to parse fields..
         if request.HasField("wild_mons"):
             await self.stats_collect_wild_mon(
@@ -106,4 +117,3 @@ class StatsHandlerServer(StatsHandlerServicer, StatsHandler):
                 encounter_ids=request.seen_type.encounter_ids,
                 type_of_detection=MonSeenTypes(request.seen_type.type_of_detection),
                 time_of_scan=DatetimeWrapper.fromtimestamp(request.timestamp))
-        return Ack()
@@ -1,9 +1,12 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Union
 
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
 from mapadroid.utils.collections import Location
+from mapadroid.utils.madGlobals import MadGlobals
 
 
 class AbstractMitmMapper(ABC):
@@ -25,6 +28,29 @@ class AbstractMitmMapper(ABC):
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
         pass
 
+    async def wait_for_latest(self, worker: str, key: str, timestamp_earliest: Optional[int],
+                              timeout: float) -> Optional[LatestMitmDataEntry]:
+        """
+        Waits for data of the given key received after timestamp_earliest. Returns immediately if such data is
+        present already.
+        Mappers should override this to wake waiters once data arrives, this default implementation polls
+        request_latest.
+        Args:
+            worker:
+            key:
+            timestamp_earliest: Only data retrieved after this timestamp is returned
+            timeout: Maximum seconds to wait for
+
+        Returns: The latest data or None if no data was received in time
+        """
+        deadline: float = time.time() + timeout
+        while True:
+            latest: Optional[LatestMitmDataEntry] = await self.request_latest(worker, key, timestamp_earliest)
+            remaining: float = deadline - time.time()
+            if latest is not None or remaining <= 0:
+                return latest
+            await asyncio.sleep(min(remaining, MadGlobals.application_args.wait_for_data_sleep_duration))
+
     @abstractmethod
     async def get_poke_stop_visits(self, worker: str) -> int:
         pass
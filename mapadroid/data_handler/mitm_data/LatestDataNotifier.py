@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Waiter:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop: asyncio.AbstractEventLoop = loop
+        self.event: asyncio.Event = asyncio.Event()
+
+
+class LatestDataNotifier:
+    """
+    Wakes coroutines waiting for latest data of a worker and key once the data has been updated.
+    notify may be called from any thread (e.g. executors updating the latest data).
+    """
+
+    def __init__(self):
+        self.__waiters: Dict[Tuple[str, str], Set[_Waiter]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def notify(self, worker: str, key: str) -> None:
+        with self.__lock:
+            waiters: List[_Waiter] = list(self.__waiters.get((worker, str(key)), ()))
+        for waiter in waiters:
+            if waiter.loop.is_closed():
+                continue
+            waiter.loop.call_soon_threadsafe(waiter.event.set)
+
+    async def wait(self, worker: str, key: str, check: Callable[[], Awaitable[Optional[T]]],
+                   timeout: float) -> Optional[T]:
+        """
+        Calls check once immediately and again whenever data of worker and key has been updated until check returns
+        a value or timeout seconds passed.
+        Returns: The value returned by check or None on timeout
+        """
+        waiter: _Waiter = _Waiter(asyncio.get_running_loop())
+        waiter_key: Tuple[str, str] = (worker, str(key))
+        # Register before checking to not miss updates arriving in between
+        with self.__lock:
+            self.__waiters.setdefault(waiter_key, set()).add(waiter)
+        deadline: float = time.monotonic() + timeout
+        try:
+            while True:
+                waiter.event.clear()
+                result: Optional[T] = await check()
+                remaining: float = deadline - time.monotonic()
+                if result is not None or remaining <= 0:
+                    return result
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return await check()
+        finally:
+            with self.__lock:
+                waiters: Optional[Set[_Waiter]] = self.__waiters.get(waiter_key)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self.__waiters[waiter_key]
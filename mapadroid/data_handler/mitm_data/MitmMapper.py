@@ -3,6 +3,8 @@ from typing import Dict, List, Optional, Union
 
 from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
     AbstractMitmMapper
+from mapadroid.data_handler.mitm_data.LatestDataNotifier import \
+    LatestDataNotifier
 from mapadroid.data_handler.mitm_data.MitmDataHandler import MitmDataHandler
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
@@ -12,6 +14,7 @@ from mapadroid.utils.collections import Location
 class MitmMapper(AbstractMitmMapper):
     def __init__(self):
         self._mitm_data_handler: MitmDataHandler = MitmDataHandler()
+        self._latest_data_notifier: LatestDataNotifier = LatestDataNotifier()
 
     # ##
     # Data related methods
@@ -23,13 +26,19 @@ class MitmMapper(AbstractMitmMapper):
                             timestamp_received_raw: float = None,
                             timestamp_received_receiver: float = None, location: Location = None) -> None:
         loop = asyncio.get_running_loop()
-        loop.run_in_executor(None, self._mitm_data_handler.update_latest, worker, key, value, timestamp_received_raw,
-                             timestamp_received_receiver, location)
+        update = loop.run_in_executor(None, self._mitm_data_handler.update_latest, worker, key, value,
+                                      timestamp_received_raw, timestamp_received_receiver, location)
+        update.add_done_callback(lambda _: self._latest_data_notifier.notify(worker, key))
 
     async def request_latest(self, worker: str, key: str,
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
         return self._mitm_data_handler.request_latest(worker, key, timestamp_earliest)
 
+    async def wait_for_latest(self, worker: str, key: str, timestamp_earliest: Optional[int],
+                              timeout: float) -> Optional[LatestMitmDataEntry]:
+        return await self._latest_data_notifier.wait(
+            worker, key, lambda: self.request_latest(worker, key, timestamp_earliest), timeout)
+
     async def get_poke_stop_visits(self, worker: str) -> int:
         return await self._mitm_data_handler.get_poke_stop_visits(worker)
 
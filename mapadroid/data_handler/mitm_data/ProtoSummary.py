@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional, Tuple
+
+from mapadroid.utils.ProtoIdentifier import ProtoIdentifier
+
+# Keys of the protos read by the worker strategies. The summaries keep the layout of the payload so the strategies
+# can evaluate the summary just like the full payload.
+_FORT_KEYS: Tuple[str, ...] = ("id", "latitude", "longitude", "type", "visited", "enabled", "closed",
+                               "cooldown_complete_ms")
+_WILD_MON_KEYS: Tuple[str, ...] = ("encounter_id", "spawnpoint_id", "latitude", "longitude")
+
+
+def _pick(source: Dict, keys: Tuple[str, ...]) -> Dict:
+    return {key: source[key] for key in keys if key in source}
+
+
+def _summarize_mon_data(pokemon_data: Optional[Dict]) -> Dict:
+    if not pokemon_data:
+        return {}
+    summary: Dict = _pick(pokemon_data, ("id",))
+    display: Optional[Dict] = pokemon_data.get("display")
+    if display and "weather_boosted_value" in display:
+        summary["display"] = {"weather_boosted_value": display["weather_boosted_value"]}
+    return summary
+
+
+def _summarize_wild_mon(wild_mon: Dict) -> Dict:
+    summary: Dict = _pick(wild_mon, _WILD_MON_KEYS)
+    if "pokemon_data" in wild_mon:
+        summary["pokemon_data"] = _summarize_mon_data(wild_mon["pokemon_data"])
+    return summary
+
+
+def _summarize_gmo(payload: Dict) -> Dict:
+    cells: List[Dict] = []
+    for cell in payload.get("cells", None) or []:
+        cells.append({
+            "id": cell.get("id"),
+            "forts": [_pick(fort, _FORT_KEYS) for fort in cell.get("forts", None) or []],
+            "wild_pokemon": [_summarize_wild_mon(wild_mon) for wild_mon in cell.get("wild_pokemon", None) or []],
+            "nearby_pokemon": [_pick(nearby_mon, ("encounter_id",))
+                               for nearby_mon in cell.get("nearby_pokemon", None) or []]
+        })
+    return {"cells": cells}
+
+
+def _summarize_fort_search(payload: Dict) -> Dict:
+    summary: Dict = _pick(payload, ("result", "fort_id"))
+    # Only the amount of items awarded is of interest
+    summary["items_awarded"] = [{} for _ in payload.get("items_awarded", None) or []]
+    quest: Optional[Dict] = (payload.get("challenge_quest", None) or {}).get("quest", None)
+    if quest is not None:
+        summary["challenge_quest"] = {"quest": _pick(quest, ("quest_type",))}
+    return summary
+
+
+def _summarize_encounter(payload: Dict) -> Dict:
+    summary: Dict = _pick(payload, ("status",))
+    if "wild_pokemon" in payload:
+        summary["wild_pokemon"] = _summarize_wild_mon(payload["wild_pokemon"])
+    return summary
+
+
+def _summarize_fort_details(payload: Dict) -> Dict:
+    return _pick(payload, ("id", "type", "latitude", "longitude"))
+
+
+_SUMMARIZERS = {
+    ProtoIdentifier.GMO.value: _summarize_gmo,
+    ProtoIdentifier.FORT_SEARCH.value: _summarize_fort_search,
+    ProtoIdentifier.ENCOUNTER.value: _summarize_encounter,
+    ProtoIdentifier.FORT_DETAILS.value: _summarize_fort_details,
+}
+
+
+def summarize_proto(proto_type: int, payload: Dict) -> Dict:
+    """
+    Reduces the payload of a proto to the data the worker strategies evaluate (cell IDs, forts and their state, wild
+    mons to be encountered, encounter IDs, fort search results, fort types) to be stored as latest data rather than
+    the full payload.
+    Returns: Summary of the payload in the layout of the payload. Empty for protos not evaluated by the strategies.
+    """
+    summarizer = _SUMMARIZERS.get(int(proto_type))
+    if summarizer is None or not payload:
+        return {}
+    return summarizer(payload)
@@ -1,24 +1,72 @@
+import asyncio
 import time
-from typing import Dict, List, Optional, Union
+import uuid
+from asyncio import Task
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import ujson
 from aiocache import cached
+from cachetools import TTLCache
 from redis import Redis
+from redis.commands.core import AsyncScript
 from loguru import logger
 
 from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
     AbstractMitmMapper
+from mapadroid.data_handler.mitm_data.LatestDataNotifier import \
+    LatestDataNotifier
 from mapadroid.data_handler.mitm_data.holder.latest_mitm_data.LatestMitmDataEntry import \
     LatestMitmDataEntry
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.utils.madConstants import (MITM_MAPPER_LOCAL_CACHE_SIZE,
+                                          MITM_MAPPER_LOCAL_CACHE_TTL)
 from mapadroid.utils.ProtoIdentifier import ProtoIdentifier
 from mapadroid.utils.collections import Location
 
+# Compares the timestamp of the latest data known with the one of the update and replaces the entry only if the update
+# is not older, all in a single round trip. Publishes the update for waiters.
+# In case of GMOs the cell IDs are compared to the previous ones to update the time the worker possibly moved, the
+# location and injection status are set and an invalidation of the cached values is published.
+# KEYS: latest data, [last cell IDs, last possibly moved, last known location, is injected]
+# ARGV: timestamp of data retrieval, entry, updates channel, [cell IDs, timestamp received, location,
+#       invalidation channel, location invalidation, injection invalidation]
+UPDATE_LATEST_SCRIPT = """
+local updated = 0
+local known = redis.call('HGET', KEYS[1], 'timestamp')
+if not known or tonumber(known) <= tonumber(ARGV[1]) then
+    redis.call('HSET', KEYS[1], 'timestamp', ARGV[1], 'entry', ARGV[2])
+    redis.call('PUBLISH', ARGV[3], ARGV[1])
+    updated = 1
+end
+if #KEYS > 1 then
+    if ARGV[4] ~= '' then
+        if redis.call('GET', KEYS[2]) ~= ARGV[4] then
+            redis.call('SET', KEYS[2], ARGV[4])
+            redis.call('SET', KEYS[3], ARGV[5])
+        end
+        if ARGV[6] ~= '' then
+            redis.call('SET', KEYS[4], ARGV[6])
+            redis.call('PUBLISH', ARGV[7], ARGV[8])
+        end
+    end
+    redis.call('SET', KEYS[5], 1)
+    redis.call('PUBLISH', ARGV[7], ARGV[9])
+end
+return updated
+"""
+
+# Marks values not present in the local cache (None being a valid value)
+_NOT_CACHED = object()
+
 
 class RedisMitmMapper(AbstractMitmMapper):
     LAST_POSSIBLY_MOVED_KEY = "last_possibly_moved:{}"
-    # latest_data:{worker}:{data_key}
-    LATEST_DATA_KEY = "latest_data:{}:{}"
+    # Hash of the timestamp of data retrieval and the entry: latest_mitm_data:{worker}:{data_key}
+    LATEST_DATA_KEY = "latest_mitm_data:{}:{}"
+    # Channel updates of latest data are published to: latest_data_updates:{worker}:{data_key}
+    LATEST_DATA_UPDATES_CHANNEL = "latest_data_updates:{}:{}"
+    # Channel changes of the values cached locally are published to as {instance}:{field}:{worker}
+    CACHE_INVALIDATION_CHANNEL = "mitm_mapper_invalidation"
     # latest_data:{worker}
     LAST_KNOWN_LOCATION_KEY = "last_known_location:{}"
     # injected:{worker}
@@ -32,12 +80,122 @@ class RedisMitmMapper(AbstractMitmMapper):
     # quests_held:{worker}
     QUESTS_HELD_KEY = "quests_held:{}"
 
+    # Fields of the values cached locally
+    CACHED_LEVEL = "level"
+    CACHED_LOCATION = "location"
+    CACHED_INJECTION_STATUS = "injected"
+
     def __init__(self, db_wrapper: DbWrapper):
         self.__db_wrapper: DbWrapper = db_wrapper
         self.__cache: Optional[Redis] = None
+        self.__update_latest_script: Optional[AsyncScript] = None
+        self.__latest_data_notifier: LatestDataNotifier = LatestDataNotifier()
+        self.__updates_listener_task: Optional[Task] = None
+        self.__invalidation_listener_task: Optional[Task] = None
+        # Identifies invalidations published by this instance
+        self.__instance_id: str = uuid.uuid4().hex
+        # (field, worker) -> value. Only used while invalidations are being received.
+        self.__local_cache: TTLCache = TTLCache(maxsize=MITM_MAPPER_LOCAL_CACHE_SIZE,
+                                                ttl=MITM_MAPPER_LOCAL_CACHE_TTL)
+        self.__listening: bool = False
 
     async def start(self):
         self.__cache: Redis = await self.__db_wrapper.get_cache()
+        self.__update_latest_script = self.__cache.register_script(UPDATE_LATEST_SCRIPT)
+
+    async def shutdown(self):
+        if self.__updates_listener_task:
+            self.__updates_listener_task.cancel()
+            self.__updates_listener_task = None
+        if self.__invalidation_listener_task:
+            self.__invalidation_listener_task.cancel()
+            self.__invalidation_listener_task = None
+        self.__listening = False
+        self.__local_cache.clear()
+
+    def __start_listening_for_updates(self) -> None:
+        if not self.__updates_listener_task:
+            loop = asyncio.get_running_loop()
+            self.__updates_listener_task = loop.create_task(self.__listen_for_updates())
+
+    def __start_listening_for_invalidations(self) -> None:
+        if not self.__invalidation_listener_task:
+            loop = asyncio.get_running_loop()
+            self.__invalidation_listener_task = loop.create_task(self.__listen_for_invalidations())
+
+    async def __listen_for_updates(self):
+        """
+        Forwards updates of latest data published by any RedisMitmMapper (e.g. those of MITMReceivers) to the waiters
+        of this instance. Only started once latest data is waited for as every update of every worker is received.
+        """
+        pattern: str = RedisMitmMapper.LATEST_DATA_UPDATES_CHANNEL.format("*", "*")
+        while True:
+            try:
+                async with self.__cache.pubsub() as pubsub:
+                    await pubsub.psubscribe(pattern)
+                    async for message in pubsub.listen():
+                        if message.get("type") != "pmessage":
+                            continue
+                        channel = message["channel"]
+                        if isinstance(channel, bytes):
+                            channel = channel.decode()
+                        worker, _, key = channel.split(":", 1)[1].rpartition(":")
+                        self.__latest_data_notifier.notify(worker, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Listening for updates of latest data failed: {}", e)
+                await asyncio.sleep(1)
+
+    async def __listen_for_invalidations(self):
+        """
+        Drops values of the local cache changed by other instances
+        """
+        while True:
+            try:
+                async with self.__cache.pubsub() as pubsub:
+                    await pubsub.subscribe(RedisMitmMapper.CACHE_INVALIDATION_CHANNEL)
+                    self.__listening = True
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.__handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Listening for invalidations of cached values failed: {}", e)
+                await asyncio.sleep(1)
+            finally:
+                # Invalidations may be missed until subscribed again
+                self.__listening = False
+                self.__local_cache.clear()
+
+    def __handle_invalidation(self, data: Union[bytes, str]) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        instance_id, field, worker = data.split(":", 2)
+        if instance_id != self.__instance_id:
+            self.__local_cache.pop((field, worker), None)
+
+    def __get_locally_cached(self, field: str, worker: str) -> Any:
+        if not self.__listening:
+            self.__start_listening_for_invalidations()
+            return _NOT_CACHED
+        return self.__local_cache.get((field, worker), _NOT_CACHED)
+
+    def __set_locally_cached(self, field: str, worker: str, value: Any) -> None:
+        if self.__listening:
+            self.__local_cache[(field, worker)] = value
+
+    def __get_invalidation(self, field: str, worker: str) -> str:
+        return "{}:{}:{}".format(self.__instance_id, field, worker)
+
+    async def __set_and_invalidate(self, field: str, worker: str, key: str, value: Union[bytes, int, str]) -> None:
+        # Dropped before the value is written as reads of other connections may see the invalidation only later
+        self.__local_cache.pop((field, worker), None)
+        async with self.__cache.pipeline(transaction=True) as pipe:
+            pipe.set(key, value)
+            pipe.publish(RedisMitmMapper.CACHE_INVALIDATION_CHANNEL, self.__get_invalidation(field, worker))
+            await pipe.execute()
 
     # ##
     # Data related methods
@@ -53,43 +211,52 @@ class RedisMitmMapper(AbstractMitmMapper):
             timestamp_received_raw = int(time.time())
         if timestamp_received_receiver is None:
             timestamp_received_receiver = int(time.time())
-        latest_entry: Optional[LatestMitmDataEntry] = await self.request_latest(worker, key)
-        if (latest_entry and latest_entry.timestamp_received
-                and (not timestamp_received_receiver
-                     or latest_entry.timestamp_of_data_retrieval > timestamp_received_receiver)):
-            # Ignore update as it yields an older timestamp than the one known to us
+        mitm_data_entry: LatestMitmDataEntry = LatestMitmDataEntry(location, timestamp_received_raw,
+                                                                   timestamp_received_receiver, value)
+        keys: List[str] = [RedisMitmMapper.LATEST_DATA_KEY.format(worker, key)]
+        args: List[Union[bytes, int, str]] = [int(timestamp_received_receiver), await mitm_data_entry.to_json(),
+                                              RedisMitmMapper.LATEST_DATA_UPDATES_CHANNEL.format(worker, key)]
+        is_gmo: bool = key == str(ProtoIdentifier.GMO.value)
+        if is_gmo:
+            cell_ids, location_json = self.__get_gmo_location_args(value, location)
+            keys.extend((RedisMitmMapper.LAST_CELL_IDS_KEY.format(worker),
+                         RedisMitmMapper.LAST_POSSIBLY_MOVED_KEY.format(worker),
+                         RedisMitmMapper.LAST_KNOWN_LOCATION_KEY.format(worker),
+                         RedisMitmMapper.IS_INJECTED_KEY.format(worker)))
+            args.extend((cell_ids, int(timestamp_received_raw), location_json,
+                         RedisMitmMapper.CACHE_INVALIDATION_CHANNEL,
+                         self.__get_invalidation(RedisMitmMapper.CACHED_LOCATION, worker),
+                         self.__get_invalidation(RedisMitmMapper.CACHED_INJECTION_STATUS, worker)))
+            # Dropped before the values are written as reads of other connections may see the invalidations only
+            # later
+            self.__local_cache.pop((RedisMitmMapper.CACHED_LOCATION, worker), None)
+            self.__local_cache.pop((RedisMitmMapper.CACHED_INJECTION_STATUS, worker), None)
+        try:
+            await self.__update_latest_script(keys=keys, args=args)
+        except Exception as e:
+            logger.exception(e)
             return
-        else:
-            mitm_data_entry: LatestMitmDataEntry = LatestMitmDataEntry(location, timestamp_received_raw,
-                                                                       timestamp_received_receiver, value)
-            json_data: bytes = await mitm_data_entry.to_json()
-            try:
-                await self.__cache.set(RedisMitmMapper.LATEST_DATA_KEY.format(worker, key), json_data)
-            except Exception as e:
-                logger.exception(e)
-        if key == str(ProtoIdentifier.GMO.value):
-            await self.__parse_gmo_for_location(worker, value, timestamp_received_raw, location)
-            await self.__cache.set(RedisMitmMapper.IS_INJECTED_KEY.format(worker), 1)
-
-    async def __parse_gmo_for_location(self, worker: str, gmo_payload: Dict, timestamp: int,
-                                       location: Optional[Location]):
-        cells = gmo_payload.get("cells", None)
+        if is_gmo:
+            if location_json:
+                self.__set_locally_cached(RedisMitmMapper.CACHED_LOCATION, worker, location)
+            self.__set_locally_cached(RedisMitmMapper.CACHED_INJECTION_STATUS, worker, True)
+
+    @staticmethod
+    def __get_gmo_location_args(gmo_payload: Dict, location: Optional[Location]) -> Tuple[str, Union[bytes, str]]:
+        """
+        Returns: The cell IDs of the GMO (sorted to compare the sets of cell IDs as strings) and the location to be set,
+        both empty if the GMO does not contain any cells
+        """
+        cells = gmo_payload.get("cells", None) if gmo_payload else None
         if not cells:
-            return
-        cell_ids: List[int] = [cell['id'] for cell in cells]
-        last_cell_ids_raw: Optional[str] = await self.__cache.get(RedisMitmMapper.LAST_CELL_IDS_KEY.format(worker))
-        last_cell_ids: List[int] = []
-        if last_cell_ids_raw:
-            last_cell_ids: List[int] = ujson.loads(last_cell_ids_raw)
-        if set(cell_ids) != set(last_cell_ids):
-            await self.__cache.set(RedisMitmMapper.LAST_CELL_IDS_KEY.format(worker), ujson.dumps(cell_ids))
-            await self.__cache.set(RedisMitmMapper.LAST_POSSIBLY_MOVED_KEY.format(worker), timestamp)
-        if location:
-            await self.__cache.set(RedisMitmMapper.LAST_KNOWN_LOCATION_KEY.format(worker), location.to_json())
+            return "", ""
+        cell_ids: List[int] = sorted({cell['id'] for cell in cells})
+        return ujson.dumps(cell_ids), location.to_json() if location else ""
 
     async def request_latest(self, worker: str, key: str,
                              timestamp_earliest: Optional[int] = None) -> Optional[LatestMitmDataEntry]:
-        latest_data: Optional[str] = await self.__cache.get(RedisMitmMapper.LATEST_DATA_KEY.format(worker, key))
+        latest_data: Optional[bytes] = await self.__cache.hget(RedisMitmMapper.LATEST_DATA_KEY.format(worker, key),
+                                                               "entry")
         if not latest_data:
             return None
         latest_entry: Optional[LatestMitmDataEntry] = await LatestMitmDataEntry.from_json(latest_data)
@@ -99,36 +266,60 @@ class RedisMitmMapper(AbstractMitmMapper):
         else:
             return latest_entry
 
+    async def wait_for_latest(self, worker: str, key: str, timestamp_earliest: Optional[int],
+                              timeout: float) -> Optional[LatestMitmDataEntry]:
+        self.__start_listening_for_updates()
+        return await self.__latest_data_notifier.wait(
+            worker, key, lambda: self.request_latest(worker, key, timestamp_earliest), timeout)
+
     async def get_poke_stop_visits(self, worker: str) -> int:
         pokestops_visited: Optional[int] = await self.__cache.get(RedisMitmMapper.POKESTOPS_VISITED_KEY.format(worker))
         return int(pokestops_visited) if pokestops_visited else 0
 
-    @cached(ttl=30)
     async def get_level(self, worker: str) -> int:
-        level: Optional[int] = await self.__cache.get(RedisMitmMapper.LEVEL_KEY.format(worker))
-        return int(level) if level else 0
+        cached_level = self.__get_locally_cached(RedisMitmMapper.CACHED_LEVEL, worker)
+        if cached_level is not _NOT_CACHED:
+            return cached_level
+        level_raw: Optional[bytes] = await self.__cache.get(RedisMitmMapper.LEVEL_KEY.format(worker))
+        level: int = int(level_raw) if level_raw else 0
+        self.__set_locally_cached(RedisMitmMapper.CACHED_LEVEL, worker, level)
+        return level
 
     async def get_injection_status(self, worker: str) -> bool:
+        cached_status = self.__get_locally_cached(RedisMitmMapper.CACHED_INJECTION_STATUS, worker)
+        if cached_status is not _NOT_CACHED:
+            return cached_status
         is_injected: Optional[bytes] = await self.__cache.get(RedisMitmMapper.IS_INJECTED_KEY.format(worker))
-        return is_injected and int(is_injected) == 1
+        status: bool = bool(is_injected) and int(is_injected) == 1
+        self.__set_locally_cached(RedisMitmMapper.CACHED_INJECTION_STATUS, worker, status)
+        return status
 
     async def set_injection_status(self, worker: str, status: bool) -> None:
-        await self.__cache.set(RedisMitmMapper.IS_INJECTED_KEY.format(worker), 1 if status else 0)
+        await self.__set_and_invalidate(RedisMitmMapper.CACHED_INJECTION_STATUS, worker,
+                                        RedisMitmMapper.IS_INJECTED_KEY.format(worker), 1 if status else 0)
+        self.__set_locally_cached(RedisMitmMapper.CACHED_INJECTION_STATUS, worker, status)
 
     async def get_last_known_location(self, worker: str) -> Optional[Location]:
+        cached_location = self.__get_locally_cached(RedisMitmMapper.CACHED_LOCATION, worker)
+        if cached_location is not _NOT_CACHED:
+            return cached_location
         last_known_location_raw: Optional[str] = await self.__cache.get(
             RedisMitmMapper.LAST_KNOWN_LOCATION_KEY.format(worker))
-        if not last_known_location_raw:
-            return None
-        try:
-            last_known_location: Location = Location.from_json(last_known_location_raw)
-        except Exception as e:
-            return None
+        last_known_location: Optional[Location] = None
+        if last_known_location_raw:
+            try:
+                last_known_location = Location.from_json(last_known_location_raw)
+            except Exception:
+                return None
+        self.__set_locally_cached(RedisMitmMapper.CACHED_LOCATION, worker, last_known_location)
         return last_known_location
 
-    @cached(ttl=30)
     async def set_level(self, worker: str, level: int) -> None:
-        await self.__cache.set(RedisMitmMapper.LEVEL_KEY.format(worker), level)
+        if self.__get_locally_cached(RedisMitmMapper.CACHED_LEVEL, worker) == level:
+            return
+        await self.__set_and_invalidate(RedisMitmMapper.CACHED_LEVEL, worker,
+                                        RedisMitmMapper.LEVEL_KEY.format(worker), level)
+        self.__set_locally_cached(RedisMitmMapper.CACHED_LEVEL, worker, level)
 
     async def set_pokestop_visits(self, worker: str, pokestop_visits: int) -> None:
         await self.__cache.set(RedisMitmMapper.POKESTOPS_VISITED_KEY.format(worker), pokestop_visits)
@@ -35,7 +35,7 @@ class PlayerStats(AbstractStatsHolder):
             self._wild_mon_stats_holder: WildMonStatsHolder = WildMonStatsHolder(self._worker)
             self._stats_location_raw_holder: StatsLocationRawHolder = StatsLocationRawHolder(self._worker)
 
-    async def submit(self, session: AsyncSession) -> None:
+    async def submit(self, session: AsyncSession) -> int:
         holders_to_submit: List[AbstractStatsHolder] = [self._stats_detect_holder, self._stats_location_holder]
         if self._wild_mon_stats_holder:
             holders_to_submit.append(self._wild_mon_stats_holder)
@@ -47,15 +47,17 @@ class PlayerStats(AbstractStatsHolder):
         del self._stats_location_raw_holder
         self.__init_holders()
 
+        submitted: int = 0
         for holder in holders_to_submit:
             async with session.begin_nested() as nested:
                 try:
-                    await holder.submit(session)
+                    submitted += await holder.submit(session)
                     await nested.commit()
                 except Exception as e:
                     await nested.rollback()
                     logger.warning("Failed submitting stats: {}", e)
         del holders_to_submit
+        return submitted
 
     def stats_collect_wild_mon(self, encounter_id: int, time_scanned: datetime):
         if self._wild_mon_stats_holder:
@@ -1,8 +1,9 @@
 import asyncio
 import time
 from asyncio import Task
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,9 +21,10 @@ from mapadroid.db.helper.TrsStatsDetectWildMonRawHelper import \
 from mapadroid.db.helper.TrsStatsLocationHelper import TrsStatsLocationHelper
 from mapadroid.db.helper.TrsStatsLocationRawHelper import \
     TrsStatsLocationRawHelper
-from mapadroid.utils.collections import Location
+from mapadroid.utils.collections import Location, StatsFlushMetrics
 from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import STATS_FLUSH_DURATION_SAMPLES
 from mapadroid.utils.madGlobals import (MadGlobals, MonSeenTypes, PositionType,
                                         TransportType)
 from mapadroid.worker.WorkerType import WorkerType
@@ -40,6 +42,10 @@ class StatsHandler(AbstractStatsHandler):
         self.__db_wrapper = db_wrapper
         self.__submission_loop_task: Optional[Task] = None
         self.__stats_detect_seen_type_holder: Optional[StatsDetectSeenTypeHolder] = None
+        self.__flushes: int = 0
+        self.__failed_flushes: int = 0
+        self.__last_flush_rows: int = 0
+        self.__flush_durations: Deque[float] = deque(maxlen=STATS_FLUSH_DURATION_SAMPLES)
         self.__init_stats_holders()
 
     async def start(self):
@@ -107,15 +113,26 @@ class StatsHandler(AbstractStatsHandler):
 
     async def __run_stats_processing(self):
         logger.info("Running stats processing")
+        start: float = time.perf_counter()
         async with self.__db_wrapper as session, session:
             try:
-                await self.__process_stats(session)
+                rows: int = await self.__process_stats(session)
                 await session.commit()
             except Exception as e:
                 logger.exception(e)
                 await session.rollback()
-
-    async def __process_stats(self, session: AsyncSession):
+                self.__failed_flushes += 1
+                return
+        duration: float = time.perf_counter() - start
+        self.__flushes += 1
+        self.__last_flush_rows = rows
+        self.__flush_durations.append(duration)
+        metrics: StatsFlushMetrics = self.get_flush_metrics()
+        logger.info("Submitted {} rows of stats in {:.2f}s ({} flushes, {} failed, avg {:.2f}s max {:.2f}s)",
+                    metrics.last_rows, metrics.last_duration, metrics.flushes, metrics.failed, metrics.avg_duration,
+                    metrics.max_duration)
+
+    async def __process_stats(self, session: AsyncSession) -> int:
         logger.info('Submitting stats')
         submittable_stats: List[AbstractStatsHolder] = []
         if self.__stats_detect_seen_type_holder:
@@ -123,12 +140,25 @@ class StatsHandler(AbstractStatsHandler):
             self.__stats_detect_seen_type_holder = None
         submittable_stats.extend(self.__worker_stats.values())
         self.__worker_stats = None
+        # Holders are swapped before submitting anything, stats collected meanwhile end up in the new holders
         self.__init_stats_holders()
+        rows: int = 0
         for submittable in submittable_stats:
-            await submittable.submit(session)
+            rows += await submittable.submit(session)
 
         await self.__cleanup_stats(session)
         logger.info("Done submitting stats")
+        return rows
+
+    def get_flush_metrics(self) -> StatsFlushMetrics:
+        durations: List[float] = list(self.__flush_durations)
+        return StatsFlushMetrics(
+            flushes=self.__flushes,
+            failed=self.__failed_flushes,
+            last_rows=self.__last_flush_rows,
+            last_duration=durations[-1] if durations else 0.0,
+            avg_duration=sum(durations) / len(durations) if durations else 0.0,
+            max_duration=max(durations) if durations else 0.0)
 
     async def __cleanup_stats(self, session: AsyncSession) -> None:
         delete_before_timestamp: int = int(time.time()) - 604800
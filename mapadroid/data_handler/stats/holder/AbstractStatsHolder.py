@@ -1,9 +1,46 @@
 from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List
 
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import STATS_SUBMIT_CHUNK_SIZE
+
+logger = get_logger(LoggerEnums.stats_handler)
+
 
 class AbstractStatsHolder(ABC):
     @abstractmethod
-    async def submit(self, session: AsyncSession) -> None:
+    async def submit(self, session: AsyncSession) -> int:
+        """
+        Submits the stats collected so far
+        Returns: Amount of rows submitted
+        """
         pass
+
+    @staticmethod
+    async def _submit_chunked(session: AsyncSession, rows: Iterable[Dict],
+                              submit_chunk: Callable[[AsyncSession, List[Dict]], Awaitable[None]],
+                              description: str) -> int:
+        """
+        Submits rows in chunks of STATS_SUBMIT_CHUNK_SIZE using submit_chunk, each chunk in a savepoint of its own.
+        rows are consumed lazily, only a single chunk is held at a time.
+        Returns: Amount of rows submitted successfully
+        """
+        submitted: int = 0
+        rows_iterator: Iterator[Dict] = iter(rows)
+        while True:
+            chunk: List[Dict] = list(islice(rows_iterator, STATS_SUBMIT_CHUNK_SIZE))
+            if not chunk:
+                break
+            async with session.begin_nested() as nested:
+                try:
+                    await submit_chunk(session, chunk)
+                    await nested.commit()
+                    submitted += len(chunk)
+                except SQLAlchemyError as e:
+                    logger.warning("Failed submitting {} rows of {} stats. {}", len(chunk), description, e)
+                    await nested.rollback()
+        return submitted
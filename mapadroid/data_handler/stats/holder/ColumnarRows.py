@@ -0,0 +1,50 @@
+from array import array
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+
+from mapadroid.utils.madConstants import STATS_SUBMIT_CHUNK_SIZE
+
+
+class ColumnarRows:
+    """
+    Fixed-width rows of unsigned integers keyed by IDs (e.g. encounter IDs). The values of all rows are held in a
+    single flat array (row-major) rather than an object per row, only the mapping of IDs to the offset of their row
+    is a python dict. Rows are iterated in the order they were created.
+    """
+
+    def __init__(self, columns: int, typecode: str = "I"):
+        self._columns: int = columns
+        self._offset_of: Dict[int, int] = {}
+        self._empty_row: array = array(typecode, [0]) * columns
+        self.values: array = array(typecode)
+
+    def __len__(self) -> int:
+        return len(self._offset_of)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._offset_of
+
+    def offset(self, key: int) -> int:
+        """
+        Offset of the row of key in values, the value of a column is at offset + column.
+        A row of zeroes is appended for unknown keys.
+        """
+        offset = self._offset_of.get(key)
+        if offset is None:
+            offset = len(self.values)
+            self.values.extend(self._empty_row)
+            self._offset_of[key] = offset
+        return offset
+
+    def items(self) -> Iterator[Tuple[int, List[int]]]:
+        """
+        Yields the keys along with the values of their rows as python ints. Rows are converted to python objects
+        in chunks, the values are not copied as a whole.
+        """
+        keys = iter(self._offset_of)
+        chunk_length: int = STATS_SUBMIT_CHUNK_SIZE * self._columns
+        for chunk_offset in range(0, len(self.values), chunk_length):
+            values: List[int] = self.values[chunk_offset:chunk_offset + chunk_length].tolist()
+            rows: List[List[int]] = [values[offset:offset + self._columns]
+                                     for offset in range(0, len(values), self._columns)]
+            yield from zip(islice(keys, len(rows)), rows)
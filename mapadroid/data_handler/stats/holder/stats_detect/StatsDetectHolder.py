@@ -14,12 +14,13 @@ class StatsDetectHolder(AbstractStatsHolder, AbstractWorkerHolder):
         AbstractWorkerHolder.__init__(self, worker)
         self._entry: StatsDetectEntry = StatsDetectEntry(worker)
 
-    async def submit(self, session: AsyncSession) -> None:
+    async def submit(self, session: AsyncSession) -> int:
         self._entry.timestamp_scan = int(time.time())
         async with session.begin_nested() as nested:
             session.add(self._entry)
             await nested.commit()
         del self._entry
+        return 1
 
     def add_mon(self, time_scanned: datetime) -> None:
         self._entry.update(time_scanned, new_mons=1)
@@ -1,49 +1,48 @@
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterator
 
-import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from mapadroid.data_handler.stats.holder.AbstractStatsHolder import AbstractStatsHolder
-from mapadroid.data_handler.stats.holder.stats_detect_seen.StatsDetectSeenTypeEntry import StatsDetectSeenTypeEntry
+from mapadroid.data_handler.stats.holder.ColumnarRows import ColumnarRows
 from mapadroid.db.helper.TrsStatsDetectSeenTypeHelper import TrsStatsDetectSeenTypeHelper
-from mapadroid.utils.logging import get_logger, LoggerEnums
+from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.madGlobals import MonSeenTypes
 
-logger = get_logger(LoggerEnums.mitm_mapper)
+# Rows hold the earliest epoch an encounter was seen as a type in the column of the value of the type followed by a
+# bitfield of the types the encounter was seen as
+_SEEN_TYPES_COLUMN: int = len(MonSeenTypes)
 
 
 class StatsDetectSeenTypeHolder(AbstractStatsHolder):
     def __init__(self):
-        self._entries: Dict[int, StatsDetectSeenTypeEntry] = {}
-
-    async def submit(self, session: AsyncSession) -> None:
-        for encounter_id, stat_entry in self._entries.items():
-            async with session.begin_nested() as nested:
-                try:
-                    await TrsStatsDetectSeenTypeHelper.create_or_update(session, stat_entry)
-                    await nested.commit()
-                except sqlalchemy.exc.IntegrityError as e:
-                    logger.warning("Failed submitting seen type stats. {}", e)
-                    await nested.rollback()
-        del self._entries
-
-    def __ensure_entry_available(self, encounter_id: int) -> StatsDetectSeenTypeEntry:
-        if encounter_id not in self._entries:
-            self._entries[encounter_id] = StatsDetectSeenTypeEntry(encounter_id)
-        return self._entries[encounter_id]
+        self._rows: ColumnarRows = ColumnarRows(len(MonSeenTypes) + 1)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def submit(self, session: AsyncSession) -> int:
+        # Swap the rows to continue collecting while the snapshot is being submitted
+        rows: ColumnarRows = self._rows
+        self._rows = ColumnarRows(len(MonSeenTypes) + 1)
+        return await self._submit_chunked(session, self.__to_db_rows(rows),
+                                          TrsStatsDetectSeenTypeHelper.insert_or_update_bulk, "seen type")
+
+    @staticmethod
+    def __to_db_rows(rows: ColumnarRows) -> Iterator[Dict]:
+        for encounter_id, values in rows.items():
+            seen_types: int = values[_SEEN_TYPES_COLUMN]
+            db_row: Dict = {"encounter_id": encounter_id}
+            for seen_type in MonSeenTypes:
+                db_row[seen_type.name] = DatetimeWrapper.fromtimestamp(values[seen_type]) \
+                    if seen_types & (1 << seen_type) else None
+            yield db_row
 
     def add(self, encounter_id: int, type_of_detection: MonSeenTypes, time_of_scan: datetime) -> None:
-        entry: StatsDetectSeenTypeEntry = self.__ensure_entry_available(encounter_id)
-        if type_of_detection == MonSeenTypes.encounter:
-            entry.update(encounter=time_of_scan)
-        elif type_of_detection == MonSeenTypes.wild:
-            entry.update(wild=time_of_scan)
-        elif type_of_detection == MonSeenTypes.nearby_stop:
-            entry.update(nearby_stop=time_of_scan)
-        elif type_of_detection == MonSeenTypes.nearby_cell:
-            entry.update(nearby_cell=time_of_scan)
-        elif type_of_detection == MonSeenTypes.lure_encounter:
-            entry.update(lure_encounter=time_of_scan)
-        elif type_of_detection == MonSeenTypes.lure_wild:
-            entry.update(lure_wild=time_of_scan)
+        offset: int = self._rows.offset(encounter_id)
+        values = self._rows.values
+        timestamp: int = int(time_of_scan.timestamp())
+        seen_type_bit: int = 1 << type_of_detection
+        if not values[offset + _SEEN_TYPES_COLUMN] & seen_type_bit or timestamp < values[offset + type_of_detection]:
+            values[offset + type_of_detection] = timestamp
+            values[offset + _SEEN_TYPES_COLUMN] |= seen_type_bit
@@ -13,14 +13,17 @@ class StatsLocationHolder(AbstractStatsHolder, AbstractWorkerHolder):
         AbstractWorkerHolder.__init__(self, worker)
         self._entry: StatsLocationEntry = StatsLocationEntry(worker)
 
-    async def submit(self, session: AsyncSession) -> None:
+    async def submit(self, session: AsyncSession) -> int:
+        submitted: int = 0
         async with session.begin_nested() as nested:
             try:
                 session.add(self._entry)
                 await nested.commit()
+                submitted = 1
             except Exception as e:
                 logger.warning("Failed submitting location data of {}", self._worker)
         del self._entry
+        return submitted
 
     def add_location_ok(self, time_of_scan: int) -> None:
         self._entry.update(time_of_scan, location_ok=True)
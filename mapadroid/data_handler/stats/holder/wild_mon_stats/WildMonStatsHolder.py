@@ -1,37 +1,54 @@
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterator
 
-import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from mapadroid.data_handler.AbstractWorkerHolder import AbstractWorkerHolder
 from mapadroid.data_handler.stats.holder.AbstractStatsHolder import AbstractStatsHolder
-from mapadroid.data_handler.stats.holder.wild_mon_stats.WildMonStatsEntry import WildMonStatsEntry
+from mapadroid.data_handler.stats.holder.ColumnarRows import ColumnarRows
 from mapadroid.db.helper.TrsStatsDetectWildMonRawHelper import TrsStatsDetectWildMonRawHelper
-from mapadroid.utils.logging import get_logger, LoggerEnums
+from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 
-logger = get_logger(LoggerEnums.mitm_mapper)
+# Columns of the rows of encounters
+_COUNT, _IS_SHINY, _FIRST_SCANNED, _LAST_SCANNED = range(4)
 
 
 class WildMonStatsHolder(AbstractStatsHolder, AbstractWorkerHolder):
     def __init__(self, worker: str):
         # Wild mon encounterID to counts seen mapping
         AbstractWorkerHolder.__init__(self, worker)
-        self._wild_mons_seen: Dict[int, WildMonStatsEntry] = {}
-
-    async def submit(self, session: AsyncSession) -> None:
-        for encounter_id, mon_entry in self._wild_mons_seen.items():
-            async with session.begin_nested() as nested:
-                try:
-                    await TrsStatsDetectWildMonRawHelper.create_or_update(session, mon_entry)
-                    await nested.commit()
-                except sqlalchemy.exc.IntegrityError as e:
-                    logger.warning("Failed submitting wild mon stats. {}", e)
-                    await nested.rollback()
-        del self._wild_mons_seen
+        self._wild_mons_seen: ColumnarRows = ColumnarRows(4)
+
+    def __len__(self) -> int:
+        return len(self._wild_mons_seen)
+
+    async def submit(self, session: AsyncSession) -> int:
+        # Swap the rows to continue collecting while the snapshot is being submitted
+        wild_mons_seen: ColumnarRows = self._wild_mons_seen
+        self._wild_mons_seen = ColumnarRows(4)
+        return await self._submit_chunked(session, self.__to_db_rows(wild_mons_seen),
+                                          TrsStatsDetectWildMonRawHelper.insert_or_update_bulk, "wild mon")
+
+    def __to_db_rows(self, wild_mons_seen: ColumnarRows) -> Iterator[Dict]:
+        for encounter_id, values in wild_mons_seen.items():
+            yield {"worker": self._worker,
+                   "encounter_id": encounter_id,
+                   "count": values[_COUNT],
+                   "is_shiny": bool(values[_IS_SHINY]),
+                   "first_scanned": DatetimeWrapper.fromtimestamp(values[_FIRST_SCANNED]),
+                   "last_scanned": DatetimeWrapper.fromtimestamp(values[_LAST_SCANNED])}
 
     def add(self, encounter_id: int, scanned: datetime, is_shiny: bool = False) -> None:
-        if encounter_id not in self._wild_mons_seen:
-            self._wild_mons_seen[encounter_id] = WildMonStatsEntry(self._worker, encounter_id, scanned)
+        timestamp: int = int(scanned.timestamp())
+        known: bool = encounter_id in self._wild_mons_seen
+        offset: int = self._wild_mons_seen.offset(encounter_id)
+        values = self._wild_mons_seen.values
+        if not known:
+            values[offset + _FIRST_SCANNED] = timestamp
+            values[offset + _LAST_SCANNED] = timestamp
         else:
-            self._wild_mons_seen[encounter_id].update(scanned, is_shiny)
+            values[offset + _COUNT] += 1
+            if timestamp > values[offset + _LAST_SCANNED]:
+                values[offset + _LAST_SCANNED] = timestamp
+        if is_shiny:
+            values[offset + _IS_SHINY] = 1
@@ -1,15 +1,20 @@
+import asyncio
+import hashlib
 import json
 import math
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import sqlalchemy
 from bitstring import BitArray
+from cachetools import TTLCache
+from orjson import orjson
 from redis import Redis
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from mapadroid.db.after_commit import call_after_commit
 from mapadroid.db.helper.GymDetailHelper import GymDetailHelper
 from mapadroid.db.helper.GymHelper import GymHelper
 from mapadroid.db.helper.PokemonDisplayHelper import PokemonDisplayHelper
@@ -30,21 +35,30 @@ from mapadroid.db.model import (Gym, GymDetail, Pokemon, Pokestop,
                                 TrsQuest, TrsSpawn, TrsStatsDetectSeenType,
                                 Weather)
 from mapadroid.db.PooledQueryExecutor import PooledQueryExecutor
+from mapadroid.utils.collections import SpawnpointState
 from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.gamemechanicutil import (gen_despawn_timestamp,
                                               is_mon_ditto)
 from mapadroid.utils.logging import LoggerEnums, get_logger
-from mapadroid.utils.madConstants import (REDIS_CACHETIME_CELLS,
+from mapadroid.utils.madConstants import (CURRENT_EVENT_CACHE_TTL,
+                                          REDIS_CACHETIME_CELLS,
                                           REDIS_CACHETIME_GYMS,
                                           REDIS_CACHETIME_MON_LURE_IV,
                                           REDIS_CACHETIME_POKESTOP_DATA,
                                           REDIS_CACHETIME_RAIDS,
                                           REDIS_CACHETIME_ROUTE,
                                           REDIS_CACHETIME_STOP_DETAILS,
-                                          REDIS_CACHETIME_WEATHER)
+                                          REDIS_CACHETIME_WEATHER,
+                                          SPAWNPOINT_CACHE_SIZE,
+                                          SPAWNPOINT_CACHE_TTL,
+                                          STOP_LOCATION_CACHE_SIZE,
+                                          STOP_LOCATION_CACHE_TTL)
 from mapadroid.utils.madGlobals import MonSeenTypes, QuestLayer
+from mapadroid.utils.map_tiles import MapTileLayer, MapTileVersions
 from mapadroid.utils.questGen import QuestGen
 from mapadroid.utils.s2Helper import S2Helper
+from mapadroid.webhook.WebhookChangeFeed import (WebhookChangeOutbox,
+                                                 WebhookChangeType)
 
 logger = get_logger(LoggerEnums.database)
 
@@ -61,94 +75,169 @@ class DbPogoProtoSubmit:
         self._db_exec: PooledQueryExecutor = db_exec
         self._args = args
         self._cache: Redis = None
+        self._spawnpoint_cache: TTLCache = TTLCache(maxsize=SPAWNPOINT_CACHE_SIZE, ttl=SPAWNPOINT_CACHE_TTL)
+        self._stop_locations: TTLCache = TTLCache(maxsize=STOP_LOCATION_CACHE_SIZE, ttl=STOP_LOCATION_CACHE_TTL)
+        self._current_event_id: Optional[int] = None
+        self._current_event_expiry: float = 0
+        self._fort_cache_hits: Dict[str, int] = {"stop": 0, "gym": 0}
+        self._fort_cache_misses: Dict[str, int] = {"stop": 0, "gym": 0}
+        self._webhook_changes: Optional[WebhookChangeOutbox] = None
+        self._map_tiles: Optional[MapTileVersions] = None
+        self._pending_cache_writes: Set[asyncio.Task] = set()
 
     async def setup(self):
         self._cache: Redis = await self._db_exec.get_cache()
+        if self._args.webhook and not self._args.webhook_disable_change_feed:
+            self._webhook_changes = WebhookChangeOutbox(self._cache)
+        self._map_tiles = MapTileVersions(self._cache)
+
+    def _announce_change(self, session: AsyncSession, change_type: WebhookChangeType, entity_id: Union[int, str],
+                         version: Union[int, float]) -> None:
+        """
+        Announces an entity written to the webhook worker once the transaction of the session has been committed
+        """
+        if self._webhook_changes is not None:
+            webhook_changes: WebhookChangeOutbox = self._webhook_changes
+            call_after_commit(session, lambda: webhook_changes.record(change_type, entity_id, version))
+
+    def _touch_map_tile(self, layer: MapTileLayer, lat: Optional[float], lng: Optional[float]) -> None:
+        """
+        Invalidates the tile of the map of madmin the entity written is located in
+        """
+        if self._map_tiles is not None:
+            self._map_tiles.record(layer, lat, lng)
+
+    def _set_cache_after_commit(self, session: AsyncSession, entries: Dict[str, Tuple[Union[int, str], int]]) -> None:
+        """
+        Sets the keys of the cache (mapping to their value and expiry in seconds) once the transaction of the session
+        has been committed. Keys marking rows as written must not outlive a rollback as the rows would otherwise be
+        skipped when the data is retried.
+        """
+        if not entries:
+            return
+
+        def schedule_write() -> None:
+            task: asyncio.Task = asyncio.get_running_loop().create_task(self.__set_cache(entries))
+            self._pending_cache_writes.add(task)
+            task.add_done_callback(self._pending_cache_writes.discard)
+
+        call_after_commit(session, schedule_write)
+
+    async def __set_cache(self, entries: Dict[str, Tuple[Union[int, str], int]]) -> None:
+        try:
+            async with self._cache.pipeline(transaction=False) as pipe:
+                for key, (value, expire) in entries.items():
+                    pipe.set(key, value, ex=expire)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Failed setting {} keys of the cache: {}", len(entries), e)
 
     async def mons(self, session: AsyncSession, timestamp: float,
                    map_proto: dict) -> List[int]:
         """
-        Update/Insert mons from a map_proto dict
+        Update/Insert mons from a map_proto dict.
+        All wild mons of the GMO are checked against the cache with a single MGET, the known despawn times are
+        fetched in a single query and all mons not cached are written using a single INSERT ... ON DUPLICATE KEY
+        UPDATE. If that fails, the mons are written one by one within savepoints of their own.
 
         Returns: List of encounterIDs of wild mons in GMO
         """
         logger.debug3("DbPogoProtoSubmit::mons called with data received")
         cells = map_proto.get("cells", None)
         encounter_ids_in_gmo = []
-        now = DatetimeWrapper.fromtimestamp(timestamp)
         if not cells:
             return encounter_ids_in_gmo
+        wild_mons: Dict[str, Tuple[int, Dict]] = {}
         for cell in cells:
             for wild_mon in cell["wild_pokemon"]:
-                spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
-                lat = wild_mon["latitude"]
-                lon = wild_mon["longitude"]
-                mon_id = wild_mon["pokemon_data"]["id"]
                 encounter_id = wild_mon["encounter_id"]
-
                 if encounter_id < 0:
                     encounter_id = encounter_id + 2 ** 64
                 encounter_ids_in_gmo.append(encounter_id)
+                cache_key = "mon{}-{}".format(encounter_id, wild_mon["pokemon_data"]["id"])
+                wild_mons[cache_key] = (encounter_id, wild_mon)
+        if not wild_mons:
+            return encounter_ids_in_gmo
 
-                cache_key = "mon{}-{}".format(encounter_id, mon_id)
-                if await self._cache.exists(cache_key):
-                    continue
+        cache_keys: List[str] = list(wild_mons.keys())
+        cached: List[Optional[bytes]] = await self._cache.mget(cache_keys)
+        to_submit: List[Tuple[str, int, Dict]] = [(cache_key, *wild_mons[cache_key])
+                                                  for cache_key, is_cached in zip(cache_keys, cached)
+                                                  if is_cached is None]
+        if not to_submit:
+            return encounter_ids_in_gmo
 
-                # get known spawn end time and feed into despawn time calculation
-                # getdetspawntime = self._get_detected_endtime(str(spawnid))
-                spawnpoint: Optional[TrsSpawn] = await TrsSpawnHelper.get(session, spawnid)
-                despawn_time_unix = gen_despawn_timestamp(spawnpoint.calc_endminsec if spawnpoint else None, timestamp,
-                                                          self._args.default_unknown_timeleft)
-                despawn_time = DatetimeWrapper.fromtimestamp(despawn_time_unix)
+        spawn_ids: Set[int] = {int(str(wild_mon["spawnpoint_id"]), 16) for _, _, wild_mon in to_submit}
+        # get known spawn end time and feed into despawn time calculation
+        endminsecs: Dict[int, Optional[str]] = await TrsSpawnHelper.get_calc_endminsec(session, spawn_ids)
 
-                if spawnpoint is None:
-                    logger.debug3("adding mon (#{}) at {}, {}. Despawns at {} (init) ({})", mon_id, lat, lon,
-                                  despawn_time.strftime("%Y-%m-%d %H:%M:%S"), spawnid)
-                else:
-                    logger.debug3("adding mon (#{}) at {}, {}. Despawns at {} (non-init) ({})", mon_id, lat, lon,
-                                  despawn_time.strftime("%Y-%m-%d %H:%M:%S"), spawnid)
+        now = DatetimeWrapper.fromtimestamp(timestamp)
+        mons_to_submit: List[Dict] = []
+        # encounter ID -> cache key and the time the mon is cached for
+        cache_times: Dict[int, Tuple[str, int]] = {}
+        for cache_key, encounter_id, wild_mon in to_submit:
+            spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
+            lat = wild_mon["latitude"]
+            lon = wild_mon["longitude"]
+            mon_id = wild_mon["pokemon_data"]["id"]
+            display = wild_mon["pokemon_data"]["display"]
+
+            despawn_time_unix = gen_despawn_timestamp(endminsecs.get(spawnid, None), timestamp,
+                                                      self._args.default_unknown_timeleft)
+            despawn_time = DatetimeWrapper.fromtimestamp(despawn_time_unix)
+            logger.debug3("adding mon (#{}) at {}, {}. Despawns at {} ({}) ({})", mon_id, lat, lon,
+                          despawn_time.strftime("%Y-%m-%d %H:%M:%S"),
+                          "non-init" if spawnid in endminsecs else "init", spawnid)
+            # TODO handle weather boost condition changes for redoing IV+ditto (set ivs to null again)
+            #  Further we should probably reset IVs if pokemon_id changes as well
+            mon: Dict = {
+                "encounter_id": encounter_id,
+                "spawnpoint_id": spawnid,
+                "latitude": lat,
+                "longitude": lon,
+                "seen_type": MonSeenTypes.wild.name,
+                "disappear_time": despawn_time,
+                "weather_boosted_condition": display["weather_boosted_value"],
+                "last_modified": now
+            }
+            if mon_id == 132:
+                # handle ditto
+                mon.update(pokemon_id=132, gender=3, costume=0, form=0)
+            else:
+                mon.update(pokemon_id=mon_id, gender=display["gender_value"], costume=display["costume_value"],
+                           form=display["form_value"])
+            mons_to_submit.append(mon)
+            cache_times[encounter_id] = (cache_key, int(despawn_time_unix - int(DatetimeWrapper.now().timestamp())))
 
+        submitted: List[Dict] = []
+        async with session.begin_nested() as nested_transaction:
+            try:
+                await PokemonHelper.insert_or_update_wild(session, mons_to_submit)
+                await nested_transaction.commit()
+                submitted = mons_to_submit
+            except sqlalchemy.exc.IntegrityError as e:
+                logger.debug("Failed committing {} mons at once ({}), submitting them one by one.",
+                             len(mons_to_submit), str(e))
+                await nested_transaction.rollback()
+        if not submitted:
+            # Only the mons actually conflicting are lost
+            for mon in mons_to_submit:
                 async with session.begin_nested() as nested_transaction:
-                    mon: Optional[Pokemon] = await PokemonHelper.get(session, encounter_id)
-                    if not mon:
-                        mon: Pokemon = Pokemon()
-                        mon.encounter_id = encounter_id
-                        mon.spawnpoint_id = spawnid
-                        mon.latitude = lat
-                        mon.longitude = lon
-                    mon.pokemon_id = mon_id
-                    if mon.seen_type not in [MonSeenTypes.encounter.name, MonSeenTypes.lure_encounter.name]:
-                        # TODO: Any other types not to overwrite?
-                        mon.seen_type = MonSeenTypes.wild.name
-                    if mon_id == 132:
-                        # handle ditto
-                        mon.pokemon_id = 132
-                        mon.gender = 3
-                        mon.costume = 0
-                        mon.form = 0
-                    else:
-                        mon.pokemon_id = mon_id
-                        mon.gender = wild_mon["pokemon_data"]["display"]["gender_value"]
-                        mon.costume = wild_mon["pokemon_data"]["display"]["costume_value"]
-                        mon.form = wild_mon["pokemon_data"]["display"]["form_value"]
-
-                    # TODO handle weather boost condition changes for redoing IV+ditto (set ivs to null again)
-                    #  Further we should probably reset IVs if pokemon_id changes as well
-
-                    mon.disappear_time = despawn_time
-                    mon.weather_boosted_condition = wild_mon["pokemon_data"]["display"]["weather_boosted_value"]
-                    mon.last_modified = now
                     try:
-                        session.add(mon)
+                        await PokemonHelper.insert_or_update_wild(session, [mon])
                         await nested_transaction.commit()
-                        cache_time = int(despawn_time_unix - int(DatetimeWrapper.now().timestamp()))
-                        if cache_time > 0:
-                            await self._cache.set(cache_key, 1, ex=cache_time)
+                        submitted.append(mon)
                     except sqlalchemy.exc.IntegrityError as e:
-                        logger.debug("Failed committing mon {} ({}). Safe to ignore.", encounter_id, str(e))
+                        logger.debug("Failed committing mon {} ({}). Safe to ignore.", mon["encounter_id"], str(e))
                         await nested_transaction.rollback()
-                        continue
-                await session.commit()
+        cache_entries: Dict[str, Tuple[int, int]] = {}
+        for mon in submitted:
+            self._announce_change(session, WebhookChangeType.pokemon, mon["encounter_id"], timestamp)
+            self._touch_map_tile(MapTileLayer.mons, mon["latitude"], mon["longitude"])
+            cache_key, cache_time = cache_times[mon["encounter_id"]]
+            if cache_time > 0:
+                cache_entries[cache_key] = (1, cache_time)
+        self._set_cache_after_commit(session, cache_entries)
         return encounter_ids_in_gmo
 
     async def mons_nearby(self, session: AsyncSession, timestamp: float,
@@ -239,6 +328,8 @@ class DbPogoProtoSubmit:
                         mon.last_modified = now
                         session.add(mon)
                         await nested_transaction.commit()
+                        self._announce_change(session, WebhookChangeType.pokemon, encounter_id, timestamp)
+                        self._touch_map_tile(MapTileLayer.mons, mon.latitude, mon.longitude)
                         await self._cache.set(cache_key, 1, ex=self._args.default_nearby_timeleft * 60)
                 except sqlalchemy.exc.IntegrityError as e:
                     logger.debug("Failed committing nearby mon {} ({}). Safe to ignore.", encounter_id, str(e))
@@ -330,6 +421,8 @@ class DbPogoProtoSubmit:
         session.add(mon)
         await self.maybe_save_ditto(session, pokemon_display, encounter_id, mon_id, pokemon_data)
         await session.commit()
+        self._announce_change(session, WebhookChangeType.pokemon, encounter_id, timestamp)
+        self._touch_map_tile(MapTileLayer.mons, latitude, longitude)
         cache_time = int(despawn_time_unix - int(DatetimeWrapper.now().timestamp()))
         if cache_time > 0:
             await self._cache.set(cache_key, 1, ex=cache_time)
@@ -420,6 +513,8 @@ class DbPogoProtoSubmit:
             session.add(mon)
             await self.maybe_save_ditto(session, display, encounter_id, mon_id, pokemon_data)
             await nested_transaction.commit()
+            self._announce_change(session, WebhookChangeType.pokemon, encounter_id, timestamp)
+            self._touch_map_tile(MapTileLayer.mons, mon.latitude, mon.longitude)
             await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_MON_LURE_IV)
             time_done = time.time() - time_start_submit
             logger.debug("Done updating mon lure IV in DB in {} seconds", time_done)
@@ -484,6 +579,8 @@ class DbPogoProtoSubmit:
                             logger.debug("Submitting lured non-IV mon {}", encounter_id)
                             session.add(mon)
                             await nested_transaction.commit()
+                            self._announce_change(session, WebhookChangeType.pokemon, encounter_id, timestamp)
+                            self._touch_map_tile(MapTileLayer.mons, lat, lon)
                             await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_MON_LURE_IV)
                         except sqlalchemy.exc.IntegrityError as e:
                             logger.debug("Failed committing lured non-IV mon {} ({}). Safe to ignore.", encounter_id,
@@ -538,96 +635,132 @@ class DbPogoProtoSubmit:
                     logger.debug("Failed submitting stat...")
 
     async def spawnpoints(self, session: AsyncSession, map_proto: dict, received_timestamp: int):
+        """
+        Update/Insert spawnpoints from a map_proto dict.
+        The state of spawnpoints is kept in a process-local cache for SPAWNPOINT_CACHE_TTL seconds. Only spawnpoints
+        which are unknown, changed or whose cached state expired are written using a single
+        INSERT ... ON DUPLICATE KEY UPDATE.
+        """
         logger.debug3("DbPogoProtoSubmit::spawnpoints called with data received")
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
-        spawn_ids: List[int] = []
+        wild_mons: Dict[int, Dict] = {}
         for cell in cells:
             for wild_mon in cell["wild_pokemon"]:
-                spawn_ids.append(int(str(wild_mon['spawnpoint_id']), 16))
-
-        spawndef: Dict[int, TrsSpawn] = await self._get_spawndef(session, spawn_ids)
-        current_event: Optional[TrsEvent] = await TrsEventHelper.get_current_event(session, True)
-        spawns_do_add: List[TrsSpawn] = []
+                wild_mons[int(str(wild_mon["spawnpoint_id"]), 16)] = wild_mon
+        if not wild_mons:
+            return True
+
+        states: Dict[int, Optional[SpawnpointState]] = {spawn_id: self._spawnpoint_cache.get(spawn_id, None)
+                                                        for spawn_id in wild_mons.keys()}
+        to_refresh: List[int] = [spawn_id for spawn_id, state in states.items() if state is None]
+        if to_refresh:
+            spawndef: Dict[int, TrsSpawn] = await self._get_spawndef(session, to_refresh)
+            for spawn_id, spawn in spawndef.items():
+                states[spawn_id] = SpawnpointState(spawn.spawndef, spawn.eventid, spawn.earliest_unseen,
+                                                   spawn.calc_endminsec)
+        current_event_id: int = await self._get_current_event_id(session)
+        minpos = self._get_current_spawndef_pos()
         received_time: datetime = DatetimeWrapper.fromtimestamp(received_timestamp)
-        for cell in cells:
-            for wild_mon in cell["wild_pokemon"]:
-                spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
-                lat, lng, _ = S2Helper.get_position_from_cell(
-                    int(str(wild_mon["spawnpoint_id"]) + "00000", 16))
-                despawntime = wild_mon["time_till_hidden"]
-
-                minpos = self._get_current_spawndef_pos()
-                # TODO: retrieve the spawndefs by a single executemany and pass that...
-                spawn = spawndef.get(spawnid, None)
-                if spawn:
-                    newspawndef = self._set_spawn_see_minutesgroup(spawn.spawndef, minpos)
-                else:
-                    newspawndef = self._set_spawn_see_minutesgroup(self.default_spawndef, minpos)
-
-                # TODO: This may break another known timer...
-                if 0 <= int(despawntime) <= 90000:
-                    fulldate = received_time + timedelta(milliseconds=despawntime)
-                    earliest_unseen = int(despawntime)
-                    calcendtime = fulldate.strftime("%M:%S")
-
-                    # TODO: First try to fetch a TrsSpawn, then handle the above...
-                    # TODO: We can just use the above dict of spawns....
-                    if spawn:
-                        # Update...
-                        # TODO: Is it that simple?
-                        spawn.earliest_unseen = min(spawn.earliest_unseen, earliest_unseen)
-                        if current_event.id == spawn.eventid or current_event.id != 1 and spawn.eventid != 1:
-                            spawn.spawndef = newspawndef
-                    else:
-                        spawn: TrsSpawn = TrsSpawn()
-                        spawn.spawnpoint = spawnid
-                        spawn.latitude = lat
-                        spawn.longitude = lng
-                        spawn.earliest_unseen = earliest_unseen
-                        spawn.spawndef = newspawndef
-                        spawn.eventid = current_event.id if current_event else 1
-                        spawn.first_detection = DatetimeWrapper.fromtimestamp(received_timestamp)
-                    spawn.last_scanned = DatetimeWrapper.fromtimestamp(received_timestamp)
-                    spawn.calc_endminsec = calcendtime
-                else:
-                    # TODO: Reduce "complexity..."
-                    if spawn:
-                        if current_event.id == spawn.eventid or current_event.id != 1 and spawn.eventid != 1:
-                            spawn.spawndef = newspawndef
-                    else:
-                        spawn: TrsSpawn = TrsSpawn()
-                        spawn.spawnpoint = spawnid
-                        spawn.latitude = lat
-                        spawn.longitude = lng
-                        spawn.earliest_unseen = 99999999
-                        spawn.spawndef = newspawndef
-                        spawn.eventid = current_event.id if current_event else 1
-                    spawn.last_non_scanned = DatetimeWrapper.now()
-                spawns_do_add.append(spawn)
-        session.add_all(spawns_do_add)
+        spawns_to_submit: List[Dict] = []
+        states_to_cache: Dict[int, SpawnpointState] = {}
+        for spawnid, wild_mon in wild_mons.items():
+            state: Optional[SpawnpointState] = states.get(spawnid, None)
+            despawntime = int(wild_mon["time_till_hidden"])
+            if state:
+                newspawndef = self._set_spawn_see_minutesgroup(state.spawndef, minpos)
+                if not (current_event_id == state.eventid or current_event_id != 1 and state.eventid != 1):
+                    newspawndef = state.spawndef
+                eventid = state.eventid
+                earliest_unseen = state.earliest_unseen
+                calcendtime = state.calc_endminsec
+            else:
+                newspawndef = self._set_spawn_see_minutesgroup(self.default_spawndef, minpos)
+                eventid = current_event_id
+                earliest_unseen = 99999999
+                calcendtime = None
+
+            # TODO: This may break another known timer...
+            last_scanned: Optional[datetime] = None
+            last_non_scanned: Optional[datetime] = None
+            if 0 <= despawntime <= 90000:
+                fulldate = received_time + timedelta(milliseconds=despawntime)
+                earliest_unseen = min(earliest_unseen, despawntime)
+                calcendtime = fulldate.strftime("%M:%S")
+                last_scanned = received_time
+            else:
+                last_non_scanned = DatetimeWrapper.now()
+
+            new_state = SpawnpointState(newspawndef, eventid, earliest_unseen, calcendtime)
+            if new_state == state and spawnid not in to_refresh:
+                continue
+            states_to_cache[spawnid] = new_state
+            lat, lng, _ = S2Helper.get_position_from_cell(int(str(wild_mon["spawnpoint_id"]) + "00000", 16))
+            spawns_to_submit.append({
+                "spawnpoint": spawnid,
+                "latitude": lat,
+                "longitude": lng,
+                "spawndef": newspawndef,
+                "earliest_unseen": earliest_unseen,
+                "eventid": eventid,
+                "first_detection": received_time,
+                "last_scanned": last_scanned,
+                "last_non_scanned": last_non_scanned,
+                "calc_endminsec": calcendtime if last_scanned else None
+            })
+        logger.debug3("Submitting {} of {} spawnpoints", len(spawns_to_submit), len(wild_mons))
+        await TrsSpawnHelper.insert_or_update_bulk(session, spawns_to_submit)
+        for spawn in spawns_to_submit:
+            self._touch_map_tile(MapTileLayer.spawns, spawn["latitude"], spawn["longitude"])
+        # Rolled back writes are not to be considered written
+        call_after_commit(session, lambda: self._spawnpoint_cache.update(states_to_cache))
+        return True
+
+    async def _get_current_event_id(self, session: AsyncSession) -> int:
+        """
+        Returns: the ID of the event currently active (including the default event) cached for
+        CURRENT_EVENT_CACHE_TTL seconds
+        """
+        if self._current_event_id is None or self._current_event_expiry < time.time():
+            current_event: Optional[TrsEvent] = await TrsEventHelper.get_current_event(session, True)
+            self._current_event_id = current_event.id if current_event else 1
+            self._current_event_expiry = time.time() + CURRENT_EVENT_CACHE_TTL
+        return self._current_event_id
 
     async def stops(self, session: AsyncSession, map_proto: dict):
         """
-        Update/Insert pokestops from a map_proto dict
+        Update/Insert pokestops from a map_proto dict. Stops are only written if their fingerprint changed.
         """
         logger.debug3("DbPogoProtoSubmit::stops called with data received")
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
 
-        for cell in cells:
-            cell_id = cell["id"]
-            cell_cache_key: str = f"stops_{cell_id}"
-            if await self._cache.exists(cell_cache_key):
-                continue
-            for fort in cell["forts"]:
-                if fort["type"] == 1:
-                    await self._handle_pokestop_data(session, fort)
-            await self._cache.set(cell_cache_key, 1, ex=REDIS_CACHETIME_CELLS)
+        stops: Dict[str, Dict] = {fort["id"]: fort for cell in cells for fort in cell["forts"] if fort["type"] == 1}
+        self._stop_locations.update({stop_id: (stop["latitude"], stop["longitude"]) for stop_id, stop in stops.items()})
+        changed: Dict[str, str] = await self._get_changed_forts(
+            "stop", {stop_id: self._get_stop_fingerprint(stop) for stop_id, stop in stops.items()})
+        submitted: Dict[str, str] = {}
+        for stop_id, fingerprint in changed.items():
+            if await self._handle_pokestop_data(session, stops[stop_id]):
+                submitted[stop_id] = fingerprint
+        self._set_fort_fingerprints(session, "stop", submitted, REDIS_CACHETIME_POKESTOP_DATA)
         return True
 
+    async def _get_stop_location(self, session: AsyncSession, stop_id: str) -> Optional[Tuple[float, float]]:
+        """
+        Returns: latitude and longitude of the stop, taken from the GMOs seen before if possible
+        """
+        location: Optional[Tuple[float, float]] = self._stop_locations.get(stop_id)
+        if location is None:
+            stop: Optional[Pokestop] = await PokestopHelper.get(session, stop_id)
+            if stop is None:
+                return None
+            location = (stop.latitude, stop.longitude)
+            self._stop_locations[stop_id] = location
+        return location
+
     async def stop_details(self, session: AsyncSession, stop_proto: dict):
         """
         Update/Insert pokestop details from a GMO
@@ -652,6 +785,9 @@ class DbPogoProtoSubmit:
                 try:
                     session.add(stop)
                     await nested_transaction.commit()
+                    self._announce_change(session, WebhookChangeType.pokestop, stop.pokestop_id,
+                                          stop.last_updated.timestamp())
+                    self._touch_map_tile(MapTileLayer.stops, stop.latitude, stop.longitude)
                     await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_STOP_DETAILS)
                 except sqlalchemy.exc.IntegrityError as e:
                     logger.warning("Failed committing stop details of {} ({})", stop.pokestop_id, str(e))
@@ -744,6 +880,12 @@ class DbPogoProtoSubmit:
             try:
                 session.add(quest)
                 await nested_transaction.commit()
+                self._announce_change(session, WebhookChangeType.quest, fort_id, quest.quest_timestamp)
+                location: Optional[Tuple[float, float]] = await self._get_stop_location(session, fort_id)
+                if location:
+                    # Stops are shown depending on whether a quest is known
+                    self._touch_map_tile(MapTileLayer.quests, *location)
+                    self._touch_map_tile(MapTileLayer.stops, *location)
             except sqlalchemy.exc.IntegrityError as e:
                 logger.warning("Failed committing quest of stop {}, ({})", fort_id, str(e))
                 await nested_transaction.rollback()
@@ -751,81 +893,173 @@ class DbPogoProtoSubmit:
 
     async def gyms(self, session: AsyncSession, map_proto: dict, received_timestamp: int):
         """
-        Update/Insert gyms from a map_proto dict
+        Update/Insert gyms from a map_proto dict. Gyms are only written if their fingerprint changed.
         """
         logger.debug3("DbPogoProtoSubmit::gyms called with data received from")
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
         time_receiver: datetime = DatetimeWrapper.fromtimestamp(received_timestamp)
-        for cell in cells:
-            cell_id = cell["id"]
-            cell_cache_key: str = f"gyms_{cell_id}"
-            if await self._cache.exists(cell_cache_key):
-                continue
-            for gym in cell["forts"]:
-                if gym["type"] == 0:
-                    gymid = gym["id"]
-                    last_modified_ts = gym["last_modified_timestamp_ms"] / 1000
-                    last_modified = DatetimeWrapper.fromtimestamp(
-                        last_modified_ts)
-                    latitude = gym["latitude"]
-                    longitude = gym["longitude"]
-                    s2_cell_id = S2Helper.lat_lng_to_cell_id(latitude, longitude)
-                    weather: Optional[Weather] = await WeatherHelper.get(session, str(s2_cell_id))
-                    gameplay_weather: int = weather.gameplay_weather if weather is not None else 0
-                    cache_key = "gym{}{}{}".format(gymid, last_modified_ts, gameplay_weather)
-                    if await self._cache.exists(cache_key):
-                        continue
-                    guard_pokemon_id = gym["gym_details"]["guard_pokemon"]
-                    team_id = gym["gym_details"]["owned_by_team"]
-                    slots_available = gym["gym_details"]["slots_available"]
-                    is_ex_raid_eligible = gym["gym_details"]["is_ex_raid_eligible"]
-                    is_ar_scan_eligible = gym["is_ar_scan_eligible"]
-                    is_in_battle = gym['gym_details']['is_in_battle']
-                    is_enabled = gym.get('enabled', 1)
-
-                    gym_obj: Optional[Gym] = await GymHelper.get(session, gymid)
-                    if not gym_obj:
-                        gym_obj: Gym = Gym()
-                        gym_obj.gym_id = gymid
-                    gym_obj.team_id = team_id
-                    gym_obj.guard_pokemon_id = guard_pokemon_id
-                    gym_obj.slots_available = slots_available
-                    gym_obj.enabled = is_enabled
-                    gym_obj.latitude = latitude
-                    gym_obj.longitude = longitude
-                    gym_obj.total_cp = gym.get("gym_display", {}).get("total_gym_cp", 0)
-                    gym_obj.is_in_battle = is_in_battle
-                    gym_obj.last_modified = last_modified
-                    gym_obj.last_scanned = time_receiver
-                    gym_obj.is_ex_raid_eligible = is_ex_raid_eligible
-                    gym_obj.is_ar_scan_eligible = is_ar_scan_eligible
-                    gym_obj.weather_boosted_condition = gameplay_weather
-
-                    gym_detail: Optional[GymDetail] = await GymDetailHelper.get(session, gymid)
-                    if not gym_detail:
-                        gym_detail: GymDetail = GymDetail()
-                        gym_detail.gym_id = gymid
-                        gym_detail.name = "unknown"
-                        gym_detail.url = ""
-                    gym_url = gym.get("image_url", "")
-                    if gym_url and gym_url.strip():
-                        gym_detail.url = gym_url.strip()
-                    gym_detail.last_scanned = time_receiver
-                    async with session.begin_nested() as nested_transaction:
-                        try:
-                            session.add(gym_obj)
-                            session.add(gym_detail)
-                            await nested_transaction.commit()
-                            await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_GYMS)
-                        except sqlalchemy.exc.IntegrityError as e:
-                            logger.warning("Failed committing gym data of {} ({})", gymid, str(e))
-                            await nested_transaction.rollback()
-            # done processing cell
-            await self._cache.set(cell_cache_key, 1, ex=REDIS_CACHETIME_CELLS)
+        gyms: Dict[str, Dict] = {fort["id"]: fort for cell in cells for fort in cell["forts"] if fort["type"] == 0}
+        if not gyms:
+            return True
+        weather_of_gyms: Dict[str, int] = await self._get_gameplay_weather_of_forts(session, map_proto,
+                                                                                    gyms.values())
+        changed: Dict[str, str] = await self._get_changed_forts(
+            "gym", {gymid: self._get_gym_fingerprint(gym, weather_of_gyms[gymid]) for gymid, gym in gyms.items()})
+        submitted: Dict[str, str] = {}
+        for gymid, fingerprint in changed.items():
+            gym = gyms[gymid]
+            gameplay_weather: int = weather_of_gyms[gymid]
+            last_modified_ts = gym["last_modified_timestamp_ms"] / 1000
+            last_modified = DatetimeWrapper.fromtimestamp(
+                last_modified_ts)
+            latitude = gym["latitude"]
+            longitude = gym["longitude"]
+            guard_pokemon_id = gym["gym_details"]["guard_pokemon"]
+            team_id = gym["gym_details"]["owned_by_team"]
+            slots_available = gym["gym_details"]["slots_available"]
+            is_ex_raid_eligible = gym["gym_details"]["is_ex_raid_eligible"]
+            is_ar_scan_eligible = gym["is_ar_scan_eligible"]
+            is_in_battle = gym['gym_details']['is_in_battle']
+            is_enabled = gym.get('enabled', 1)
+
+            gym_obj: Optional[Gym] = await GymHelper.get(session, gymid)
+            if not gym_obj:
+                gym_obj: Gym = Gym()
+                gym_obj.gym_id = gymid
+            gym_obj.team_id = team_id
+            gym_obj.guard_pokemon_id = guard_pokemon_id
+            gym_obj.slots_available = slots_available
+            gym_obj.enabled = is_enabled
+            gym_obj.latitude = latitude
+            gym_obj.longitude = longitude
+            gym_obj.total_cp = gym.get("gym_display", {}).get("total_gym_cp", 0)
+            gym_obj.is_in_battle = is_in_battle
+            gym_obj.last_modified = last_modified
+            gym_obj.last_scanned = time_receiver
+            gym_obj.is_ex_raid_eligible = is_ex_raid_eligible
+            gym_obj.is_ar_scan_eligible = is_ar_scan_eligible
+            gym_obj.weather_boosted_condition = gameplay_weather
+
+            gym_detail: Optional[GymDetail] = await GymDetailHelper.get(session, gymid)
+            if not gym_detail:
+                gym_detail: GymDetail = GymDetail()
+                gym_detail.gym_id = gymid
+                gym_detail.name = "unknown"
+                gym_detail.url = ""
+            gym_url = gym.get("image_url", "")
+            if gym_url and gym_url.strip():
+                gym_detail.url = gym_url.strip()
+            gym_detail.last_scanned = time_receiver
+            async with session.begin_nested() as nested_transaction:
+                try:
+                    session.add(gym_obj)
+                    session.add(gym_detail)
+                    await nested_transaction.commit()
+                    submitted[gymid] = fingerprint
+                    self._announce_change(session, WebhookChangeType.gym, gymid, received_timestamp)
+                    self._touch_map_tile(MapTileLayer.gyms, latitude, longitude)
+                except sqlalchemy.exc.IntegrityError as e:
+                    logger.warning("Failed committing gym data of {} ({})", gymid, str(e))
+                    await nested_transaction.rollback()
+        self._set_fort_fingerprints(session, "gym", submitted, REDIS_CACHETIME_GYMS)
         return True
 
+    async def _get_gameplay_weather_of_forts(self, session: AsyncSession, map_proto: dict,
+                                             forts: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Determines the gameplay weather of the forts passed. The weather sent within the GMO is preferred, the DB is
+        only queried for weather cells not contained in the GMO.
+        Returns: Dict mapping the fort IDs to the gameplay weather
+        """
+        weather_of_cells: Dict[int, int] = {}
+        for client_weather in map_proto.get("client_weather", []):
+            cell_id = client_weather["cell_id"]
+            if cell_id < 0:
+                cell_id = cell_id + 2 ** 64
+            weather_of_cells[cell_id] = client_weather.get("gameplay_weather", {}).get("gameplay_condition", 0)
+        weather_of_forts: Dict[str, int] = {}
+        for fort in forts:
+            s2_cell_id = S2Helper.lat_lng_to_cell_id(fort["latitude"], fort["longitude"])
+            if s2_cell_id not in weather_of_cells:
+                weather: Optional[Weather] = await WeatherHelper.get(session, str(s2_cell_id))
+                weather_of_cells[s2_cell_id] = weather.gameplay_weather if weather is not None else 0
+            weather_of_forts[fort["id"]] = weather_of_cells[s2_cell_id]
+        return weather_of_forts
+
+    @staticmethod
+    def _get_fingerprint(values: Dict) -> str:
+        return hashlib.blake2b(orjson.dumps(values, option=orjson.OPT_SORT_KEYS), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _get_stop_fingerprint(stop_data: Dict) -> str:
+        return DbPogoProtoSubmit._get_fingerprint({
+            "last_modified": stop_data.get("last_modified_timestamp_ms"),
+            "enabled": stop_data.get("enabled", 1),
+            "latitude": stop_data["latitude"],
+            "longitude": stop_data["longitude"],
+            "is_ar_scan_eligible": stop_data.get("is_ar_scan_eligible"),
+            "active_fort_modifier": stop_data.get("active_fort_modifier"),
+            "pokestop_display": stop_data.get("pokestop_display"),
+            "pokestop_displays": stop_data.get("pokestop_displays")
+        })
+
+    @staticmethod
+    def _get_gym_fingerprint(gym_data: Dict, gameplay_weather: int) -> str:
+        gym_details: Dict = gym_data["gym_details"]
+        return DbPogoProtoSubmit._get_fingerprint({
+            "last_modified": gym_data["last_modified_timestamp_ms"],
+            "enabled": gym_data.get("enabled", 1),
+            "latitude": gym_data["latitude"],
+            "longitude": gym_data["longitude"],
+            "is_ar_scan_eligible": gym_data.get("is_ar_scan_eligible"),
+            "team": gym_details.get("owned_by_team"),
+            "slots": gym_details.get("slots_available"),
+            "guard": gym_details.get("guard_pokemon"),
+            "in_battle": gym_details.get("is_in_battle"),
+            "ex_eligible": gym_details.get("is_ex_raid_eligible"),
+            "total_cp": gym_data.get("gym_display", {}).get("total_gym_cp", 0),
+            "image_url": gym_data.get("image_url", ""),
+            "weather": gameplay_weather
+        })
+
+    async def _get_changed_forts(self, fort_type: str, fingerprints: Dict[str, str]) -> Dict[str, str]:
+        """
+        Compares the fingerprints of the forts passed with the fingerprints stored of the last submission.
+        Args:
+            fort_type: "stop" or "gym"
+            fingerprints: Dict mapping fort IDs to the current fingerprints
+
+        Returns: Dict of the fort IDs whose fingerprint changed (or is not known) mapping to the current fingerprint
+        """
+        if not fingerprints:
+            return {}
+        fort_ids: List[str] = list(fingerprints.keys())
+        stored: List[Optional[bytes]] = await self._cache.mget(
+            [f"{fort_type}fp{fort_id}" for fort_id in fort_ids])
+        changed: Dict[str, str] = {fort_id: fingerprints[fort_id]
+                                   for fort_id, stored_fingerprint in zip(fort_ids, stored)
+                                   if stored_fingerprint is None
+                                   or stored_fingerprint.decode() != fingerprints[fort_id]}
+        self._fort_cache_hits[fort_type] += len(fort_ids) - len(changed)
+        self._fort_cache_misses[fort_type] += len(changed)
+        logger.debug3("{} of {} {}s changed. Hits/misses since start: {}/{}", len(changed), len(fort_ids),
+                      fort_type, self._fort_cache_hits[fort_type], self._fort_cache_misses[fort_type])
+        return changed
+
+    def _set_fort_fingerprints(self, session: AsyncSession, fort_type: str, fingerprints: Dict[str, str],
+                               expire: int) -> None:
+        self._set_cache_after_commit(session, {f"{fort_type}fp{fort_id}": (fingerprint, expire)
+                                               for fort_id, fingerprint in fingerprints.items()})
+
+    def get_fort_cache_stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns: Dict mapping the fort type ("stop"/"gym") to the amount of hits and misses of the fingerprint cache
+        """
+        return {fort_type: (self._fort_cache_hits[fort_type], self._fort_cache_misses[fort_type])
+                for fort_type in self._fort_cache_hits.keys()}
+
     async def gym(self, session: AsyncSession, map_proto: dict):
         """
         Update gyms from a map_proto dict
@@ -862,6 +1096,7 @@ class DbPogoProtoSubmit:
                 try:
                     session.add(gym_detail)
                     await nested_transaction.commit()
+                    self._touch_map_tile(MapTileLayer.gyms, fort_proto.get("latitude"), fort_proto.get("longitude"))
                 except sqlalchemy.exc.IntegrityError as e:
                     logger.warning("Failed committing gym info {} ({})", gym_id, str(e))
                     await nested_transaction.rollback()
@@ -949,6 +1184,8 @@ class DbPogoProtoSubmit:
                         try:
                             session.add(raid)
                             await nested_transaction.commit()
+                            self._announce_change(session, WebhookChangeType.raid, gymid, timestamp)
+                            self._touch_map_tile(MapTileLayer.gyms, gym["latitude"], gym["longitude"])
                             await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_RAIDS)
                         except sqlalchemy.exc.IntegrityError as e:
                             logger.warning("Failed committing raid for gym {} ({})", gymid, str(e))
@@ -1135,19 +1372,13 @@ class DbPogoProtoSubmit:
                 await self._handle_single_incident(session, stop_id, incident)
 
     async def _handle_pokestop_data(self, session: AsyncSession,
-                                    stop_data: Dict) -> Optional[Pokestop]:
+                                    stop_data: Dict) -> bool:
+        """
+        Returns: True if the stop was submitted
+        """
         if stop_data["type"] != 1:
             logger.info("{} is not a pokestop", stop_data)
-            return
-
-        # We can detect changes of the incidents by simply appending all incident IDs sent in the proto I guess...
-        stop_id: str = stop_data["id"]
-        last_modified_timestamp: int = stop_data.get("last_modified_timestamp_ms")
-        if not last_modified_timestamp:
-            last_modified_timestamp = int(math.ceil(DatetimeWrapper.now().timestamp() / 1000)) * 1000
-        cache_key = "stop{}{}".format(stop_id, last_modified_timestamp)
-        if await self._cache.exists(cache_key):
-            return
+            return False
 
         now = DatetimeWrapper.fromtimestamp(time.time())
         last_modified: datetime = DatetimeWrapper.fromtimestamp(
@@ -1187,11 +1418,14 @@ class DbPogoProtoSubmit:
             try:
                 session.add(pokestop)
                 await nested_transaction.commit()
-                await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_POKESTOP_DATA)
             except sqlalchemy.exc.IntegrityError as e:
                 logger.warning("Failed committing stop {} ({})", stop_id, str(e))
                 await session.rollback()
+                return False
         await self._handle_pokestop_incident_data(session, stop_id, stop_data)
+        self._announce_change(session, WebhookChangeType.pokestop, stop_id, now.timestamp())
+        self._touch_map_tile(MapTileLayer.stops, pokestop.latitude, pokestop.longitude)
+        return True
 
     async def _extract_args_single_stop_details(self, session: AsyncSession, stop_data) -> Optional[Pokestop]:
         if stop_data.get("type", 999) != 1:
@@ -1263,6 +1497,7 @@ class DbPogoProtoSubmit:
                 session.add(weather)
                 await self._cache.set(cache_key, 1, ex=REDIS_CACHETIME_WEATHER)
                 await nested_transaction.commit()
+                self._announce_change(session, WebhookChangeType.weather, str(cell_id), received_timestamp)
             except sqlalchemy.exc.IntegrityError as e:
                 logger.warning("Failed committing weather of cell {} ({})", cell_id, str(e))
                 await nested_transaction.rollback()
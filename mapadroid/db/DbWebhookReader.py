@@ -1,5 +1,5 @@
 import json
-from typing import Tuple, List, Dict, Optional, Set, Any
+from typing import Tuple, List, Dict, Optional, Set, Any, Collection, AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,19 +12,37 @@ from mapadroid.db.model import Raid, Gym, GymDetail, Weather, TrsQuest, Pokestop
     PokestopIncident
 from mapadroid.utils.WebhookJsonEncoder import WebhookJsonEncoder
 from mapadroid.utils.logging import get_logger, LoggerEnums
+from mapadroid.utils.madConstants import WEBHOOK_READ_BATCH_SIZE
 from mapadroid.utils.madGlobals import MonSeenTypes
 
 logger = get_logger(LoggerEnums.webhook)
 
 
 class DbWebhookReader:
+    """
+    The stream_*_changed_since methods optionally accept the IDs of the entities announced by the webhook change feed
+    to only read those rather than every row changed since the timestamp passed.
+    Rows are read in pages of batch_size rows (keyset pagination) and yielded as lists of dicts page by page in order to
+    not hold all changes in memory at once.
+    """
     @staticmethod
-    async def get_raids_changed_since(session: AsyncSession, _timestamp: int):
-        logger.debug2("DbWebhookReader::get_raids_changed_since called")
+    async def stream_raids_changed_since(session: AsyncSession, _timestamp: int,
+                                         gym_ids: Optional[Collection[str]] = None,
+                                         batch_size: int = WEBHOOK_READ_BATCH_SIZE) -> AsyncGenerator:
+        logger.debug2("DbWebhookReader::stream_raids_changed_since called")
         # TODO: Consider geofences?
-        raids_changed: List[Tuple[Raid, GymDetail, Gym]] = await RaidHelper.get_raids_changed_since(session,
-                                                                                                    _timestamp=_timestamp)
+        after_gym_id: Optional[str] = None
+        while True:
+            raids_changed: List[Tuple[Raid, GymDetail, Gym]] = await RaidHelper.get_raids_changed_since(
+                session, _timestamp=_timestamp, gym_ids=gym_ids, after_gym_id=after_gym_id, limit=batch_size)
+            if raids_changed:
+                after_gym_id = raids_changed[-1][0].gym_id
+                yield DbWebhookReader.__raids_to_dicts(raids_changed)
+            if len(raids_changed) < batch_size:
+                break
 
+    @staticmethod
+    def __raids_to_dicts(raids_changed: List[Tuple[Raid, GymDetail, Gym]]) -> List[Dict[str, Any]]:
         ret = []
         for (raid, gym_detail, gym) in raids_changed:
             ret.append({
@@ -54,10 +72,23 @@ class DbWebhookReader:
         return ret
 
     @staticmethod
-    async def get_weather_changed_since(session: AsyncSession, _timestamp: int):
-        logger.debug2("DbWebhookReader::get_weather_changed_since called")
-        weather_changed: List[Weather] = await WeatherHelper.get_changed_since(session, _timestamp=_timestamp)
+    async def stream_weather_changed_since(session: AsyncSession, _timestamp: int,
+                                           s2_cell_ids: Optional[Collection[str]] = None,
+                                           batch_size: int = WEBHOOK_READ_BATCH_SIZE) -> AsyncGenerator:
+        logger.debug2("DbWebhookReader::stream_weather_changed_since called")
+        after_s2_cell_id: Optional[str] = None
+        while True:
+            weather_changed: List[Weather] = await WeatherHelper.get_changed_since(
+                session, _timestamp=_timestamp, s2_cell_ids=s2_cell_ids, after_s2_cell_id=after_s2_cell_id,
+                limit=batch_size)
+            if weather_changed:
+                after_s2_cell_id = weather_changed[-1].s2_cell_id
+                yield DbWebhookReader.__weather_to_dicts(weather_changed)
+            if len(weather_changed) < batch_size:
+                break
 
+    @staticmethod
+    def __weather_to_dicts(weather_changed: List[Weather]) -> List[Dict[str, Any]]:
         ret = []
         for weather in weather_changed:
             ret.append({
@@ -79,18 +110,43 @@ class DbWebhookReader:
         return ret
 
     @staticmethod
-    async def get_quests_changed_since(session: AsyncSession, _timestamp: int) -> Dict[int, Tuple[Pokestop,
-                                                                                                  Dict[int, TrsQuest]]]:
-        logger.debug2("DbWebhookReader::get_quests_changed_since called")
-        quests_with_changes: Dict[int, Tuple[Pokestop, Dict[int, TrsQuest]]] = await PokestopHelper.get_with_quests(
-            session, timestamp=_timestamp)
-        return quests_with_changes
+    async def stream_quests_changed_since(session: AsyncSession, _timestamp: int,
+                                          pokestop_ids: Optional[Collection[str]] = None,
+                                          batch_size: int = WEBHOOK_READ_BATCH_SIZE) -> AsyncGenerator:
+        """
+        Yields: Dicts of stop IDs mapping the stop and its quests by layer. The quests of a stop may be yielded in
+            consecutive pages
+        """
+        logger.debug2("DbWebhookReader::stream_quests_changed_since called")
+        after_quest: Optional[Tuple[str, int]] = None
+        while True:
+            quests_with_changes: Dict[int, Tuple[Pokestop, Dict[int, TrsQuest]]] = await PokestopHelper\
+                .get_with_quests(session, timestamp=_timestamp, pokestop_ids=pokestop_ids, after_quest=after_quest,
+                                 limit=batch_size)
+            if quests_with_changes:
+                last_stop, last_quests = next(reversed(quests_with_changes.values()))
+                after_quest = (last_stop.pokestop_id, max(last_quests.keys()))
+                yield quests_with_changes
+            if sum(len(quests) for _, quests in quests_with_changes.values()) < batch_size:
+                break
 
     @staticmethod
-    async def get_gyms_changed_since(session: AsyncSession, _timestamp: int):
-        logger.debug2("DbWebhookReader::get_gyms_changed_since called")
-        gyms_changed: List[Tuple[Gym, GymDetail]] = await GymHelper.get_changed_since(session, _timestamp)
+    async def stream_gyms_changed_since(session: AsyncSession, _timestamp: int,
+                                        gym_ids: Optional[Collection[str]] = None,
+                                        batch_size: int = WEBHOOK_READ_BATCH_SIZE) -> AsyncGenerator:
+        logger.debug2("DbWebhookReader::stream_gyms_changed_since called")
+        after_gym_id: Optional[str] = None
+        while True:
+            gyms_changed: List[Tuple[Gym, GymDetail]] = await GymHelper.get_changed_since(
+                session, _timestamp, gym_ids=gym_ids, after_gym_id=after_gym_id, limit=batch_size)
+            if gyms_changed:
+                after_gym_id = gyms_changed[-1][0].gym_id
+                yield DbWebhookReader.__gyms_to_dicts(gyms_changed)
+            if len(gyms_changed) < batch_size:
+                break
 
+    @staticmethod
+    def __gyms_to_dicts(gyms_changed: List[Tuple[Gym, GymDetail]]) -> List[Dict[str, Any]]:
         ret = []
         for (gym, gym_detail) in gyms_changed:
             ret.append({
@@ -114,10 +170,38 @@ class DbWebhookReader:
         return ret
 
     @staticmethod
-    async def get_stops_changed_since(session: AsyncSession, _timestamp: int) -> List[Dict[str, Any]]:
-        logger.debug2("DbWebhookReader::get_stops_changed_since called")
-        stops_with_changes: Dict[Pokestop, List[PokestopIncident]] = await PokestopHelper\
-            .get_changed_since_or_incidents(session, _timestamp)
+    async def stream_stops_changed_since(session: AsyncSession, _timestamp: int,
+                                         pokestop_ids: Optional[Collection[str]] = None,
+                                         batch_size: int = WEBHOOK_READ_BATCH_SIZE) -> AsyncGenerator:
+        logger.debug2("DbWebhookReader::stream_stops_changed_since called")
+        after_incident: Optional[Tuple[str, Optional[str]]] = None
+        # The incidents of the last stop of a page may continue on the next page
+        pending: Dict[str, Tuple[Pokestop, List[PokestopIncident]]] = {}
+        while True:
+            stops_with_changes: Dict[Pokestop, List[PokestopIncident]] = await PokestopHelper\
+                .get_changed_since_or_incidents(session, _timestamp, pokestop_ids=pokestop_ids,
+                                                after_incident=after_incident, limit=batch_size)
+            for stop, incidents in stops_with_changes.items():
+                if stop.pokestop_id in pending:
+                    pending[stop.pokestop_id][1].extend(incidents)
+                else:
+                    pending[stop.pokestop_id] = (stop, incidents)
+            last_page: bool = sum(max(1, len(incidents)) for incidents in stops_with_changes.values()) < batch_size
+            if stops_with_changes and not last_page:
+                last_stop, last_incidents = next(reversed(stops_with_changes.items()))
+                after_incident = (last_stop.pokestop_id,
+                                  last_incidents[-1].incident_id if last_incidents else None)
+                continued: Tuple[Pokestop, List[PokestopIncident]] = pending.pop(last_stop.pokestop_id)
+                if pending:
+                    yield DbWebhookReader.__stops_to_dicts(dict(pending.values()))
+                pending = {last_stop.pokestop_id: continued}
+            else:
+                if pending:
+                    yield DbWebhookReader.__stops_to_dicts(dict(pending.values()))
+                break
+
+    @staticmethod
+    def __stops_to_dicts(stops_with_changes: Dict[Pokestop, List[PokestopIncident]]) -> List[Dict[str, Any]]:
         ret: List[Dict[str, Any]] = []
         for stop, incidents in stops_with_changes.items():
             stop_entry: Dict[str, Any] = {
@@ -147,15 +231,31 @@ class DbWebhookReader:
         return ret
 
     @staticmethod
-    async def get_mon_changed_since(session: AsyncSession, _timestamp: int,
-                                    mon_types: Optional[Set[MonSeenTypes]] = None):
-        logger.debug2("DbWebhookReader::get_mon_changed_since called")
-        mons_with_changes: List[
-            Tuple[Pokemon, TrsSpawn, Optional[Pokestop], Optional[
-                PokemonDisplay]]] = await PokemonHelper.get_changed_since(
-            session,
-            _timestamp,
-            mon_types)
+    async def stream_mon_changed_since(session: AsyncSession, _timestamp: int,
+                                       mon_types: Optional[Set[MonSeenTypes]] = None,
+                                       encounter_ids: Optional[Collection[int]] = None,
+                                       batch_size: int = WEBHOOK_READ_BATCH_SIZE) -> AsyncGenerator:
+        logger.debug2("DbWebhookReader::stream_mon_changed_since called")
+        after_encounter_id: Optional[int] = None
+        while True:
+            mons_with_changes: List[
+                Tuple[Pokemon, TrsSpawn, Optional[Pokestop], Optional[
+                    PokemonDisplay]]] = await PokemonHelper.get_changed_since(
+                session,
+                _timestamp,
+                mon_types,
+                encounter_ids=encounter_ids,
+                after_encounter_id=after_encounter_id,
+                limit=batch_size)
+            if mons_with_changes:
+                after_encounter_id = mons_with_changes[-1][0].encounter_id
+                yield DbWebhookReader.__mons_to_dicts(mons_with_changes)
+            if len(mons_with_changes) < batch_size:
+                break
+
+    @staticmethod
+    def __mons_to_dicts(mons_with_changes: List[Tuple[Pokemon, TrsSpawn, Optional[Pokestop],
+                                                      Optional[PokemonDisplay]]]) -> List[Dict[str, Any]]:
         ret = []
         for (mon, spawn, stop, mon_display) in mons_with_changes:
             if mon.latitude == 0 and mon.seen_type == MonSeenTypes.lure_encounter.value:
@@ -0,0 +1,75 @@
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from mapadroid.utils.logging import LoggerEnums, get_logger
+
+logger = get_logger(LoggerEnums.database)
+
+_PENDING_KEY = "mad_after_commit"
+# Callbacks registered within a savepoint are kept in a frame of their own (keyed by the savepoint, None for the
+# outermost transaction) until the savepoint ends
+_Frame = Tuple[Optional[SessionTransaction], List[Callable[[], None]]]
+
+
+def call_after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Calls the callback once the outermost transaction of the session has been committed. Callbacks registered within
+    a savepoint (begin_nested) are dropped if the savepoint is rolled back and kept for the enclosing transaction if
+    the savepoint is committed. Callbacks pending are dropped if the outermost transaction is rolled back.
+    """
+    frames: Optional[List[_Frame]] = session.info.get(_PENDING_KEY)
+    if frames is None:
+        frames = []
+        session.info[_PENDING_KEY] = frames
+        event.listen(session.sync_session, "after_commit", _run_pending)
+        event.listen(session.sync_session, "after_rollback", _drop_pending)
+    _get_frame(frames, session.sync_session.get_nested_transaction()).append(callback)
+
+
+def _get_frame(frames: List[_Frame], savepoint: Optional[SessionTransaction]) -> List[Callable[[], None]]:
+    # Frames of savepoints enclosed by the savepoint have been popped once those ended
+    if not frames or frames[-1][0] is not savepoint:
+        frames.append((savepoint, []))
+    return frames[-1][1]
+
+
+def _pop_frame(frames: List[_Frame], savepoint: SessionTransaction) -> List[Callable[[], None]]:
+    if not frames or frames[-1][0] is not savepoint:
+        return []
+    return frames.pop()[1]
+
+
+def _enclosing_savepoint(savepoint: SessionTransaction) -> Optional[SessionTransaction]:
+    transaction: Optional[SessionTransaction] = savepoint.parent
+    while transaction is not None and not transaction.nested:
+        transaction = transaction.parent
+    return transaction
+
+
+def _run_pending(session: Session) -> None:
+    frames: List[_Frame] = session.info.get(_PENDING_KEY, [])
+    savepoint: Optional[SessionTransaction] = session.get_nested_transaction()
+    if savepoint is not None:
+        callbacks: List[Callable[[], None]] = _pop_frame(frames, savepoint)
+        if callbacks:
+            _get_frame(frames, _enclosing_savepoint(savepoint)).extend(callbacks)
+        return
+    callbacks = [callback for _, frame in frames for callback in frame]
+    frames.clear()
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning("Failed calling callback after commit: {}", e)
+
+
+def _drop_pending(session: Session) -> None:
+    frames: List[_Frame] = session.info.get(_PENDING_KEY, [])
+    savepoint: Optional[SessionTransaction] = session.get_nested_transaction()
+    if savepoint is not None:
+        _pop_frame(frames, savepoint)
+        return
+    frames.clear()
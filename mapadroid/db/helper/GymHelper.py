@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Collection, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_, case, func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -88,10 +88,24 @@ class GymHelper:
         return team_count
 
     @staticmethod
-    async def get_changed_since(session: AsyncSession, timestamp: int) -> List[Tuple[Gym, GymDetail]]:
+    async def get_changed_since(session: AsyncSession, timestamp: int,
+                                gym_ids: Optional[Collection[str]] = None,
+                                after_gym_id: Optional[str] = None,
+                                limit: Optional[int] = None) -> List[Tuple[Gym, GymDetail]]:
+        """
+        Args:
+            after_gym_id: Only consider gyms with a greater ID (keyset pagination)
+            limit: Maximum amount of gyms to be read, ordered by the ID
+        """
         stmt = select(Gym, GymDetail) \
             .join(GymDetail, GymDetail.gym_id == Gym.gym_id, isouter=False) \
             .where(Gym.last_modified >= DatetimeWrapper.fromtimestamp(timestamp))
+        if gym_ids is not None:
+            stmt = stmt.where(Gym.gym_id.in_(gym_ids))
+        if after_gym_id is not None:
+            stmt = stmt.where(Gym.gym_id > after_gym_id)
+        if limit is not None:
+            stmt = stmt.order_by(Gym.gym_id).limit(limit)
         # TODO: Consider last_scanned above
         result = await session.execute(stmt)
         return result.all()
@@ -1,9 +1,10 @@
 import datetime
 import time
 from functools import reduce
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Collection, Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import Result, and_, delete, desc, func, text
+from sqlalchemy import Result, and_, case, delete, desc, func, text
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -26,6 +27,33 @@ class PokemonHelper:
         result = await session.execute(stmt)
         return result.scalars().first()
 
+    @staticmethod
+    async def insert_or_update_wild(session: AsyncSession, mons: List[Dict]) -> None:
+        """
+        Inserts or updates the wild mons passed in a single statement. Location and spawnpoint are only set for new
+        mons and the seen_type of mons already encountered is retained.
+        The rows are inserted ordered by encounter_id for concurrent submissions to lock the rows in the same order.
+        Args:
+            session:
+            mons: values of the mons to be inserted/updated keyed by the column names
+        """
+        if not mons:
+            return
+        insert_stmt = insert(Pokemon).values(sorted(mons, key=lambda mon: mon["encounter_id"]))
+        on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(
+            pokemon_id=insert_stmt.inserted.pokemon_id,
+            seen_type=case((Pokemon.seen_type.in_([MonSeenTypes.encounter.name, MonSeenTypes.lure_encounter.name]),
+                            Pokemon.seen_type),
+                           else_=insert_stmt.inserted.seen_type),
+            gender=insert_stmt.inserted.gender,
+            costume=insert_stmt.inserted.costume,
+            form=insert_stmt.inserted.form,
+            disappear_time=insert_stmt.inserted.disappear_time,
+            weather_boosted_condition=insert_stmt.inserted.weather_boosted_condition,
+            last_modified=insert_stmt.inserted.last_modified
+        )
+        await session.execute(on_duplicate_key_stmt)
+
     @staticmethod
     async def get_encountered(session: AsyncSession, geofence_helper: GeofenceHelper, latest: int = 0) \
             -> Tuple[int, Dict[int, int]]:
@@ -47,9 +75,8 @@ class PokemonHelper:
                                           ))
         result = await session.execute(stmt)
         encounter_id_infos: Dict[int, int] = {}
-        for pokemon in result.scalars().all():
-            if not geofence_helper.is_coord_inside_include_geofence([pokemon.latitude, pokemon.longitude]):
-                continue
+        for pokemon in geofence_helper.filter_in_geofence(result.scalars().all(),
+                                                          lambda mon: (mon.latitude, mon.longitude)):
             latest = max(latest, pokemon.last_modified.timestamp())
             # Add an hour to avoid encountering unknown disappear times again
             encounter_id_infos[pokemon.encounter_id] = int(pokemon.disappear_time.timestamp() + 60 * 60)
@@ -294,9 +321,17 @@ class PokemonHelper:
 
     @staticmethod
     async def get_changed_since(session: AsyncSession, _timestamp: int,
-                                mon_types: Optional[Set[MonSeenTypes]] = None) -> List[Tuple[Pokemon, TrsSpawn,
+                                mon_types: Optional[Set[MonSeenTypes]] = None,
+                                encounter_ids: Optional[Collection[int]] = None,
+                                after_encounter_id: Optional[int] = None,
+                                limit: Optional[int] = None) -> List[Tuple[Pokemon, TrsSpawn,
     Optional[Pokestop],
     Optional[PokemonDisplay]]]:
+        """
+        Args:
+            after_encounter_id: Only consider mons with a greater encounter ID (keyset pagination)
+            limit: Maximum amount of mons to be read, ordered by the encounter ID
+        """
         if not mon_types:
             mon_types = {MonSeenTypes.encounter, MonSeenTypes.lure_encounter}
 
@@ -312,6 +347,12 @@ class PokemonHelper:
         stmt = stmt.join(PokemonDisplay, Pokemon.encounter_id == PokemonDisplay.encounter_id, isouter=True)
         stmt = stmt.where(and_(Pokemon.last_modified >= DatetimeWrapper.fromtimestamp(_timestamp),
                                Pokemon.seen_type.in_(raw_types)))
+        if encounter_ids is not None:
+            stmt = stmt.where(Pokemon.encounter_id.in_(encounter_ids))
+        if after_encounter_id is not None:
+            stmt = stmt.where(Pokemon.encounter_id > after_encounter_id)
+        if limit is not None:
+            stmt = stmt.order_by(Pokemon.encounter_id).limit(limit)
 
         result = await session.execute(stmt)
         return result.all()
@@ -1,6 +1,6 @@
 from datetime import datetime
 from operator import or_
-from typing import Dict, List, Optional, Tuple
+from typing import Collection, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -84,11 +84,8 @@ class PokestopHelper:
                         Pokestop.latitude <= max_lat, Pokestop.longitude <= max_lon,
                         TrsVisited.origin == None))
         result = await session.execute(stmt)
-        unvisited: List[Pokestop] = []
-        for pokestop in result.scalars().all():
-            if geofence_helper.is_coord_inside_include_geofence([pokestop.latitude, pokestop.longitude]):
-                unvisited.append(pokestop)
-        return unvisited
+        return geofence_helper.filter_in_geofence(result.scalars().all(),
+                                                  lambda stop: (stop.latitude, stop.longitude))
 
     @staticmethod
     async def update_location(session: AsyncSession, fort_id: str, location: Location) -> None:
@@ -176,10 +173,8 @@ class PokestopHelper:
             if limit > 0:
                 stmt = stmt.limit(limit)
             result = await session.execute(stmt)
-            for stop, _distance in result.all():
-                if not geofence_helper.is_coord_inside_include_geofence([stop.latitude, stop.longitude]):
-                    continue
-                stops_retrieved.append(stop)
+            stops_retrieved.extend(geofence_helper.filter_in_geofence([stop for stop, _distance in result.all()],
+                                                                      lambda stop: (stop.latitude, stop.longitude)))
 
             if len(stops_retrieved) == 0 or limit > 0 and len(stops_retrieved) <= limit:
                 logger.debug("No location found or not getting enough locations - increasing distance")
@@ -199,7 +194,10 @@ class PokestopHelper:
                               ne_corner: Optional[Location] = None, sw_corner: Optional[Location] = None,
                               old_ne_corner: Optional[Location] = None, old_sw_corner: Optional[Location] = None,
                               timestamp: Optional[int] = None,
-                              fence: Optional[Tuple[str, Optional[GeofenceHelper]]] = None) -> \
+                              fence: Optional[Tuple[str, Optional[GeofenceHelper]]] = None,
+                              pokestop_ids: Optional[Collection[str]] = None,
+                              after_quest: Optional[Tuple[str, int]] = None,
+                              limit: Optional[int] = None) -> \
             Dict[int, Tuple[Pokestop, Dict[int, TrsQuest]]]:
         """
         quests_from_db
@@ -211,6 +209,10 @@ class PokestopHelper:
             old_sw_corner:
             timestamp:
             fence:
+            pokestop_ids: Only consider the stops passed
+            after_quest: Only consider quests following the stop ID and layer passed (keyset pagination)
+            limit: Maximum amount of quests to be read, ordered by the stop ID and layer. The quests of a stop may be
+                split across multiple pages
 
         Returns:
 
@@ -250,6 +252,13 @@ class PokestopHelper:
                                          Pokestop.longitude <= old_ne_corner.lng))
         if timestamp:
             where_conditions.append(TrsQuest.quest_timestamp >= timestamp)
+        if pokestop_ids is not None:
+            where_conditions.append(Pokestop.pokestop_id.in_(pokestop_ids))
+        if after_quest is not None:
+            after_pokestop_id, after_layer = after_quest
+            where_conditions.append(or_(Pokestop.pokestop_id > after_pokestop_id,
+                                        and_(Pokestop.pokestop_id == after_pokestop_id,
+                                             TrsQuest.layer > after_layer)))
 
         if fence:
             fence_str, geofence_helper = fence
@@ -257,6 +266,8 @@ class PokestopHelper:
             where_conditions.append(func.ST_Contains(func.ST_GeomFromText(polygon),
                                                      func.POINT(Pokestop.latitude, Pokestop.longitude)))
         stmt = stmt.where(and_(*where_conditions))
+        if limit is not None:
+            stmt = stmt.order_by(Pokestop.pokestop_id, TrsQuest.layer).limit(limit)
         result = await session.execute(stmt)
         stop_with_quest: Dict[int, Tuple[Pokestop, Dict[int, TrsQuest]]] = {}
         for (stop, quest) in result.all():
@@ -305,13 +316,15 @@ class PokestopHelper:
         stmt = stmt.where(and_(*where_conditions))
         result = await session.execute(stmt)
         stops_without_quests: Dict[str, Pokestop] = {}
+        candidates: List[Pokestop] = []
         for (stop, quest) in result.all():
             if quest and (quest.layer != quest_layer.value
                           or (without_quests and quest.quest_timestamp >= timezone_midnight.timestamp())
                           or (not without_quests and quest.quest_timestamp < timezone_midnight.timestamp())):
                 continue
-            if geofence_helper.is_coord_inside_include_geofence(Location(float(stop.latitude), float(stop.longitude))):
-                stops_without_quests[stop.pokestop_id] = stop
+            candidates.append(stop)
+        for stop in geofence_helper.filter_in_geofence(candidates, lambda stop: (stop.latitude, stop.longitude)):
+            stops_without_quests[stop.pokestop_id] = stop
         return stops_without_quests
 
     @staticmethod
@@ -370,8 +383,18 @@ class PokestopHelper:
         await session.execute(stmt)
 
     @staticmethod
-    async def get_changed_since_or_incidents(session: AsyncSession, timestamp: int) \
+    async def get_changed_since_or_incidents(session: AsyncSession, timestamp: int,
+                                             pokestop_ids: Optional[Collection[str]] = None,
+                                             after_incident: Optional[Tuple[str, Optional[str]]] = None,
+                                             limit: Optional[int] = None) \
             -> Dict[Pokestop, List[PokestopIncident]]:
+        """
+        Args:
+            after_incident: Only consider rows following the stop ID and incident ID passed (keyset pagination). The
+                incident ID is None for stops without incidents
+            limit: Maximum amount of rows (stops joined with their incidents) to be read, ordered by the stop ID and
+                incident ID. The incidents of a stop may be split across multiple pages
+        """
         stmt = select(Pokestop, PokestopIncident) \
             .join(PokestopIncident, Pokestop.pokestop_id == PokestopIncident.pokestop_id,
                   isouter=True)
@@ -386,6 +409,20 @@ class PokestopHelper:
                 )
             )
         )
+        if pokestop_ids is not None:
+            stmt = stmt.where(Pokestop.pokestop_id.in_(pokestop_ids))
+        if after_incident is not None:
+            after_pokestop_id, after_incident_id = after_incident
+            if after_incident_id is None:
+                # Stops without incidents are only joined with NULL
+                stmt = stmt.where(Pokestop.pokestop_id > after_pokestop_id)
+            else:
+                stmt = stmt.where(or_(Pokestop.pokestop_id > after_pokestop_id,
+                                      and_(Pokestop.pokestop_id == after_pokestop_id,
+                                           PokestopIncident.incident_id > after_incident_id)))
+        if limit is not None:
+            # NULL is sorted first
+            stmt = stmt.order_by(Pokestop.pokestop_id, PokestopIncident.incident_id).limit(limit)
         result = await session.execute(stmt)
         stops_and_incidents: Dict[Pokestop, List[PokestopIncident]] = {}
         for pokestop, incident in result.all():
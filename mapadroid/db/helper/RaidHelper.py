@@ -1,5 +1,5 @@
 import datetime
-from typing import List, Optional, Tuple
+from typing import Collection, List, Optional, Tuple
 
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -46,19 +46,32 @@ class RaidHelper:
 
     @staticmethod
     async def get_raids_changed_since(session: AsyncSession, _timestamp: int,
-                                      geofence_helper: GeofenceHelper = None) -> List[Tuple[Raid, GymDetail, Gym]]:
+                                      geofence_helper: GeofenceHelper = None,
+                                      gym_ids: Optional[Collection[str]] = None,
+                                      after_gym_id: Optional[str] = None,
+                                      limit: Optional[int] = None) -> List[Tuple[Raid, GymDetail, Gym]]:
+        """
+        Args:
+            after_gym_id: Only consider the raids of gyms with a greater ID (keyset pagination)
+            limit: Maximum amount of raids to be read, ordered by the gym ID
+        """
         stmt = select(Raid, GymDetail, Gym) \
             .select_from(Raid) \
             .join(GymDetail, GymDetail.gym_id == Raid.gym_id) \
             .join(Gym, Gym.gym_id == Raid.gym_id) \
-            .where(Raid.last_scanned > DatetimeWrapper.fromtimestamp(_timestamp))
+            .where(and_(Raid.last_scanned > DatetimeWrapper.fromtimestamp(_timestamp),
+                        Gym.latitude.isnot(None), Gym.longitude.isnot(None)))
+        if gym_ids is not None:
+            stmt = stmt.where(Raid.gym_id.in_(gym_ids))
+        if after_gym_id is not None:
+            stmt = stmt.where(Raid.gym_id > after_gym_id)
+        if limit is not None:
+            stmt = stmt.order_by(Raid.gym_id).limit(limit)
         result = await session.execute(stmt)
         changed_data: List[Tuple[Raid, GymDetail, Gym]] = []
         raw = result.all()
         for (raid, gym_detail, gym) in raw:
-            if gym.latitude is None or gym.longitude is None:
-                continue
-            elif geofence_helper \
+            if geofence_helper \
                     and not geofence_helper.is_coord_inside_include_geofence([gym.latitude, gym.longitude]):
                 continue
             changed_data.append((raid, gym_detail, gym))
@@ -1,12 +1,12 @@
 import asyncio
-import concurrent.futures
 import functools
 import time
 from datetime import datetime
 from typing import Collection, Dict, List, Optional, Tuple
 
 from _datetime import timedelta
-from sqlalchemy import and_, delete, func, not_, update
+from sqlalchemy import and_, delete, func, not_, or_, update
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -35,9 +35,46 @@ class TrsSpawnHelper:
         result = await session.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    async def get_calc_endminsec(session: AsyncSession, spawn_ids: Collection[int]) -> Dict[int, Optional[str]]:
+        """
+        Fetches the calculated despawn minute/second of the given spawnpoints in a single query.
+        Returns: Dict of spawnpoint IDs mapping to calc_endminsec. Unknown spawnpoints are not part of the result.
+        """
+        if not spawn_ids:
+            return {}
+        stmt = select(TrsSpawn.spawnpoint, TrsSpawn.calc_endminsec).where(TrsSpawn.spawnpoint.in_(spawn_ids))
+        result = await session.execute(stmt)
+        return {int(spawnpoint): calc_endminsec for spawnpoint, calc_endminsec in result.all()}
+
+    @staticmethod
+    async def insert_or_update_bulk(session: AsyncSession, spawns: List[Dict]) -> None:
+        """
+        Inserts or updates the spawnpoints passed in a single statement. The earliest_unseen value is only ever
+        lowered and calc_endminsec, last_scanned and last_non_scanned are only overwritten if a value is passed.
+        The spawndef passed is merged with the one stored as spawnpoints may be written by multiple processes: a
+        quarter of an hour is considered seen (lower 4 bits set, upper 4 bits cleared) if either considered it seen.
+        Args:
+            session:
+            spawns: values of the spawnpoints to be inserted/updated keyed by the column names
+        """
+        if not spawns:
+            return
+        insert_stmt = insert(TrsSpawn).values(spawns)
+        on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(
+            spawndef=TrsSpawn.spawndef.op("|")(insert_stmt.inserted.spawndef).op("&")(0x0F).op("|")(
+                TrsSpawn.spawndef.op("&")(insert_stmt.inserted.spawndef).op("&")(0xF0)),
+            earliest_unseen=func.least(TrsSpawn.earliest_unseen, insert_stmt.inserted.earliest_unseen),
+            calc_endminsec=func.coalesce(insert_stmt.inserted.calc_endminsec, TrsSpawn.calc_endminsec),
+            last_scanned=func.coalesce(insert_stmt.inserted.last_scanned, TrsSpawn.last_scanned),
+            last_non_scanned=func.coalesce(insert_stmt.inserted.last_non_scanned, TrsSpawn.last_non_scanned)
+        )
+        await session.execute(on_duplicate_key_stmt)
+
     @staticmethod
     async def __get_of_area(session: AsyncSession, geofence_helper: GeofenceHelper,
-                            additional_event: Optional[int], only_unknown_endtime: bool = False) -> List[TrsSpawn]:
+                            additional_event: Optional[int], only_unknown_endtime: bool = False,
+                            changed_since: Optional[datetime] = None) -> List[TrsSpawn]:
         if not geofence_helper:
             logger.warning("No geofence helper was passed. Returning empty list of spawns.")
             return []
@@ -53,23 +90,15 @@ class TrsSpawnHelper:
                                TrsSpawn.longitude <= max_lon)
         if only_unknown_endtime:
             where_condition = and_(TrsSpawn.calc_endminsec == None, where_condition)
+        if changed_since is not None:
+            where_condition = and_(or_(TrsSpawn.last_scanned >= changed_since,
+                                       TrsSpawn.last_non_scanned >= changed_since,
+                                       TrsSpawn.first_detection >= changed_since), where_condition)
 
         stmt = select(TrsSpawn).where(where_condition)
         result = await session.execute(stmt)
-        loop = asyncio.get_running_loop()
-        with concurrent.futures.ProcessPoolExecutor() as pool:
-            list_of_spawns = await loop.run_in_executor(pool, TrsSpawnHelper._filter_in_geofence,
-                                                        geofence_helper, result.scalars().all())
-        return list_of_spawns
-
-    @staticmethod
-    def _filter_in_geofence(geofence_helper, result):
-        list_of_spawns: List[TrsSpawn] = []
-        for spawnpoint in result:
-            if not geofence_helper.is_coord_inside_include_geofence([spawnpoint.latitude, spawnpoint.longitude]):
-                continue
-            list_of_spawns.append(spawnpoint)
-        return list_of_spawns
+        return geofence_helper.filter_in_geofence(result.scalars().all(),
+                                                  lambda spawn: (spawn.latitude, spawn.longitude))
 
     @staticmethod
     async def get_known_of_area(session: AsyncSession, geofence_helper: GeofenceHelper,
@@ -101,6 +130,23 @@ class TrsSpawnHelper:
         """
         return await TrsSpawnHelper.__get_of_area(session, geofence_helper, additional_event, only_unknown_endtime=True)
 
+    @staticmethod
+    async def get_changed_of_area(session: AsyncSession, geofence_helper: GeofenceHelper,
+                                  additional_event: Optional[int], changed_since: datetime) -> List[TrsSpawn]:
+        """
+        Fetches the spawnpoints in the given area defined by geofence_helper which have been detected, seen or
+        scanned without a mon since changed_since
+        Args:
+            session:
+            geofence_helper:
+            additional_event:
+            changed_since:
+
+        Returns: List of spawnpoints in the area (both with known and unknown despawn time)
+        """
+        return await TrsSpawnHelper.__get_of_area(session, geofence_helper, additional_event,
+                                                  changed_since=changed_since)
+
     @staticmethod
     async def convert_spawnpoints(session: AsyncSession, spawnpoint_ids: List[int], event_id: int = 1) -> None:
         stmt = update(TrsSpawn).where(TrsSpawn.spawnpoint.in_(spawnpoint_ids)).values(eventid=event_id)
@@ -155,9 +201,7 @@ class TrsSpawnHelper:
         current_time_of_day = DatetimeWrapper.now().replace(microsecond=0)
         timedelta_to_be_added = timedelta(hours=1)
 
-        for spawn in result:
-            if not geofence_helper.is_coord_inside_include_geofence([spawn.latitude, spawn.longitude]):
-                continue
+        for spawn in geofence_helper.filter_in_geofence(result, lambda spawn: (spawn.latitude, spawn.longitude)):
             endminsec_split = spawn.calc_endminsec.split(":")
             minutes = int(endminsec_split[0])
             seconds = int(endminsec_split[1])
@@ -1,5 +1,7 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -39,3 +41,24 @@ class TrsStatsDetectSeenTypeHelper:
             if not existing.nearby_stop or stat_entry.nearby_stop and existing.nearby_stop > stat_entry.nearby_stop:
                 existing.nearby_stop = stat_entry.nearby_stop
             session.add(existing)
+
+    @staticmethod
+    async def insert_or_update_bulk(session: AsyncSession, stat_entries: List[Dict]) -> None:
+        """
+        Inserts or updates the seen types of the encounters passed in a single statement. Each type keeps the
+        earliest time an encounter was seen as.
+        Args:
+            session:
+            stat_entries: values of the encounters to be inserted/updated keyed by the column names
+        """
+        if not stat_entries:
+            return
+        insert_stmt = insert(TrsStatsDetectSeenType).values(stat_entries)
+        on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(
+            **{column: func.coalesce(func.least(getattr(TrsStatsDetectSeenType, column),
+                                                getattr(insert_stmt.inserted, column)),
+                                     getattr(TrsStatsDetectSeenType, column),
+                                     getattr(insert_stmt.inserted, column))
+               for column in ("encounter", "wild", "nearby_stop", "nearby_cell", "lure_encounter", "lure_wild")}
+        )
+        await session.execute(on_duplicate_key_stmt)
@@ -1,8 +1,9 @@
 import datetime
 import time
-from typing import Optional
+from typing import Dict, List, Optional
 
-from sqlalchemy import delete, and_, or_, select
+from sqlalchemy import delete, and_, func, or_, select
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from mapadroid.db.model import TrsStatsDetectWildMonRaw
@@ -35,6 +36,26 @@ class TrsStatsDetectWildMonRawHelper:
                 existing.is_shiny = instance.is_shiny
             session.add(existing)
 
+    @staticmethod
+    async def insert_or_update_bulk(session: AsyncSession, mon_entries: List[Dict]) -> None:
+        """
+        Inserts or updates the wild mon stats passed in a single statement. Counts of existing rows are summed up,
+        the range of first_scanned and last_scanned is extended and is_shiny is only ever set.
+        Args:
+            session:
+            mon_entries: values of the stats to be inserted/updated keyed by the column names
+        """
+        if not mon_entries:
+            return
+        insert_stmt = insert(TrsStatsDetectWildMonRaw).values(mon_entries)
+        on_duplicate_key_stmt = insert_stmt.on_duplicate_key_update(
+            count=TrsStatsDetectWildMonRaw.count + insert_stmt.inserted.count,
+            is_shiny=func.greatest(TrsStatsDetectWildMonRaw.is_shiny, insert_stmt.inserted.is_shiny),
+            first_scanned=func.least(TrsStatsDetectWildMonRaw.first_scanned, insert_stmt.inserted.first_scanned),
+            last_scanned=func.greatest(TrsStatsDetectWildMonRaw.last_scanned, insert_stmt.inserted.last_scanned)
+        )
+        await session.execute(on_duplicate_key_stmt)
+
     @staticmethod
     async def cleanup(session: AsyncSession, delete_before_timestap_scan: datetime.datetime,
                       raw_delete_shiny_days: int = 0) -> None:
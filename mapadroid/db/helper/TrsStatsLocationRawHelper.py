@@ -2,6 +2,7 @@ from datetime import timedelta
 from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import and_, asc, case, delete, desc, func, or_
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import aliased
@@ -241,6 +242,20 @@ class TrsStatsLocationRawHelper:
         stat.transporttype = transporttype.value
         session.add(stat)
 
+    @staticmethod
+    async def add_bulk(session: AsyncSession, stats: List[Dict]) -> None:
+        """
+        Inserts the raw location stats passed in a single statement. Stats of an event already recorded (same worker,
+        location, type and period) are skipped.
+        Args:
+            session:
+            stats: values of the stats to be inserted keyed by the column names
+        """
+        if not stats:
+            return
+        insert_stmt = insert(TrsStatsLocationRaw).values(stats).prefix_with("IGNORE")
+        await session.execute(insert_stmt)
+
     @staticmethod
     async def get(session: AsyncSession, worker: str, location: Location, type_of_location: PositionType,
                   period: int) -> Optional[TrsStatsLocationRaw]:
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Collection, Optional, List
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -15,7 +15,21 @@ class WeatherHelper:
         return result.scalars().first()
 
     @staticmethod
-    async def get_changed_since(session: AsyncSession, _timestamp: int) -> List[Weather]:
+    async def get_changed_since(session: AsyncSession, _timestamp: int,
+                                s2_cell_ids: Optional[Collection[str]] = None,
+                                after_s2_cell_id: Optional[str] = None,
+                                limit: Optional[int] = None) -> List[Weather]:
+        """
+        Args:
+            after_s2_cell_id: Only consider cells with a greater ID (keyset pagination)
+            limit: Maximum amount of cells to be read, ordered by the ID
+        """
         stmt = select(Weather).where(Weather.last_updated > DatetimeWrapper.fromtimestamp(_timestamp))
+        if s2_cell_ids is not None:
+            stmt = stmt.where(Weather.s2_cell_id.in_(s2_cell_ids))
+        if after_s2_cell_id is not None:
+            stmt = stmt.where(Weather.s2_cell_id > after_s2_cell_id)
+        if limit is not None:
+            stmt = stmt.order_by(Weather.s2_cell_id).limit(limit)
         result = await session.execute(stmt)
         return result.scalars().all()
@@ -1,5 +1,7 @@
 import sys
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from mapadroid.db.model import SettingsGeofence
 from mapadroid.utils.logging import get_logger, LoggerEnums
@@ -18,6 +20,104 @@ except ImportError:
     pass
 
 
+class PreparedArea:
+    """
+    Polygon of a geofence area compiled to NumPy arrays (and a matplotlib path if available) once rather than for
+    every point to be checked.
+    """
+
+    def __init__(self, area: Dict, use_matplotlib: bool):
+        polygon = area['polygon']
+        self.name: str = area['name']
+        self.lats: np.ndarray = np.array([coord['lat'] for coord in polygon], dtype=np.float64)
+        self.lons: np.ndarray = np.array([coord['lon'] for coord in polygon], dtype=np.float64)
+        self.empty: bool = len(polygon) == 0
+        self.path = None
+        if self.empty:
+            return
+        self.min_lat, self.max_lat = float(self.lats.min()), float(self.lats.max())
+        self.min_lon, self.max_lon = float(self.lons.min()), float(self.lons.max())
+        # Edges from each vertex to the next one, the last vertex is connected to the first one. Edges parallel to
+        #  the meridian are never crossed by the ray (see is_point_in_polygon_custom)
+        lats_next = np.roll(self.lats, -1)
+        lons_next = np.roll(self.lons, -1)
+        crossable = self.lons != lons_next
+        self._edge_lat1, self._edge_lon1 = self.lats[crossable], self.lons[crossable]
+        self._edge_lat2, self._edge_lon2 = lats_next[crossable], lons_next[crossable]
+        self._edge_min_lon = np.minimum(self._edge_lon1, self._edge_lon2)
+        self._edge_max_lon = np.maximum(self._edge_lon1, self._edge_lon2)
+        self._edge_max_lat = np.maximum(self._edge_lat1, self._edge_lat2)
+        if use_matplotlib:
+            vertexes = np.column_stack((self.lats, self.lons))
+            self.path = Path(np.vstack((vertexes, vertexes[:1])))
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if self.empty or lat > self.max_lat or lat < self.min_lat or lon > self.max_lon or lon < self.min_lon:
+            return False
+        if self.path is not None:
+            return bool(self.path.contains_point((lat, lon)))
+        return bool(self.contains_many(np.array([lat]), np.array([lon]))[0])
+
+    def contains_many(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        inside = np.zeros(len(lats), dtype=bool)
+        if self.empty:
+            return inside
+        candidates = np.flatnonzero((lats <= self.max_lat) & (lats >= self.min_lat)
+                                    & (lons <= self.max_lon) & (lons >= self.min_lon))
+        if len(candidates) == 0:
+            return inside
+        if self.path is not None:
+            inside[candidates] = self.path.contains_points(np.column_stack((lats[candidates], lons[candidates])))
+            return inside
+        # Even-odd ray casting like is_point_in_polygon_custom. Points are sorted by longitude to only inspect the
+        #  slice of points within the longitude range of each edge
+        order = np.argsort(lons[candidates], kind="stable")
+        sorted_lats = lats[candidates][order]
+        sorted_lons = lons[candidates][order]
+        sorted_inside = np.zeros(len(candidates), dtype=bool)
+        starts = np.searchsorted(sorted_lons, self._edge_min_lon, side="right")
+        ends = np.searchsorted(sorted_lons, self._edge_max_lon, side="right")
+        for edge in range(len(starts)):
+            start, end = starts[edge], ends[edge]
+            if start >= end:
+                continue
+            lat1, lon1 = self._edge_lat1[edge], self._edge_lon1[edge]
+            lat2, lon2 = self._edge_lat2[edge], self._edge_lon2[edge]
+            point_lats = sorted_lats[start:end]
+            crossing = point_lats <= self._edge_max_lat[edge]
+            if lat1 != lat2:
+                lat_intersection = (sorted_lons[start:end] - lon1) * (lat2 - lat1) / (lon2 - lon1) + lat1
+                crossing &= point_lats <= lat_intersection
+            sorted_inside[start:end] ^= crossing
+        inside[candidates[order]] = sorted_inside
+        return inside
+
+    def classify_rectangle(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Optional[bool]:
+        """
+        Returns: True if the rectangle is inside the polygon entirely, False if it is outside entirely and None if the
+            border of the polygon crosses the rectangle
+        """
+        if (self.empty or min_lat > self.max_lat or max_lat < self.min_lat
+                or min_lon > self.max_lon or max_lon < self.min_lon):
+            return False
+        lats_next = np.roll(self.lats, -1)
+        lons_next = np.roll(self.lons, -1)
+        overlapping = ((np.minimum(self.lats, lats_next) <= max_lat) & (np.maximum(self.lats, lats_next) >= min_lat)
+                       & (np.minimum(self.lons, lons_next) <= max_lon) & (np.maximum(self.lons, lons_next) >= min_lon))
+        if overlapping.any():
+            # An edge overlapping the bounding box crosses the rectangle unless all corners are on the same side
+            delta_lats = lats_next - self.lats
+            delta_lons = lons_next - self.lons
+            sides = np.stack([delta_lats * (lon - self.lons) - delta_lons * (lat - self.lats)
+                              for lat, lon in ((min_lat, min_lon), (min_lat, max_lon),
+                                               (max_lat, min_lon), (max_lat, max_lon))])
+            same_side = np.all(sides > 0, axis=0) | np.all(sides < 0, axis=0)
+            if (overlapping & ~same_side).any():
+                return None
+        # The border does not cross the rectangle, a single corner decides
+        return self.contains(min_lat, min_lon)
+
+
 class GeofenceHelper:
     def __init__(self, include_geofence: SettingsGeofence, exclude_geofence: Optional[SettingsGeofence],
                  fence_name=None):
@@ -31,6 +131,10 @@ class GeofenceHelper:
                 exclude_geofence, excluded=True, fence_fallback=fence_name)
             logger.debug2("Loaded {} geofenced and {} excluded areas.", len(self.geofenced_areas),
                           len(self.excluded_areas))
+        self._prepared_geofenced_areas: List[PreparedArea] = [PreparedArea(area, self.use_matplotlib)
+                                                              for area in self.geofenced_areas]
+        self._prepared_excluded_areas: List[PreparedArea] = [PreparedArea(area, self.use_matplotlib)
+                                                             for area in self.excluded_areas]
 
     def get_polygon_from_fence(self) -> Tuple[float, float, float, float]:
         max_lat, min_lat, max_lon, min_lon = -90, 90, -180, 180
@@ -50,35 +154,94 @@ class GeofenceHelper:
             return False
 
         # Coordinate is geofenced if in one geofenced area.
-        if self.geofenced_areas:
-            for va in self.geofenced_areas:
-                if self._in_area(coordinate, va):
+        if self._prepared_geofenced_areas:
+            for area in self._prepared_geofenced_areas:
+                if area.contains(coordinate[0], coordinate[1]):
                     return True
         else:
             return True
         return False
 
-    # TODO: Async/Threaded?
+    def contains_many(self, lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+        """
+        Batch variant of is_coord_inside_include_geofence
+        Args:
+            lats: latitudes of the points to check
+            lngs: longitudes of the points to check, same length as lats
+
+        Returns: boolean mask of the points inside any geofenced and outside all excluded areas
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if self._prepared_geofenced_areas:
+            inside = np.zeros(len(lats), dtype=bool)
+            for area in self._prepared_geofenced_areas:
+                inside |= area.contains_many(lats, lngs)
+        else:
+            inside = np.ones(len(lats), dtype=bool)
+        for area in self._prepared_excluded_areas:
+            inside &= ~area.contains_many(lats, lngs)
+        return inside
+
+    def classify_rectangle(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Optional[bool]:
+        """
+        Rectangle variant of is_coord_inside_include_geofence
+        Returns: True if all points of the rectangle are inside the geofence, False if none are and None if the
+            rectangle is crossed by the border of an area
+        """
+        excluded: Optional[bool] = False
+        for area in self._prepared_excluded_areas:
+            state: Optional[bool] = area.classify_rectangle(min_lat, min_lon, max_lat, max_lon)
+            if state is True:
+                return False
+            elif state is None:
+                excluded = None
+        included: Optional[bool] = True
+        if self._prepared_geofenced_areas:
+            included = False
+            for area in self._prepared_geofenced_areas:
+                state: Optional[bool] = area.classify_rectangle(min_lat, min_lon, max_lat, max_lon)
+                if state is True:
+                    included = True
+                    break
+                elif state is None:
+                    included = None
+        if included is False:
+            return False
+        elif included is True and excluded is False:
+            return True
+        return None
+
+    def get_bounding_box(self) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Returns: min_lat, min_lon, max_lat, max_lon of all points inside the geofence, None if it is not limited
+        """
+        areas = [area for area in self._prepared_geofenced_areas if not area.empty]
+        if not self._prepared_geofenced_areas:
+            return None
+        elif not areas:
+            return 0.0, 0.0, -1.0, -1.0
+        return (min(area.min_lat for area in areas), min(area.min_lon for area in areas),
+                max(area.max_lat for area in areas), max(area.max_lon for area in areas))
+
+    def filter_in_geofence(self, entries: List, get_lat_lng=lambda entry: (entry[0], entry[1])) -> List:
+        """
+        Returns the entries located inside the geofence keeping their order.
+        get_lat_lng retrieves latitude and longitude of an entry, e.g. lambda spawn: (spawn.latitude, spawn.longitude)
+        """
+        if not entries:
+            return []
+        coords = np.array([get_lat_lng(entry) for entry in entries], dtype=np.float64).reshape(-1, 2)
+        mask = self.contains_many(coords[:, 0], coords[:, 1])
+        return [entry for entry, inside in zip(entries, mask.tolist()) if inside]
+
     def get_geofenced_coordinates(self, coordinates):
         # Import: We are working with n-tuples in some functions be carefull
         # and do not break compatibility
         logger.debug('Using matplotlib: {}.', self.use_matplotlib)
         logger.debug2('Found {} coordinates to geofence.', len(coordinates))
 
-        geofenced_coordinates = []
-        for coord in coordinates:
-            # Coordinate is not valid if in one excluded area.
-            if self._is_excluded(coord):
-                continue
-
-            # Coordinate is geofenced if in one geofenced area.
-            if self.geofenced_areas:
-                for va in self.geofenced_areas:
-                    if self._in_area(coord, va):
-                        geofenced_coordinates.append(coord)
-                        break
-            else:
-                geofenced_coordinates.append(coord)
+        geofenced_coordinates = self.filter_in_geofence(coordinates)
 
         logger.debug2("Geofenced to {} coordinates", len(geofenced_coordinates))
         return geofenced_coordinates
@@ -127,20 +290,12 @@ class GeofenceHelper:
         return geofences
 
     def _is_excluded(self, coordinate):
-        for ea in self.excluded_areas:
-            if self._in_area(coordinate, ea):
+        for area in self._prepared_excluded_areas:
+            if area.contains(coordinate[0], coordinate[1]):
                 return True
 
         return False
 
-    def _in_area(self, coordinate, area):
-        point = {'lat': coordinate[0], 'lon': coordinate[1]}
-        polygon = area['polygon']
-        if self.use_matplotlib:
-            return self.is_point_in_polygon_matplotlib(point, polygon)
-        else:
-            return self.is_point_in_polygon_custom(point, polygon)
-
     @staticmethod
     def is_point_in_polygon_matplotlib(point, polygon):
         point_tuple = (point['lat'], point['lon'])
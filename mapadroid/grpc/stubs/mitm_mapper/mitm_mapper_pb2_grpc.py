@@ -76,6 +76,16 @@ class MitmMapperStub(object):
                 request_serializer=shared_dot_Worker__pb2.Worker.SerializeToString,
                 response_deserializer=mitm__mapper_dot_mitm__mapper__pb2.GetQuestsHeldResponse.FromString,
                 )
+        self.WaitForLatest = channel.unary_stream(
+                '/mapadroid.mitm_mapper.MitmMapper/WaitForLatest',
+                request_serializer=mitm__mapper_dot_mitm__mapper__pb2.WaitForLatestRequest.SerializeToString,
+                response_deserializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.FromString,
+                )
+        self.UpdateBatch = channel.unary_unary(
+                '/mapadroid.mitm_mapper.MitmMapper/UpdateBatch',
+                request_serializer=mitm__mapper_dot_mitm__mapper__pb2.MitmMapperUpdateBatch.SerializeToString,
+                response_deserializer=shared_dot_Ack__pb2.Ack.FromString,
+                )
 
 
 class MitmMapperServicer(object):
@@ -153,6 +163,20 @@ class MitmMapperServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WaitForLatest(self, request, context):
+        """Streams the latest data of the key whenever newer data than sent before arrives until timeout_ms passed
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UpdateBatch(self, request, context):
+        """Updates buffered by clients, applied in the order given
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MitmMapperServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -216,6 +240,16 @@ def add_MitmMapperServicer_to_server(servicer, server):
                     request_deserializer=shared_dot_Worker__pb2.Worker.FromString,
                     response_serializer=mitm__mapper_dot_mitm__mapper__pb2.GetQuestsHeldResponse.SerializeToString,
             ),
+            'WaitForLatest': grpc.unary_stream_rpc_method_handler(
+                    servicer.WaitForLatest,
+                    request_deserializer=mitm__mapper_dot_mitm__mapper__pb2.WaitForLatestRequest.FromString,
+                    response_serializer=mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.SerializeToString,
+            ),
+            'UpdateBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateBatch,
+                    request_deserializer=mitm__mapper_dot_mitm__mapper__pb2.MitmMapperUpdateBatch.FromString,
+                    response_serializer=shared_dot_Ack__pb2.Ack.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'mapadroid.mitm_mapper.MitmMapper', rpc_method_handlers)
@@ -429,3 +463,37 @@ class MitmMapper(object):
             mitm__mapper_dot_mitm__mapper__pb2.GetQuestsHeldResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def WaitForLatest(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/mapadroid.mitm_mapper.MitmMapper/WaitForLatest',
+            mitm__mapper_dot_mitm__mapper__pb2.WaitForLatestRequest.SerializeToString,
+            mitm__mapper_dot_mitm__mapper__pb2.LatestMitmDataEntryResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def UpdateBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/mapadroid.mitm_mapper.MitmMapper/UpdateBatch',
+            mitm__mapper_dot_mitm__mapper__pb2.MitmMapperUpdateBatch.SerializeToString,
+            shared_dot_Ack__pb2.Ack.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -16,6 +16,7 @@ from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.db.model import AuthLevel, Base, SettingsAuth
 from mapadroid.mad_apk.abstract_apk_storage import AbstractAPKStorage
 from mapadroid.madmin import apiException
+from mapadroid.madmin.MapTileCache import MapTileCache
 from mapadroid.mapping_manager.MappingManager import MappingManager
 from mapadroid.updater.updater import DeviceUpdater
 from mapadroid.utils.aiohttp import add_prefix_to_url, get_forwarded_path
@@ -183,6 +184,9 @@ class AbstractMadminRootEndpoint(web.View, ABC):
     def _get_account_handler(self) -> AbstractAccountHandler:
         return self.request.app["account_handler"]
 
+    def _get_map_tile_cache(self) -> MapTileCache:
+        return self.request.app["map_tile_cache"]
+
     @staticmethod
     def _convert_to_json_string(content) -> str:
         try:
@@ -0,0 +1,76 @@
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from cachetools import TTLCache
+from redis import Redis
+
+from mapadroid.utils.collections import MapTile
+from mapadroid.utils.json_encoder import mad_orjson_dumps
+from mapadroid.utils.madConstants import (MAP_TILE_CACHE_SIZE,
+                                          MAP_TILE_CACHE_TTL)
+from mapadroid.utils.map_tiles import MapTileLayer, MapTileVersions, TileKey
+
+# Reads the objects of a layer located in the tiles passed, tiles without objects may be omitted
+TileBuilder = Callable[[List[TileKey]], Awaitable[Dict[TileKey, List]]]
+
+
+class MapTileCache:
+    """
+    Keeps the serialized objects of the tiles of the layers of the map. A tile is served from memory as long as its
+    counter in redis (see MapTileVersions) did not change and it is not older than the TTL. Tiles missing are read at
+    once by the builder passed, concurrent requests of the same tiles share a single read.
+    """
+
+    def __init__(self, cache: Redis, maxsize: int = MAP_TILE_CACHE_SIZE, ttl: float = MAP_TILE_CACHE_TTL):
+        self._cache: Redis = cache
+        self._tiles: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._building: Dict[Tuple[MapTileLayer, TileKey], asyncio.Future] = {}
+
+    async def get(self, layer: MapTileLayer, tiles: List[TileKey], build: TileBuilder) -> Dict[TileKey, MapTile]:
+        counters: List[int] = await MapTileVersions.get(self._cache, layer, tiles)
+        result: Dict[TileKey, MapTile] = {}
+        pending: Dict[TileKey, asyncio.Future] = {}
+        missing: Dict[TileKey, int] = {}
+        for tile, counter in zip(tiles, counters):
+            cached: MapTile = self._tiles.get((layer, tile))
+            if cached is not None and cached.counter == counter:
+                result[tile] = cached
+            elif (layer, tile) in self._building:
+                pending[tile] = self._building[(layer, tile)]
+            else:
+                missing[tile] = counter
+        if missing:
+            await self.__build(layer, missing, build, result)
+        for tile, future in pending.items():
+            result[tile] = await asyncio.shield(future)
+        return result
+
+    async def __build(self, layer: MapTileLayer, missing: Dict[TileKey, int], build: TileBuilder,
+                      result: Dict[TileKey, MapTile]) -> None:
+        loop = asyncio.get_running_loop()
+        futures: Dict[TileKey, asyncio.Future] = {tile: loop.create_future() for tile in missing.keys()}
+        self._building.update({(layer, tile): future for tile, future in futures.items()})
+        try:
+            objects: Dict[TileKey, List] = await build(list(missing.keys()))
+            for tile, counter in missing.items():
+                # The counter read before building is stored, writes in between invalidate the tile once more
+                data: bytes = mad_orjson_dumps(objects.get(tile, []))
+                built: MapTile = MapTile(counter, hashlib.blake2b(data, digest_size=8).hexdigest(), data)
+                self._tiles[(layer, tile)] = built
+                result[tile] = built
+                futures[tile].set_result(built)
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Only raised to the requests waiting for the tiles, if any
+                    future.exception()
+            raise
+        finally:
+            for tile in futures.keys():
+                self._building.pop((layer, tile), None)
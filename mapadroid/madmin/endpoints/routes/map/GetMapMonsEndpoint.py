@@ -1,17 +1,13 @@
 import asyncio
-import random
-from typing import Dict, List, Optional
-
-from loguru import logger
+from typing import List, Optional
 
 from mapadroid.db.helper.PokemonHelper import PokemonHelper
 from mapadroid.db.model import AuthLevel, Pokemon
 from mapadroid.madmin.AbstractMadminRootEndpoint import (
     AbstractMadminRootEndpoint, check_authorization_header)
 from mapadroid.madmin.functions import get_bound_params
+from mapadroid.madmin.map_serialization import serialize_mons
 from mapadroid.utils.collections import Location
-from mapadroid.utils.language import get_mon_name_sync
-from mapadroid.utils.madGlobals import MonSeenTypes
 
 
 class GetMapMonsEndpoint(AbstractMadminRootEndpoint):
@@ -36,39 +32,7 @@ class GetMapMonsEndpoint(AbstractMadminRootEndpoint):
                                                       timestamp=timestamp)
         loop = asyncio.get_running_loop()
         mons_serialized = await loop.run_in_executor(
-            None, self.__serialize_mons, data)
+            None, serialize_mons, data, self._get_mon_name_cache())
         del data
         response = await self._json_response(mons_serialized)
         return response
-
-    def __serialize_mons(self, data):
-        mons_serialized: List[Dict] = []
-        mon_name_cache: Dict[int, str] = self._get_mon_name_cache()
-        for mon in data:
-            serialized_entry = self.__serialize_single_mon(mon, mon_name_cache)
-            mons_serialized.append(serialized_entry)
-        del data
-        return mons_serialized
-
-    @staticmethod
-    def __serialize_single_mon(mon, mon_name_cache):
-        serialized_entry: Dict = {x: y for x, y in vars(mon).items() if not x.startswith("_")}
-        serialized_entry["disappear_time"] = int(mon.disappear_time.timestamp())
-        if mon.last_modified:
-            serialized_entry["last_modified"] = int(mon.last_modified.timestamp())
-        else:
-            serialized_entry["last_modified"] = 0
-        if mon.seen_type in (MonSeenTypes.nearby_stop.value, MonSeenTypes.nearby_cell.value):
-            serialized_entry["latitude"] = float(serialized_entry["latitude"]) + random.uniform(-0.0003, 0.0003)
-            serialized_entry["longitude"] = float(serialized_entry["longitude"]) + random.uniform(-0.0005, 0.0005)
-        try:
-            if mon.pokemon_id in mon_name_cache:
-                mon_name = mon_name_cache[mon.pokemon_id]
-            else:
-                mon_name = get_mon_name_sync(mon.pokemon_id)
-                mon_name_cache[mon.pokemon_id] = mon_name
-
-            serialized_entry["name"] = mon_name
-        except Exception as e:
-            logger.exception(e)
-        return serialized_entry
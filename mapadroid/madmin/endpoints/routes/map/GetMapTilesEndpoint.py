@@ -0,0 +1,109 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+from aiohttp import web
+
+from mapadroid.db.helper.GymHelper import GymHelper
+from mapadroid.db.helper.PokemonHelper import PokemonHelper
+from mapadroid.db.helper.PokestopHelper import PokestopHelper
+from mapadroid.db.helper.TrsSpawnHelper import TrsSpawnHelper
+from mapadroid.db.model import (AuthLevel, Gym, GymDetail, Pokemon, Pokestop,
+                                Raid, TrsEvent, TrsQuest, TrsSpawn)
+from mapadroid.madmin.AbstractMadminRootEndpoint import (
+    AbstractMadminRootEndpoint, check_authorization_header)
+from mapadroid.madmin.map_serialization import (serialize_gyms,
+                                                serialize_mons,
+                                                serialize_quests,
+                                                serialize_spawns,
+                                                serialize_stops)
+from mapadroid.madmin.MapTileCache import MapTileCache
+from mapadroid.utils.collections import Location, MapTile
+from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
+from mapadroid.utils.madConstants import (MAP_TILE_MAX_TILES_PER_REQUEST,
+                                          MAP_TILE_ZOOM)
+from mapadroid.utils.map_tiles import (MapTileLayer, TileKey, group_by_tile,
+                                       rectangle_of_tiles, tiles_in_rectangle)
+
+
+class GetMapTilesEndpoint(AbstractMadminRootEndpoint):
+    """
+    "/get_map_tiles"
+    Serves the objects of a layer of the map by the tiles covering the viewport. The versions of the tiles known to the
+    client are passed, only tiles of a different version are returned.
+    """
+
+    @check_authorization_header(AuthLevel.MADMIN_ADMIN)
+    async def post(self):
+        try:
+            request_data: Dict = await self.request.json()
+            layer: MapTileLayer = MapTileLayer(request_data["layer"])
+            ne_corner: Location = Location(float(request_data["neLat"]), float(request_data["neLon"]))
+            sw_corner: Location = Location(float(request_data["swLat"]), float(request_data["swLon"]))
+            known_versions: Dict[TileKey, str] = request_data.get("tiles") or {}
+        except (ValueError, KeyError, TypeError):
+            return web.Response(text="Invalid request", status=400)
+        tiles: List[TileKey] = tiles_in_rectangle(ne_corner, sw_corner)
+        if len(tiles) > MAP_TILE_MAX_TILES_PER_REQUEST:
+            return web.Response(text="Too many tiles requested, use the rectangle", status=400)
+
+        tile_cache: MapTileCache = self._get_map_tile_cache()
+        built: Dict[TileKey, MapTile] = await tile_cache.get(layer, tiles, self.__builders()[layer])
+        # The serialized tiles are embedded as they are rather than being parsed and encoded once more
+        changed: List[bytes] = [b'"%s":{"version":"%s","data":%s}' % (tile.encode(), entry.version.encode(), entry.data)
+                                for tile, entry in built.items() if known_versions.get(tile) != entry.version]
+        body: bytes = b'{"zoom":%d,"tiles":{%s}}' % (MAP_TILE_ZOOM, b",".join(changed))
+        return await self._json_response(body=body)
+
+    def __builders(self):
+        return {
+            MapTileLayer.mons: self.__build_mons,
+            MapTileLayer.spawns: self.__build_spawns,
+            MapTileLayer.stops: self.__build_stops,
+            MapTileLayer.gyms: self.__build_gyms,
+            MapTileLayer.quests: self.__build_quests
+        }
+
+    async def __build_mons(self, tiles: List[TileKey]) -> Dict[TileKey, List]:
+        ne_corner, sw_corner = rectangle_of_tiles(tiles)
+        data: List[Pokemon] = await PokemonHelper.get_mons_in_rectangle(self._session, ne_corner=ne_corner,
+                                                                        sw_corner=sw_corner)
+        grouped: Dict[TileKey, List[Pokemon]] = group_by_tile(data, lambda mon: (mon.latitude, mon.longitude))
+        mon_name_cache: Dict[int, str] = self._get_mon_name_cache()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: {tile: serialize_mons(mons, mon_name_cache) for tile, mons in grouped.items()})
+
+    async def __build_spawns(self, tiles: List[TileKey]) -> Dict[TileKey, List]:
+        ne_corner, sw_corner = rectangle_of_tiles(tiles)
+        data: Dict[int, Tuple[TrsSpawn, TrsEvent]] = await TrsSpawnHelper.download_spawns(
+            self._session, ne_corner=ne_corner, sw_corner=sw_corner)
+        grouped = group_by_tile(data.items(), lambda item: (item[1][0].latitude, item[1][0].longitude))
+        datetimeformat: str = self._datetimeformat
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: {tile: serialize_spawns(dict(spawns), datetimeformat) for tile, spawns in grouped.items()})
+
+    async def __build_stops(self, tiles: List[TileKey]) -> Dict[TileKey, List]:
+        ne_corner, sw_corner = rectangle_of_tiles(tiles)
+        data: List[Pokestop] = await PokestopHelper.get_in_rectangle(self._session, ne_corner=ne_corner,
+                                                                     sw_corner=sw_corner)
+        stops_with_quests: Dict[str, Tuple[Pokestop, Dict[int, TrsQuest]]] = \
+            await PokestopHelper.get_with_quests(self._session, ne_corner=ne_corner, sw_corner=sw_corner)
+        grouped: Dict[TileKey, List[Pokestop]] = group_by_tile(data, lambda stop: (stop.latitude, stop.longitude))
+        return {tile: serialize_stops(stops, stops_with_quests) for tile, stops in grouped.items()}
+
+    async def __build_gyms(self, tiles: List[TileKey]) -> Dict[TileKey, List]:
+        ne_corner, sw_corner = rectangle_of_tiles(tiles)
+        data: Dict[str, Tuple[Gym, GymDetail, Raid]] = await GymHelper.get_gyms_in_rectangle(
+            self._session, ne_corner=ne_corner, sw_corner=sw_corner)
+        grouped = group_by_tile(data.items(), lambda item: (item[1][0].latitude, item[1][0].longitude))
+        now = DatetimeWrapper.now()
+        return {tile: serialize_gyms(dict(gyms), now) for tile, gyms in grouped.items()}
+
+    async def __build_quests(self, tiles: List[TileKey]) -> Dict[TileKey, List]:
+        ne_corner, sw_corner = rectangle_of_tiles(tiles)
+        data: Dict[str, Tuple[Pokestop, Dict[int, TrsQuest]]] = await PokestopHelper.get_with_quests(
+            self._session, ne_corner=ne_corner, sw_corner=sw_corner)
+        grouped = group_by_tile(data.items(), lambda item: (item[1][0].latitude, item[1][0].longitude))
+        quest_gen = self._get_quest_gen()
+        return {tile: await serialize_quests(dict(quests), quest_gen) for tile, quests in grouped.items()}
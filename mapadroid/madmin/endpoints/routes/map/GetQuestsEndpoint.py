@@ -1,4 +1,4 @@
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from mapadroid.db.helper.PokestopHelper import PokestopHelper
 from mapadroid.db.model import AuthLevel, Pokestop, TrsQuest
@@ -7,8 +7,8 @@ from mapadroid.madmin.AbstractMadminRootEndpoint import (
     AbstractMadminRootEndpoint, check_authorization_header)
 from mapadroid.madmin.functions import (generate_coords_from_geofence,
                                         get_bound_params)
+from mapadroid.madmin.map_serialization import serialize_quests
 from mapadroid.utils.collections import Location
-from mapadroid.utils.questGen import QuestGen
 
 
 class GetQuestsEndpoint(AbstractMadminRootEndpoint):
@@ -18,8 +18,6 @@ class GetQuestsEndpoint(AbstractMadminRootEndpoint):
 
     @check_authorization_header(AuthLevel.MADMIN_ADMIN)
     async def get(self):
-        quests = []
-
         fence_name = self._request.query.get("fence")
         fence: Optional[Tuple[str, Optional[GeofenceHelper]]] = None
         if fence_name not in (None, 'None', 'All'):
@@ -37,10 +35,7 @@ class GetQuestsEndpoint(AbstractMadminRootEndpoint):
                                                  old_sw_corner=Location(o_sw_lat, o_sw_lng),
                                                  timestamp=timestamp,
                                                  fence=fence)
-        quest_gen: QuestGen = self._get_quest_gen()
-        for stop_id, (stop, quests_of_stop) in data.items():
-            for quest in quests_of_stop.values():
-                quests.append(await quest_gen.generate_quest(stop, quest))
+        quests: List[Dict] = await serialize_quests(data, self._get_quest_gen())
         del data
         resp = await self._json_response(quests)
         del quests
@@ -1,12 +1,13 @@
 import asyncio
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from mapadroid.db.helper.TrsSpawnHelper import TrsSpawnHelper
 from mapadroid.db.model import AuthLevel, TrsEvent, TrsSpawn
 from mapadroid.madmin.AbstractMadminRootEndpoint import (
     AbstractMadminRootEndpoint, check_authorization_header)
 from mapadroid.madmin.functions import get_bound_params
+from mapadroid.madmin.map_serialization import serialize_spawns
 from mapadroid.utils.collections import Location
 
 
@@ -22,7 +23,6 @@ class GetSpawnsEndpoint(AbstractMadminRootEndpoint):
         if timestamp:
             timestamp = int(timestamp)
 
-        coords: Dict[str, List[Dict]] = {}
         data: Dict[int, Tuple[TrsSpawn, TrsEvent]] = \
             await TrsSpawnHelper.download_spawns(self._session,
                                                  ne_corner=Location(ne_lat, ne_lng), sw_corner=Location(sw_lat, sw_lng),
@@ -31,7 +31,7 @@ class GetSpawnsEndpoint(AbstractMadminRootEndpoint):
                                                  timestamp=timestamp)
         loop = asyncio.get_running_loop()
         cluster_spawns = await loop.run_in_executor(
-            None, self.__serialize_spawns, coords, data)
+            None, serialize_spawns, data, self._datetimeformat)
         del data
         resp = await self._json_response(cluster_spawns)
         del cluster_spawns
@@ -40,25 +40,3 @@ class GetSpawnsEndpoint(AbstractMadminRootEndpoint):
     @staticmethod
     def get_time_ms():
         return int(time.time() * 1000)
-
-    def __serialize_spawns(self, coords, data):
-        # TODO: Starmap/multiprocess if possible given the possible huge amount of data here?
-        for (spawn_id, (spawn, event)) in data.items():
-            if event.event_name not in coords:
-                coords[event.event_name] = []
-            coords[event.event_name].append({
-                "id": spawn_id,
-                "endtime": spawn.calc_endminsec,
-                "lat": spawn.latitude,
-                "lon": spawn.longitude,
-                "spawndef": spawn.spawndef,
-                "lastnonscan": spawn.last_non_scanned.strftime(
-                    self._datetimeformat) if spawn.last_non_scanned else None,
-                "lastscan": spawn.last_scanned.strftime(self._datetimeformat) if spawn.last_scanned else None,
-                "first_detection": spawn.first_detection.strftime(self._datetimeformat),
-                "event": event.event_name
-            })
-        cluster_spawns = []
-        for spawn in coords:
-            cluster_spawns.append({"EVENT": spawn, "Coords": coords[spawn]})
-        return cluster_spawns
@@ -5,6 +5,7 @@ from mapadroid.db.model import AuthLevel, Pokestop, TrsQuest
 from mapadroid.madmin.AbstractMadminRootEndpoint import (
     AbstractMadminRootEndpoint, check_authorization_header)
 from mapadroid.madmin.functions import get_bound_params
+from mapadroid.madmin.map_serialization import serialize_stops
 from mapadroid.utils.collections import Location
 
 
@@ -33,23 +34,7 @@ class GetStopsEndpoint(AbstractMadminRootEndpoint):
                                                  old_ne_corner=Location(o_ne_lat, o_ne_lng),
                                                  old_sw_corner=Location(o_sw_lat, o_sw_lng),
                                                  timestamp=timestamp)
-        prepared_for_serialization: List[Dict] = []
-        for stop in data:
-            stop_serialized = {variable: value for variable, value in vars(stop).items() if
-                               not variable.startswith("_")}
-            stop_serialized["last_modified"] = int(
-                stop.last_modified.timestamp()) if stop.last_modified else 0
-            stop_serialized["lure_expiration"] = int(
-                stop.lure_expiration.timestamp()) if stop.lure_expiration else 0
-            stop_serialized["last_updated"] = int(
-                stop.last_updated.timestamp()) if stop.last_updated else 0
-            # TODO: Add incidents list
-            #stop_serialized["incident_start"] = int(
-            #    stop.incident_start.timestamp()) if stop.incident_start else 0
-            #stop_serialized["incident_expiration"] = int(
-            #    stop.incident_expiration.timestamp()) if stop.incident_expiration else 0
-            stop_serialized["has_quest"] = stop.pokestop_id in stops_with_quests
-            prepared_for_serialization.append(stop_serialized)
+        prepared_for_serialization: List[Dict] = serialize_stops(data, stops_with_quests)
         del data
         del stops_with_quests
 
@@ -5,6 +5,7 @@ from mapadroid.madmin.endpoints.routes.map.GetCellsEndpoint import GetCellsEndpo
 from mapadroid.madmin.endpoints.routes.map.GetGeofencesEndpoint import GetGeofencesEndpoint
 from mapadroid.madmin.endpoints.routes.map.GetGymcoords import GetGymcoordsEndpoint
 from mapadroid.madmin.endpoints.routes.map.GetMapMonsEndpoint import GetMapMonsEndpoint
+from mapadroid.madmin.endpoints.routes.map.GetMapTilesEndpoint import GetMapTilesEndpoint
 from mapadroid.madmin.endpoints.routes.map.GetPriorouteEndpoint import GetPriorouteEndpoint
 from mapadroid.madmin.endpoints.routes.map.GetQuestsEndpoint import GetQuestsEndpoint
 from mapadroid.madmin.endpoints.routes.map.GetRouteEndpoint import GetRouteEndpoint
@@ -28,4 +29,5 @@ def register_routes_map_endpoints(app: web.Application):
     app.router.add_view('/get_map_mons', GetMapMonsEndpoint, name='get_map_mons')
     app.router.add_view('/get_cells', GetCellsEndpoint, name='get_cells')
     app.router.add_view('/get_stops', GetStopsEndpoint, name='get_stops')
+    app.router.add_view('/get_map_tiles', GetMapTilesEndpoint, name='get_map_tiles')
     app.router.add_view('/savefence', SaveFenceEndpoint, name='savefence')
@@ -31,6 +31,7 @@ from mapadroid.madmin.endpoints.routes.settings import \
     register_routes_settings_endpoints
 from mapadroid.madmin.endpoints.routes.statistics import \
     register_routes_statistics_endpoints
+from mapadroid.madmin.MapTileCache import MapTileCache
 from mapadroid.mapping_manager import MappingManager
 from mapadroid.updater.updater import DeviceUpdater
 from mapadroid.utils.aiohttp.XPathForwardedFor import XPathForwarded
@@ -74,6 +75,7 @@ class MADmin(object):
         except Exception as e:  # noqa: E722 B001
             logger.exception(e)
             logger.opt(exception=True).critical('Unable to load MADmin component')
+        self._app['map_tile_cache'] = MapTileCache(await self._db_wrapper.get_cache())
 
         runner: web.AppRunner = web.AppRunner(self._app)
         await runner.setup()
@@ -0,0 +1,126 @@
+import random
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from loguru import logger
+
+from mapadroid.db.model import (Gym, GymDetail, Pokemon, Pokestop, Raid,
+                                TrsEvent, TrsQuest, TrsSpawn)
+from mapadroid.utils.language import get_mon_name_sync
+from mapadroid.utils.madGlobals import MonSeenTypes
+from mapadroid.utils.questGen import QuestGen
+
+
+def serialize_mons(data: List[Pokemon], mon_name_cache: Dict[int, str]) -> List[Dict]:
+    mons_serialized: List[Dict] = []
+    for mon in data:
+        mons_serialized.append(serialize_single_mon(mon, mon_name_cache))
+    return mons_serialized
+
+
+def serialize_single_mon(mon: Pokemon, mon_name_cache: Dict[int, str]) -> Dict:
+    serialized_entry: Dict = {x: y for x, y in vars(mon).items() if not x.startswith("_")}
+    serialized_entry["disappear_time"] = int(mon.disappear_time.timestamp())
+    if mon.last_modified:
+        serialized_entry["last_modified"] = int(mon.last_modified.timestamp())
+    else:
+        serialized_entry["last_modified"] = 0
+    if mon.seen_type in (MonSeenTypes.nearby_stop.value, MonSeenTypes.nearby_cell.value):
+        # Seeded by the mon to place it at the same spot whenever its tile is rebuilt, the content of the tile and
+        # thus its version only change if the mons did
+        jitter: random.Random = random.Random(mon.encounter_id)
+        serialized_entry["latitude"] = float(serialized_entry["latitude"]) + jitter.uniform(-0.0003, 0.0003)
+        serialized_entry["longitude"] = float(serialized_entry["longitude"]) + jitter.uniform(-0.0005, 0.0005)
+    try:
+        if mon.pokemon_id in mon_name_cache:
+            mon_name = mon_name_cache[mon.pokemon_id]
+        else:
+            mon_name = get_mon_name_sync(mon.pokemon_id)
+            mon_name_cache[mon.pokemon_id] = mon_name
+
+        serialized_entry["name"] = mon_name
+    except Exception as e:
+        logger.exception(e)
+    return serialized_entry
+
+
+def serialize_spawns(data: Dict[int, Tuple[TrsSpawn, TrsEvent]], datetimeformat: str) -> List[Dict]:
+    coords: Dict[str, List[Dict]] = {}
+    # TODO: Starmap/multiprocess if possible given the possible huge amount of data here?
+    for (spawn_id, (spawn, event)) in data.items():
+        if event.event_name not in coords:
+            coords[event.event_name] = []
+        coords[event.event_name].append({
+            "id": spawn_id,
+            "endtime": spawn.calc_endminsec,
+            "lat": spawn.latitude,
+            "lon": spawn.longitude,
+            "spawndef": spawn.spawndef,
+            "lastnonscan": spawn.last_non_scanned.strftime(
+                datetimeformat) if spawn.last_non_scanned else None,
+            "lastscan": spawn.last_scanned.strftime(datetimeformat) if spawn.last_scanned else None,
+            "first_detection": spawn.first_detection.strftime(datetimeformat),
+            "event": event.event_name
+        })
+    cluster_spawns = []
+    for spawn in coords:
+        cluster_spawns.append({"EVENT": spawn, "Coords": coords[spawn]})
+    return cluster_spawns
+
+
+def serialize_stops(data: List[Pokestop],
+                    stops_with_quests: Dict[str, Tuple[Pokestop, Dict[int, TrsQuest]]]) -> List[Dict]:
+    prepared_for_serialization: List[Dict] = []
+    for stop in data:
+        stop_serialized = {variable: value for variable, value in vars(stop).items() if
+                           not variable.startswith("_")}
+        stop_serialized["last_modified"] = int(
+            stop.last_modified.timestamp()) if stop.last_modified else 0
+        stop_serialized["lure_expiration"] = int(
+            stop.lure_expiration.timestamp()) if stop.lure_expiration else 0
+        stop_serialized["last_updated"] = int(
+            stop.last_updated.timestamp()) if stop.last_updated else 0
+        # TODO: Add incidents list (start and expiration of the incidents of the stop)
+        stop_serialized["has_quest"] = stop.pokestop_id in stops_with_quests
+        prepared_for_serialization.append(stop_serialized)
+    return prepared_for_serialization
+
+
+def serialize_gyms(data: Dict[str, Tuple[Gym, GymDetail, Raid]], now: datetime) -> List[Dict]:
+    coords: List[Dict] = []
+    for gym_id, (gym, gym_detail, raid) in data.items():
+        raid_data = None
+        # TODO: Validate time of spawn/end/start
+        if raid and raid.end > now:
+            raid_data = {
+                "spawn": int(raid.spawn.timestamp()),
+                "start": int(raid.start.timestamp()),
+                "end": int(raid.end.timestamp()),
+                "mon": raid.pokemon_id,
+                "form": raid.form,
+                "level": raid.level,
+                "costume": raid.costume,
+                "evolution": raid.evolution
+            }
+
+        coords.append({
+            "id": gym_id,
+            "name": gym_detail.name,
+            "img": gym_detail.url,
+            "lat": gym.latitude,
+            "lon": gym.longitude,
+            "team_id": gym.team_id,
+            "last_updated": gym.last_modified.timestamp(),
+            "last_scanned": gym.last_scanned.timestamp(),
+            "raid": raid_data
+        })
+    return coords
+
+
+async def serialize_quests(data: Dict[str, Tuple[Pokestop, Dict[int, TrsQuest]]],
+                           quest_gen: QuestGen) -> List[Dict]:
+    quests: List[Dict] = []
+    for stop_id, (stop, quests_of_stop) in data.items():
+        for quest in quests_of_stop.values():
+            quests.append(await quest_gen.generate_quest(stop, quest))
+    return quests
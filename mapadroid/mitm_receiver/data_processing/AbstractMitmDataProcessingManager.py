@@ -5,9 +5,14 @@ from abc import ABC
 class AbstractMitmDataProcessingManager(ABC):
     _mitm_data_queue: asyncio.Queue
 
-    def __init__(self):
+    def __init__(self, queue_size: int = 0):
+        """
+        Args:
+            queue_size: Maximum amount of items queued, putting further items waits for the processors to catch up.
+                Unbounded if 0.
+        """
         super(AbstractMitmDataProcessingManager, self).__init__()
-        self._mitm_data_queue = asyncio.Queue()
+        self._mitm_data_queue = asyncio.Queue(maxsize=queue_size)
 
     def get_queue(self) -> asyncio.Queue:
         return self._mitm_data_queue
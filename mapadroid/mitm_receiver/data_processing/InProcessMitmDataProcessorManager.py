@@ -33,8 +33,8 @@ class InProcessMitmDataProcessorManager(AbstractMitmDataProcessingManager, Proce
      a shared queue.
     """
     def __init__(self, mitm_mapper: AbstractMitmMapper, stats_handler: AbstractStatsHandler, db_wrapper: DbWrapper,
-                 quest_gen: QuestGen, account_handler: AbstractAccountHandler):
-        super(InProcessMitmDataProcessorManager, self).__init__()
+                 quest_gen: QuestGen, account_handler: AbstractAccountHandler, queue_size: int = 0):
+        super(InProcessMitmDataProcessorManager, self).__init__(queue_size)
         super(Process, self).__init__()
         self._worker_threads: List[Task] = []
         self._mitm_mapper: AbstractMitmMapper = mitm_mapper
@@ -1,15 +1,35 @@
 import asyncio
 import multiprocessing
+import zlib
 from asyncio import Task
+from multiprocessing.process import BaseProcess
+from multiprocessing.synchronize import Event
+from queue import Full
 from typing import List, Optional
 
-from mapadroid.data_handler.mitm_data import AbstractMitmMapper
-from mapadroid.data_handler.stats import AbstractStatsHandler
-from mapadroid.db import DbWrapper
+from loguru import logger
+
+from mapadroid.account_handler import setup_account_handler
+from mapadroid.account_handler.AbstractAccountHandler import \
+    AbstractAccountHandler
+from mapadroid.data_handler.grpc.MitmMapperClientConnector import \
+    MitmMapperClientConnector
+from mapadroid.data_handler.grpc.StatsHandlerClientConnector import \
+    StatsHandlerClientConnector
+from mapadroid.data_handler.mitm_data.AbstractMitmMapper import \
+    AbstractMitmMapper
+from mapadroid.data_handler.mitm_data.MitmMapperType import MitmMapperType
+from mapadroid.data_handler.mitm_data.RedisMitmMapper import RedisMitmMapper
+from mapadroid.data_handler.stats.AbstractStatsHandler import \
+    AbstractStatsHandler
+from mapadroid.db.DbFactory import DbFactory
 from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
     AbstractMitmDataProcessingManager
 from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
     InProcessMitmDataProcessorManager
+from mapadroid.utils.EnvironmentUtil import setup_loggers
+from mapadroid.utils.logging import init_logging
+from mapadroid.utils.madConstants import MITM_DATA_PROCESS_QUEUE_SIZE
 from mapadroid.utils.madGlobals import MadGlobals
 from mapadroid.utils.questGen import QuestGen
 
@@ -18,31 +38,138 @@ class ProcessMitmDataProcessingManager(AbstractMitmDataProcessingManager):
     """
     In order to utilize as many cores as possible properly, a mitm data processing asyncio loop needs to be started for
      each core available.
-     This class handles the creation of processes accordingly.
+     This class handles the creation of processes accordingly. Data is sharded by origin across the processes in
+     order to retain the order of the data of each device. Each process owns its DB pool and runs
+     mitmreceiver_data_workers SerializedMitmDataProcessor instances.
     """
-    _data_queue: multiprocessing.Queue
-    _db_wrapper: Optional[DbWrapper]
-    _worker_threads: List[Task]
-    _mitm_mapper: AbstractMitmMapper
-    _stats_handler: AbstractStatsHandler
-    _quest_gen: QuestGen
-    _all_queues_of_processors: List[asyncio.Queue]
+    _processes: List[BaseProcess]
+    _process_queues: List[multiprocessing.Queue]
+    _dispatcher: Optional[Task]
 
     def __init__(self):
         super().__init__()
-        self._all_queues_of_processors = []
+        self._processes = []
+        self._process_queues = []
+        self._dispatcher = None
+
+    @staticmethod
+    def is_supported() -> bool:
+        """
+        The processes need to access the MitmMapper and StatsHandler of the main process remotely.
+        """
+        return MadGlobals.application_args.mitmmapper_type in (MitmMapperType.grpc, MitmMapperType.redis)
 
     async def launch_processors(self):
-        for i in range(MadGlobals.application_args.mitmreceiver_data_workers):
+        context = multiprocessing.get_context("spawn")
+        events_ready: List[Event] = []
+        for i in range(MadGlobals.application_args.mitmreceiver_data_processes):
             # As this loop starts processes, shared asyncio queues are not possible and need to be created and filled
             #  by this manager.
+            process_queue: multiprocessing.Queue = context.Queue(maxsize=MITM_DATA_PROCESS_QUEUE_SIZE)
+            event_ready: Event = context.Event()
+            process: BaseProcess = context.Process(target=_run_data_processing_process,
+                                                   args=(i, MadGlobals.application_args, process_queue, event_ready),
+                                                   name="MitmDataProcessor-%s" % str(i), daemon=True)
+            process.start()
+            self._processes.append(process)
+            self._process_queues.append(process_queue)
+            events_ready.append(event_ready)
+        loop = asyncio.get_running_loop()
+        for event_ready in events_ready:
+            await loop.run_in_executor(None, event_ready.wait)
+        logger.info("Started {} MITM data processing processes", len(self._processes))
+        self._dispatcher = loop.create_task(self.__dispatch())
+
+    async def __dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._mitm_data_queue.get()
+            try:
+                if item is None:
+                    break
+                process_queue: multiprocessing.Queue = self._process_queues[
+                    zlib.crc32(str(item[2]).encode()) % len(self._process_queues)]
+                try:
+                    process_queue.put_nowait(item)
+                except Full:
+                    # Backpressure: wait for the process to catch up. In the meantime, data queues up in the queue of
+                    #  the receiver which drops data if it grows too large
+                    logger.debug("Queue of MITM data process full, waiting")
+                    await loop.run_in_executor(None, process_queue.put, item)
+            finally:
+                self._mitm_data_queue.task_done()
+        logger.info("Stopping dispatching of MITM data to processes")
+        for process_queue in self._process_queues:
+            for _ in range(MadGlobals.application_args.mitmreceiver_data_workers):
+                await loop.run_in_executor(None, process_queue.put, None)
+
+    async def shutdown(self):
+        if self._dispatcher is not None and not self._dispatcher.done():
+            await self._mitm_data_queue.put(None)
+            await self._dispatcher
+        loop = asyncio.get_running_loop()
+        logger.info("Waiting for {} MITM data processes to finish", len(self._processes))
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, 60)
+            if process.is_alive():
+                logger.warning("MITM data process {} did not finish in time, terminating", process.name)
+                process.terminate()
+        logger.info("Stopped MITM data processes")
+
+
+def _run_data_processing_process(index: int, application_args, process_queue: multiprocessing.Queue,
+                                 event_ready: Event) -> None:
+    MadGlobals.application_args = application_args
+    init_logging(application_args, print_info=False)
+    setup_loggers()
+    with logger.contextualize(identifier="MitmDataProcessor-%s" % str(index), name="mitm-processor"):
+        try:
+            asyncio.run(_process_data_of_queue(process_queue, event_ready))
+        except (KeyboardInterrupt, Exception) as e:
+            logger.info("Shutting down MITM data process. {}", e)
+            logger.exception(e)
+
+
+async def _process_data_of_queue(process_queue: multiprocessing.Queue, event_ready: Event) -> None:
+    application_args = MadGlobals.application_args
+    db_wrapper, db_exec = await DbFactory.get_wrapper(application_args,
+                                                      application_args.mitmreceiver_data_workers * 2)
+    mitm_mapper_connector: Optional[MitmMapperClientConnector] = None
+    if application_args.mitmmapper_type == MitmMapperType.grpc:
+        mitm_mapper_connector = MitmMapperClientConnector()
+        await mitm_mapper_connector.start()
+        mitm_mapper: AbstractMitmMapper = await mitm_mapper_connector.get_client()
+    else:
+        mitm_mapper: AbstractMitmMapper = RedisMitmMapper(db_wrapper)
+        await mitm_mapper.start()
+    stats_handler_connector = StatsHandlerClientConnector()
+    await stats_handler_connector.start()
+    stats_handler: AbstractStatsHandler = await stats_handler_connector.get_client()
+    await stats_handler.start()
+    quest_gen: QuestGen = QuestGen()
+    await quest_gen.setup()
+    account_handler: AbstractAccountHandler = await setup_account_handler(db_wrapper)
+
+    data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper, quest_gen,
+                                                               account_handler=account_handler,
+                                                               queue_size=MITM_DATA_PROCESS_QUEUE_SIZE)
+    await data_processor_manager.launch_processors()
+    local_queue: asyncio.Queue = data_processor_manager.get_queue()
+    event_ready.set()
 
-            data_processor: InProcessMitmDataProcessorManager = InProcessMitmDataProcessorManager(
-                queue_of_task,
-                self._mitm_mapper,
-                self._db_wrapper,
-                self._quest_gen,
-                name="SerialiedMitmDataProcessor-%s" % str(i))
+    loop = asyncio.get_running_loop()
+    stop_signals_received: int = 0
+    while stop_signals_received < application_args.mitmreceiver_data_workers:
+        item = await loop.run_in_executor(None, process_queue.get)
+        if item is None:
+            stop_signals_received += 1
+        # The local queue is bounded, further data is only fetched once the processors caught up to keep the
+        #  backpressure towards the receiver
+        await local_queue.put(item)
+    logger.info("Draining queue of MITM data process")
+    await data_processor_manager.shutdown()
 
-            data_processor.start()
-            self._worker_threads.append(data_processor)
+    if mitm_mapper_connector:
+        await mitm_mapper_connector.close()
+    await stats_handler_connector.close()
+    await db_exec.shutdown()
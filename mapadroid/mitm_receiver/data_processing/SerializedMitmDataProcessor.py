@@ -1,12 +1,14 @@
 import asyncio
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import (Any, Awaitable, Callable, Dict, List, Optional, Set,
+                    Tuple)
 
 import sqlalchemy
 from loguru import logger
 from redis.asyncio import Redis
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from mapadroid.account_handler.AbstractAccountHandler import \
     AbstractAccountHandler
@@ -26,6 +28,9 @@ from mapadroid.utils.questGen import QuestGen
 
 
 class SerializedMitmDataProcessor:
+    # Key of the data of GMOs rescheduled holding the tables the GMO has been committed to already
+    _SUBMITTED_TABLES_KEY = "mad_submitted_tables"
+
     def __init__(self, data_queue: asyncio.Queue, stats_handler: AbstractStatsHandler,
                  mitm_mapper: AbstractMitmMapper, db_wrapper: DbWrapper, quest_gen: QuestGen,
                  account_handler: AbstractAccountHandler,
@@ -43,29 +48,115 @@ class SerializedMitmDataProcessor:
         logger.info("Starting serialized MITM data processor")
         # TODO: use event to stop... Remove try/catch...
         with logger.contextualize(identifier=self.__name, name="mitm-processor"):
+            if MadGlobals.application_args.mitmreceiver_gmo_batch_size > 1:
+                await self.__run_batched()
+                return
             while True:
                 try:
                     item = await self.__queue.get()
                     if item is None:
                         logger.info("Received signal to stop MITM data processor")
+                        self.__queue.task_done()
                         break
-                    start_time = self.get_time_ms()
+                    await self.__process_item(item)
+                    del item
+                    self.__queue.task_done()
+                except KeyboardInterrupt:
+                    logger.info("Received keyboard interrupt, stopping MITM data processor")
+
+    async def __process_item(self, item: Tuple[int, Dict, str]) -> None:
+        start_time = self.get_time_ms()
+        try:
+            with logger.contextualize(identifier=item[2], name="mitm-processor"):
+                await self.process_data(received_timestamp=item[0], data=item[1],
+                                        origin=item[2])
+        except (sqlalchemy.exc.IntegrityError, MitmReceiverRetry, sqlalchemy.exc.InternalError) as e:
+            logger.info("Failed submitting data to DB, rescheduling. {}", e)
+            self.__reschedule(item)
+        except Exception as e:
+            logger.exception(e)
+            logger.info("Failed processing data. {}", e)
+        end_time = self.get_time_ms() - start_time
+        logger.debug("MITM data processor {} finished queue item in {}ms", self.__name, end_time)
+
+    async def __run_batched(self):
+        batch_size: int = MadGlobals.application_args.mitmreceiver_gmo_batch_size
+        batch_latency: float = MadGlobals.application_args.mitmreceiver_gmo_batch_latency / 1000
+        logger.info("Processing MITM data in batches of up to {} items or {}ms", batch_size,
+                    MadGlobals.application_args.mitmreceiver_gmo_batch_latency)
+        stop_requested: bool = False
+        while not stop_requested:
+            try:
+                items, stop_requested = await self.__drain_queue(batch_size, batch_latency)
+                gmos: List[Tuple[int, Dict, str]] = []
+                for item in items:
+                    data = item[1]
+                    if (data.get("type", None) == 106 and not data.get("raw", False)
+                            and not self.__is_outdated(item[0])):
+                        gmos.append(item)
+                    else:
+                        await self.__process_item(item)
+                if gmos:
                     try:
-                        with logger.contextualize(identifier=item[2], name="mitm-processor"):
-                            await self.process_data(received_timestamp=item[0], data=item[1],
-                                                    origin=item[2])
-                        del item
+                        await self.__process_gmo_batch(gmos)
                     except (sqlalchemy.exc.IntegrityError, MitmReceiverRetry, sqlalchemy.exc.InternalError) as e:
-                        logger.info("Failed submitting data to DB, rescheduling. {}", e)
-                        await self.__queue.put(item)
+                        logger.info("Failed submitting batch of {} GMOs to DB, rescheduling. {}", len(gmos), e)
+                        for item in gmos:
+                            self.__reschedule(item)
                     except Exception as e:
                         logger.exception(e)
-                        logger.info("Failed processing data. {}", e)
+                        logger.info("Failed processing batch of GMOs. {}", e)
+                for _ in range(len(items) + 1 if stop_requested else len(items)):
                     self.__queue.task_done()
-                    end_time = self.get_time_ms() - start_time
-                    logger.debug("MITM data processor {} finished queue item in {}ms", self.__name, end_time)
-                except KeyboardInterrupt:
-                    logger.info("Received keyboard interrupt, stopping MITM data processor")
+                del items
+                del gmos
+            except KeyboardInterrupt:
+                logger.info("Received keyboard interrupt, stopping MITM data processor")
+                break
+        logger.info("Received signal to stop MITM data processor")
+
+    def __reschedule(self, item: Tuple[int, Dict, str]) -> None:
+        # The queue may be bounded, the processor must not wait for a free slot as it may be the one to free it
+        try:
+            self.__queue.put_nowait(item)
+        except asyncio.QueueFull:
+            asyncio.get_running_loop().create_task(self.__queue.put(item))
+
+    async def __drain_queue(self, batch_size: int,
+                            batch_latency: float) -> Tuple[List[Tuple[int, Dict, str]], bool]:
+        """
+        Waits for the next item of the queue and collects further items until either batch_size items have been
+        collected or batch_latency seconds passed.
+
+        Returns: Tuple of the items collected and whether the signal to stop has been received
+        """
+        items: List[Tuple[int, Dict, str]] = []
+        item = await self.__queue.get()
+        if item is None:
+            return items, True
+        items.append(item)
+        deadline: float = time.monotonic() + batch_latency
+        while len(items) < batch_size:
+            try:
+                item = self.__queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining: float = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.__queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def __is_outdated(self, received_timestamp: int) -> bool:
+        threshold_seconds = MadGlobals.application_args.mitm_ignore_proc_time_thresh
+        if threshold_seconds <= 0:
+            return False
+        return received_timestamp < time.time() - threshold_seconds
 
     async def process_data(self, received_timestamp: int, data, origin):
         data_type = data.get("type", None)
@@ -254,6 +345,213 @@ class SerializedMitmDataProcessor:
         await self.__stats_handler.stats_collect_seen_type(lure_mons, MonSeenTypes.lure_wild, time_received_raw)
         await self.__stats_handler.stats_collect_raid(worker, time_received_raw, amount_raids)
 
+    async def __process_gmo_batch(self, gmos: List[Tuple[int, Dict, str]]) -> None:
+        start_time = self.get_time_ms()
+        amount_cells: int = sum(len(data["payload"].get("cells", [])) for _, data, _ in gmos)
+        db_submit: DbPogoProtoSubmit = self.__db_submit
+        tables: Dict[str, Callable[[AsyncSession, int, Dict], Awaitable[Any]]] = {
+            "weather": lambda session, ts, payload: db_submit.weather(session, payload, ts),
+            "stops": lambda session, ts, payload: db_submit.stops(session, payload),
+            "gyms": lambda session, ts, payload: db_submit.gyms(session, payload, ts),
+            "raids": lambda session, ts, payload: db_submit.raids(session, payload, ts),
+            "spawnpoints": lambda session, ts, payload: db_submit.spawnpoints(session, payload, ts),
+            "cells": lambda session, ts, payload: db_submit.cells(session, payload),
+            "wild mons": lambda session, ts, payload: db_submit.mons(session, ts, payload)
+        }
+        if MadGlobals.application_args.scan_nearby_mons:
+            tables["nearby mons"] = lambda session, ts, payload: db_submit.mons_nearby(session, ts, payload)
+        if MadGlobals.application_args.scan_lured_mons:
+            tables["lure no iv"] = lambda session, ts, payload: db_submit.mon_lure_noiv(session, ts, payload)
+
+        loop = asyncio.get_running_loop()
+        # GMOs of a batch rescheduled are not submitted to the tables already committed again. Usually all GMOs of
+        # a batch are pending for all tables and are thus only merged once.
+        merged_by_gmos: Dict[Tuple[int, ...], List[Tuple[int, Dict]]] = {}
+        merged_by_table: Dict[str, List[Tuple[int, Dict]]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        for name, submit in tables.items():
+            pending: Tuple[int, ...] = tuple(
+                index for index, (_, data, _) in enumerate(gmos)
+                if name not in data.get(self._SUBMITTED_TABLES_KEY, ()))
+            if not pending:
+                continue
+            merged: Optional[List[Tuple[int, Dict]]] = merged_by_gmos.get(pending)
+            if merged is None:
+                merged = self._merge_gmos([gmos[index] for index in pending])
+                merged_by_gmos[pending] = merged
+            merged_by_table[name] = merged
+            tasks[name] = loop.create_task(self.__submit_batch(name, merged, submit))
+        if tasks:
+            await asyncio.wait(tasks.values())
+        # Submissions to be retried are handled once all tables have been handled, the batch is then rescheduled
+        # remembering the tables committed
+        failures: Dict[str, BaseException] = {name: task.exception() for name, task in tasks.items()
+                                              if task.exception()}
+        if failures:
+            logger.info("Failed submitting {} of batch of {} GMOs to DB, rescheduling. {}", ", ".join(failures),
+                        len(gmos), next(iter(failures.values())))
+            submitted_tables: Set[str] = set(tasks) - set(failures)
+            for received_timestamp, data, origin in gmos:
+                retried_data: Dict = dict(data)
+                retried_data[self._SUBMITTED_TABLES_KEY] = set(data.get(self._SUBMITTED_TABLES_KEY, ())) \
+                    | submitted_tables
+                self.__reschedule((received_timestamp, retried_data, origin))
+            return
+        results: Dict[str, Tuple[List[Any], int]] = {name: task.result() for name, task in tasks.items()}
+        nearby_results, nearby_mons_time = results.get("nearby mons", ([], 0))
+        lure_results, lure_processing_time = results.get("lure no iv", ([], 0))
+        times: Dict[str, int] = {name: processing_time for name, (_, processing_time) in results.items()}
+        amount_cells_merged: int = max((sum(len(payload["cells"]) for _, payload in merged)
+                                        for merged in merged_by_gmos.values()), default=0)
+        full_time = self.get_time_ms() - start_time
+        logger.debug("Done processing batch of {} GMOs ({} of {} cells after merging) in {}ms (weather={}ms, "
+                     "stops={}ms, gyms={}ms, raids={}ms, spawnpoints={}ms, mons={}ms, nearby_mons={}ms, "
+                     "lure_noiv={}ms, cells={}ms)",
+                     len(gmos), amount_cells_merged, amount_cells, full_time, times.get("weather", 0),
+                     times.get("stops", 0), times.get("gyms", 0), times.get("raids", 0), times.get("spawnpoints", 0),
+                     times.get("wild mons", 0), nearby_mons_time, lure_processing_time, times.get("cells", 0))
+
+        nearby_cell_mons: List[Tuple[datetime, List[int]]] = []
+        nearby_fort_mons: List[Tuple[datetime, List[int]]] = []
+        for (received_timestamp, _), nearby_result in zip(merged_by_table.get("nearby mons", []), nearby_results):
+            if nearby_result is None:
+                continue
+            cell_encounters, stop_encounters = nearby_result
+            received_date: datetime = DatetimeWrapper.fromtimestamp(received_timestamp)
+            nearby_cell_mons.append((received_date, cell_encounters))
+            nearby_fort_mons.append((received_date, stop_encounters))
+        lure_mons: List[Tuple[datetime, List[int]]] = [
+            (DatetimeWrapper.fromtimestamp(received_timestamp), encounter_ids)
+            for (received_timestamp, _), encounter_ids in zip(merged_by_table.get("lure no iv", []), lure_results)
+            if encounter_ids is not None]
+        loop.create_task(self.__fire_stats_gmo_batch_submission(gmos, nearby_cell_mons, nearby_fort_mons,
+                                                                lure_mons))
+
+    async def __submit_batch(self, name: str, gmos: List[Tuple[int, Dict]],
+                             submit: Callable[[AsyncSession, int, Dict], Awaitable[Any]]) -> Tuple[List[Any], int]:
+        """
+        Submits the payloads of all GMOs of a batch within a single transaction. If the transaction fails, the GMOs
+        are submitted one by one in order to only lose the GMOs that cannot be submitted.
+
+        Returns: Tuple of the results of the individual submissions (None for GMOs that could not be submitted) and
+        the duration taken
+        """
+        time_start = self.get_time_ms()
+        results: Optional[List[Any]] = []
+        async with self.__db_wrapper as session, session:
+            try:
+                for received_timestamp, payload in gmos:
+                    results.append(await submit(session, received_timestamp, payload))
+                await session.commit()
+            except Exception as e:
+                logger.info("Failed submitting batch of {}, submitting the GMOs one by one. {}", name, e)
+                await session.rollback()
+                results = None
+        if results is None:
+            results = await self.__submit_individually(name, gmos, submit)
+        return results, self.get_time_ms() - time_start
+
+    async def __submit_individually(self, name: str, gmos: List[Tuple[int, Dict]],
+                                    submit: Callable[[AsyncSession, int, Dict], Awaitable[Any]]) -> List[Any]:
+        """
+        Errors worth retrying are raised in order to reschedule the batch, GMOs failing otherwise are skipped.
+        """
+        results: List[Any] = []
+        for received_timestamp, payload in gmos:
+            async with self.__db_wrapper as session, session:
+                try:
+                    result: Any = await submit(session, received_timestamp, payload)
+                    await session.commit()
+                    results.append(result)
+                except (sqlalchemy.exc.IntegrityError, MitmReceiverRetry, sqlalchemy.exc.InternalError):
+                    await session.rollback()
+                    raise
+                except Exception as e:
+                    logger.warning("Failed submitting {} of GMO received at {}: {}", name, received_timestamp, e)
+                    await session.rollback()
+                    results.append(None)
+        return results
+
+    @staticmethod
+    def _merge_gmos(gmos: List[Tuple[int, Dict, str]]) -> List[Tuple[int, Dict]]:
+        """
+        Merges the GMOs of a batch by only keeping the most recent copy of each cell and weather cell.
+        Cells seen by multiple devices (or multiple times by a single device) within a batch are thus only submitted
+        once. As each device only sees the mons within its own range, the wild and nearby mons of all copies of a
+        cell are added to the most recent copy (preferring the most recent sighting of an encounter).
+
+        Returns: List of (received_timestamp, payload) ordered by received_timestamp with payloads only containing
+        the cells and weather not superseded by a newer GMO of the batch
+        """
+        merged_cells: Dict[int, Dict] = {}
+        seen_encounters: Dict[int, Dict[str, Set[int]]] = {}
+        seen_weather_cells: Set[int] = set()
+        merged: List[Tuple[int, Dict]] = []
+        for received_timestamp, data, _ in sorted(gmos, key=lambda item: item[0], reverse=True):
+            payload: Dict = data["payload"]
+            cells: List[Dict] = []
+            for cell in payload.get("cells", []):
+                merged_cell: Optional[Dict] = merged_cells.get(cell["id"])
+                if merged_cell is None:
+                    # Copy the cell as the lists of mons are extended by older copies
+                    merged_cell = dict(cell)
+                    merged_cells[cell["id"]] = merged_cell
+                    seen_encounters[cell["id"]] = {}
+                    cells.append(merged_cell)
+                for mon_key in ("wild_pokemon", "nearby_pokemon"):
+                    mons: List[Dict] = cell.get(mon_key, [])
+                    encounter_ids: Optional[Set[int]] = seen_encounters[cell["id"]].get(mon_key)
+                    if encounter_ids is None:
+                        merged_cell[mon_key] = list(mons)
+                        seen_encounters[cell["id"]][mon_key] = {mon["encounter_id"] for mon in mons}
+                        continue
+                    for mon in mons:
+                        if mon["encounter_id"] not in encounter_ids:
+                            encounter_ids.add(mon["encounter_id"])
+                            merged_cell[mon_key].append(mon)
+            client_weather: List[Dict] = []
+            for weather in payload.get("client_weather", []):
+                if weather["cell_id"] not in seen_weather_cells:
+                    seen_weather_cells.add(weather["cell_id"])
+                    client_weather.append(weather)
+            if not cells and not client_weather:
+                continue
+            reduced_payload: Dict = dict(payload)
+            reduced_payload["cells"] = cells
+            reduced_payload["client_weather"] = client_weather
+            merged.append((received_timestamp, reduced_payload))
+        merged.reverse()
+        return merged
+
+    async def __fire_stats_gmo_batch_submission(self, gmos: List[Tuple[int, Dict, str]],
+                                                nearby_cell_mons: List[Tuple[datetime, List[int]]],
+                                                nearby_fort_mons: List[Tuple[datetime, List[int]]],
+                                                lure_mons: List[Tuple[datetime, List[int]]]):
+        for received_timestamp, data, origin in gmos:
+            received_date: datetime = DatetimeWrapper.fromtimestamp(received_timestamp)
+            wild_encounter_ids: List[int] = []
+            amount_raids: int = 0
+            for cell in data["payload"].get("cells", []):
+                for wild_mon in cell["wild_pokemon"]:
+                    encounter_id = wild_mon["encounter_id"]
+                    if encounter_id < 0:
+                        encounter_id = encounter_id + 2 ** 64
+                    wild_encounter_ids.append(encounter_id)
+                for fort in cell["forts"]:
+                    if (fort["type"] == 0 and fort["gym_details"]["has_raid"]
+                            and fort["gym_details"]["raid_info"]["has_pokemon"]):
+                        amount_raids += 1
+            await self.__stats_handler.stats_collect_wild_mon(origin, wild_encounter_ids, received_date)
+            await self.__stats_handler.stats_collect_raid(origin, received_date, amount_raids)
+        for received_date, encounter_ids in nearby_cell_mons:
+            await self.__stats_handler.stats_collect_seen_type(encounter_ids, MonSeenTypes.nearby_cell,
+                                                               received_date)
+        for received_date, encounter_ids in nearby_fort_mons:
+            await self.__stats_handler.stats_collect_seen_type(encounter_ids, MonSeenTypes.nearby_stop,
+                                                               received_date)
+        for received_date, encounter_ids in lure_mons:
+            await self.__stats_handler.stats_collect_seen_type(encounter_ids, MonSeenTypes.lure_wild, received_date)
+
     async def __process_gmo_mon_stats(self, cell_encounters, lure_wild, stop_encounters, wild_encounter_ids_processed):
         async with self.__db_wrapper as session, session:
             await self.__db_submit.update_seen_type_stats(session,
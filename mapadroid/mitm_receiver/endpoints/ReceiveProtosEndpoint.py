@@ -6,6 +6,7 @@ from aiohttp import web
 from loguru import logger
 from orjson import orjson
 
+from mapadroid.data_handler.mitm_data.ProtoSummary import summarize_proto
 from mapadroid.db.helper.SettingsDeviceHelper import SettingsDeviceHelper
 from mapadroid.db.helper.TrsVisitedHelper import TrsVisitedHelper
 from mapadroid.db.model import SettingsDevice
@@ -102,9 +103,13 @@ class ReceiveProtosEndpoint(AbstractMitmReceiverRootEndpoint):
             await self._handle_fort_search_proto(origin, data["payload"], location_of_data, timestamp)
         quests_held: Optional[List[int]] = data.get("quests_held", None)
         await self._get_mitm_mapper().set_quests_held(origin, quests_held)
+        latest_value: Dict = data["payload"]
+        if not self._get_mad_args().mitm_latest_full_payload:
+            # Only the data evaluated by the workers is held (and possibly sent to redis/the MitmMapper service)
+            latest_value = summarize_proto(proto_type, latest_value)
         await self._get_mitm_mapper().update_latest(origin, timestamp_received_raw=timestamp,
                                                     timestamp_received_receiver=time_received, key=str(proto_type),
-                                                    value=data["payload"],
+                                                    value=latest_value,
                                                     location=location_of_data)
         logger.debug2("Placing data received to data_queue")
         await self._add_to_queue((timestamp, data, origin))
@@ -6,6 +6,7 @@ import xml.etree.ElementTree as ET  # noqa: N817
 from enum import Enum
 from typing import List, Optional, Tuple
 
+from aiofile import async_open
 from loguru import logger
 
 from mapadroid.account_handler.AbstractAccountHandler import (
@@ -16,6 +17,7 @@ from mapadroid.mapping_manager import MappingManager
 from mapadroid.mapping_manager.MappingManagerDevicemappingKey import \
     MappingManagerDevicemappingKey
 from mapadroid.ocr.screen_type import ScreenType
+from mapadroid.ocr.utils import ImageSource
 from mapadroid.utils.collections import Location, ScreenCoordinates
 from mapadroid.utils.CustomTypes import MessageTyping
 from mapadroid.utils.madGlobals import MadGlobals, ScreenshotType
@@ -358,7 +360,7 @@ class WordToScreenMatching(object):
         return screentype
 
     async def __check_pogo_screen_ban_or_loading(self, screentype, y_offset: int = 0) -> ScreenType:
-        screenshot_path: str = await self.get_screenshot_path()
+        screenshot_path: Optional[bytes] = self._worker_state.last_screenshot
         backgroundcolor = await self._worker_state.pogo_windows.most_frequent_colour(screenshot_path,
                                                                                      self._worker_state.origin,
                                                                                      y_offset=y_offset)
@@ -593,11 +595,11 @@ class WordToScreenMatching(object):
 
     async def __handle_returning_player_or_wrong_credentials(self) -> None:
         self._nextscreen = ScreenType.UNDEFINED
-        screenshot_path = await self.get_screenshot_path()
+        screenshot_path = self._worker_state.last_screenshot
         coordinates: Optional[ScreenCoordinates] = await self._worker_state.pogo_windows.look_for_button(
             screenshot_path,
             2.20, 3.01,
-            upper=True)
+            upper=True, identifier=self._worker_state.origin)
         if coordinates:
             coordinates = ScreenCoordinates(int(self._worker_state.resolution_calculator.screen_size_x / 2),
                                             int(self._worker_state.resolution_calculator.screen_size_y * 0.7 - self._worker_state.resolution_calculator.y_offset))
@@ -639,11 +641,11 @@ class WordToScreenMatching(object):
 
     async def __handle_welcome_screen(self) -> ScreenType:
         # self._nextscreen = ScreenType.TOS
-        screenshot_path = await self.get_screenshot_path()
+        screenshot_path = self._worker_state.last_screenshot
         coordinates: Optional[ScreenCoordinates] = await self._worker_state.pogo_windows.look_for_button(
             screenshot_path,
             2.20, 3.01,
-            upper=True)
+            upper=True, identifier=self._worker_state.origin)
         if coordinates:
             await self._communicator.click(coordinates.x, coordinates.y)
             await asyncio.sleep(2)
@@ -652,13 +654,13 @@ class WordToScreenMatching(object):
 
     async def __handle_tos_screen(self) -> ScreenType:
         # self._nextscreen = ScreenType.PRIVACY
-        screenshot_path = await self.get_screenshot_path()
+        screenshot_path = self._worker_state.last_screenshot
         await self._communicator.click(int(self._worker_state.resolution_calculator.screen_size_x / 2),
                                        int(self._worker_state.resolution_calculator.screen_size_y * 0.47))
         coordinates: Optional[ScreenCoordinates] = await self._worker_state.pogo_windows.look_for_button(
             screenshot_path,
             2.20, 3.01,
-            upper=True)
+            upper=True, identifier=self._worker_state.origin)
         if coordinates:
             await self._communicator.click(coordinates.x, coordinates.y)
             await asyncio.sleep(2)
@@ -667,11 +669,11 @@ class WordToScreenMatching(object):
 
     async def __handle_privacy_screen(self) -> ScreenType:
         # self._nextscreen = ScreenType.WILLOWCHAR
-        screenshot_path = await self.get_screenshot_path()
+        screenshot_path = self._worker_state.last_screenshot
         coordinates: Optional[ScreenCoordinates] = await self._worker_state.pogo_windows.look_for_button(
             screenshot_path,
             2.20, 3.01,
-            upper=True)
+            upper=True, identifier=self._worker_state.origin)
         if coordinates:
             await self._communicator.click(coordinates.x, coordinates.y)
             await asyncio.sleep(3)
@@ -697,11 +699,11 @@ class WordToScreenMatching(object):
             logger.error("Failed getting screenshot")
             return ScreenType.ERROR
 
-        screenshot_path = await self.get_screenshot_path()
+        screenshot_path = self._worker_state.last_screenshot
         coordinates: Optional[ScreenCoordinates] = await self._worker_state.pogo_windows.look_for_button(
             screenshot_path,
             2.20, 3.01,
-            upper=True)
+            upper=True, identifier=self._worker_state.origin)
         if coordinates:
             await self._communicator.click(coordinates.x, coordinates.y)
             await asyncio.sleep(5)
@@ -723,7 +725,7 @@ class WordToScreenMatching(object):
                                                delay_after=2):
                 logger.error("Failed getting screenshot")
                 return ScreenType.ERROR
-            screenshot_path = await self.get_screenshot_path()
+            screenshot_path = self._worker_state.last_screenshot
             globaldict = await self._worker_state.pogo_windows.get_screen_text(screenshot_path,
                                                                                self._worker_state.origin)
             starter = ['Bulbasaur', 'Charmander', 'Squirtle', 'Bisasam', 'Glumanda', 'Schiggy', 'Bulbizarre',
@@ -745,11 +747,11 @@ class WordToScreenMatching(object):
                 logger.error("Failed getting screenshot")
                 return ScreenType.ERROR
 
-            screenshot_path = await self.get_screenshot_path()
+            screenshot_path = self._worker_state.last_screenshot
             coordinates: Optional[ScreenCoordinates] = await self._worker_state.pogo_windows.look_for_button(
                 screenshot_path,
                 2.20, 3.01,
-                upper=True)
+                upper=True, identifier=self._worker_state.origin)
             if coordinates:
                 await self._communicator.click(coordinates.x, coordinates.y)
                 logger.info("Catched Pokémon.")
@@ -787,7 +789,7 @@ class WordToScreenMatching(object):
                                            delay_after=2):
             logger.error("Failed getting screenshot")
             return ScreenType.ERROR
-        screenshot_path = await self.get_screenshot_path()
+        screenshot_path = self._worker_state.last_screenshot
         globaldict = await self._worker_state.pogo_windows.get_screen_text(screenshot_path, self._worker_state.origin)
         errortext = ['available.', 'verfugbar.', 'disponible.']
         if any(text in errortext for text in globaldict['text']):
@@ -824,7 +826,7 @@ class WordToScreenMatching(object):
         return await self.__handle_screentype(screentype=screentype, global_dict=global_dict, diff=diff,
                                               y_offset=y_offset)
 
-    async def check_quest(self, screenpath: str) -> ScreenType:
+    async def check_quest(self, screenpath: ImageSource) -> ScreenType:
         if screenpath is None or len(screenpath) == 0:
             logger.error("Invalid screen path: {}", screenpath)
             return ScreenType.ERROR
@@ -1005,15 +1007,19 @@ class WordToScreenMatching(object):
 
         screenshot_quality: int = 80
 
-        take_screenshot = await self._communicator.get_screenshot(await self.get_screenshot_path(fileaddon=errorscreen),
-                                                                  screenshot_quality, screenshot_type)
+        screenshot: Optional[bytes] = await self._communicator.get_screenshot_data(screenshot_quality,
+                                                                                   screenshot_type)
 
-        if not take_screenshot:
+        if screenshot is None:
             logger.error("takeScreenshot: Failed retrieving screenshot")
             logger.debug("Failed retrieving screenshot")
             return False
         else:
             logger.debug("Success retrieving screenshot")
+            self._worker_state.last_screenshot = screenshot
+            if errorscreen:
+                async with async_open(await self.get_screenshot_path(fileaddon=True), "wb") as fh:
+                    await fh.write(screenshot)
             self._lastScreenshotTaken = time.time()
             await asyncio.sleep(delay_after)
             return True
@@ -1033,7 +1039,7 @@ class WordToScreenMatching(object):
             logger.error("Failed getting screenshot")
             return None
 
-        screenpath = await self.get_screenshot_path()
+        screenpath: Optional[bytes] = self._worker_state.last_screenshot
 
         result: Optional[Tuple[ScreenType,
         Optional[
@@ -0,0 +1,44 @@
+import asyncio
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ScreenResultCache:
+    """
+    Results of analysing screenshots, or the futures of the analysis still running, looked up by the perceptual hash
+    of the screenshot. Screenshots of the same size with hashes differing by up to `tolerance` bits are considered
+    identical. The least recently used results are dropped once `maxsize` results are held.
+    """
+
+    def __init__(self, maxsize: int, tolerance: int):
+        self._maxsize: int = maxsize
+        self._tolerance: int = tolerance
+        self._results: OrderedDict[Tuple[str, int, int, int], asyncio.Future] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @staticmethod
+    def __key(name: str, image_hash: Tuple[int, int, bytes]) -> Tuple[str, int, int, int]:
+        width, height, gradients = image_hash
+        return name, width, height, int.from_bytes(gradients, "big")
+
+    def get(self, name: str, image_hash: Tuple[int, int, bytes]) -> Optional[asyncio.Future]:
+        key: Tuple[str, int, int, int] = self.__key(name, image_hash)
+        if key not in self._results:
+            for cached in self._results:
+                if cached[:3] == key[:3] and (cached[3] ^ key[3]).bit_count() <= self._tolerance:
+                    key = cached
+                    break
+            else:
+                return None
+        self._results.move_to_end(key)
+        return self._results[key]
+
+    def put(self, name: str, image_hash: Tuple[int, int, bytes], result: asyncio.Future) -> None:
+        self._results[self.__key(name, image_hash)] = result
+        if len(self._results) > self._maxsize:
+            self._results.popitem(last=False)
+
+    def discard(self, name: str, image_hash: Tuple[int, int, bytes]) -> None:
+        self._results.pop(self.__key(name, image_hash), None)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from loguru import logger
+
+from mapadroid.ocr.screen_type import ScreenType
+from mapadroid.ocr.utils import screen_fingerprint
+from mapadroid.utils.collections import ScreenClassifierMetrics
+from mapadroid.utils.madConstants import (SCREEN_CLASSIFIER_LATENCY_SAMPLES,
+                                          SCREEN_CLASSIFIER_MAX_TEMPLATES,
+                                          SCREEN_CLASSIFIER_THRESHOLD)
+
+# Screens with a layout stable per resolution, classified by templates rather than OCR once they were identified.
+# Dialogs only told apart by their text (e.g. strikes, suspensions and terminations of accounts) are always run through
+# OCR as their fingerprints are nearly identical.
+TEMPLATE_SCREEN_TYPES: Set[ScreenType] = {ScreenType.BIRTHDATE, ScreenType.TOS, ScreenType.PRIVACY,
+                                          ScreenType.MARKETING}
+
+ScreenAnalysis = Tuple[ScreenType, Optional[dict], int, int, int]
+
+
+class _Templates:
+    def __init__(self):
+        self.fingerprints: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.analyses: List[ScreenAnalysis] = []
+
+    def match(self, fingerprint: np.ndarray, threshold: float) -> Optional[ScreenAnalysis]:
+        if not self.analyses:
+            return None
+        correlations: np.ndarray = self.fingerprints @ fingerprint
+        best: int = int(np.argmax(correlations))
+        return self.analyses[best] if correlations[best] >= threshold else None
+
+    def add(self, fingerprint: np.ndarray, analysis: ScreenAnalysis, max_templates: int) -> None:
+        fingerprints: List[np.ndarray] = list(self.fingerprints) + [fingerprint]
+        self.analyses.append(analysis)
+        # The oldest templates are dropped
+        self.fingerprints = np.stack(fingerprints[-max_templates:])
+        self.analyses = self.analyses[-max_templates:]
+
+
+class ScreenClassifier:
+    """
+    Classifies screenshots before running OCR by comparing a fingerprint of the screenshot to templates of the same
+    resolution. Templates are added once a screen of a type with a stable layout (TEMPLATE_SCREEN_TYPES) was
+    identified by OCR, the analysis of the template is returned for screenshots matching it.
+    """
+
+    def __init__(self, threshold: float = SCREEN_CLASSIFIER_THRESHOLD,
+                 max_templates: int = SCREEN_CLASSIFIER_MAX_TEMPLATES):
+        self._threshold: float = threshold
+        self._max_templates: int = max_templates
+        self._templates: Dict[Tuple[int, int], _Templates] = {}
+        self._classified: int = 0
+        self._hits: int = 0
+        self._latencies: Deque[float] = deque(maxlen=SCREEN_CLASSIFIER_LATENCY_SAMPLES)
+
+    async def classify(self, image: bytes) -> Tuple[Optional[ScreenAnalysis],
+                                                    Optional[Tuple[int, int, np.ndarray]]]:
+        """
+        Returns: analysis of the template matched (None on a miss) and the fingerprint to be passed to learn
+        """
+        start: float = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        fingerprint: Optional[Tuple[int, int, np.ndarray]] = await loop.run_in_executor(
+            None, screen_fingerprint, image)
+        analysis: Optional[ScreenAnalysis] = None
+        if fingerprint is not None:
+            width, height, vector = fingerprint
+            templates: Optional[_Templates] = self._templates.get((width, height))
+            if templates is not None:
+                analysis = templates.match(vector, self._threshold)
+        self._classified += 1
+        if analysis is not None:
+            self._hits += 1
+            logger.debug("Classified screen as {} by template", analysis[0])
+        self._latencies.append(time.perf_counter() - start)
+        return analysis, fingerprint
+
+    def learn(self, fingerprint: Optional[Tuple[int, int, np.ndarray]], analysis: Optional[ScreenAnalysis]) -> None:
+        if fingerprint is None or analysis is None or analysis[0] not in TEMPLATE_SCREEN_TYPES or not analysis[1]:
+            return
+        width, height, vector = fingerprint
+        templates: _Templates = self._templates.setdefault((width, height), _Templates())
+        if templates.match(vector, self._threshold) is not None:
+            return
+        logger.info("Adding {} screen of {}x{} to the templates", analysis[0], width, height)
+        templates.add(vector, analysis, self._max_templates)
+
+    def get_metrics(self) -> ScreenClassifierMetrics:
+        latencies: List[float] = list(self._latencies)
+        return ScreenClassifierMetrics(
+            templates=sum(len(templates.analyses) for templates in self._templates.values()),
+            classified=self._classified,
+            hits=self._hits,
+            hit_rate=self._hits / self._classified if self._classified else 0.0,
+            avg_latency=sum(latencies) / len(latencies) if latencies else 0.0,
+            max_latency=max(latencies) if latencies else 0.0)
@@ -0,0 +1,63 @@
+import asyncio
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Union
+
+from loguru import logger
+
+from mapadroid.utils.collections import SharedFrame
+
+# Blocks attached by the OCR process, kept open as long as the process is running
+_attached_blocks: Dict[str, shared_memory.SharedMemory] = {}
+
+
+class SharedFramePool:
+    """
+    Fixed slots of shared memory the screenshots are copied to rather than pickled when they are handed to the OCR
+    processes. Only the name of the slot and the size of the screenshot are sent to the process.
+    """
+
+    def __init__(self, slots: int, slot_size: int):
+        self._slot_size: int = slot_size
+        self._blocks: List[shared_memory.SharedMemory] = [shared_memory.SharedMemory(create=True, size=slot_size)
+                                                          for _ in range(slots)]
+        self._blocks_by_name: Dict[str, shared_memory.SharedMemory] = {block.name: block for block in self._blocks}
+        self._free: asyncio.Queue = asyncio.Queue()
+        for block in self._blocks:
+            self._free.put_nowait(block)
+
+    async def acquire(self, data: bytes) -> Union[SharedFrame, bytes]:
+        """
+        Copies the screenshot to a free slot. Returns the frame to be passed to the OCR process, to be released once
+        the OCR process is done reading it (rather than once the caller stops waiting for the result).
+        """
+        if len(data) > self._slot_size:
+            logger.debug("Screenshot of {} bytes exceeds the shared memory slots, passing it as it is", len(data))
+            return data
+        block: shared_memory.SharedMemory = await self._free.get()
+        block.buf[:len(data)] = data
+        return SharedFrame(block.name, len(data))
+
+    def release(self, frame: Union[SharedFrame, bytes]) -> None:
+        if not isinstance(frame, SharedFrame):
+            return
+        block: Optional[shared_memory.SharedMemory] = self._blocks_by_name.get(frame.name)
+        if block is not None:
+            self._free.put_nowait(block)
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+        self._blocks_by_name.clear()
+
+
+def read_shared_frame(frame: SharedFrame) -> memoryview:
+    """
+    Called within the OCR process. Returns a view of the encoded screenshot, valid until the job is done.
+    """
+    block: shared_memory.SharedMemory = _attached_blocks.get(frame.name)
+    if block is None:
+        block = shared_memory.SharedMemory(name=frame.name)
+        _attached_blocks[frame.name] = block
+    return block.buf[:frame.size]
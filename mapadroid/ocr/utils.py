@@ -1,4 +1,6 @@
-from typing import List, Optional, Tuple
+import io
+import math
+from typing import List, Optional, Tuple, Union
 
 import cv2
 import numpy as np
@@ -7,6 +9,26 @@ from PIL import Image
 from pytesseract import Output, pytesseract
 
 from mapadroid.ocr.screen_type import ScreenType
+from mapadroid.ocr.shared_frames import read_shared_frame
+from mapadroid.utils.collections import ScreenCoordinates, SharedFrame
+from mapadroid.utils.madConstants import (OCR_CACHE_HASH_DEAD_ZONE,
+                                          OCR_CACHE_HASH_SIZE,
+                                          SCREEN_FINGERPRINT_SIZE)
+
+try:
+    from tesserocr import PyTessBaseAPI
+except ImportError:
+    # Optional requirement, the tesseract binary is run by pytesseract for every image if tesserocr is not installed
+    PyTessBaseAPI = None
+
+# Screenshots are passed as the encoded bytes received from the device, a frame in shared memory or as the path of a
+# file
+ImageSource = Union[str, bytes, SharedFrame]
+
+# Columns of the TSV output of tesseract, the header is omitted by the API
+_TESSERACT_TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+# API handle of the OCR process, initialized once per process by init_ocr_worker
+_tesseract_api = None
 
 screen_texts: dict = {1: ['Geburtdatum', 'birth.', 'naissance.', 'date'],
                       2: ['ZURUCKKEHRENDER', 'ZURÜCKKEHRENDER', 'GAME', 'FREAK', 'SPIELER'],
@@ -47,7 +69,112 @@ screen_texts: dict = {1: ['Geburtdatum', 'birth.', 'naissance.', 'date'],
                      }
 
 
-def screendetection_get_type_internal(image,
+def tesserocr_installed() -> bool:
+    return PyTessBaseAPI is not None
+
+
+def init_ocr_worker() -> None:
+    """
+    Initializer of the OCR processes. Tesseract is loaded once per process (if tesserocr is installed) rather than for
+    every image.
+    """
+    global _tesseract_api
+    if PyTessBaseAPI is None:
+        return
+    try:
+        _tesseract_api = PyTessBaseAPI()
+        _tesseract_api.SetVariable("user_defined_dpi", "70")
+    except RuntimeError as e:
+        logger.warning("Failed initializing tesseract, running the tesseract binary instead: {}", e)
+        _tesseract_api = None
+
+
+def image_to_data(frame: Image.Image) -> dict:
+    """
+    Returns: boxes of the text recognized in the same format as pytesseract.image_to_data with Output.DICT
+    """
+    if _tesseract_api is None:
+        return pytesseract.image_to_data(frame, output_type=Output.DICT, timeout=40, config='--dpi 70')
+    if frame.mode == "LA":
+        frame = frame.convert("L")
+    _tesseract_api.SetImage(frame)
+    return pytesseract.file_to_dict(_TESSERACT_TSV_HEADER + "\n" + _tesseract_api.GetTSVText(0), "\t", -1)
+
+
+def open_image(image: ImageSource) -> Image.Image:
+    if isinstance(image, SharedFrame):
+        return Image.open(io.BytesIO(read_shared_frame(image)))
+    elif isinstance(image, bytes):
+        return Image.open(io.BytesIO(image))
+    return Image.open(image)
+
+
+def decode_image(image: ImageSource) -> Optional[np.ndarray]:
+    """
+    Returns: BGR array of the image, None if it could not be decoded
+    """
+    if isinstance(image, SharedFrame):
+        return cv2.imdecode(np.frombuffer(read_shared_frame(image), dtype=np.uint8), cv2.IMREAD_COLOR)
+    elif isinstance(image, bytes):
+        return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return cv2.imread(image)
+
+
+def _decode_reduced(image: bytes) -> Optional[Tuple[int, int, np.ndarray]]:
+    """
+    Returns: width, height and a grayscale copy of the screenshot downscaled by 8 while decoding, None if it could not
+    be decoded
+    """
+    try:
+        with Image.open(io.BytesIO(image)) as frame:
+            width, height = frame.size
+        reduced = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    except (ValueError, OSError, cv2.error):
+        return None
+    if reduced is None:
+        return None
+    return width, height, reduced
+
+
+def screen_hash(image: bytes) -> Optional[Tuple[int, int, bytes]]:
+    """
+    Perceptual hash of a screenshot: directions of the horizontal gradients of a downscaled grayscale copy.
+    Identical screens (e.g. the same dialog) seen by devices of the same resolution share the hash despite
+    compression artifacts.
+    Returns: width, height and hash of the screenshot, None if it could not be decoded
+    """
+    decoded: Optional[Tuple[int, int, np.ndarray]] = _decode_reduced(image)
+    if decoded is None:
+        return None
+    width, height, reduced = decoded
+    grid = cv2.resize(reduced, (OCR_CACHE_HASH_SIZE + 1, OCR_CACHE_HASH_SIZE),
+                      interpolation=cv2.INTER_AREA).astype(np.int16)
+    gradients = grid[:, 1:] - grid[:, :-1]
+    # Gradients within the dead zone (flat areas) are ignored, their sign would merely reflect noise
+    return width, height, np.packbits(np.stack((gradients > OCR_CACHE_HASH_DEAD_ZONE,
+                                                gradients < -OCR_CACHE_HASH_DEAD_ZONE))).tobytes()
+
+
+def screen_fingerprint(image: bytes) -> Optional[Tuple[int, int, np.ndarray]]:
+    """
+    Fingerprint of a screenshot to be compared to others of the same resolution by correlation: downscaled grayscale
+    copy, zero mean and unit length.
+    Returns: width, height and fingerprint of the screenshot, None if it could not be decoded or is uniform (e.g. a
+    black loading screen)
+    """
+    decoded: Optional[Tuple[int, int, np.ndarray]] = _decode_reduced(image)
+    if decoded is None:
+        return None
+    width, height, reduced = decoded
+    fingerprint = cv2.resize(reduced, SCREEN_FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    fingerprint -= fingerprint.mean()
+    norm: float = float(np.linalg.norm(fingerprint))
+    if norm < 1.0:
+        return None
+    return width, height, fingerprint / norm
+
+
+def screendetection_get_type_internal(image: ImageSource,
                                       identifier) -> Optional[Tuple[ScreenType, Optional[dict], int, int, int]]:
     with logger.contextualize(identifier=identifier):
         returntype: ScreenType = ScreenType.UNDEFINED
@@ -57,7 +184,7 @@ def screendetection_get_type_internal(image,
 
         texts = []
         try:
-            with Image.open(image) as frame_org:
+            with open_image(image) as frame_org:
                 width, height = frame_org.size
 
                 logger.debug("Screensize: W:{} x H:{}", width, height)
@@ -74,8 +201,7 @@ def screendetection_get_type_internal(image,
                     texts.append(frame)
                 for text in texts:
                     try:
-                        globaldict = pytesseract.image_to_data(text, output_type=Output.DICT, timeout=40,
-                                                               config='--dpi 70')
+                        globaldict = image_to_data(text)
                     except Exception as e:
                         logger.error("Tesseract Error: {}. Exception: {}", globaldict, e)
                         globaldict = None
@@ -97,18 +223,18 @@ def screendetection_get_type_internal(image,
 
                 del texts
                 frame.close()
-        except (FileNotFoundError, ValueError) as e:
-            logger.error("Failed opening image {} with exception {}", image, e)
+        except (FileNotFoundError, ValueError, OSError) as e:
+            logger.error("Failed opening image with exception {}", e)
             return None
 
         return returntype, globaldict, width, height, diff
 
 
-def check_pogo_mainscreen(filename, identifier) -> bool:
+def check_pogo_mainscreen(image: ImageSource, identifier) -> bool:
     with logger.contextualize(identifier=identifier):
-        logger.debug("__internal_check_pogo_mainscreen: Checking close except nearby with: file {}", filename)
+        logger.debug("__internal_check_pogo_mainscreen: Checking close except nearby")
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = decode_image(image)
         except Exception:
             logger.error("Screenshot corrupted")
             logger.debug("__internal_check_pogo_mainscreen: Screenshot corrupted...")
@@ -149,11 +275,11 @@ def check_pogo_mainscreen(filename, identifier) -> bool:
         return False
 
 
-def most_frequent_colour_internal(image, identifier, y_offset: int = 0) -> Optional[List[int]]:
+def most_frequent_colour_internal(image: ImageSource, identifier, y_offset: int = 0) -> Optional[List[int]]:
     with logger.contextualize(identifier=identifier):
         logger.debug("most_frequent_colour_internal: Reading screen text")
         try:
-            with Image.open(image) as img:
+            with open_image(image) as img:
                 w, h = img.size
                 left = 0
                 top = int(h * 0.05)
@@ -169,29 +295,28 @@ def most_frequent_colour_internal(image, identifier, y_offset: int = 0) -> Optio
                         most_frequent_pixel = (count, colour)
 
                 logger.debug("Most frequent pixel on screen: {}", most_frequent_pixel[1])
-        except (FileNotFoundError, ValueError) as e:
-            logger.error("Failed opening image {} with exception {}", image, e)
+        except (FileNotFoundError, ValueError, OSError) as e:
+            logger.error("Failed opening image with exception {}", e)
             return None
 
         return most_frequent_pixel[1]
 
 
-def get_screen_text(screenpath: str, identifier) -> Optional[dict]:
+def get_screen_text(image: ImageSource, identifier) -> Optional[dict]:
     with logger.contextualize(identifier=identifier):
         returning_dict: Optional[dict] = {}
         logger.debug("get_screen_text: Reading screen text")
 
         try:
-            with Image.open(screenpath) as frame:
+            with open_image(image) as frame:
                 frame = frame.convert('LA')
                 try:
-                    returning_dict = pytesseract.image_to_data(frame, output_type=Output.DICT, timeout=40,
-                                                               config='--dpi 70')
+                    returning_dict = image_to_data(frame)
                 except Exception as e:
                     logger.error("Tesseract Error: {}. Exception: {}", returning_dict, e)
                     returning_dict = None
-        except (FileNotFoundError, ValueError) as e:
-            logger.error("Failed opening image {} with exception {}", screenpath, e)
+        except (FileNotFoundError, ValueError, OSError) as e:
+            logger.error("Failed opening image with exception {}", e)
             return None
 
         if isinstance(returning_dict, dict):
@@ -199,3 +324,236 @@ def get_screen_text(screenpath: str, identifier) -> Optional[dict]:
         else:
             logger.warning("Could not read text in image: {}", returning_dict)
             return None
+
+
+def read_circles(screenshot: np.ndarray, ratio, xcord=False, crop=False, canny=False,
+                 secondratio=False) -> List[ScreenCoordinates]:
+    logger.debug("read_circles: Reading circles")
+    circles_found: List[ScreenCoordinates] = []
+    height, width, _ = screenshot.shape
+
+    if crop:
+        screenshot = screenshot[int(height) - int(int(height / 4)):int(height),
+                                int(int(width) / 2) - int(int(width) / 8):int(int(width) / 2) + int(int(width) / 8)]
+
+    logger.debug("read_circles: Determined screenshot scale: {} x {}", height, width)
+    gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+    # detect circles in the image
+
+    if not secondratio:
+        radius_min = int((width / float(ratio) - 3) / 2)
+        radius_max = int((width / float(ratio) + 3) / 2)
+    else:
+        radius_min = int((width / float(ratio) - 3) / 2)
+        radius_max = int((width / float(secondratio) + 3) / 2)
+    if canny:
+        gaussian = cv2.GaussianBlur(gray, (3, 3), 0)
+        gray = cv2.Canny(gaussian, 100, 50, apertureSize=3)
+
+    logger.debug("read_circles: Detect radius of circle: Min {} / Max {}", radius_min, radius_max)
+    circles = cv2.HoughCircles(gray, cv2.HOUGH_GRADIENT, 1, width / 8, param1=100, param2=15,
+                               minRadius=radius_min, maxRadius=radius_max)
+    # ensure at least some circles were found
+    if circles is None:
+        logger.debug("read_circles: Determined screenshot to have 0 Circle")
+        return circles_found
+    # convert the (x, y) coordinates and radius of the circles to integers
+    circles_first_col = np.round(circles[0, :]).astype("int")
+    # loop over the (x, y) coordinates and radius of the circles
+    for (pos_x, pos_y, _) in circles_first_col:
+        if not xcord:
+            circles_found.append(ScreenCoordinates(width / 2, (int(height) - int(height / 4.5)) + pos_y))
+        else:
+            if (width / 2) - 100 <= pos_x <= (width / 2) + 100 and pos_y >= (height - (height / 3)):
+                circles_found.append(ScreenCoordinates(width / 2, (int(height) - int(height / 4.5)) + pos_y))
+    logger.debug("read_circles: Determined screenshot to have {} Circle.", len(circles_found))
+    return circles_found
+
+
+def look_for_button_internal(image: ImageSource, identifier, ratiomin, ratiomax,
+                             upper) -> Optional[ScreenCoordinates]:
+    with logger.contextualize(identifier=identifier):
+        logger.debug("lookForButton: Reading lines")
+        min_distance_to_middle = None
+        try:
+            screenshot_read = decode_image(image)
+            if screenshot_read is None:
+                logger.error("Screenshot corrupted")
+                return None
+            gray = cv2.cvtColor(screenshot_read, cv2.COLOR_BGR2GRAY)
+        except cv2.error:
+            logger.error("Screenshot corrupted")
+            return None
+
+        height, width, _ = screenshot_read.shape
+        _widthold = float(width)
+        logger.debug("lookForButton: Determined screenshot scale: {} x {}", height, width)
+
+        # resize for better line quality
+        height, width = gray.shape
+        factor = width / _widthold
+
+        gaussian = cv2.GaussianBlur(gray, (3, 3), 0)
+        edges = cv2.Canny(gaussian, 50, 200, apertureSize=3)
+
+        # checking for all possible button lines
+        max_line_length = (width / ratiomin) + (width * 0.18)
+        logger.debug("lookForButton: MaxLineLength: {}", max_line_length)
+        min_line_length = (width / ratiomax) - (width * 0.02)
+        logger.debug("lookForButton: MinLineLength: {}", min_line_length)
+
+        kernel = np.ones((2, 2), np.uint8)
+        gradient_of_edges_found = cv2.morphologyEx(edges, cv2.MORPH_GRADIENT, kernel)
+
+        num_lines = 0
+        lines = cv2.HoughLinesP(gradient_of_edges_found, rho=1, theta=math.pi / 180, threshold=90,
+                                minLineLength=min_line_length, maxLineGap=5)
+        if lines is None:
+            return None
+
+        lines_processed = _check_lines(lines, height)
+        _last_y = _x1 = _x2 = click_y = 0
+        for x1, y1, x2, y2 in lines_processed:
+            if y1 == y2 and max_line_length >= x2 - x1 >= min_line_length \
+                    and y1 > height / 3 \
+                    and width / 2 + 50 > (x2 - x1) / 2 + x1 > width / 2 - 50:
+
+                num_lines += 1
+                min_distance_to_middle_tmp = y1 - (height / 2)
+                if upper:
+                    if min_distance_to_middle is None:
+                        min_distance_to_middle = min_distance_to_middle_tmp
+                        click_y = y1 + 50
+                        _last_y = y1
+                        _x1 = x1
+                        _x2 = x2
+                    else:
+                        if min_distance_to_middle_tmp < min_distance_to_middle:
+                            click_y = _last_y + ((y1 - _last_y) / 2)
+                            _last_y = y1
+                            _x1 = x1
+                            _x2 = x2
+
+                else:
+                    click_y = _last_y + ((y1 - _last_y) / 2)
+                    _last_y = y1
+                    _x1 = x1
+                    _x2 = x2
+                logger.debug("lookForButton: Found Buttonline Nr. {} - Line lenght: {}px Coords - X: {} {} "
+                             "Y: {} {}", num_lines, x2 - x1, x1, x2, y1, y1)
+        if 1 < num_lines <= 6:
+            # recalculate click area for real resolution
+            click_x = int(((width - _x2) + ((_x2 - _x1) / 2)) /
+                          round(factor, 2))
+            click_y = int(click_y)
+            logger.debug('lookForButton: found Button')
+            return ScreenCoordinates(click_x, click_y)
+
+        elif num_lines > 6:
+            logger.debug('lookForButton: found too many Buttons :) - assuming X coords to close present')
+            return ScreenCoordinates(int(width - (width / 7.2)),
+                                     int(height - (height / 12.19)))
+
+        logger.debug('lookForButton: did not found any Button')
+        return None
+
+
+def _check_lines(lines, height) -> np.ndarray:
+    temp_lines = []
+    sort_lines = []
+    old_y1 = 0
+
+    for line in lines:
+        for x1, y1, x2, y2 in line:
+            temp_lines.append([y1, y2, x1, x2])
+
+    temp_lines = np.array(temp_lines)
+    sort_arr = (temp_lines[temp_lines[:, 0].argsort()])
+
+    button_value = height / 40
+
+    for line in sort_arr:
+        if int(old_y1 + int(button_value)) < int(line[0]):
+            if int(line[0]) == int(line[1]):
+                sort_lines.append([line[2], line[0], line[3], line[1]])
+                old_y1 = line[0]
+
+    return np.asarray(sort_lines, dtype=np.int32)
+
+
+def check_raid_line(screenshot: np.ndarray, left_side=False) -> Optional[ScreenCoordinates]:
+    logger.debug("check_raid_line: Reading lines")
+    if left_side:
+        logger.debug("check_raid_line: Check nearby open ")
+
+    if len(read_circles(screenshot, float(11), xcord=False, crop=True, canny=True)) == 0:
+        logger.debug("check_raid_line: Not active")
+        return None
+
+    height, width, _ = screenshot.shape
+    screenshot_partial = screenshot[int(height / 2) - int(height / 3):int(height / 2) + int(height / 3),
+                                    int(0):int(width)]
+    gray = cv2.cvtColor(screenshot_partial, cv2.COLOR_BGR2GRAY)
+    gaussian = cv2.GaussianBlur(gray, (5, 5), 0)
+    logger.debug("check_raid_line: Determined screenshot scale: {} x {}", height, width)
+    edges = cv2.Canny(gaussian, 50, 150, apertureSize=3)
+    max_line_length = width / 3.30 + width * 0.03
+    logger.debug("check_raid_line: MaxLineLength: {}", max_line_length)
+    min_line_length = width / 6.35 - width * 0.03
+    logger.debug("check_raid_line: MinLineLength: {}", min_line_length)
+    lines = cv2.HoughLinesP(edges, rho=1, theta=math.pi / 180, threshold=70, minLineLength=min_line_length,
+                            maxLineGap=2)
+    if lines is None:
+        return None
+    for line in lines:
+        for x1, y1, x2, y2 in line:
+            if not left_side:
+                if y1 == y2 and (x2 - x1 <= max_line_length) and (
+                        x2 - x1 >= min_line_length) and x1 > width / 2 and x2 > width / 2 and y1 < (
+                        height / 2):
+                    logger.debug("check_raid_line: Raid-tab is active - Line length: {}px "
+                                 "Coords - x: {} {} Y: {} {}", x2 - x1, x1, x2, y1, y2)
+                    return ScreenCoordinates(0, 0)
+            else:
+                if y1 == y2 and (x2 - x1 <= max_line_length) and (
+                        x2 - x1 >= min_line_length) and (
+                        (x1 < width / 2 and x2 < width / 2) or (
+                        x1 < width / 2 < x2)) and y1 < (
+                        height / 2):
+                    logger.debug("check_raid_line: Nearby is active - but not Raid-Tab")
+                    raidtab_x = int(width - (x2 - x1))
+                    raidtab_y = int(
+                        (int(height / 2) - int(height / 3) + y1) * 0.9)
+                    return ScreenCoordinates(raidtab_x, raidtab_y)
+    logger.debug("check_raid_line: Not active")
+    return None
+
+
+def check_close_except_nearby_button_internal(image: ImageSource, identifier,
+                                              close_raid=False) -> List[ScreenCoordinates]:
+    """
+    Checks for X button on any screen... could kill raidscreen, handle properly
+    """
+    with logger.contextualize(identifier=identifier):
+        logger.debug("check_close_except_nearby_button_internal: Checking close except nearby")
+        try:
+            screenshot_read = decode_image(image)
+        except cv2.error:
+            screenshot_read = None
+        if screenshot_read is None:
+            logger.error("check_close_except_nearby_button_internal: Screenshot corrupted")
+            return []
+
+        if not close_raid:
+            logger.debug("check_close_except_nearby_button_internal: Raid is not to be closed...")
+            if check_raid_line(screenshot_read) or check_raid_line(screenshot_read, left_side=True):
+                # raid tab present
+                logger.debug("check_close_except_nearby_button_internal: Not checking for close button (X). "
+                             "Nearby or raid tab open but not to be closed.")
+                return []
+        logger.debug("check_close_except_nearby_button_internal: Checking for close button (X).")
+        coordinates_of_close_found: List[ScreenCoordinates] = read_circles(screenshot_read, float(10), xcord=False,
+                                                                           crop=True, canny=True)
+        if coordinates_of_close_found:
+            logger.debug("Found close button (X).")
+        return coordinates_of_close_found
@@ -127,7 +127,7 @@ class RouteManagerLeveling(RouteManagerBase):
                                                                         coords,
                                                                         self.get_max_radius(),
                                                                         self.get_max_coords_within_radius(),
-                                                                        algorithm=RoutecalculationTypes.TSP_QUICK,
+                                                                        algorithm=RoutecalculationTypes.CHRISTOFIDES,
                                                                         use_s2=self.useS2,
                                                                         s2_level=self.S2level,
                                                                         route_name=self.name,
@@ -1,6 +1,4 @@
-import asyncio
 import collections
-import concurrent.futures
 import math
 from abc import ABC
 from operator import itemgetter
@@ -9,6 +7,7 @@ from typing import Collection, Dict, List, Optional
 from mapadroid.route.RouteManagerBase import RouteManagerBase
 from mapadroid.route.RoutePoolEntry import RoutePoolEntry
 from mapadroid.utils.collections import Location
+from mapadroid.utils.ComputePool import get_compute_pool
 from mapadroid.utils.geo import get_distance_of_two_points_in_meters
 from mapadroid.utils.logging import LoggerEnums, get_logger
 
@@ -52,12 +51,10 @@ class SubrouteReplacingMixin(RouteManagerBase, ABC):
         # we want to order the dict by the time's we added the workers to the areas
         # we first need to build a list of tuples with only origin, time_added
         logger.debug("Checking routepools in the following order: {}", sorted_routepools)
-        loop = asyncio.get_running_loop()
-        with concurrent.futures.ProcessPoolExecutor() as pool:
-            routepool = await loop.run_in_executor(pool, SubrouteReplacingMixin._populate_subroutes,
-                                                   extra_length_workers, new_subroute_length, routepool,
-                                                   sorted_routepools,
-                                                   temp_total_round)
+        routepool = await get_compute_pool().run(SubrouteReplacingMixin._populate_subroutes,
+                                                 extra_length_workers, new_subroute_length, routepool,
+                                                 sorted_routepools,
+                                                 temp_total_round)
 
         logger.debug("Done updating subroutes")
         return routepool
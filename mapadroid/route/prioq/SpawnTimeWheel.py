@@ -0,0 +1,115 @@
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.utils.collections import Location
+
+SECONDS_PER_HOUR = 3600
+
+
+def get_spawn_second_of_hour(calc_endminsec: str, spawndef: int) -> int:
+    """
+    Args:
+        calc_endminsec: despawn minute and second as stored in trs_spawn ("MM:SS")
+        spawndef: spawndef of the spawnpoint, 15 indicates a 60 minute spawn
+
+    Returns: The second of the hour the spawnpoint spawns at
+    """
+    minutes, seconds = calc_endminsec.split(":")
+    spawn_duration_seconds = SECONDS_PER_HOUR if spawndef == 15 else SECONDS_PER_HOUR // 2
+    return (int(minutes) * 60 + int(seconds) - spawn_duration_seconds) % SECONDS_PER_HOUR
+
+
+class SpawnTimeWheel:
+    """
+    In-memory state of the spawnpoints of an area used to generate the upcoming spawn events without reading and
+    clustering every spawnpoint of the area with each update of a prioQ.
+    Spawnpoints are placed in the bucket of the hour they spawn in. The clusters of a bucket are kept until a
+    spawnpoint of the bucket is added, moved or removed, i.e. updates only recluster the buckets touched.
+    """
+
+    def __init__(self, clustering_helper: ClusteringHelper, bucket_seconds: int):
+        self._clustering_helper: ClusteringHelper = clustering_helper
+        self._bucket_seconds: int = max(1, min(int(bucket_seconds), SECONDS_PER_HOUR))
+        amount_of_buckets: int = math.ceil(SECONDS_PER_HOUR / self._bucket_seconds)
+        # spawnpoint ID -> (second of the hour the spawnpoint spawns at, location)
+        self._spawns: Dict[int, Tuple[int, Location]] = {}
+        self._buckets: List[Set[int]] = [set() for _ in range(amount_of_buckets)]
+        # Clusters of each bucket as tuples of (second of the hour, location), None if outdated
+        self._clusters: List[Optional[List[Tuple[int, Location]]]] = [None] * amount_of_buckets
+
+    def __len__(self) -> int:
+        return len(self._spawns)
+
+    def upsert(self, spawnpoint: int, location: Location, calc_endminsec: Optional[str], spawndef: int) -> bool:
+        """
+        Adds or moves a spawnpoint. Spawnpoints without a known despawn time are removed.
+        Returns: True if the spawnpoint was added, moved or removed
+        """
+        if not calc_endminsec:
+            return self.remove(spawnpoint)
+        spawn = (get_spawn_second_of_hour(calc_endminsec, spawndef), location)
+        current: Optional[Tuple[int, Location]] = self._spawns.get(spawnpoint)
+        if current == spawn:
+            return False
+        elif current is not None:
+            self.remove(spawnpoint)
+        self._spawns[spawnpoint] = spawn
+        bucket: int = spawn[0] // self._bucket_seconds
+        self._buckets[bucket].add(spawnpoint)
+        self._clusters[bucket] = None
+        return True
+
+    def remove(self, spawnpoint: int) -> bool:
+        current: Optional[Tuple[int, Location]] = self._spawns.pop(spawnpoint, None)
+        if current is None:
+            return False
+        bucket: int = current[0] // self._bucket_seconds
+        self._buckets[bucket].discard(spawnpoint)
+        self._clusters[bucket] = None
+        return True
+
+    def retain(self, spawnpoints: Set[int]) -> int:
+        """
+        Removes any spawnpoint not part of spawnpoints
+        Returns: The amount of spawnpoints removed
+        """
+        to_be_removed: List[int] = [spawnpoint for spawnpoint in self._spawns.keys()
+                                    if spawnpoint not in spawnpoints]
+        for spawnpoint in to_be_removed:
+            self.remove(spawnpoint)
+        return len(to_be_removed)
+
+    def get_upcoming(self, now: int, limit_next_n_seconds: int) -> List[Tuple[int, Location]]:
+        """
+        Args:
+            now: unix timestamp to start at
+            limit_next_n_seconds: length of the window to return the events of
+
+        Returns: The clustered spawn events as tuples of (timestamp, location) due within
+        [now, now + limit_next_n_seconds] ordered by timestamp
+        """
+        end: int = now + limit_next_n_seconds
+        upcoming: List[Tuple[int, Location]] = []
+        current: int = now
+        while current <= end:
+            start_of_hour: int = current - current % SECONDS_PER_HOUR
+            bucket: int = (current - start_of_hour) // self._bucket_seconds
+            for second_of_hour, location in self._get_clusters_of_bucket(bucket):
+                timestamp: int = start_of_hour + second_of_hour
+                if current <= timestamp <= end:
+                    upcoming.append((timestamp, location))
+            current = min(start_of_hour + (bucket + 1) * self._bucket_seconds, start_of_hour + SECONDS_PER_HOUR)
+        upcoming.sort(key=lambda event: event[0])
+        return upcoming
+
+    def _get_clusters_of_bucket(self, bucket: int) -> List[Tuple[int, Location]]:
+        clusters: Optional[List[Tuple[int, Location]]] = self._clusters[bucket]
+        if clusters is None:
+            # Sorted to have the clusters not depend on the order the spawnpoints were added in
+            events: List[Tuple[int, Location]] = sorted((self._spawns[spawnpoint] for spawnpoint
+                                                         in self._buckets[bucket]),
+                                                        key=lambda event: (event[0], event[1].lat, event[1].lng))
+            clusters = self._clustering_helper.get_clustered(events) if events else []
+            self._clusters[bucket] = clusters
+        return clusters
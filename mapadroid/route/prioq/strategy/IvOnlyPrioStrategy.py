@@ -5,7 +5,8 @@ from mapadroid.db.helper.PokemonHelper import PokemonHelper
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.route.prioq.strategy.AbstractRoutePriorityQueueStrategy import AbstractRoutePriorityQueueStrategy, \
     RoutePriorityQueueEntry
-from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.SpatialClusteringHelper import \
+    SpatialClusteringHelper
 from mapadroid.utils.collections import Location
 
 
@@ -17,9 +18,9 @@ class IvOnlyPrioStrategy(AbstractRoutePriorityQueueStrategy):
         super().__init__(update_interval=30, full_replace_queue=False,
                          max_backlog_duration=max_backlog_duration,
                          delay_after_event=delay_after_event)
-        self._clustering_helper = ClusteringHelper(clustering_distance,
-                                                   max_count_per_circle=clustering_count_per_circle,
-                                                   max_timedelta_seconds=clustering_timedelta)
+        self._clustering_helper = SpatialClusteringHelper(clustering_distance,
+                                                          max_count_per_circle=clustering_count_per_circle,
+                                                          max_timedelta_seconds=clustering_timedelta)
         self._db_wrapper: DbWrapper = db_wrapper
         self._geofence_helper: GeofenceHelper = geofence_helper
         self._min_time_left_seconds: int = min_time_left_seconds
@@ -1,13 +1,21 @@
-from typing import List, Optional, Tuple
+import asyncio
+import time
+from typing import List, Optional, Set, Tuple
 
 from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.db.helper.TrsSpawnHelper import TrsSpawnHelper
+from mapadroid.db.model import TrsSpawn
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
+from mapadroid.route.prioq.SpawnTimeWheel import SpawnTimeWheel
 from mapadroid.route.prioq.strategy.AbstractRoutePriorityQueueStrategy import AbstractRoutePriorityQueueStrategy, \
     RoutePriorityQueueEntry
-from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.SpatialClusteringHelper import \
+    SpatialClusteringHelper
 from mapadroid.utils.collections import Location
+from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.logging import get_logger, LoggerEnums
+from mapadroid.utils.madConstants import (PRIOQ_SPAWN_DELTA_OVERLAP,
+                                          PRIOQ_SPAWN_FULL_SYNC_INTERVAL)
 
 logger = get_logger(LoggerEnums.routemanager)
 
@@ -15,18 +23,27 @@ logger = get_logger(LoggerEnums.routemanager)
 class MonSpawnPrioStrategy(AbstractRoutePriorityQueueStrategy):
     def __init__(self, clustering_timedelta: int, clustering_distance: int, clustering_count_per_circle: int,
                  max_backlog_duration: int, db_wrapper: DbWrapper, geofence_helper: GeofenceHelper,
-                 include_event_id: Optional[int], delay_after_event: int):
+                 include_event_id: Optional[int], delay_after_event: int, incremental: bool = False):
         super().__init__(update_interval=600, full_replace_queue=False,
                          max_backlog_duration=max_backlog_duration,
                          delay_after_event=delay_after_event)
-        self._clustering_helper = ClusteringHelper(clustering_distance,
-                                                   max_count_per_circle=clustering_count_per_circle,
-                                                   max_timedelta_seconds=clustering_timedelta)
+        self._clustering_helper = SpatialClusteringHelper(clustering_distance,
+                                                          max_count_per_circle=clustering_count_per_circle,
+                                                          max_timedelta_seconds=clustering_timedelta)
         self._db_wrapper: DbWrapper = db_wrapper
         self._geofence_helper: GeofenceHelper = geofence_helper
         self._include_event_id: Optional[int] = include_event_id
+        # The spawnpoints of the area are kept in memory and updated using the spawnpoints changed since the last
+        # update. Events retrieved are clustered already.
+        self._spawn_time_wheel: Optional[SpawnTimeWheel] = None
+        if incremental:
+            self._spawn_time_wheel = SpawnTimeWheel(self._clustering_helper, self.get_update_interval())
+        self._last_full_sync: int = 0
+        self._last_sync: int = 0
 
     async def retrieve_new_coords(self) -> List[RoutePriorityQueueEntry]:
+        if self._spawn_time_wheel is not None:
+            return await self._retrieve_new_coords_incremental()
         logger.debug("Fetching mon spawn coords")
         async with self._db_wrapper as session, session:
             next_spawns: List[Tuple[int, Location]] = await TrsSpawnHelper.get_next_spawns(session,
@@ -40,11 +57,51 @@ class MonSpawnPrioStrategy(AbstractRoutePriorityQueueStrategy):
             new_coords.append(entry)
         return new_coords
 
+    async def _retrieve_new_coords_incremental(self) -> List[RoutePriorityQueueEntry]:
+        now: int = int(time.time())
+        full_sync: bool = now - self._last_full_sync >= PRIOQ_SPAWN_FULL_SYNC_INTERVAL
+        async with self._db_wrapper as session, session:
+            if full_sync:
+                logger.debug("Fetching all mon spawns of the area")
+                spawns: List[TrsSpawn] = await TrsSpawnHelper.get_known_of_area(session, self._geofence_helper,
+                                                                                self._include_event_id)
+            else:
+                changed_since = DatetimeWrapper.fromtimestamp(self._last_sync - PRIOQ_SPAWN_DELTA_OVERLAP)
+                logger.debug("Fetching mon spawns changed since {}", changed_since)
+                spawns: List[TrsSpawn] = await TrsSpawnHelper.get_changed_of_area(session, self._geofence_helper,
+                                                                                  self._include_event_id,
+                                                                                  changed_since)
+        loop = asyncio.get_running_loop()
+        next_spawns: List[Tuple[int, Location]] = await loop.run_in_executor(
+            None, self._update_time_wheel, spawns, full_sync, now)
+        self._last_sync = now
+        if full_sync:
+            self._last_full_sync = now
+        return [RoutePriorityQueueEntry(timestamp_due=timestamp_due, location=location)
+                for (timestamp_due, location) in next_spawns]
+
+    def _update_time_wheel(self, spawns: List[TrsSpawn], full_sync: bool, now: int) -> List[Tuple[int, Location]]:
+        changed: int = 0
+        for spawn in spawns:
+            if self._spawn_time_wheel.upsert(int(spawn.spawnpoint), Location(float(spawn.latitude),
+                                                                             float(spawn.longitude)),
+                                             spawn.calc_endminsec, spawn.spawndef):
+                changed += 1
+        if full_sync:
+            present: Set[int] = {int(spawn.spawnpoint) for spawn in spawns}
+            changed += self._spawn_time_wheel.retain(present)
+        logger.debug("{} of {} mon spawns read changed, {} known in total", changed, len(spawns),
+                     len(self._spawn_time_wheel))
+        return self._spawn_time_wheel.get_upcoming(now, self.get_update_interval())
+
     def filter_queue(self, queue: List[RoutePriorityQueueEntry]) -> List[RoutePriorityQueueEntry]:
         return queue
 
     def postprocess_coords(self, coords: List[RoutePriorityQueueEntry]) -> List[RoutePriorityQueueEntry]:
         logger.debug("Post-processing coords")
+        if self._spawn_time_wheel is not None:
+            return [RoutePriorityQueueEntry(timestamp_due=entry.timestamp_due + self.get_delay_after_event(),
+                                            location=entry.location) for entry in coords]
         try:
             locations_transformed_for_clustering: List[Tuple[int, Location]] = []
             for entry in coords:
@@ -1,16 +1,17 @@
-import asyncio
-import concurrent.futures
 from timeit import default_timer as timer
 from typing import List, Optional, Tuple
 
+import numpy as np
 from loguru import logger
 
 from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.db.helper import SettingsRoutecalcHelper
 from mapadroid.db.model import SettingsRoutecalc
 from mapadroid.route.routecalc.calculate_route_all import route_calc_all
-from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.SpatialClusteringHelper import \
+    SpatialClusteringHelper
 from mapadroid.utils.collections import Location
+from mapadroid.utils.ComputePool import get_compute_pool
 from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.madGlobals import RoutecalculationTypes
 
@@ -55,11 +56,10 @@ class RoutecalcUtil:
 
         if len(coords) > 0 and max_radius and max_radius >= 1 and max_coords_within_radius:
             logger.info("Calculating route for {}", route_name)
-            loop = asyncio.get_running_loop()
-            with concurrent.futures.ProcessPoolExecutor() as pool:
-                calculated_route = await loop.run_in_executor(
-                    pool, RoutecalcUtil.get_less_coords, coords, max_radius, max_coords_within_radius, use_s2,
-                    s2_level)
+            coords_array = np.array([(coord.lat, coord.lng) for coord in coords], dtype=np.float64)
+            calculated_route = await get_compute_pool().run(
+                RoutecalcUtil.get_less_coords_of_array, coords_array, max_radius, max_coords_within_radius, use_s2,
+                s2_level)
 
             logger.debug("Coords summed up to {} coords", len(calculated_route))
         logger.debug("Got {} coordinates", len(calculated_route))
@@ -109,6 +109,15 @@ class RoutecalcUtil:
         to_be_written = str(calc_coords).replace("\'", "\"")
         routecalc_entry.routefile = to_be_written
 
+    @staticmethod
+    def get_less_coords_of_array(coords: np.ndarray, max_radius: int, max_coords_within_radius: int,
+                                 use_s2: bool = False, s2_level: int = 15) -> List[Location]:
+        """
+        Same as get_less_coords taking the coords as an array of shape (n, 2) as passed to the compute pool
+        """
+        return RoutecalcUtil.get_less_coords([Location(lat, lng) for lat, lng in coords.tolist()], max_radius,
+                                             max_coords_within_radius, use_s2, s2_level)
+
     @staticmethod
     def get_less_coords(coords: List[Location], max_radius: int, max_coords_within_radius: int,
                         use_s2: bool = False, s2_level: int = 15):
@@ -133,8 +142,9 @@ class RoutecalcUtil:
                 coordinates.append(
                     (0, coord)
                 )
-            clustering_helper = ClusteringHelper(max_radius=max_radius, max_count_per_circle=max_coords_within_radius,
-                                                 max_timedelta_seconds=0, use_s2=use_s2, s2_level=s2_level)
+            clustering_helper = SpatialClusteringHelper(max_radius=max_radius,
+                                                        max_count_per_circle=max_coords_within_radius,
+                                                        max_timedelta_seconds=0, use_s2=use_s2, s2_level=s2_level)
             clustered_events = clustering_helper.get_clustered(coordinates)
             for event in clustered_events:
                 coords_cleaned_up.append(event[1])
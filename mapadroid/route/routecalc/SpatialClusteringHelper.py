@@ -0,0 +1,153 @@
+import heapq
+import math
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.utils.collections import Location, Relation
+from mapadroid.utils.geo import (get_chord_of_distance,
+                                 get_distance_of_two_points_in_meters,
+                                 get_unit_vectors)
+
+# Upper bound of the diagonal of S2 cells in radians is S2_MAX_DIAG * 2^-level
+S2_MAX_DIAG = 2.438654594
+# Earth radius used by S2Helper.get_s2cells_from_circle and by get_distance_of_two_points_in_meters
+S2_HELPER_EARTH_RADIUS = 6371000
+GEO_EARTH_RADIUS = 6373000
+# Relative and absolute slack of the range queries, the exact distance check is done afterwards
+RANGE_QUERY_SLACK = 1e-6
+RANGE_QUERY_SLACK_METERS = 0.01
+
+
+class _SpatialRelations(Mapping):
+    """
+    Replacement of the relations dict built by ClusteringHelper._get_relations_in_range_within_time.
+    Relations of an event are only computed once needed using a KD-tree and relations to coords that have been
+    removed since are filtered on access. Iteration yields the remaining events in the order of the queue just like
+    the original dict.
+    """
+
+    def __init__(self, queue: List[Tuple], max_radius, max_timedelta_seconds):
+        self._max_radius = max_radius
+        self._max_timedelta_seconds = max_timedelta_seconds
+        self._index_of_event: Dict[Tuple, int] = {}
+        # Events equal to one another are represented by the first occurrence just like keys of a dict
+        self._events: List[Tuple] = []
+        for event in queue:
+            if event not in self._index_of_event:
+                self._index_of_event[event] = len(self._events)
+                self._events.append(event)
+        amount = len(self._events)
+        self._timestamps: np.ndarray = np.array([event[0] for event in self._events], dtype=np.float64)
+        self._vectors: np.ndarray = get_unit_vectors(
+            np.array([(event[1].lat, event[1].lng) for event in self._events], dtype=np.float64).reshape(-1, 2))
+        self._tree: cKDTree = cKDTree(self._vectors)
+        self._remaining: np.ndarray = np.ones(amount, dtype=bool)
+        self._amount_remaining: int = amount
+        self._removed_locations: Set[Location] = set()
+        self._relations: Dict[int, List[Relation]] = {}
+        # Previously clustered events are always considered inside a circle
+        self._clustered: List[int] = [index for index, event in enumerate(self._events)
+                                      if len(event) == 4 and event[3]]
+        self._west_heap: List[Tuple[float, float, int]] = [(event[1].lng, -event[1].lat, index)
+                                                           for index, event in enumerate(self._events)]
+        heapq.heapify(self._west_heap)
+
+    def __len__(self) -> int:
+        return self._amount_remaining
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for index in np.flatnonzero(self._remaining).tolist():
+            yield self._events[index]
+
+    def __getitem__(self, event: Tuple) -> List[Relation]:
+        index: Optional[int] = self._index_of_event.get(event)
+        if index is None or not self._remaining[index]:
+            raise KeyError(event)
+        relations: Optional[List[Relation]] = self._relations.get(index)
+        if relations is None:
+            relations = self._build_relations(index)
+            self._relations[index] = relations
+        if self._removed_locations:
+            relations = [relation for relation in relations
+                         if relation.other_event[1] not in self._removed_locations]
+            self._relations[index] = relations
+        return relations
+
+    def _query_range(self, vector: np.ndarray, radius: float) -> List[int]:
+        chord = get_chord_of_distance(radius * (1 + RANGE_QUERY_SLACK) + RANGE_QUERY_SLACK_METERS)
+        return sorted(self._tree.query_ball_point(vector, chord))
+
+    def _build_relations(self, index: int) -> List[Relation]:
+        event = self._events[index]
+        relations: List[Relation] = []
+        locations_present: Set[Location] = set()
+        candidates = np.array(self._query_range(self._vectors[index], self._max_radius * 2), dtype=np.int64)
+        timedeltas = event[0] - self._timestamps[candidates]
+        candidates = candidates[(timedeltas >= 0) & (timedeltas <= self._max_timedelta_seconds)]
+        for other_index in candidates.tolist():
+            other_event = self._events[other_index]
+            if other_event[1] in locations_present:
+                continue
+            distance = get_distance_of_two_points_in_meters(event[1].lat, event[1].lng,
+                                                            other_event[1].lat, other_event[1].lng)
+            if 0 <= distance <= self._max_radius * 2:
+                locations_present.add(other_event[1])
+                relations.append(Relation(other_event, distance, event[0] - other_event[0]))
+        return relations
+
+    def get_most_west(self) -> Tuple:
+        while not self._remaining[self._west_heap[0][2]]:
+            heapq.heappop(self._west_heap)
+        return self._events[self._west_heap[0][2]]
+
+    def get_remaining_events_in_range(self, location: Location, radius: float) -> List[Tuple]:
+        """
+        Superset of the remaining events within radius of location, ordered like the queue
+        """
+        vector = get_unit_vectors(np.array([[location.lat, location.lng]], dtype=np.float64))[0]
+        indexes = self._query_range(vector, radius)
+        if self._clustered:
+            indexes = sorted(set(indexes).union(self._clustered))
+        return [self._events[index] for index in indexes if self._remaining[index]]
+
+    def remove(self, events_to_be_removed: List[Tuple]) -> None:
+        for event in events_to_be_removed:
+            index: Optional[int] = self._index_of_event.get(event)
+            if index is not None and self._remaining[index]:
+                self._remaining[index] = False
+                self._amount_remaining -= 1
+                self._relations.pop(index, None)
+            self._removed_locations.add(event[1])
+
+
+class SpatialClusteringHelper(ClusteringHelper):
+    """
+    Produces the same clusters as ClusteringHelper while using a KD-tree for any range lookup instead of comparing
+    every event with every other event.
+    """
+
+    def _get_relations_in_range_within_time(self, queue: List[Tuple[int, Location]], max_radius):
+        return _SpatialRelations(queue, max_radius, self.max_timedelta_seconds)
+
+    def _get_most_west_amongst_relations(self, relations: _SpatialRelations):
+        return relations.get_most_west()
+
+    def _get_count_and_coords_in_circle_within_timedelta(self, middle, relations: _SpatialRelations,
+                                                         earliest_timestamp, latest_timestamp, max_radius):
+        if self.useS2:
+            # The S2 covering of the circle around the middle may reach beyond the radius by a cell's diagonal
+            radius = (self.max_radius * GEO_EARTH_RADIUS / S2_HELPER_EARTH_RADIUS
+                      + 2 * S2_MAX_DIAG * math.pow(2, -self.S2level) * GEO_EARTH_RADIUS)
+        else:
+            radius = max_radius
+        candidates: List[Tuple] = relations.get_remaining_events_in_range(middle, radius)
+        return super()._get_count_and_coords_in_circle_within_timedelta(middle, candidates, earliest_timestamp,
+                                                                        latest_timestamp, max_radius)
+
+    def _remove_coords_from_relations(self, relations: _SpatialRelations, events_to_be_removed):
+        relations.remove(events_to_be_removed)
+        return relations
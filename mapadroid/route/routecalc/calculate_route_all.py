@@ -1,15 +1,16 @@
-import asyncio
 import math
 import platform
-from concurrent.futures import ProcessPoolExecutor
 from typing import List
 
 import numpy as np
 
+from mapadroid.route.routecalc.calculate_route_christofides import \
+    route_calc_christofides
 from mapadroid.route.routecalc.calculate_route_quick import route_calc_impl
 from mapadroid.utils.collections import Location
-from mapadroid.utils.logging import LoggerEnums, get_logger, init_logging
-from mapadroid.utils.madGlobals import MadGlobals, RoutecalculationTypes
+from mapadroid.utils.ComputePool import get_compute_pool
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madGlobals import RoutecalculationTypes
 
 logger = get_logger(LoggerEnums.routecalc)
 
@@ -73,8 +74,6 @@ def format_solution(manager, routing, solution):
 
 
 def _run_in_process_executor(method, less_coordinates, route_name):
-    # Utility method to init logging in process executor...
-    init_logging(MadGlobals.application_args, print_info=False)
     try:
         return method(less_coordinates, route_name)
     except Exception as e:
@@ -121,19 +120,16 @@ def route_calc_ortools(less_coordinates, route_name):
 
 async def route_calc_all(coords: List[Location], route_name, algorithm: RoutecalculationTypes):
     # check to see if we can use OR-Tools to perform our routecalc
-    coords_for_calc = np.zeros(shape=(len(coords), 2))
-    for i in range(len(coords)):
-        coords_for_calc[i][0] = coords[i].lat
-        coords_for_calc[i][1] = coords[i].lng
-    loop = asyncio.get_running_loop()
-    with ProcessPoolExecutor() as executor:
-        if is_or_tools_available() and algorithm.OR_TOOLS:
-            logger.debug("Using OR-Tools for routecalc")
-            sol_best = await loop.run_in_executor(
-                executor, _run_in_process_executor, route_calc_ortools, coords_for_calc, route_name)
-        else:
-            logger.debug("Using MAD quick routecalc")
-            sol_best = await loop.run_in_executor(
-                executor, _run_in_process_executor, route_calc_impl, coords_for_calc, route_name)
+    coords_for_calc = np.array([(coord.lat, coord.lng) for coord in coords], dtype=np.float64).reshape(-1, 2)
+    if algorithm == RoutecalculationTypes.OR_TOOLS and is_or_tools_available():
+        logger.debug("Using OR-Tools for routecalc")
+        method = route_calc_ortools
+    elif algorithm in (RoutecalculationTypes.OR_TOOLS, RoutecalculationTypes.CHRISTOFIDES):
+        logger.debug("Using MAD christofides routecalc")
+        method = route_calc_christofides
+    else:
+        logger.debug("Using MAD quick routecalc")
+        method = route_calc_impl
+    sol_best = await get_compute_pool().run(_run_in_process_executor, method, coords_for_calc, route_name)
     logger.debug("Solution has {} coordinates", len(sol_best))
     return sol_best
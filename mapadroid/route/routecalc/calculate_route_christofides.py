@@ -0,0 +1,352 @@
+import math
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components, minimum_spanning_tree
+from scipy.spatial import cKDTree
+
+from mapadroid.utils.geo import get_unit_vectors
+from mapadroid.utils.logging import LoggerEnums, get_logger
+
+logger = get_logger(LoggerEnums.routecalc)
+
+EARTH_RADIUS_METERS = 6373000.0
+# Amount of nearest neighbours used to build the sparse graph the MST is derived from as well as the candidate lists
+#  of the local search
+NEIGHBOURS_FOR_GRAPH = 10
+NEIGHBOURS_FOR_IMPROVEMENT = 8
+# Upper limit of the time spent on improving the tour using 2-opt/Or-opt
+IMPROVEMENT_TIME_LIMIT_SECONDS = 60
+MAX_SEGMENT_LENGTH_OR_OPT = 3
+
+
+def route_calc_christofides(coords, route_name):
+    """
+    Christofides-like route calculation working on NumPy arrays which scales to several thousand coordinates.
+    Args:
+        coords: array of shape (n, 2) containing lat, lng
+        route_name: name of the route used for logging
+
+    Returns: list of indices of coords in the order of the route, starting at index 0
+    """
+    with logger.contextualize(origin=route_name):
+        coordinates = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        start = time.perf_counter()
+        path = tsp_christofides(coordinates)
+        logger.info("Found {}m long solution for {} coords in {:.2f}s", int(get_tour_length(coordinates, path)),
+                    len(path), time.perf_counter() - start)
+    return path
+
+
+def haversine_distances(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized haversine distance in meters of the coordinates (in degrees) given
+    """
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    angle = (np.sin((lat2 - lat1) / 2) ** 2
+             + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(angle, 0, 1)))
+
+
+def get_tour_length(coordinates: np.ndarray, path: List[int]) -> float:
+    """
+    Length in meters of the closed tour through the coordinates in the order of path
+    """
+    if len(path) < 2:
+        return 0.0
+    order = np.asarray(path, dtype=np.int64)
+    following = np.roll(order, -1)
+    return float(haversine_distances(coordinates[order, 0], coordinates[order, 1],
+                                     coordinates[following, 0], coordinates[following, 1]).sum())
+
+
+def _chord_to_meters(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def tsp_christofides(coordinates: np.ndarray,
+                     improvement_time_limit: float = IMPROVEMENT_TIME_LIMIT_SECONDS) -> List[int]:
+    amount = len(coordinates)
+    if amount < 4:
+        return list(range(amount))
+    vectors = get_unit_vectors(coordinates)
+    tree = cKDTree(vectors)
+
+    logger.debug("Building MST on the sparse nearest neighbour graph of {} coords", amount)
+    mst_edges = _build_spanning_tree(tree, vectors)
+
+    logger.debug("Matching odd vertexes of MST")
+    degrees = np.bincount(mst_edges.ravel(), minlength=amount)
+    odd_vertexes = np.flatnonzero(degrees % 2 == 1)
+    matching_edges = _greedy_matching(vectors, odd_vertexes)
+
+    logger.debug("Finding eulerian tour")
+    tour = _shortcut_eulerian_tour(amount, np.concatenate((mst_edges, matching_edges)))
+
+    logger.debug("Improving tour using 2-opt/Or-opt")
+    tour = _improve_tour(tour, vectors, tree, improvement_time_limit)
+    # Routes are circular, start at the first coordinate like the other algorithms
+    start_index = tour.index(0)
+    return tour[start_index:] + tour[:start_index]
+
+
+def _build_spanning_tree(tree: cKDTree, vectors: np.ndarray) -> np.ndarray:
+    amount = len(vectors)
+    neighbours = min(NEIGHBOURS_FOR_GRAPH + 1, amount)
+    chords, indices = tree.query(vectors, k=neighbours)
+    rows = np.repeat(np.arange(amount), neighbours - 1)
+    cols = indices[:, 1:].ravel()
+    # Duplicate points have a distance of 0 which would be dropped as an edge by the sparse representation
+    weights = _chord_to_meters(chords[:, 1:].ravel()) + 1e-6
+    rows, cols, weights = _connect_components(tree, vectors, rows, cols, weights)
+    graph = coo_matrix((weights, (rows, cols)), shape=(amount, amount)).tocsr()
+    mst = minimum_spanning_tree(graph).tocoo()
+    return np.column_stack((mst.row, mst.col)).astype(np.int64)
+
+
+def _connect_components(tree: cKDTree, vectors: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                        weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The nearest neighbour graph is disconnected if coords form clusters far apart. In that case the components are
+    connected Boruvka-style using the nearest coordinate of another component.
+    """
+    amount = len(vectors)
+    neighbours = min(NEIGHBOURS_FOR_GRAPH * 2, amount)
+    while True:
+        graph = coo_matrix((weights, (rows, cols)), shape=(amount, amount))
+        amount_components, labels = connected_components(graph, directed=False)
+        if amount_components <= 1:
+            return rows, cols, weights
+        chords, indices = tree.query(vectors, k=neighbours)
+        foreign = labels[indices] != labels[:, None]
+        has_foreign = foreign.any(axis=1)
+        first_foreign = np.argmax(foreign, axis=1)
+        candidates = np.flatnonzero(has_foreign)
+        new_rows, new_cols, new_weights = [], [], []
+        if len(candidates) > 0:
+            candidate_chords = chords[candidates, first_foreign[candidates]]
+            candidate_targets = indices[candidates, first_foreign[candidates]]
+            # Shortest outgoing edge per component
+            order = np.lexsort((candidate_chords, labels[candidates]))
+            component_of_candidates = labels[candidates][order]
+            first_of_component = np.r_[True, component_of_candidates[1:] != component_of_candidates[:-1]]
+            selected = order[first_of_component]
+            new_rows = candidates[selected]
+            new_cols = candidate_targets[selected]
+            new_weights = _chord_to_meters(candidate_chords[selected]) + 1e-6
+        if len(candidates) == 0 or len(np.unique(labels[candidates])) < amount_components - 1:
+            # Not all components found a way out within the neighbours queried
+            if neighbours >= amount:
+                raise RuntimeError("Unable to connect components of nearest neighbour graph")
+            neighbours = min(neighbours * 2, amount)
+        rows = np.concatenate((rows, np.asarray(new_rows, dtype=rows.dtype)))
+        cols = np.concatenate((cols, np.asarray(new_cols, dtype=cols.dtype)))
+        weights = np.concatenate((weights, np.asarray(new_weights, dtype=weights.dtype)))
+
+
+def _greedy_matching(vectors: np.ndarray, odd_vertexes: np.ndarray) -> np.ndarray:
+    """
+    Greedy minimum weight perfect matching of the odd vertexes: candidate pairs of nearest neighbours are matched by
+    increasing distance. Vertexes left unmatched are matched in further rounds with an increasing amount of
+    neighbours.
+    """
+    matched_edges: List[Tuple[int, int]] = []
+    remaining = odd_vertexes
+    neighbours = NEIGHBOURS_FOR_GRAPH
+    while len(remaining) > 1:
+        amount_queried = min(neighbours + 1, len(remaining))
+        chords, indices = cKDTree(vectors[remaining]).query(vectors[remaining], k=amount_queried)
+        sources = np.repeat(np.arange(len(remaining)), amount_queried - 1)
+        targets = indices[:, 1:].ravel()
+        order = np.argsort(chords[:, 1:].ravel(), kind="stable")
+        is_matched = np.zeros(len(remaining), dtype=bool)
+        for source, target in zip(sources[order].tolist(), targets[order].tolist()):
+            if is_matched[source] or is_matched[target] or source == target:
+                continue
+            is_matched[source] = True
+            is_matched[target] = True
+            matched_edges.append((int(remaining[source]), int(remaining[target])))
+        remaining = remaining[~is_matched]
+        neighbours *= 2
+    return np.asarray(matched_edges, dtype=np.int64).reshape(-1, 2)
+
+
+def _shortcut_eulerian_tour(amount: int, edges: np.ndarray) -> List[int]:
+    """
+    Hierholzer's algorithm on the multigraph given followed by skipping vertexes visited before
+    """
+    adjacency: List[List[Tuple[int, int]]] = [[] for _ in range(amount)]
+    for edge_id, (source, target) in enumerate(edges.tolist()):
+        adjacency[source].append((target, edge_id))
+        adjacency[target].append((source, edge_id))
+    edge_used = np.zeros(len(edges), dtype=bool)
+    stack: List[int] = [int(edges[0][0])]
+    visited = np.zeros(amount, dtype=bool)
+    tour: List[int] = []
+    while stack:
+        vertex = stack[-1]
+        neighbours = adjacency[vertex]
+        while neighbours and edge_used[neighbours[-1][1]]:
+            neighbours.pop()
+        if neighbours:
+            following, edge_id = neighbours.pop()
+            edge_used[edge_id] = True
+            stack.append(following)
+        else:
+            stack.pop()
+            if not visited[vertex]:
+                visited[vertex] = True
+                tour.append(vertex)
+    return tour
+
+
+class _TourImprover:
+    """
+    2-opt and Or-opt local search restricted to nearest neighbour candidate lists using don't-look bits.
+    """
+
+    def __init__(self, tour: List[int], vectors: np.ndarray, candidates: np.ndarray):
+        self.tour: np.ndarray = np.asarray(tour, dtype=np.int64)
+        self.amount: int = len(self.tour)
+        self.position: np.ndarray = np.empty(self.amount, dtype=np.int64)
+        self.position[self.tour] = np.arange(self.amount)
+        self._vectors: List[Tuple[float, float, float]] = [tuple(vector) for vector in vectors.tolist()]
+        # With duplicate coordinates, the KD-tree may not return the vertex itself first
+        self._candidates: List[List[int]] = [[other for other in row if other != vertex]
+                                             for vertex, row in enumerate(candidates.tolist())]
+
+    def dist(self, first: int, second: int) -> float:
+        x1, y1, z1 = self._vectors[first]
+        x2, y2, z2 = self._vectors[second]
+        chord = math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2)
+        return 2 * EARTH_RADIUS_METERS * math.asin(min(chord / 2, 1.0))
+
+    def succ(self, vertex: int) -> int:
+        return int(self.tour[(self.position[vertex] + 1) % self.amount])
+
+    def pred(self, vertex: int) -> int:
+        return int(self.tour[self.position[vertex] - 1])
+
+    def _reverse(self, start: int, end: int) -> None:
+        """
+        Reverses the tour between the positions start and end (inclusive, circular). The shorter side is reversed
+        which yields the same cycle.
+        """
+        inner = (end - start) % self.amount + 1
+        if inner * 2 > self.amount:
+            start, end = (end + 1) % self.amount, (start - 1) % self.amount
+            inner = self.amount - inner
+        if inner < 2:
+            return
+        positions = (start + np.arange(inner)) % self.amount
+        self.tour[positions] = self.tour[positions[::-1]]
+        self.position[self.tour[positions]] = positions
+
+    def try_2opt(self, vertex: int) -> Optional[List[int]]:
+        """
+        Returns: the vertexes whose edges changed if an improving move has been applied
+        """
+        for direction in (1, -1):
+            adjacent = self.succ(vertex) if direction == 1 else self.pred(vertex)
+            dist_adjacent = self.dist(vertex, adjacent)
+            for candidate in self._candidates[vertex]:
+                dist_candidate = self.dist(vertex, candidate)
+                if dist_candidate >= dist_adjacent:
+                    break
+                candidate_adjacent = self.succ(candidate) if direction == 1 else self.pred(candidate)
+                if candidate == adjacent or candidate_adjacent == vertex:
+                    continue
+                delta = (dist_candidate + self.dist(adjacent, candidate_adjacent) - dist_adjacent
+                         - self.dist(candidate, candidate_adjacent))
+                if delta < -1e-7:
+                    if direction == 1:
+                        # vertex adjacent ... candidate candidate_adjacent
+                        #  -> vertex candidate ... adjacent candidate_adjacent
+                        self._reverse(self.position[adjacent], self.position[candidate])
+                    else:
+                        # adjacent vertex ... candidate_adjacent candidate
+                        #  -> adjacent candidate_adjacent ... vertex candidate
+                        self._reverse(self.position[vertex], self.position[candidate_adjacent])
+                    return [vertex, adjacent, candidate, candidate_adjacent]
+        return None
+
+    def try_or_opt(self, first: int) -> Optional[List[int]]:
+        """
+        Moves a segment of up to MAX_SEGMENT_LENGTH_OR_OPT vertexes starting at first between two other adjacent
+        vertexes.
+        Returns: the vertexes whose edges changed if an improving move has been applied
+        """
+        for length in range(1, MAX_SEGMENT_LENGTH_OR_OPT + 1):
+            if length + 3 > self.amount:
+                break
+            segment_positions = (self.position[first] + np.arange(length)) % self.amount
+            segment: List[int] = self.tour[segment_positions].tolist()
+            last = segment[-1]
+            prev = self.pred(first)
+            following = self.succ(last)
+            removal_gain = self.dist(prev, first) + self.dist(last, following) - self.dist(prev, following)
+            if removal_gain <= 1e-7:
+                continue
+            in_segment = set(segment)
+            for candidate in self._candidates[first] + self._candidates[last]:
+                if candidate in in_segment:
+                    continue
+                for candidate_adjacent in (self.succ(candidate), self.pred(candidate)):
+                    if candidate_adjacent in in_segment:
+                        continue
+                    dist_candidates = self.dist(candidate, candidate_adjacent)
+                    # Either first or last of the segment is attached to the candidate
+                    cost_forward = self.dist(candidate, first) + self.dist(last, candidate_adjacent) - dist_candidates
+                    cost_reversed = self.dist(candidate, last) + self.dist(first, candidate_adjacent) - dist_candidates
+                    if min(cost_forward, cost_reversed) < removal_gain - 1e-7:
+                        self._move_segment(segment, candidate, candidate_adjacent, cost_forward <= cost_reversed)
+                        return [prev, following, candidate, candidate_adjacent, first, last]
+        return None
+
+    def _move_segment(self, segment: List[int], target: int, target_adjacent: int,
+                      first_attached_to_target: bool) -> None:
+        in_segment = set(segment)
+        rest: List[int] = [vertex for vertex in self.tour.tolist() if vertex not in in_segment]
+        index_of_target = rest.index(target)
+        if rest[(index_of_target + 1) % len(rest)] == target_adjacent:
+            # target, segment, target_adjacent
+            insert_after = index_of_target
+            to_insert = segment if first_attached_to_target else segment[::-1]
+        else:
+            # target_adjacent, segment, target
+            insert_after = rest.index(target_adjacent)
+            to_insert = segment[::-1] if first_attached_to_target else segment
+        new_tour = rest[:insert_after + 1] + to_insert + rest[insert_after + 1:]
+        self.tour = np.asarray(new_tour, dtype=np.int64)
+        self.position[self.tour] = np.arange(self.amount)
+
+
+def _improve_tour(tour: List[int], vectors: np.ndarray, tree: cKDTree, time_limit: float) -> List[int]:
+    amount = len(tour)
+    if amount < 5 or time_limit <= 0:
+        return tour
+    neighbours = min(NEIGHBOURS_FOR_IMPROVEMENT + 1, amount)
+    _, indices = tree.query(vectors, k=neighbours)
+    improver = _TourImprover(tour, vectors, indices)
+    deadline: float = time.perf_counter() + time_limit
+    # Don't-look bits: only vertexes whose surrounding changed are checked again
+    queue: List[int] = list(tour)
+    queued = np.ones(amount, dtype=bool)
+    improvements: int = 0
+    while queue:
+        if time.perf_counter() > deadline:
+            logger.info("Stopping tour improvement after reaching the time limit of {}s", time_limit)
+            break
+        vertex = queue.pop()
+        queued[vertex] = False
+        affected: Optional[List[int]] = improver.try_2opt(vertex) or improver.try_or_opt(vertex)
+        if affected:
+            improvements += 1
+            for other in affected:
+                if not queued[other]:
+                    queued[other] = True
+                    queue.append(other)
+    logger.debug("Improved tour {} times", improvements)
+    return improver.tour.tolist()
@@ -0,0 +1,75 @@
+import unittest
+from typing import List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from mapadroid.db.after_commit import call_after_commit
+
+
+class _AsyncSession:
+    """
+    The parts of an AsyncSession used, backed by a synchronous session
+    """
+
+    def __init__(self, sync_session: Session):
+        self.sync_session: Session = sync_session
+        self.info = sync_session.info
+
+
+class TestAfterCommit(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sync_session = Session(create_engine("sqlite://"))
+        self.session = _AsyncSession(self.sync_session)
+        self.calls: List[int] = []
+
+    def tearDown(self) -> None:
+        self.sync_session.close()
+
+    def test_called_after_outermost_commit(self):
+        self.sync_session.execute(text("select 1"))
+        nested = self.sync_session.begin_nested()
+        nested.commit()
+        call_after_commit(self.session, lambda: self.calls.append(1))
+        nested = self.sync_session.begin_nested()
+        nested.commit()
+        nested = self.sync_session.begin_nested()
+        nested.rollback()
+        self.assertEqual(self.calls, [])
+        self.sync_session.commit()
+        self.assertEqual(self.calls, [1])
+        self.sync_session.execute(text("select 1"))
+        self.sync_session.commit()
+        self.assertEqual(self.calls, [1])
+
+    def test_dropped_on_rollback(self):
+        self.sync_session.execute(text("select 1"))
+        call_after_commit(self.session, lambda: self.calls.append(1))
+        self.sync_session.rollback()
+        self.sync_session.execute(text("select 1"))
+        call_after_commit(self.session, lambda: self.calls.append(2))
+        self.sync_session.commit()
+        self.assertEqual(self.calls, [2])
+
+    def test_dropped_on_rollback_of_savepoint(self):
+        self.sync_session.execute(text("select 1"))
+        call_after_commit(self.session, lambda: self.calls.append(1))
+        outer = self.sync_session.begin_nested()
+        call_after_commit(self.session, lambda: self.calls.append(2))
+        inner = self.sync_session.begin_nested()
+        call_after_commit(self.session, lambda: self.calls.append(3))
+        inner.commit()
+        outer.rollback()
+        nested = self.sync_session.begin_nested()
+        call_after_commit(self.session, lambda: self.calls.append(4))
+        inner = self.sync_session.begin_nested()
+        call_after_commit(self.session, lambda: self.calls.append(5))
+        inner.rollback()
+        nested.commit()
+        self.assertEqual(self.calls, [])
+        self.sync_session.commit()
+        self.assertEqual(self.calls, [1, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
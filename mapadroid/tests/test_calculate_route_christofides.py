@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_christofides import (
+    get_tour_length, tsp_christofides)
+from mapadroid.route.routecalc.calculate_route_quick import tsp
+
+
+class TestRouteCalcChristofides(unittest.TestCase):
+    def test_route_is_permutation_starting_at_first_coord(self):
+        rng = np.random.default_rng(42)
+        coords = np.column_stack((52.5 + rng.random(300) * 0.05, 13.4 + rng.random(300) * 0.05))
+        # Duplicates and far apart clusters result in a disconnected nearest neighbour graph
+        coords = np.concatenate((coords, coords[:20], coords[:30] + 1.5))
+        route = tsp_christofides(coords)
+        self.assertEqual(sorted(route), list(range(len(coords))))
+        self.assertEqual(route[0], 0)
+
+    def test_route_not_longer_than_quick_route(self):
+        rng = np.random.default_rng(7)
+        coords = np.column_stack((52.5 + rng.random(200) * 0.05, 13.4 + rng.random(200) * 0.05))
+        _, quick_route = tsp(coords.tolist())
+        route = tsp_christofides(coords)
+        self.assertLessEqual(get_tour_length(coords, route), get_tour_length(coords, quick_route))
+
+    def test_few_coords(self):
+        self.assertEqual(tsp_christofides(np.array([[52.5, 13.4], [52.6, 13.5]])), [0, 1])
+        self.assertEqual(sorted(tsp_christofides(np.array([[52.5, 13.4], [52.6, 13.5], [52.5, 13.5],
+                                                           [52.6, 13.4]]))), [0, 1, 2, 3])
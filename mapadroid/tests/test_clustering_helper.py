@@ -0,0 +1,57 @@
+import random
+import unittest
+from typing import List, Tuple
+
+from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.SpatialClusteringHelper import \
+    SpatialClusteringHelper
+from mapadroid.utils.collections import Location
+
+
+def generate_events(amount: int, seed: int, timed: bool = False,
+                    duplicates: bool = False) -> List[Tuple[int, Location]]:
+    rng = random.Random(seed)
+    events: List[Tuple[int, Location]] = []
+    for _ in range(amount):
+        timestamp = rng.randint(0, 3600) if timed else 0
+        events.append((timestamp, Location(52.5 + rng.random() * 0.02, 13.4 + rng.random() * 0.03)))
+    if duplicates:
+        # Same location at a different time as well as events present multiple times
+        events += [(event[0] + 5, event[1]) for event in events[:amount // 10]]
+        events += events[:5]
+    return events
+
+
+class TestSpatialClusteringHelperParity(unittest.TestCase):
+    def assert_parity(self, events: List[Tuple[int, Location]], **kwargs):
+        expected = ClusteringHelper(**kwargs).get_clustered(events)
+        actual = SpatialClusteringHelper(**kwargs).get_clustered(events)
+        self.assertEqual(expected, actual)
+
+    def test_routecalc_clustering(self):
+        for seed, (radius, count) in enumerate([(70, 3), (150, 5), (300, 10)]):
+            with self.subTest(radius=radius, count=count):
+                self.assert_parity(generate_events(300, seed), max_radius=radius, max_count_per_circle=count,
+                                   max_timedelta_seconds=0)
+
+    def test_routecalc_clustering_s2(self):
+        for seed, level in enumerate([15, 17]):
+            with self.subTest(level=level):
+                self.assert_parity(generate_events(300, seed), max_radius=100, max_count_per_circle=5,
+                                   max_timedelta_seconds=0, use_s2=True, s2_level=level)
+
+    def test_prioq_clustering(self):
+        for seed, timedelta in enumerate([0, 60, 300]):
+            with self.subTest(timedelta=timedelta):
+                self.assert_parity(generate_events(300, seed, timed=True), max_radius=100,
+                                   max_count_per_circle=8, max_timedelta_seconds=timedelta)
+
+    def test_duplicates(self):
+        self.assert_parity(generate_events(300, 3, timed=True, duplicates=True), max_radius=100,
+                           max_count_per_circle=5, max_timedelta_seconds=300)
+        self.assert_parity(generate_events(300, 4, duplicates=True), max_radius=100,
+                           max_count_per_circle=5, max_timedelta_seconds=0)
+
+    def test_trivial_input(self):
+        self.assert_parity([], max_radius=100, max_count_per_circle=5, max_timedelta_seconds=0)
+        self.assert_parity(generate_events(1, 5), max_radius=100, max_count_per_circle=5, max_timedelta_seconds=0)
@@ -0,0 +1,60 @@
+import os
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_christofides import \
+    tsp_christofides
+from mapadroid.utils.ComputePool import ComputePool
+
+
+def sum_of_array(array: np.ndarray, offset: float = 0.0) -> float:
+    return float(array.sum()) + offset
+
+
+def raise_error(array: np.ndarray):
+    raise ValueError("Failed with {} elements".format(len(array)))
+
+
+def exit_worker(array: np.ndarray):
+    os._exit(len(array))
+
+
+class TestComputePool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.pool = ComputePool(2)
+
+    async def asyncTearDown(self) -> None:
+        self.pool.shutdown()
+
+    async def test_shared_arrays(self):
+        # Large enough to be passed through shared memory, small ones are pickled
+        large = np.arange(100000, dtype=np.float64)
+        small = np.arange(10, dtype=np.float64)
+        self.assertEqual(await self.pool.run(sum_of_array, large), float(large.sum()))
+        self.assertEqual(await self.pool.run(sum_of_array, small, offset=1.0), float(small.sum()) + 1.0)
+        self.assertEqual(await self.pool.run(sum_of_array, array=large, offset=2.0), float(large.sum()) + 2.0)
+
+    async def test_route_calculation(self):
+        rng = np.random.default_rng(1)
+        coords = np.column_stack((52.5 + rng.random(5000) * 0.1, 13.4 + rng.random(5000) * 0.1))
+        route = await self.pool.run(tsp_christofides, coords, 1)
+        self.assertEqual(sorted(route), list(range(len(coords))))
+
+    async def test_metrics(self):
+        await self.pool.run(sum_of_array, np.ones(10))
+        with self.assertRaises(ValueError):
+            await self.pool.run(raise_error, np.ones(100000))
+        metrics = self.pool.get_metrics()
+        self.assertEqual(metrics.workers, 2)
+        self.assertEqual(metrics.completed, 1)
+        self.assertEqual(metrics.failed, 1)
+        self.assertEqual(metrics.queued, 0)
+        self.assertGreater(metrics.avg_latency, 0)
+        self.assertGreaterEqual(metrics.max_latency, metrics.avg_latency)
+
+    async def test_pool_recreated_when_broken(self):
+        with self.assertRaises(BrokenProcessPool):
+            await self.pool.run(exit_worker, np.ones(1))
+        self.assertEqual(await self.pool.run(sum_of_array, np.ones(10)), 10.0)
@@ -0,0 +1,81 @@
+import json
+import math
+import random
+import unittest
+from typing import List, Tuple
+
+import numpy as np
+
+from mapadroid.db.model import SettingsGeofence
+from mapadroid.geofence.geofenceHelper import GeofenceHelper, PreparedArea
+
+
+def build_geofence(polygons: List[List[Tuple[float, float]]]) -> SettingsGeofence:
+    lines: List[str] = []
+    for i, polygon in enumerate(polygons):
+        lines.append("[fence{}]".format(i))
+        lines.extend("{},{}".format(lat, lon) for lat, lon in polygon)
+    geofence = SettingsGeofence()
+    geofence.fence_data = json.dumps(lines)
+    return geofence
+
+
+def random_polygon(rng: random.Random, lat: float, lon: float, vertexes: int,
+                   radius: float) -> List[Tuple[float, float]]:
+    polygon: List[Tuple[float, float]] = []
+    for i in range(vertexes):
+        angle = 2 * math.pi * i / vertexes
+        distance = radius * (0.4 + rng.random() * 0.6)
+        polygon.append((round(lat + distance * math.cos(angle), 4), round(lon + distance * math.sin(angle), 4)))
+    return polygon
+
+
+class TestGeofenceHelper(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(1)
+        self.included = build_geofence([random_polygon(rng, 52.5, 13.4, 50, 0.1),
+                                        [(52.0, 13.0), (52.0, 13.1), (52.1, 13.1), (52.1, 13.0)]])
+        self.excluded = build_geofence([random_polygon(rng, 52.5, 13.4, 10, 0.03)])
+        points = np.random.default_rng(2)
+        # Include points on the grid of the vertexes to hit edges and vertexes exactly
+        self.lats = np.concatenate((points.uniform(51.95, 52.65, 20000),
+                                    np.round(points.uniform(51.95, 52.65, 2000), 4)))
+        self.lngs = np.concatenate((points.uniform(12.95, 13.55, 20000),
+                                    np.round(points.uniform(12.95, 13.55, 2000), 2)))
+
+    def assert_contains_many_matches_single_checks(self, use_matplotlib: bool):
+        geofence_helper = GeofenceHelper(self.included, self.excluded, "test")
+        geofence_helper._prepared_geofenced_areas = [PreparedArea(area, use_matplotlib)
+                                                     for area in geofence_helper.geofenced_areas]
+        geofence_helper._prepared_excluded_areas = [PreparedArea(area, use_matplotlib)
+                                                    for area in geofence_helper.excluded_areas]
+        is_point_in_polygon = (GeofenceHelper.is_point_in_polygon_matplotlib if use_matplotlib
+                               else GeofenceHelper.is_point_in_polygon_custom)
+        mask = geofence_helper.contains_many(self.lats, self.lngs)
+        self.assertTrue(mask.any())
+        for lat, lng, inside in zip(self.lats.tolist(), self.lngs.tolist(), mask.tolist()):
+            point = {'lat': lat, 'lon': lng}
+            expected = (not any(is_point_in_polygon(point, area['polygon'])
+                                for area in geofence_helper.excluded_areas)
+                        and any(is_point_in_polygon(point, area['polygon'])
+                                for area in geofence_helper.geofenced_areas))
+            self.assertEqual(expected, inside, (lat, lng))
+            self.assertEqual(expected, geofence_helper.is_coord_inside_include_geofence((lat, lng)))
+
+    def test_contains_many_custom(self):
+        self.assert_contains_many_matches_single_checks(use_matplotlib=False)
+
+    def test_contains_many_matplotlib(self):
+        self.assert_contains_many_matches_single_checks(use_matplotlib=True)
+
+    def test_filter_in_geofence(self):
+        geofence_helper = GeofenceHelper(self.included, None, "test")
+        coords = list(zip(self.lats.tolist(), self.lngs.tolist()))
+        filtered = geofence_helper.filter_in_geofence(coords)
+        self.assertEqual(filtered, [coord for coord in coords
+                                    if geofence_helper.is_coord_inside_include_geofence(coord)])
+        self.assertEqual(geofence_helper.filter_in_geofence([]), [])
+
+    def test_no_geofence(self):
+        geofence_helper = GeofenceHelper(None, None)
+        self.assertTrue(geofence_helper.contains_many(self.lats, self.lngs).all())
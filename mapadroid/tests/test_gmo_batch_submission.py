@@ -0,0 +1,131 @@
+import unittest
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+from unittest import mock
+
+import sqlalchemy
+
+from mapadroid.mitm_receiver.data_processing.SerializedMitmDataProcessor import \
+    SerializedMitmDataProcessor
+from mapadroid.utils.madGlobals import MadGlobals
+
+
+class _Session:
+    def __init__(self, sessions: List["_Session"]):
+        self.submitted: List[int] = []
+        self.committed: bool = False
+        sessions.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        self.submitted.clear()
+
+
+class _DbWrapper:
+    def __init__(self):
+        self.proto_submit = mock.Mock()
+        self.sessions: List[_Session] = []
+
+    async def __aenter__(self):
+        return _Session(self.sessions)
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class TestGmoBatchSubmission(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.db_wrapper = _DbWrapper()
+        self.processor = SerializedMitmDataProcessor(mock.Mock(), mock.Mock(), mock.Mock(), self.db_wrapper,
+                                                     mock.Mock(), mock.Mock())
+        self.gmos: List[Tuple[int, Dict]] = [(timestamp, {}) for timestamp in (1, 2, 3)]
+
+    async def submit_batch(self, submit):
+        return await self.processor._SerializedMitmDataProcessor__submit_batch("test", self.gmos, submit)
+
+    async def test_batch_submitted_in_one_transaction(self):
+        async def submit(session, timestamp, payload):
+            session.submitted.append(timestamp)
+            return timestamp
+
+        results, _ = await self.submit_batch(submit)
+        self.assertEqual(results, [1, 2, 3])
+        self.assertEqual(len(self.db_wrapper.sessions), 1)
+        self.assertTrue(self.db_wrapper.sessions[0].committed)
+
+    async def test_failing_gmo_skipped(self):
+        async def submit(session, timestamp, payload):
+            if timestamp == 2:
+                raise ValueError("bad row")
+            session.submitted.append(timestamp)
+            return timestamp
+
+        results, _ = await self.submit_batch(submit)
+        self.assertEqual(results, [1, None, 3])
+        self.assertEqual([session.submitted for session in self.db_wrapper.sessions if session.committed],
+                         [[1], [3]])
+
+    async def test_retryable_error_raised(self):
+        async def submit(session, timestamp, payload):
+            if timestamp == 2:
+                raise sqlalchemy.exc.IntegrityError("insert", {}, Exception("duplicate"))
+            return timestamp
+
+        with self.assertRaises(sqlalchemy.exc.IntegrityError):
+            await self.submit_batch(submit)
+
+    def test_merge_keeps_mons_of_all_copies_of_cell(self):
+        older_cell = {"id": 1, "forts": ["old"], "wild_pokemon": [{"encounter_id": 10, "seen": "old"},
+                                                                  {"encounter_id": 11}],
+                      "nearby_pokemon": [{"encounter_id": 20}]}
+        newer_cell = {"id": 1, "forts": ["new"], "wild_pokemon": [{"encounter_id": 10, "seen": "new"},
+                                                                  {"encounter_id": 12}],
+                      "nearby_pokemon": []}
+        gmos = [(1, {"payload": {"cells": [older_cell], "client_weather": []}}, "first"),
+                (2, {"payload": {"cells": [newer_cell], "client_weather": []}}, "second")]
+
+        merged = SerializedMitmDataProcessor._merge_gmos(gmos)
+        self.assertEqual([timestamp for timestamp, _ in merged], [2])
+        cell = merged[0][1]["cells"][0]
+        self.assertEqual(cell["forts"], ["new"])
+        self.assertEqual(cell["wild_pokemon"], [{"encounter_id": 10, "seen": "new"}, {"encounter_id": 12},
+                                                {"encounter_id": 11}])
+        self.assertEqual(cell["nearby_pokemon"], [{"encounter_id": 20}])
+        # The received payloads are still used for stats and must not be altered
+        self.assertEqual(len(newer_cell["wild_pokemon"]), 2)
+        self.assertEqual(newer_cell["nearby_pokemon"], [])
+
+    async def test_rescheduled_batch_skips_tables_committed(self):
+        queue = mock.Mock()
+        self.db_wrapper.proto_submit = mock.AsyncMock()
+        self.db_wrapper.proto_submit.gyms.side_effect = sqlalchemy.exc.IntegrityError("insert", {},
+                                                                                      Exception("deadlock"))
+        processor = SerializedMitmDataProcessor(queue, mock.AsyncMock(), mock.Mock(), self.db_wrapper,
+                                                mock.Mock(), mock.Mock())
+        gmos = [(timestamp, {"type": 106, "payload": {"cells": [], "client_weather": [{"cell_id": timestamp}]}},
+                 "origin") for timestamp in (1, 2)]
+        with mock.patch.object(MadGlobals, "application_args", SimpleNamespace(scan_nearby_mons=False,
+                                                                               scan_lured_mons=False)):
+            await processor._SerializedMitmDataProcessor__process_gmo_batch(gmos)
+            rescheduled = [call.args[0] for call in queue.put_nowait.call_args_list]
+            self.assertEqual([item[0] for item in rescheduled], [1, 2])
+            self.assertEqual(self.db_wrapper.proto_submit.weather.await_count, 2)
+
+            self.db_wrapper.proto_submit.gyms.side_effect = None
+            await processor._SerializedMitmDataProcessor__process_gmo_batch(rescheduled)
+        self.assertEqual(queue.put_nowait.call_count, 2)
+        self.assertEqual(self.db_wrapper.proto_submit.weather.await_count, 2)
+        self.assertEqual(self.db_wrapper.proto_submit.gyms.await_count, 4)
+        self.assertNotIn("mad_submitted_tables", gmos[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import unittest
+from datetime import datetime
+from typing import Dict, List
+
+import orjson
+
+from mapadroid.db.model import Pokemon
+from mapadroid.madmin.map_serialization import serialize_mons
+from mapadroid.madmin.MapTileCache import MapTileCache
+from mapadroid.utils.collections import Location
+from mapadroid.utils.madConstants import MAP_TILE_VERSIONS_KEY
+from mapadroid.utils.madGlobals import MonSeenTypes
+from mapadroid.utils.map_tiles import (MapTileLayer, MapTileVersions,
+                                       group_by_tile, parse_tile_key,
+                                       rectangle_of_tiles, tile_bounds,
+                                       tile_key, tile_of, tiles_in_rectangle)
+
+
+class _Hashes:
+    """
+    Hash commands of redis used by the versions of the tiles, pipelines execute the commands queued at once
+    """
+
+    def __init__(self):
+        self.hashes: Dict[str, Dict[str, int]] = {}
+        self.pipelines: int = 0
+        self.failing: bool = False
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    def hincrby(self, name, key, amount=1):
+        self.hashes.setdefault(name, {})[key] = self.hashes.get(name, {}).get(key, 0) + amount
+
+    async def hmget(self, name, keys):
+        return [str(self.hashes[name][key]).encode() if key in self.hashes.get(name, {}) else None for key in keys]
+
+
+class _Pipeline:
+    def __init__(self, hashes: _Hashes):
+        self.__hashes: _Hashes = hashes
+        self.__queued: List = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def hincrby(self, name, key, amount=1):
+        self.__queued.append((name, key, amount))
+
+    async def execute(self):
+        if self.__hashes.failing:
+            raise ConnectionError("Connection refused")
+        self.__hashes.pipelines += 1
+        for name, key, amount in self.__queued:
+            self.__hashes.hincrby(name, key, amount)
+
+
+class TestMapTiles(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.redis = _Hashes()
+        self.versions = MapTileVersions(self.redis, flush_interval=60)
+        self.builds: List[List[str]] = []
+
+    async def asyncTearDown(self) -> None:
+        if self.versions._flush_task:
+            self.versions._flush_task.cancel()
+
+    def test_tile_math(self):
+        self.assertEqual(tile_of(0, 0, 1), (1, 1))
+        self.assertEqual(tile_of(90, 180, 1), (1, 0))
+        self.assertEqual(tile_of(-90, -180, 1), (0, 1))
+        x, y = tile_of(52.5163, 13.3777)
+        ne_corner, sw_corner = tile_bounds(x, y)
+        self.assertTrue(sw_corner.lat <= 52.5163 < ne_corner.lat and sw_corner.lng <= 13.3777 < ne_corner.lng)
+        self.assertEqual(parse_tile_key(tile_key(x, y)), (x, y))
+
+        tiles = tiles_in_rectangle(Location(52.6, 13.5), Location(52.4, 13.2))
+        self.assertEqual(len(tiles), len(set(tiles)))
+        self.assertIn(tile_key(x, y), tiles)
+        ne_corner, sw_corner = rectangle_of_tiles(tiles)
+        self.assertTrue(ne_corner.lat > 52.6 and ne_corner.lng > 13.5 and sw_corner.lat < 52.4 and sw_corner.lng < 13.2)
+        # Tiles bordering the equator and prime meridian are not queried by a coordinate of 0.0
+        ne_corner, sw_corner = rectangle_of_tiles([tile_key(*tile_of(0.001, 0.001))])
+        self.assertTrue(sw_corner.lat < 0 and sw_corner.lng < 0)
+
+        grouped = group_by_tile([(52.5163, 13.3777), (52.5164, 13.3778), (0.001, 0.001)], lambda item: item)
+        self.assertEqual(grouped[tile_key(x, y)], [(52.5163, 13.3777), (52.5164, 13.3778)])
+        self.assertEqual(len(grouped), 2)
+
+    async def test_versions_flushed_twice(self):
+        self.versions.record(MapTileLayer.mons, 52.5163, 13.3777)
+        self.versions.record(MapTileLayer.mons, 52.5164, 13.3778)
+        self.versions.record(MapTileLayer.gyms, 52.5163, 13.3777)
+        self.versions.record(MapTileLayer.gyms, None, None)
+        tile = tile_key(*tile_of(52.5163, 13.3777))
+        self.assertEqual(await MapTileVersions.get(self.redis, MapTileLayer.mons, [tile]), [0])
+        self.assertEqual(await self.versions.flush(), 2)
+        self.assertEqual(self.redis.pipelines, 1)
+        self.assertEqual(await MapTileVersions.get(self.redis, MapTileLayer.mons, [tile, "0/0"]), [1, 0])
+        # Incremented once more as the writes may not have been committed when flushing before
+        self.assertEqual(await self.versions.flush(), 2)
+        self.assertEqual(await self.versions.flush(), 0)
+        self.assertEqual(self.redis.hashes[MAP_TILE_VERSIONS_KEY.format("gyms")], {tile: 2})
+
+    async def test_failed_flush_retried(self):
+        self.versions.record(MapTileLayer.stops, 52.5163, 13.3777)
+        tile = tile_key(*tile_of(52.5163, 13.3777))
+        self.redis.failing = True
+        self.assertEqual(await self.versions.flush(), 0)
+        self.redis.failing = False
+        self.assertEqual(await self.versions.flush(), 1)
+        self.assertEqual(await self.versions.flush(), 1)
+        self.assertEqual(await self.versions.flush(), 0)
+        self.assertEqual(await MapTileVersions.get(self.redis, MapTileLayer.stops, [tile]), [2])
+
+    def test_nearby_mons_serialized_alike(self):
+        mons = [Pokemon(encounter_id=encounter_id, pokemon_id=1, latitude=52.5163, longitude=13.3777,
+                        disappear_time=datetime(2024, 1, 1), seen_type=MonSeenTypes.nearby_stop.value)
+                for encounter_id in (1, 2)]
+        serialized = serialize_mons(mons, {1: "Bulbasaur"})
+        # Placed around the stop, at the same spot on every rebuild of the tile
+        self.assertNotEqual(serialized[0]["latitude"], serialized[1]["latitude"])
+        self.assertEqual(orjson.dumps(serialize_mons(mons, {1: "Bulbasaur"})), orjson.dumps(serialized))
+
+    async def build(self, tiles: List[str]) -> Dict[str, List]:
+        self.builds.append(sorted(tiles))
+        await asyncio.sleep(0.05)
+        return {tile: [{"tile": tile}] for tile in tiles if tile != "1/1"}
+
+    async def test_tiles_served_until_written(self):
+        cache = MapTileCache(self.redis, ttl=60)
+        tiles = cache.get(MapTileLayer.stops, ["1/0", "1/1"], self.build)
+        concurrent = cache.get(MapTileLayer.stops, ["1/1", "2/2"], self.build)
+        first, second = await asyncio.gather(tiles, concurrent)
+        # Tiles requested concurrently are built once
+        self.assertEqual(self.builds, [["1/0", "1/1"], ["2/2"]])
+        self.assertEqual(orjson.loads(first["1/0"].data), [{"tile": "1/0"}])
+        self.assertEqual(orjson.loads(first["1/1"].data), [])
+        self.assertIs(first["1/1"], second["1/1"])
+
+        unchanged = await cache.get(MapTileLayer.stops, ["1/0", "1/1"], self.build)
+        self.assertEqual(len(self.builds), 2)
+        self.assertIs(unchanged["1/0"], first["1/0"])
+
+        self.redis.hincrby(MAP_TILE_VERSIONS_KEY.format("stops"), "1/0")
+        rebuilt = await cache.get(MapTileLayer.stops, ["1/0", "1/1"], self.build)
+        self.assertEqual(self.builds[-1], ["1/0"])
+        # The content did not change, the version is the same
+        self.assertEqual(rebuilt["1/0"].version, first["1/0"].version)
+        self.assertNotEqual(rebuilt["1/0"].version, first["1/1"].version)
+
+        await cache.get(MapTileLayer.gyms, ["1/0"], self.build)
+        self.assertEqual(len(self.builds), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import asyncio
+import time
+import unittest
+
+from mapadroid.data_handler.mitm_data.MitmMapper import MitmMapper
+from mapadroid.utils.collections import Location
+
+
+class TestMitmMapperWaitForLatest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.mitm_mapper = MitmMapper()
+        self.now = int(time.time())
+
+    async def update(self, key: str, timestamp: int, delay: float = 0.0):
+        await asyncio.sleep(delay)
+        await self.mitm_mapper.update_latest("worker", key, {"timestamp": timestamp}, timestamp_received_raw=timestamp,
+                                             timestamp_received_receiver=timestamp, location=Location(1.0, 2.0))
+
+    async def test_returns_present_data(self):
+        await self.update("106", self.now)
+        # Updates are applied in an executor
+        await asyncio.sleep(0.1)
+        latest = await self.mitm_mapper.wait_for_latest("worker", "106", self.now - 1, 5)
+        self.assertEqual(latest.data, {"timestamp": self.now})
+
+    async def test_wakes_on_update(self):
+        await self.update("106", self.now)
+        await asyncio.sleep(0.1)
+        start = time.monotonic()
+        asyncio.create_task(self.update("106", self.now + 1, delay=0.2))
+        latest = await self.mitm_mapper.wait_for_latest("worker", "106", self.now, 5)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(latest.timestamp_of_data_retrieval, self.now + 1)
+
+    async def test_ignores_other_keys_and_workers(self):
+        asyncio.create_task(self.update("102", self.now + 1, delay=0.1))
+        asyncio.create_task(self.mitm_mapper.update_latest("other", "106", {}, self.now + 1, self.now + 1))
+        start = time.monotonic()
+        self.assertIsNone(await self.mitm_mapper.wait_for_latest("worker", "106", self.now, 0.5))
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
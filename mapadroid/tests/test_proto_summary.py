@@ -0,0 +1,74 @@
+import unittest
+
+from mapadroid.data_handler.mitm_data.ProtoSummary import summarize_proto
+from mapadroid.utils.ProtoIdentifier import ProtoIdentifier
+from mapadroid.worker.strategy.AbstractMitmBaseStrategy import \
+    AbstractMitmBaseStrategy
+
+GMO = {
+    "cells": [
+        {
+            "id": 5138124153593085952,
+            "current_timestamp": 1700000000000,
+            "forts": [{"id": "a1b2.16", "latitude": 52.5, "longitude": 13.4, "type": 1, "enabled": True,
+                       "cooldown_complete_ms": 0, "image_url": "http://example.com/stop.png",
+                       "active_fort_modifier": [], "pokestop_display": {"incident_expiration_ms": 0}}],
+            "wild_pokemon": [{"encounter_id": -1234567890123, "spawnpoint_id": "47C0D3F1", "latitude": 52.5001,
+                              "longitude": 13.4001, "time_till_hidden_ms": 1200000,
+                              "pokemon_data": {"id": 16, "cp": 10, "move_1": 221,
+                                               "display": {"weather_boosted_value": 0, "gender_value": 1}}}],
+            "nearby_pokemon": [{"encounter_id": 42, "pokedex_number": 19, "fort_id": "a1b2.16"}],
+            "spawn_points": [{"latitude": 52.5002, "longitude": 13.4002}]
+        },
+        {
+            "id": 5138124153593085953,
+            "weather": [{"gameplay_weather": {"gameplay_condition": 1}}]
+        }
+    ]
+}
+
+
+class TestProtoSummary(unittest.TestCase):
+    def test_gmo(self):
+        summary = summarize_proto(ProtoIdentifier.GMO.value, GMO)
+        self.assertEqual([cell["id"] for cell in summary["cells"]], [cell["id"] for cell in GMO["cells"]])
+        cell = summary["cells"][0]
+        self.assertEqual(cell["forts"], [{"id": "a1b2.16", "latitude": 52.5, "longitude": 13.4, "type": 1,
+                                          "enabled": True, "cooldown_complete_ms": 0}])
+        self.assertEqual(cell["wild_pokemon"], [{"encounter_id": -1234567890123, "spawnpoint_id": "47C0D3F1",
+                                                 "latitude": 52.5001, "longitude": 13.4001,
+                                                 "pokemon_data": {"id": 16,
+                                                                  "display": {"weather_boosted_value": 0}}}])
+        self.assertEqual(cell["nearby_pokemon"], [{"encounter_id": 42}])
+        self.assertNotIn("spawn_points", cell)
+        self.assertEqual(summary["cells"][1], {"id": 5138124153593085953, "forts": [], "wild_pokemon": [],
+                                               "nearby_pokemon": []})
+        self.assertTrue(AbstractMitmBaseStrategy._gmo_cells_contain_multiple_of_key(summary, "forts"))
+        self.assertTrue(AbstractMitmBaseStrategy._gmo_cells_contain_multiple_of_key(summary, ["nearby_pokemon"]))
+
+    def test_fort_search(self):
+        fort_search = {"result": 1, "fort_id": "a1b2.16", "items_awarded": [{"item": 1, "count": 3},
+                                                                           {"item": 701, "count": 1}],
+                       "experience_awarded": 50,
+                       "challenge_quest": {"quest": {"quest_type": 7, "quest_rewards": [{"type": 2}]},
+                                           "quest_display": {"description": "Catch 5 Pokémon"}}}
+        self.assertEqual(summarize_proto(ProtoIdentifier.FORT_SEARCH.value, fort_search),
+                         {"result": 1, "fort_id": "a1b2.16", "items_awarded": [{}, {}],
+                          "challenge_quest": {"quest": {"quest_type": 7}}})
+        self.assertEqual(summarize_proto(ProtoIdentifier.FORT_SEARCH.value, {"result": 3}),
+                         {"result": 3, "items_awarded": []})
+
+    def test_others(self):
+        encounter = {"status": 1, "capture_probability": {"base_capture_probability": [0.5]},
+                     "wild_pokemon": {"encounter_id": 1, "spawnpoint_id": "47C0D3F1", "latitude": 52.5,
+                                      "longitude": 13.4, "pokemon_data": {"id": 16, "individual_attack": 15}}}
+        self.assertEqual(summarize_proto(ProtoIdentifier.ENCOUNTER.value, encounter),
+                         {"status": 1, "wild_pokemon": {"encounter_id": 1, "spawnpoint_id": "47C0D3F1",
+                                                        "latitude": 52.5, "longitude": 13.4,
+                                                        "pokemon_data": {"id": 16}}})
+        self.assertEqual(summarize_proto(ProtoIdentifier.FORT_DETAILS.value,
+                                         {"id": "a1b2.16", "type": 1, "name": "Stop", "latitude": 52.5,
+                                          "longitude": 13.4, "image_urls": ["http://example.com/stop.png"]}),
+                         {"id": "a1b2.16", "type": 1, "latitude": 52.5, "longitude": 13.4})
+        self.assertEqual(summarize_proto(ProtoIdentifier.INVENTORY.value, {"inventory_delta": {}}), {})
+        self.assertEqual(summarize_proto(ProtoIdentifier.GMO.value, {}), {})
@@ -0,0 +1,131 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from typing import List
+from unittest import mock
+
+import grpc
+
+from mapadroid.data_handler.grpc.MitmMapperClient import MitmMapperClient
+from mapadroid.data_handler.grpc.MitmMapperServer import MitmMapperServer
+from mapadroid.data_handler.grpc.RpcBatcher import RpcBatcher
+from mapadroid.grpc.stubs.mitm_mapper.mitm_mapper_pb2_grpc import \
+    add_MitmMapperServicer_to_server
+from mapadroid.utils.collections import Location
+from mapadroid.utils.madGlobals import MadGlobals
+
+
+class TestRpcBatcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.batches: List[List[int]] = []
+
+    async def submit(self, batch: List[int]) -> None:
+        self.batches.append(batch)
+
+    async def test_flush_on_size_and_latency(self):
+        batcher: RpcBatcher[int] = RpcBatcher("test", self.submit, max_batch_size=3, max_latency=0.2,
+                                              max_buffered=100)
+        for request in range(7):
+            batcher.add(request)
+        await asyncio.sleep(0.05)
+        # Once a batch is full, everything buffered is submitted
+        self.assertEqual(self.batches, [[0, 1, 2], [3, 4, 5], [6]])
+        batcher.add(7)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(self.batches), 3)
+        # Otherwise once the latency passed
+        await asyncio.sleep(0.3)
+        self.assertEqual(self.batches[3:], [[7]])
+        await batcher.stop()
+
+    async def test_bounded_buffer_and_stop(self):
+        batcher: RpcBatcher[int] = RpcBatcher("test", self.submit, max_batch_size=5, max_latency=10,
+                                              max_buffered=8)
+        # Not yielding to the loop, the buffer overflows
+        for request in range(12):
+            batcher.add(request)
+        self.assertEqual(len(batcher), 8)
+        await batcher.stop()
+        self.assertEqual([request for batch in self.batches for request in batch], list(range(4, 12)))
+
+    async def test_failed_submission_does_not_stop_flushing(self):
+        async def fail(batch: List[int]) -> None:
+            raise ValueError("Server unavailable")
+        batcher: RpcBatcher[int] = RpcBatcher("test", fail, max_batch_size=2, max_latency=0.01, max_buffered=10)
+        batcher.add(1)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(batcher), 0)
+        batcher._submit = self.submit
+        batcher.add(2)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.batches, [[2]])
+        await batcher.stop()
+
+    async def test_flush_waits_for_batch_in_flight(self):
+        submitted: asyncio.Event = asyncio.Event()
+
+        async def slow_submit(batch: List[int]) -> None:
+            await asyncio.sleep(0.1)
+            self.batches.append(batch)
+            submitted.set()
+        batcher: RpcBatcher[int] = RpcBatcher("test", slow_submit, max_batch_size=1, max_latency=10,
+                                              max_buffered=10)
+        batcher.add(1)
+        await asyncio.sleep(0.01)
+        # Taken from the buffer but not yet submitted
+        self.assertEqual(len(batcher), 0)
+        await batcher.flush()
+        self.assertTrue(submitted.is_set())
+        self.assertEqual(self.batches, [[1]])
+        await batcher.stop()
+
+
+class TestBatchedMitmMapperClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.args_patch = mock.patch.object(MadGlobals, "application_args", SimpleNamespace(
+            grpc_batch_size=50, grpc_batch_latency=0.05, grpc_batch_buffer=1000, wait_for_data_sleep_duration=1.0))
+        self.args_patch.start()
+        self.mitm_mapper_server = MitmMapperServer()
+        self.server = grpc.aio.server()
+        add_MitmMapperServicer_to_server(self.mitm_mapper_server, self.server)
+        port = self.server.add_insecure_port("127.0.0.1:0")
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel("127.0.0.1:{}".format(port))
+        self.client = MitmMapperClient(self.channel)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.shutdown()
+        await self.channel.close()
+        await self.server.stop(0)
+        self.args_patch.stop()
+
+    async def test_updates_submitted_in_batches(self):
+        now = int(time.time())
+        with mock.patch.object(self.client, "UpdateBatch", wraps=self.client.UpdateBatch) as update_batch:
+            for worker in range(20):
+                for offset in range(5):
+                    await self.client.update_latest("worker{}".format(worker), "106", {"cells": [{"id": offset}]},
+                                                    now + offset, now + offset, Location(1.0, float(worker)))
+                await self.client.set_level("worker{}".format(worker), 30)
+                await self.client.set_quests_held("worker{}".format(worker), [1, 2])
+            await asyncio.sleep(0.2)
+            # 140 updates submitted in few bulk requests rather than one request each
+            self.assertLessEqual(update_batch.call_count, 10)
+            self.assertEqual(sum(len(call.args[0].updates) for call in update_batch.call_args_list), 140)
+        # Updates are applied in an executor
+        await asyncio.sleep(0.1)
+        latest = await self.mitm_mapper_server.request_latest("worker7", "106")
+        self.assertEqual(latest.timestamp_of_data_retrieval, now + 4)
+        self.assertEqual(latest.data, {"cells": [{"id": 4.0}]})
+        self.assertEqual(await self.mitm_mapper_server.get_level("worker7"), 30)
+        self.assertEqual(await self.mitm_mapper_server.get_quests_held("worker19"), [1, 2])
+
+    async def test_reads_submit_buffered_updates(self):
+        now = int(time.time())
+        await self.client.set_injection_status("worker", True)
+        await self.client.update_latest("worker", "101", {"result": 1}, now, now)
+        self.assertTrue(await self.client.get_injection_status("worker"))
+        await asyncio.sleep(0.1)
+        latest = await self.client.request_latest("worker", "101")
+        self.assertEqual(latest.data, {"result": 1.0})
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from mapadroid.ocr.pogoWindows import PogoWindows
+from mapadroid.ocr.screen_cache import ScreenResultCache
+from mapadroid.ocr.screen_classifier import ScreenClassifier
+from mapadroid.ocr.screen_type import ScreenType
+from mapadroid.ocr.shared_frames import SharedFramePool, read_shared_frame
+from mapadroid.ocr.utils import (check_close_except_nearby_button_internal,
+                                 check_pogo_mainscreen,
+                                 look_for_button_internal,
+                                 most_frequent_colour_internal, screen_hash)
+from mapadroid.utils.collections import SharedFrame
+from mapadroid.utils.madConstants import SCREEN_CLASSIFIER_THRESHOLD
+
+
+def build_screen(quality: int = 80, text: str = "") -> bytes:
+    screen = np.full((1920, 1080, 3), 230, dtype=np.uint8)
+    cv2.circle(screen, (540, 1750), 52, (90, 110, 40), 6)
+    cv2.rectangle(screen, (300, 1200), (780, 1320), (40, 180, 120), -1)
+    cv2.putText(screen, text, (300, 700), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 3)
+    _, encoded = cv2.imencode(".jpg", screen, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes()
+
+
+def build_dialog(body: str) -> bytes:
+    screen = np.full((1920, 1080, 3), 60, dtype=np.uint8)
+    cv2.rectangle(screen, (90, 500), (990, 1400), (250, 250, 250), -1)
+    cv2.putText(screen, "Account notice", (220, 640), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 3)
+    cv2.putText(screen, body, (160, 900), cv2.FONT_HERSHEY_SIMPLEX, 1, (40, 40, 40), 2)
+    cv2.rectangle(screen, (340, 1220), (740, 1320), (40, 180, 120), -1)
+    _, encoded = cv2.imencode(".jpg", screen, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return encoded.tobytes()
+
+
+class TestScreenAnalysis(unittest.TestCase):
+    def setUp(self) -> None:
+        self.screen: bytes = build_screen()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path: str = os.path.join(self.temp_dir.name, "screenshot_test.jpg")
+        with open(self.path, "wb") as fh:
+            fh.write(self.screen)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_bytes_analysed_like_file(self):
+        close = check_close_except_nearby_button_internal(self.screen, "test")
+        self.assertEqual(len(close), 1)
+        self.assertEqual(close, check_close_except_nearby_button_internal(self.path, "test"))
+        button = look_for_button_internal(self.screen, "test", 2.20, 3.01, False)
+        self.assertIsNotNone(button)
+        self.assertEqual(button, look_for_button_internal(self.path, "test", 2.20, 3.01, False))
+        self.assertEqual(check_pogo_mainscreen(self.screen, "test"), check_pogo_mainscreen(self.path, "test"))
+        self.assertEqual(most_frequent_colour_internal(self.screen, "test"),
+                         most_frequent_colour_internal(self.path, "test"))
+
+    def test_corrupted_screenshot(self):
+        corrupted: bytes = self.screen[:100]
+        self.assertEqual(check_close_except_nearby_button_internal(corrupted, "test"), [])
+        self.assertIsNone(look_for_button_internal(corrupted, "test", 2.20, 3.01, False))
+        self.assertIsNone(most_frequent_colour_internal(b"", "test"))
+
+    def test_screen_hash(self):
+        cache = ScreenResultCache(2, 3)
+        welcome: asyncio.Future = mock.Mock()
+        cache.put("text", screen_hash(build_screen(text="Welcome")), welcome)
+        for quality in range(30, 100, 10):
+            self.assertIs(cache.get("text", screen_hash(build_screen(quality=quality, text="Welcome"))), welcome)
+        self.assertIsNone(cache.get("type", screen_hash(build_screen(text="Welcome"))))
+        self.assertIsNone(cache.get("text", screen_hash(build_screen(text="Welcomf"))))
+        self.assertIsNone(cache.get("text", screen_hash(self.screen)))
+        self.assertIsNone(screen_hash(b"corrupted"))
+
+
+class TestPogoWindows(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pogo_windows = PogoWindows(self.temp_dir.name, 1)
+
+    async def asyncTearDown(self) -> None:
+        await self.pogo_windows.shutdown()
+        self.temp_dir.cleanup()
+
+    async def test_shared_frames(self):
+        frames = SharedFramePool(1, 1024)
+        try:
+            frame = await frames.acquire(b"screen")
+            self.assertIsInstance(frame, SharedFrame)
+            self.assertEqual(bytes(read_shared_frame(frame)), b"screen")
+            # The slot is only reused once released
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(frames.acquire(b"other"), 0.1)
+            frames.release(frame)
+            frame = await frames.acquire(b"other")
+            self.assertEqual(bytes(read_shared_frame(frame)), b"other")
+            frames.release(frame)
+            self.assertEqual(await frames.acquire(bytes(2048)), bytes(2048))
+        finally:
+            frames.close()
+
+        screen: bytes = build_screen()
+        self.assertEqual(await self.pogo_windows.check_close_except_nearby_button(screen, "test"),
+                         check_close_except_nearby_button_internal(screen, "test"))
+
+    async def test_identical_screens_analysed_once(self):
+        result = (ScreenType.WELCOME, {"text": ["Welcome"]}, 1080, 1920, 1)
+
+        async def analyse(*_args):
+            await asyncio.sleep(0.1)
+            return result
+
+        with mock.patch.object(self.pogo_windows, "_PogoWindows__run", side_effect=analyse) as run:
+            results = await asyncio.gather(*[self.pogo_windows.screendetection_get_type_by_screen_analysis(
+                build_screen(quality=quality, text="Welcome"), "test") for quality in (60, 70, 80)])
+            self.assertEqual(results, [result] * 3)
+            self.assertEqual(run.call_count, 1)
+            await self.pogo_windows.screendetection_get_type_by_screen_analysis(build_screen(text="Welcome"), "test")
+            self.assertEqual(run.call_count, 1)
+            await self.pogo_windows.screendetection_get_type_by_screen_analysis(build_screen(text="Bye"), "test")
+            self.assertEqual(run.call_count, 2)
+
+
+    async def test_stable_screens_classified_by_template(self):
+        classifier = ScreenClassifier()
+        tos = (ScreenType.TOS, {"text": ["Terms"]}, 1080, 1920, 1)
+        analysis, fingerprint = await classifier.classify(build_screen(text="Terms of Service"))
+        self.assertIsNone(analysis)
+        classifier.learn(fingerprint, tos)
+        classifier.learn(fingerprint, tos)
+        classifier.learn((await classifier.classify(build_screen(text="Welcome")))[1],
+                         (ScreenType.UNDEFINED, {"text": []}, 1080, 1920, 1))
+        self.assertEqual((await classifier.classify(build_screen(quality=40, text="Terms of Service")))[0], tos)
+        self.assertIsNone((await classifier.classify(build_screen(text="Privacy Policy")))[0])
+        self.assertIsNone((await classifier.classify(build_screen(text="Welcome")))[0])
+        metrics = classifier.get_metrics()
+        self.assertEqual((metrics.templates, metrics.classified, metrics.hits, metrics.hit_rate), (1, 5, 1, 0.2))
+
+        with mock.patch.object(self.pogo_windows, "_PogoWindows__run_ocr", return_value=tos) as run_ocr:
+            for quality in (60, 70, 80):
+                self.assertEqual(await self.pogo_windows.screendetection_get_type_by_screen_analysis(
+                    build_screen(quality=quality, text="Terms of Service"), "test"), tos)
+            self.assertEqual(run_ocr.call_count, 1)
+        self.assertEqual(self.pogo_windows.get_classifier_metrics().hits, 2)
+
+    async def test_dialogs_differing_by_text_not_classified(self):
+        classifier = ScreenClassifier()
+        strike = (ScreenType.STRIKE, {"text": ["Strike"]}, 1080, 1920, 1)
+        _, strike_fingerprint = await classifier.classify(build_dialog("Strike: modified client detected"))
+        classifier.learn(strike_fingerprint, strike)
+        analysis, suspended_fingerprint = await classifier.classify(build_dialog("Your account has been suspended"))
+        # Both dialogs share the layout, the suspension would match a template of the strike
+        self.assertGreaterEqual(float(strike_fingerprint[2] @ suspended_fingerprint[2]), SCREEN_CLASSIFIER_THRESHOLD)
+        self.assertIsNone(analysis)
+        self.assertEqual(classifier.get_metrics().templates, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import unittest
+from typing import Dict, List, Tuple
+
+from mapadroid.route.prioq.SpawnTimeWheel import (SpawnTimeWheel,
+                                                  get_spawn_second_of_hour)
+from mapadroid.route.routecalc.SpatialClusteringHelper import \
+    SpatialClusteringHelper
+from mapadroid.utils.collections import Location
+
+# Arbitrary full hour
+START_OF_HOUR = 1700002800
+
+
+def generate_spawns(amount: int, seed: int) -> Dict[int, Tuple[Location, str, int]]:
+    rng = random.Random(seed)
+    spawns: Dict[int, Tuple[Location, str, int]] = {}
+    for spawnpoint in range(amount):
+        location = Location(52.5 + rng.random() * 0.02, 13.4 + rng.random() * 0.03)
+        calc_endminsec = "{:02d}:{:02d}".format(rng.randint(0, 59), rng.randint(0, 59))
+        spawns[spawnpoint] = (location, calc_endminsec, rng.choice([15, 240]))
+    return spawns
+
+
+def expected_upcoming(spawns: Dict[int, Tuple[Location, str, int]], now: int,
+                      limit: int) -> List[Tuple[int, Location]]:
+    upcoming: List[Tuple[int, Location]] = []
+    for location, calc_endminsec, spawndef in spawns.values():
+        timestamp = now - now % 3600 + get_spawn_second_of_hour(calc_endminsec, spawndef)
+        if timestamp < now:
+            timestamp += 3600
+        if timestamp <= now + limit:
+            upcoming.append((timestamp, location))
+    return sorted(upcoming, key=lambda event: (event[0], event[1].lat, event[1].lng))
+
+
+class TestSpawnTimeWheel(unittest.TestCase):
+    def setUp(self) -> None:
+        # A single spawnpoint per circle, i.e. no clustering at all
+        self.wheel = SpawnTimeWheel(SpatialClusteringHelper(0, max_count_per_circle=1, max_timedelta_seconds=0),
+                                    bucket_seconds=600)
+        self.spawns = generate_spawns(500, 1)
+        for spawnpoint, (location, calc_endminsec, spawndef) in self.spawns.items():
+            self.wheel.upsert(spawnpoint, location, calc_endminsec, spawndef)
+
+    def assert_upcoming(self, now: int, limit: int):
+        upcoming = sorted(self.wheel.get_upcoming(now, limit), key=lambda event: (event[0], event[1].lat,
+                                                                                 event[1].lng))
+        self.assertEqual(expected_upcoming(self.spawns, now, limit), upcoming)
+
+    def test_spawn_second_of_hour(self):
+        self.assertEqual(get_spawn_second_of_hour("45:00", 240), 15 * 60)
+        self.assertEqual(get_spawn_second_of_hour("10:30", 240), 40 * 60 + 30)
+        self.assertEqual(get_spawn_second_of_hour("10:30", 15), 10 * 60 + 30)
+
+    def test_upcoming(self):
+        for offset in (0, 599, 600, 1234, 3000, 3599):
+            with self.subTest(offset=offset):
+                self.assert_upcoming(START_OF_HOUR + offset, 600)
+        self.assert_upcoming(START_OF_HOUR + 100, 3599)
+
+    def test_updates(self):
+        self.assertEqual(len(self.wheel), 500)
+        location, _, spawndef = self.spawns[0]
+        self.assertFalse(self.wheel.upsert(0, location, self.spawns[0][1], spawndef))
+        self.spawns[0] = (location, "12:34", spawndef)
+        self.assertTrue(self.wheel.upsert(0, location, "12:34", spawndef))
+        self.assertTrue(self.wheel.upsert(1, self.spawns[1][0], None, 240))
+        del self.spawns[1]
+        self.assertEqual(self.wheel.retain(set(range(400))), 100)
+        for spawnpoint in range(400, 500):
+            del self.spawns[spawnpoint]
+        self.assertEqual(len(self.wheel), 399)
+        for offset in range(0, 3600, 300):
+            self.assert_upcoming(START_OF_HOUR + offset, 600)
+
+    def test_clusters_cached_until_bucket_changes(self):
+        clustering_helper = SpatialClusteringHelper(100, max_count_per_circle=5, max_timedelta_seconds=120)
+        wheel = SpawnTimeWheel(clustering_helper, bucket_seconds=600)
+        for spawnpoint, (location, calc_endminsec, spawndef) in self.spawns.items():
+            wheel.upsert(spawnpoint, location, calc_endminsec, spawndef)
+        clustered = wheel.get_upcoming(START_OF_HOUR, 3599)
+        self.assertLess(len(clustered), len(self.spawns))
+        self.assertEqual(clustered, sorted(clustered, key=lambda event: event[0]))
+        self.assertEqual(clustered, wheel.get_upcoming(START_OF_HOUR, 3599))
+        # Spawning at 00:05 moves the spawnpoint into the first bucket, others keep their clusters
+        wheel.upsert(0, self.spawns[0][0], "30:05", 240)
+        cached = [clusters for clusters in wheel._clusters]
+        self.assertIsNone(cached[0])
+        self.assertEqual(1, sum(clusters is None for clusters in cached[1:]))
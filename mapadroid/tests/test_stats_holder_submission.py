@@ -0,0 +1,131 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from unittest import mock
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import OperationalError
+
+from mapadroid.data_handler.stats.holder.stats_detect_seen.StatsDetectSeenTypeHolder import \
+    StatsDetectSeenTypeHolder
+from mapadroid.data_handler.stats.holder.wild_mon_stats.WildMonStatsHolder import \
+    WildMonStatsHolder
+from mapadroid.db.helper.TrsStatsDetectSeenTypeHelper import \
+    TrsStatsDetectSeenTypeHelper
+from mapadroid.db.helper.TrsStatsDetectWildMonRawHelper import \
+    TrsStatsDetectWildMonRawHelper
+from mapadroid.utils.madGlobals import MonSeenTypes
+
+
+class _Savepoint:
+    def __init__(self):
+        self.commit = mock.AsyncMock()
+        self.rollback = mock.AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class TestStatsHolderSubmission(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.statements = []
+        self.session = mock.MagicMock()
+        self.session.begin_nested.side_effect = _Savepoint
+        self.session.execute = mock.AsyncMock(side_effect=self.statements.append)
+        self.chunk_size_patch = mock.patch(
+            "mapadroid.data_handler.stats.holder.AbstractStatsHolder.STATS_SUBMIT_CHUNK_SIZE", 2)
+        self.chunk_size_patch.start()
+
+    async def asyncTearDown(self) -> None:
+        self.chunk_size_patch.stop()
+
+    def compile_statement(self, index: int) -> str:
+        return str(self.statements[index].compile(dialect=mysql.dialect()))
+
+    async def test_seen_types_submitted_in_chunks(self):
+        now = datetime.now(timezone.utc)
+        holder = StatsDetectSeenTypeHolder()
+        for encounter_id in range(5):
+            holder.add(encounter_id, MonSeenTypes.wild, now)
+        holder.add(0, MonSeenTypes.encounter, now + timedelta(seconds=10))
+
+        self.assertEqual(await holder.submit(self.session), 5)
+        # A single multi-row statement per chunk rather than a SELECT and INSERT/UPDATE per encounter
+        self.assertEqual(len(self.statements), 3)
+        self.assertEqual(self.session.begin_nested.call_count, 3)
+        sql: str = self.compile_statement(0)
+        self.assertIn("ON DUPLICATE KEY UPDATE", sql)
+        self.assertIn("coalesce(least(trs_stats_detect_seen_type.encounter, VALUES(encounter))", sql)
+        self.assertEqual(self.statements[0].compile().params["encounter_id_m0"], 0)
+
+        # Collection continues in the new snapshot, the entries submitted are not submitted again
+        holder.add(7, MonSeenTypes.nearby_cell, now)
+        self.assertEqual(await holder.submit(self.session), 1)
+        self.assertEqual(len(self.statements), 4)
+
+    async def test_failed_chunk_does_not_stop_submission(self):
+        holder = WildMonStatsHolder("worker")
+        # Timestamps are held as epoch seconds
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        for encounter_id in range(4):
+            holder.add(encounter_id, now)
+        holder.add(3, now + timedelta(seconds=30), is_shiny=True)
+        chunks: List[List[Dict]] = []
+
+        async def insert_or_update_bulk(session, mon_entries: List[Dict]) -> None:
+            chunks.append(mon_entries)
+            if len(chunks) == 1:
+                raise OperationalError("INSERT", {}, Exception("Lock wait timeout exceeded"))
+
+        with mock.patch.object(TrsStatsDetectWildMonRawHelper, "insert_or_update_bulk",
+                               side_effect=insert_or_update_bulk):
+            self.assertEqual(await holder.submit(self.session), 2)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[1][1], {"worker": "worker", "encounter_id": 3, "count": 1, "is_shiny": True,
+                                        "first_scanned": now, "last_scanned": now + timedelta(seconds=30)})
+
+    async def test_seen_types_keep_earliest_time(self):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        holder = StatsDetectSeenTypeHolder()
+        # More encounters than submitted in a single chunk
+        for encounter_id in range(1100):
+            holder.add(encounter_id, MonSeenTypes.wild, now)
+        holder.add(1099, MonSeenTypes.wild, now - timedelta(minutes=1))
+        holder.add(1099, MonSeenTypes.wild, now + timedelta(minutes=1))
+        holder.add(1099, MonSeenTypes.lure_encounter, now)
+        self.assertEqual(len(holder), 1100)
+        chunks: List[List[Dict]] = []
+
+        async def insert_or_update_bulk(session, stat_entries: List[Dict]) -> None:
+            chunks.append(stat_entries)
+
+        with mock.patch.object(TrsStatsDetectSeenTypeHelper, "insert_or_update_bulk",
+                               side_effect=insert_or_update_bulk):
+            self.assertEqual(await holder.submit(self.session), 1100)
+        self.assertEqual([row["encounter_id"] for chunk in chunks for row in chunk], list(range(1100)))
+        self.assertEqual(chunks[-1][-1], {"encounter_id": 1099, "wild": now - timedelta(minutes=1),
+                                          "encounter": None, "lure_encounter": now, "lure_wild": None,
+                                          "nearby_stop": None, "nearby_cell": None})
+        self.assertEqual(len(holder), 0)
+
+    async def test_wild_mon_merge(self):
+        now = datetime.now(timezone.utc)
+        await TrsStatsDetectWildMonRawHelper.insert_or_update_bulk(self.session, [
+            {"worker": "worker", "encounter_id": 1, "count": 2, "is_shiny": False, "first_scanned": now,
+             "last_scanned": now}])
+        sql: str = self.compile_statement(0)
+        self.assertIn("count = (trs_stats_detect_wild_mon_raw.count + VALUES(count))", sql)
+        self.assertIn("first_scanned = least(trs_stats_detect_wild_mon_raw.first_scanned, VALUES(first_scanned))",
+                      sql)
+        self.assertIn("last_scanned = greatest(trs_stats_detect_wild_mon_raw.last_scanned, VALUES(last_scanned))",
+                      sql)
+        # Nothing to be submitted
+        await TrsStatsDetectSeenTypeHelper.insert_or_update_bulk(self.session, [])
+        self.assertEqual(len(self.statements), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import time
+import unittest
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+from redis.exceptions import ResponseError
+
+from mapadroid.utils.madConstants import WEBHOOK_CHANGE_FEED_KEY
+from mapadroid.webhook.WebhookChangeFeed import (WebhookChangeFeedReader,
+                                                 WebhookChangeOutbox,
+                                                 WebhookChangeType)
+
+
+class _Stream:
+    """
+    Stream commands of redis used by the change feed, entry IDs are derived from the current time like redis does
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[bytes, Dict[bytes, bytes]]] = []
+        self.max_deleted_id: Optional[bytes] = None
+
+    @staticmethod
+    def _key(entry_id) -> Tuple[int, int]:
+        milliseconds, sequence = (entry_id.decode() if isinstance(entry_id, bytes) else entry_id).split("-")
+        return int(milliseconds), int(sequence)
+
+    async def xadd(self, name, fields, minid=None, approximate=True):
+        assert name == WEBHOOK_CHANGE_FEED_KEY
+        milliseconds = int(time.time() * 1000)
+        sequence = 0
+        if self.entries and self._key(self.entries[-1][0])[0] >= milliseconds:
+            milliseconds, sequence = self._key(self.entries[-1][0])
+            sequence += 1
+        entry_id = "{}-{}".format(milliseconds, sequence).encode()
+        self.entries.append((entry_id, {key.encode(): value for key, value in fields.items()}))
+        return entry_id
+
+    async def xrange(self, name, min="-", max="+", count=None):
+        return [(entry_id, fields) for entry_id, fields in self.entries
+                if self._key(min) <= self._key(entry_id) <= self._key(max)][:count]
+
+    async def time(self):
+        now = time.time()
+        return int(now), int(now % 1 * 1000000)
+
+    async def xinfo_stream(self, name):
+        if not self.entries:
+            raise ResponseError("no such key")
+        return {"length": len(self.entries), "first-entry": self.entries[0],
+                "max-deleted-entry-id": self.max_deleted_id or b"0-0"}
+
+    def trim(self, amount: int) -> None:
+        self.max_deleted_id = self.entries[amount - 1][0]
+        del self.entries[:amount]
+
+
+class TestWebhookChangeFeed(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.stream = _Stream()
+        self.outbox = WebhookChangeOutbox(self.stream, max_size=3, flush_interval=60)
+        self.reader = WebhookChangeFeedReader(self.stream)
+
+    async def asyncTearDown(self) -> None:
+        if self.outbox._flush_task:
+            self.outbox._flush_task.cancel()
+
+    async def read(self):
+        # Entries of the current millisecond are left to the next read
+        await asyncio.sleep(0.002)
+        return await self.reader.read()
+
+    async def test_changes_deduplicated_by_id(self):
+        # Nothing read yet, the DB is to be polled once
+        self.assertIsNone(await self.read())
+        self.outbox.record(WebhookChangeType.pokemon, 2 ** 64 - 1, 100)
+        self.outbox.record(WebhookChangeType.pokemon, 2 ** 64 - 1, 90.5)
+        self.outbox.record(WebhookChangeType.raid, "gym1", 100)
+        self.outbox.record(WebhookChangeType.raid, "gym1", 110)
+        self.assertEqual(len(self.outbox), 2)
+        self.assertEqual(await self.outbox.flush(), 2)
+        self.assertEqual(await self.outbox.flush(), 0)
+        self.assertEqual(len(self.stream.entries), 1)
+
+        # Another process announcing the same entity
+        other_outbox = WebhookChangeOutbox(self.stream, max_size=3, flush_interval=60)
+        other_outbox.record(WebhookChangeType.raid, "gym1", 105)
+        other_outbox.record(WebhookChangeType.weather, "123", 105)
+        await other_outbox.flush()
+        other_outbox._flush_task.cancel()
+
+        changes = await self.read()
+        self.assertEqual(changes[WebhookChangeType.pokemon], {2 ** 64 - 1: 100})
+        self.assertEqual(changes[WebhookChangeType.raid], {"gym1": 110})
+        self.assertEqual(changes[WebhookChangeType.weather], {"123": 105})
+        self.assertEqual(changes[WebhookChangeType.quest], {})
+        # Entries are only read once
+        self.assertEqual(await self.read(), {change_type: {} for change_type in WebhookChangeType})
+
+    async def test_missed_changes_fall_back_to_polling(self):
+        self.assertIsNone(await self.read())
+        # Changes dropped as the outbox is full
+        for stop in range(4):
+            self.outbox.record(WebhookChangeType.pokestop, "stop{}".format(stop), 100)
+        self.assertEqual(len(self.outbox), 3)
+        await self.outbox.flush()
+        self.assertIsNone(await self.read())
+
+        # Entries trimmed before being read
+        for stop in range(3):
+            self.outbox.record(WebhookChangeType.quest, "stop{}".format(stop), 100)
+            await self.outbox.flush()
+        self.stream.trim(2)
+        self.assertIsNone(await self.read())
+        # The poll covered the entries left
+        self.assertEqual(await self.read(), {change_type: {} for change_type in WebhookChangeType})
+
+        # Failing to announce changes
+        self.stream.xadd = mock.AsyncMock(side_effect=ConnectionError("Connection refused"))
+        self.outbox.record(WebhookChangeType.quest, "stop1", 110)
+        self.assertEqual(await self.outbox.flush(), 0)
+        del self.stream.xadd
+        await self.outbox.flush()
+        self.assertIsNone(await self.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
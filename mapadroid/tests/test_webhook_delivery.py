@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+from typing import Dict, List
+from unittest import mock
+
+from aiohttp import web
+from orjson import orjson
+
+from mapadroid.webhook.WebhookDelivery import WebhookDelivery
+from mapadroid.webhook.WebhookReceiver import WebhookReceiver
+from mapadroid.webhook.WebhookRoutingIndex import WebhookRoutingIndex
+
+
+class TestWebhookDelivery(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.received: Dict[str, List[List[Dict]]] = {"fast": [], "slow": [], "flaky": []}
+        self.release_slow: asyncio.Event = asyncio.Event()
+        self.flaky_failures: int = 1
+
+        async def fast(request: web.Request) -> web.Response:
+            self.received["fast"].append(orjson.loads(await request.read()))
+            return web.Response()
+
+        async def slow(request: web.Request) -> web.Response:
+            await self.release_slow.wait()
+            self.received["slow"].append(orjson.loads(await request.read()))
+            return web.Response()
+
+        async def flaky(request: web.Request) -> web.Response:
+            if self.flaky_failures > 0:
+                self.flaky_failures -= 1
+                return web.Response(status=503)
+            self.received["flaky"].append(orjson.loads(await request.read()))
+            return web.Response()
+
+        app = web.Application()
+        app.router.add_post("/fast", fast)
+        app.router.add_post("/slow", slow)
+        app.router.add_post("/flaky", flaky)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = "http://127.0.0.1:{}".format(self.runner.addresses[0][1])
+        self.receivers: List[WebhookReceiver] = []
+
+    async def asyncTearDown(self) -> None:
+        self.release_slow.set()
+        for receiver in self.receivers:
+            await receiver.stop()
+        await self.runner.cleanup()
+
+    def receiver(self, path: str, sub_types=None, concurrency: int = 1, queue_size: int = 10) -> WebhookReceiver:
+        receiver = WebhookReceiver(self.url + path, sub_types, concurrency=concurrency, queue_size=queue_size,
+                                   retries=2)
+        self.receivers.append(receiver)
+        return receiver
+
+    @staticmethod
+    def delivery(receivers: List[WebhookReceiver], max_payload_size: int) -> WebhookDelivery:
+        return WebhookDelivery(WebhookRoutingIndex(receivers, []), max_payload_size=max_payload_size)
+
+    @staticmethod
+    def payloads(amount: int, payload_type: str = "raid") -> List[Dict]:
+        return [{"type": payload_type, "message": {"gym_id": str(index)}} for index in range(amount)]
+
+    async def test_slow_receiver_does_not_delay_others(self):
+        delivery = self.delivery([self.receiver("/slow"), self.receiver("/fast")], max_payload_size=2)
+        delivery.submit(self.payloads(5))
+        await asyncio.sleep(0.2)
+        self.assertEqual([len(chunk) for chunk in self.received["fast"]], [2, 2, 1])
+        self.assertEqual(self.received["slow"], [])
+        self.release_slow.set()
+        await asyncio.sleep(0.2)
+        self.assertEqual(self.received["slow"], self.received["fast"])
+
+    async def test_payloads_filtered_and_serialized(self):
+        now = datetime.now(timezone.utc)
+        delivery = self.delivery([self.receiver("/fast", ["pokemon", "encounter"])], max_payload_size=0)
+        delivery.submit(self.payloads(3) + [
+            {"type": "pokemon", "message": {"encounter_id": 2 ** 64 - 1, "last_modified": now, "seen_type": "wild"}},
+            {"type": "pokemon", "message": {"encounter_id": 1, "seen_type": "encounter"}}])
+        await asyncio.sleep(0.2)
+        self.assertEqual(self.received["fast"], [[
+            {"type": "pokemon",
+             "message": {"encounter_id": 2 ** 64 - 1, "last_modified": int(now.timestamp()), "seen_type": "wild"}},
+            {"type": "pokemon", "message": {"encounter_id": 1, "seen_type": "encounter"}}]])
+
+    async def test_retry_and_bounded_queue(self):
+        flaky = self.receiver("/flaky")
+        with mock.patch("mapadroid.webhook.WebhookReceiver.WEBHOOK_RETRY_BACKOFF", 0.05):
+            self.delivery([flaky], max_payload_size=0).submit(self.payloads(1))
+            await asyncio.sleep(0.3)
+        # Sent again after the server error
+        self.assertEqual(self.received["flaky"], [self.payloads(1)])
+
+        slow = self.receiver("/slow", queue_size=3)
+        delivery = self.delivery([slow], max_payload_size=1)
+        delivery.submit(self.payloads(2))
+        await asyncio.sleep(0.1)
+        # One chunk is being sent, the oldest chunks queued are dropped
+        delivery.submit(self.payloads(5, "gym"))
+        self.assertEqual(len(slow), 3)
+        self.release_slow.set()
+        await asyncio.sleep(0.2)
+        self.assertEqual([chunk[0]["message"]["gym_id"] for chunk in self.received["slow"]], ["0", "2", "3", "4"])
+
+    async def test_put_waits_for_capacity(self):
+        slow = self.receiver("/slow", queue_size=2)
+        fast = self.receiver("/fast", queue_size=2)
+        delivery = self.delivery([slow, fast], max_payload_size=1)
+        put = asyncio.create_task(delivery.put(self.payloads(6)))
+        await asyncio.sleep(0.1)
+        # One chunk is being sent and two are queued, nothing is dropped
+        self.assertFalse(put.done())
+        self.assertEqual(len(slow), 2)
+        self.release_slow.set()
+        await asyncio.wait_for(put, 1)
+        await asyncio.sleep(0.2)
+        self.assertEqual([chunk[0]["message"]["gym_id"] for chunk in self.received["slow"]],
+                         [str(index) for index in range(6)])
+        self.assertEqual(self.received["fast"], self.received["slow"])
+
+    async def test_sender_survives_unexpected_errors(self):
+        fast = self.receiver("/fast")
+        delivery = self.delivery([fast], max_payload_size=1)
+        with mock.patch.object(fast, "_WebhookReceiver__send", new_callable=mock.AsyncMock,
+                               side_effect=[ValueError("broken"), True]):
+            delivery.submit(self.payloads(2))
+            await asyncio.wait_for(fast._queue.join(), 1)
+        self.assertEqual(len(fast), 0)
+        delivery.submit(self.payloads(1))
+        await asyncio.sleep(0.2)
+        self.assertEqual(self.received["fast"], [self.payloads(1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
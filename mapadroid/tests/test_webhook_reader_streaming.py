@@ -0,0 +1,103 @@
+import unittest
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+from sqlalchemy.dialects import mysql
+
+from mapadroid.db.DbWebhookReader import DbWebhookReader
+from mapadroid.db.helper.PokestopHelper import PokestopHelper
+from mapadroid.db.helper.WeatherHelper import WeatherHelper
+from mapadroid.db.model import Pokestop, PokestopIncident, Weather
+
+
+def build_stop(pokestop_id: str) -> Pokestop:
+    stop = Pokestop()
+    stop.pokestop_id = pokestop_id
+    stop.latitude, stop.longitude = 52.5, 13.4
+    stop.last_updated = datetime.now(timezone.utc)
+    return stop
+
+
+def build_incident(pokestop_id: str, incident_id: str) -> PokestopIncident:
+    incident = PokestopIncident()
+    incident.pokestop_id = pokestop_id
+    incident.incident_id = incident_id
+    incident.character_display = 4
+    return incident
+
+
+class TestWebhookReaderStreaming(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.statements = []
+        self.session = mock.MagicMock()
+        self.session.execute = mock.AsyncMock(side_effect=lambda stmt: self.statements.append(stmt) or mock.MagicMock())
+
+    async def test_weather_read_in_pages(self):
+        cells: List[Weather] = []
+        for cell_id in range(5):
+            weather = Weather()
+            weather.s2_cell_id = str(cell_id)
+            weather.last_updated = datetime.now(timezone.utc)
+            cells.append(weather)
+        calls: List[Tuple[Optional[str], int]] = []
+
+        async def get_changed_since(session, _timestamp, s2_cell_ids=None, after_s2_cell_id=None, limit=None):
+            calls.append((after_s2_cell_id, limit))
+            page = [weather for weather in cells if after_s2_cell_id is None or weather.s2_cell_id > after_s2_cell_id]
+            return page[:limit]
+
+        with mock.patch.object(WeatherHelper, "get_changed_since", side_effect=get_changed_since):
+            pages = [page async for page in DbWebhookReader.stream_weather_changed_since(self.session, 0,
+                                                                                         batch_size=2)]
+        self.assertEqual([[weather["s2_cell_id"] for weather in page] for page in pages],
+                         [["0", "1"], ["2", "3"], ["4"]])
+        self.assertEqual(calls, [(None, 2), ("1", 2), ("3", 2)])
+
+    async def test_incidents_of_stop_not_split(self):
+        rows: List[Tuple[Pokestop, Optional[PokestopIncident]]] = [
+            (build_stop("a"), None),
+            (build_stop("b"), build_incident("b", "1")),
+            (build_stop("b"), build_incident("b", "2")),
+            (build_stop("b"), build_incident("b", "3")),
+            (build_stop("c"), None),
+            (build_stop("d"), build_incident("d", "1"))]
+
+        async def get_changed_since_or_incidents(session, timestamp, pokestop_ids=None, after_incident=None,
+                                                 limit=None):
+            page = rows
+            if after_incident is not None:
+                page = [(stop, incident) for stop, incident in rows
+                        if (stop.pokestop_id, incident.incident_id if incident else "")
+                        > (after_incident[0], after_incident[1] or "")]
+            stops_and_incidents: Dict[Pokestop, List[PokestopIncident]] = {}
+            for stop, incident in page[:limit]:
+                stops_and_incidents.setdefault(stop, [])
+                if incident:
+                    stops_and_incidents[stop].append(incident)
+            return stops_and_incidents
+
+        for batch_size in range(1, 8):
+            with mock.patch.object(PokestopHelper, "get_changed_since_or_incidents",
+                                   side_effect=get_changed_since_or_incidents):
+                stops = [stop async for page in DbWebhookReader.stream_stops_changed_since(
+                    self.session, 0, batch_size=batch_size) for stop in page]
+            self.assertEqual([(stop["pokestop_id"], [incident.incident_id for incident in stop["incidents"]])
+                              for stop in stops],
+                             [("a", []), ("b", ["1", "2", "3"]), ("c", []), ("d", ["1"])], batch_size)
+            self.assertEqual(stops[1]["incident_grunt_type"], 4)
+
+    async def test_keyset_pagination_statement(self):
+        await WeatherHelper.get_changed_since(self.session, 0, after_s2_cell_id="10", limit=100)
+        await PokestopHelper.get_changed_since_or_incidents(self.session, 0, after_incident=("stop", "incident"),
+                                                            limit=100)
+        sql: str = str(self.statements[0].compile(dialect=mysql.dialect()))
+        self.assertIn("weather.s2_cell_id > %s ORDER BY weather.s2_cell_id \n LIMIT %s", sql)
+        sql = str(self.statements[1].compile(dialect=mysql.dialect()))
+        self.assertIn("pokestop.pokestop_id > %s OR pokestop.pokestop_id = %s AND "
+                      "pokestop_incident.incident_id > %s", sql)
+        self.assertIn("ORDER BY pokestop.pokestop_id, pokestop_incident.incident_id", sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
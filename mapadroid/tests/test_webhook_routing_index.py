@@ -0,0 +1,58 @@
+import random
+import unittest
+
+import numpy as np
+
+from mapadroid.geofence.geofenceHelper import GeofenceHelper
+from mapadroid.tests.test_geofence_helper import build_geofence, random_polygon
+from mapadroid.webhook.WebhookReceiver import WebhookReceiver
+from mapadroid.webhook.WebhookRoutingIndex import WebhookRoutingIndex
+
+
+class TestWebhookRoutingIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(1)
+        self.excluded_areas = [
+            GeofenceHelper(build_geofence([random_polygon(rng, 52.5, 13.4, 50, 0.1)]),
+                           build_geofence([random_polygon(rng, 52.5, 13.4, 10, 0.03)]), "city"),
+            GeofenceHelper(build_geofence([[(52.0, 13.0), (52.0, 13.1), (52.1, 13.1), (52.1, 13.0)]]), None,
+                           "square")]
+        points = np.random.default_rng(2)
+        self.lats = points.uniform(51.95, 52.65, 20000).tolist()
+        self.lngs = points.uniform(12.95, 13.55, 20000).tolist()
+
+    @staticmethod
+    def receiver(sub_types=None) -> WebhookReceiver:
+        return WebhookReceiver("http://127.0.0.1/", sub_types, concurrency=1, queue_size=1, retries=0)
+
+    def test_payloads_routed_to_groups(self):
+        receivers = [self.receiver(["raid", "gym"]), self.receiver(), self.receiver(["gym", "raid"]),
+                     self.receiver(["pokemon", "encounter"]), self.receiver(["nearby_stop"])]
+        routing = WebhookRoutingIndex(receivers, [])
+        self.assertEqual(routing.groups, [[receivers[0], receivers[2]], [receivers[1]], [receivers[3]],
+                                          [receivers[4]]])
+        self.assertEqual(routing.route({"type": "raid", "message": {}}), (0, 1))
+        self.assertEqual(routing.route({"type": "weather", "message": {}}), (1,))
+        self.assertEqual(routing.route({"type": "pokemon", "message": {"seen_type": "nearby_stop"}}), (1, 2, 3))
+        for lat, lng in zip(self.lats[:100], self.lngs[:100]):
+            self.assertFalse(routing.is_excluded(lat, lng))
+
+    def test_excluded_cells_match_polygons(self):
+        for cell_size in (0.1, 0.005, 0.001):
+            routing = WebhookRoutingIndex([], self.excluded_areas, cell_size=cell_size)
+            for lat, lng in zip(self.lats, self.lngs):
+                expected = any(gfh.is_coord_inside_include_geofence([lat, lng]) for gfh in self.excluded_areas)
+                self.assertEqual(expected, routing.is_excluded(lat, lng), (cell_size, lat, lng))
+            # Only the coordinates of cells crossed by borders are tested against the polygons
+            states = set(routing._cells.values())
+            self.assertEqual(states, {False, None} if cell_size == 0.1 else {True, False, None})
+
+    def test_area_without_include_geofence(self):
+        unlimited = GeofenceHelper(None, build_geofence([[(52.0, 13.0), (52.0, 13.1), (52.1, 13.1)]]))
+        routing = WebhookRoutingIndex([], [unlimited])
+        self.assertTrue(routing.is_excluded(10.0, 10.0))
+        self.assertFalse(routing.is_excluded(52.01, 13.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import List, Optional
+from unittest import mock
+
+from mapadroid.utils.collections import Location
+from mapadroid.websocket.communicator import Communicator
+from mapadroid.websocket.WebsocketConnectedClientEntry import \
+    WebsocketConnectedClientEntry
+
+
+class FakeConnection:
+    """
+    Replies to the commands like a device after the given delay, binary replies are delivered like the websocket
+    server does (as a view of the frame received)
+    """
+
+    def __init__(self, entry: Optional[WebsocketConnectedClientEntry] = None, delay: float = 0.05,
+                 binary_reply: Optional[bytes] = None):
+        self.entry: Optional[WebsocketConnectedClientEntry] = entry
+        self.open: bool = True
+        self.sent: List[str] = []
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.__delay: float = delay
+        self.__binary_reply: Optional[bytes] = binary_reply
+        self.__tasks: List[asyncio.Task] = []
+
+    async def send(self, message: str) -> None:
+        self.sent.append(message)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.__tasks.append(asyncio.create_task(self.__reply(message)))
+
+    async def __reply(self, message: str) -> None:
+        message_id, command = message.split(";", 1)
+        await asyncio.sleep(self.__delay)
+        self.in_flight -= 1
+        if command.startswith("ignore"):
+            return
+        elif self.__binary_reply is not None:
+            frame: bytes = int(message_id).to_bytes(4, byteorder='big') + self.__binary_reply
+            self.entry.set_message_response(int(message_id), memoryview(frame)[4:])
+        else:
+            self.entry.set_message_response(int(message_id), "OK")
+
+    async def close(self) -> None:
+        self.open = False
+
+
+class TestWebsocketPipeline(unittest.IsolatedAsyncioTestCase):
+    def create_entry(self, connection: FakeConnection, max_in_flight: int = 16) -> WebsocketConnectedClientEntry:
+        entry = WebsocketConnectedClientEntry("test", mock.Mock(), connection, mock.Mock(),
+                                              max_in_flight=max_in_flight)
+        connection.entry = entry
+        return entry
+
+    async def test_batch_replies_awaited_together(self):
+        connection = FakeConnection(delay=0.1)
+        entry = self.create_entry(connection)
+        communicator = Communicator(entry, "test", entry.worker_instance, 5)
+        loop = asyncio.get_running_loop()
+        start: float = loop.time()
+        locations: List[Location] = [Location(0, 0.00001 * leg) for leg in range(11)]
+        self.assertEqual(await communicator.walk_route(locations, 100), ["OK"] * 10)
+        self.assertLess(loop.time() - start, 0.5)
+        self.assertEqual(connection.max_in_flight, 10)
+        self.assertEqual([message.split(";", 1)[1] for message in connection.sent],
+                         ["geo walk {} {} {} {} 100\r\n".format(location_from.lat, location_from.lng,
+                                                                location_to.lat, location_to.lng)
+                          for location_from, location_to in zip(locations, locations[1:])])
+        self.assertEqual(entry.received_messages, {})
+        self.assertEqual(await communicator.walk_route([Location(0, 0)], 100), [])
+
+    async def test_in_flight_limit(self):
+        connection = FakeConnection(delay=0.02)
+        entry = self.create_entry(connection, max_in_flight=3)
+        self.assertEqual(await entry.send_batch_and_wait(["a"] * 5, 5, entry.worker_instance), ["OK"] * 5)
+        self.assertEqual(connection.max_in_flight, 3)
+
+    async def test_commands_not_interleaved(self):
+        connection = FakeConnection(delay=0.02)
+        entry = self.create_entry(connection)
+        replies = await asyncio.gather(entry.send_and_wait("a", 5, entry.worker_instance),
+                                       entry.send_batch_and_wait(["b", "c"], 5, entry.worker_instance),
+                                       entry.send_and_wait("d", 5, "madmin"))
+        self.assertEqual(replies, ["OK", ["OK", "OK"], "OK"])
+        # A command is only sent once the previous one or batch has been replied to
+        self.assertEqual([message.split(";", 1)[1] for message in connection.sent], ["a", "b", "c", "d"])
+        self.assertEqual(connection.max_in_flight, 2)
+
+    async def test_message_ids(self):
+        connection = FakeConnection()
+        entry = self.create_entry(connection)
+        entry.message_id_counter = 99998
+        await entry.send_batch_and_wait(["a", "b", "c"], 5, entry.worker_instance)
+        self.assertEqual([message.split(";", 1)[0] for message in connection.sent], ["99999", "1", "2"])
+
+        # IDs of commands awaiting a reply are skipped
+        entry.message_id_counter = 0
+        entry.received_messages[1] = asyncio.get_running_loop().create_future()
+        await entry.send_and_wait("a", 5, entry.worker_instance)
+        self.assertEqual(connection.sent[-1].split(";", 1)[0], "2")
+
+    async def test_batch_timeout(self):
+        connection = FakeConnection(delay=0.01)
+        entry = self.create_entry(connection, max_in_flight=2)
+        replies = await entry.send_batch_and_wait(["a", "ignore", "b"], 0.2, entry.worker_instance)
+        self.assertEqual(replies, ["OK", None, "OK"])
+        self.assertEqual(entry.fail_counter, 1)
+        self.assertEqual(entry.received_messages, {})
+        # The slot of the command not replied to is freed
+        self.assertEqual(await entry.send_batch_and_wait(["a", "b"], 0.2, entry.worker_instance), ["OK", "OK"])
+        self.assertEqual(entry.fail_counter, 0)
+
+    async def test_binary_reply_stored(self):
+        screenshot: bytes = os.urandom(3 * 1024 * 1024 + 17)
+        connection = FakeConnection(binary_reply=screenshot)
+        entry = self.create_entry(connection)
+        communicator = Communicator(entry, "test", entry.worker_instance, 5)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path: str = os.path.join(temp_dir, "screenshot.jpg")
+            self.assertTrue(await communicator.get_screenshot(path))
+            with open(path, "rb") as fh:
+                self.assertEqual(fh.read(), screenshot)
+        self.assertEqual(await communicator.get_screenshot_data(), screenshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mapadroid.utils.collections import ComputePoolMetrics
+from mapadroid.utils.logging import LoggerEnums, get_logger, init_logging
+from mapadroid.utils.madConstants import (COMPUTE_POOL_LATENCY_SAMPLES,
+                                          COMPUTE_POOL_SHARED_MEMORY_MIN_BYTES)
+from mapadroid.utils.madGlobals import MadGlobals
+
+logger = get_logger(LoggerEnums.system)
+
+
+class _SharedArray:
+    """
+    Reference to a numpy array placed in shared memory by the parent process. Only the name of the segment, shape
+    and dtype are pickled when submitting a job.
+    """
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str):
+        self.name: str = name
+        self.shape: Tuple[int, ...] = shape
+        self.dtype: str = dtype
+
+
+def _init_worker(application_args) -> None:
+    MadGlobals.application_args = application_args
+    if application_args is not None:
+        init_logging(application_args, print_info=False)
+
+
+def _run_job(method: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float]:
+    attached: List[shared_memory.SharedMemory] = []
+
+    def attach(value):
+        if not isinstance(value, _SharedArray):
+            return value
+        segment = shared_memory.SharedMemory(name=value.name)
+        attached.append(segment)
+        # Read-only view, the segment is owned and released by the parent process
+        array = np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf)
+        array.flags.writeable = False
+        return array
+
+    start: float = time.perf_counter()
+    try:
+        result = method(*[attach(arg) for arg in args], **{key: attach(value) for key, value in kwargs.items()})
+        # Results must not reference the segments as those are closed below
+        if attached and isinstance(result, np.ndarray):
+            result = result.copy()
+        return result, time.perf_counter() - start
+    finally:
+        for segment in attached:
+            try:
+                segment.close()
+            except BufferError:
+                logger.warning("Shared array of {} is still referenced", method)
+
+
+class ComputePool:
+    """
+    Process pool shared by CPU heavy route and geofence jobs. The workers are spawned once and reused instead of
+    creating a ProcessPoolExecutor (spawning processes and importing MAD again) for every job.
+    numpy arrays passed as arguments are placed in shared memory rather than being pickled.
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers: int = max_workers
+        self._executor: ProcessPoolExecutor = self.__create_executor()
+        self._pending: int = 0
+        self._completed: int = 0
+        self._failed: int = 0
+        self._latencies: Deque[float] = deque(maxlen=COMPUTE_POOL_LATENCY_SAMPLES)
+        self._runtimes: Deque[float] = deque(maxlen=COMPUTE_POOL_LATENCY_SAMPLES)
+
+    def __create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self._max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(MadGlobals.application_args,))
+
+    def __recreate_executor(self, broken: ProcessPoolExecutor) -> None:
+        # All jobs running in the broken pool fail, the pool is only recreated once
+        if self._executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self.__create_executor()
+
+    async def run(self, method: Callable, *args, **kwargs) -> Any:
+        """
+        Runs method in a worker of the pool. method has to be importable (i.e. defined on module or class level).
+        Returns: The result of method
+        """
+        segments: List[shared_memory.SharedMemory] = []
+        submitted: float = time.perf_counter()
+        self._pending += 1
+        try:
+            job_args = tuple(self.__share(arg, segments) for arg in args)
+            job_kwargs: Dict[str, Any] = {key: self.__share(value, segments) for key, value in kwargs.items()}
+            loop = asyncio.get_running_loop()
+            executor: ProcessPoolExecutor = self._executor
+            try:
+                result, runtime = await loop.run_in_executor(executor, _run_job, method, job_args, job_kwargs)
+            except BrokenProcessPool as e:
+                logger.warning("Broken process pool exception was raised ('{}'), trying to recreate the pool.", e)
+                self.__recreate_executor(executor)
+                result, runtime = await loop.run_in_executor(self._executor, _run_job, method, job_args,
+                                                             job_kwargs)
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+        latency: float = time.perf_counter() - submitted
+        self._completed += 1
+        self._latencies.append(latency)
+        self._runtimes.append(runtime)
+        logger.debug2("Compute job {} took {:.3f}s ({:.3f}s running)", getattr(method, "__qualname__", method),
+                      latency, runtime)
+        return result
+
+    @staticmethod
+    def __share(value, segments: List[shared_memory.SharedMemory]):
+        if (not isinstance(value, np.ndarray) or value.nbytes < COMPUTE_POOL_SHARED_MEMORY_MIN_BYTES
+                or value.dtype.hasobject):
+            return value
+        segment = shared_memory.SharedMemory(create=True, size=value.nbytes)
+        segments.append(segment)
+        shared = np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf)
+        shared[...] = value
+        del shared
+        return _SharedArray(segment.name, value.shape, value.dtype.str)
+
+    def get_metrics(self) -> ComputePoolMetrics:
+        latencies: List[float] = list(self._latencies)
+        runtimes: List[float] = list(self._runtimes)
+        return ComputePoolMetrics(
+            workers=self._max_workers,
+            running=min(self._pending, self._max_workers),
+            queued=max(0, self._pending - self._max_workers),
+            completed=self._completed,
+            failed=self._failed,
+            avg_latency=sum(latencies) / len(latencies) if latencies else 0.0,
+            max_latency=max(latencies) if latencies else 0.0,
+            avg_runtime=sum(runtimes) / len(runtimes) if runtimes else 0.0)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_compute_pool: Optional[ComputePool] = None
+
+
+def get_compute_pool() -> ComputePool:
+    """
+    Returns: The compute pool of this process, started with compute_pool_workers workers on first use
+    """
+    global _compute_pool
+    if _compute_pool is None:
+        max_workers: Optional[int] = None
+        if MadGlobals.application_args is not None:
+            max_workers = MadGlobals.application_args.compute_pool_workers
+        if not max_workers:
+            max_workers = max(1, min(4, os.cpu_count() or 1))
+        logger.info("Starting compute pool with {} workers", max_workers)
+        _compute_pool = ComputePool(max_workers)
+    return _compute_pool
+
+
+def get_running_compute_pool() -> Optional[ComputePool]:
+    """
+    Returns: The compute pool of this process if it has been started already, None otherwise
+    """
+    return _compute_pool
+
+
+def shutdown_compute_pool() -> None:
+    global _compute_pool
+    if _compute_pool is not None:
+        _compute_pool.shutdown()
+        _compute_pool = None
@@ -1,3 +1,5 @@
 from typing import Union
 
 MessageTyping = Union[str, bytes]
+# Replies as received by the websocket server, binary replies are views of the frames received
+ResponseTyping = Union[str, memoryview]
@@ -2,17 +2,22 @@ import asyncio
 import calendar
 import datetime
 import os
+from typing import Callable, Dict, Optional, Tuple
 
 import psutil
 
 from mapadroid.db.helper.TrsUsageHelper import TrsUsageHelper
+from mapadroid.utils.collections import (ComputePoolMetrics,
+                                         ScreenClassifierMetrics)
+from mapadroid.utils.ComputePool import ComputePool, get_running_compute_pool
 from mapadroid.utils.logging import LoggerEnums, get_logger
 from mapadroid.utils.madGlobals import MadGlobals, terminate_mad
 
 logger = get_logger(LoggerEnums.system)
 
 
-async def get_system_infos(db_wrapper):
+async def get_system_infos(db_wrapper,
+                           screen_classifier_metrics: Optional[Callable[[], ScreenClassifierMetrics]] = None):
     pid = os.getpid()
     process_running = psutil.Process(pid)
     await asyncio.sleep(60)
@@ -27,6 +32,24 @@ async def get_system_infos(db_wrapper):
         async with db_wrapper as session, session:
             await TrsUsageHelper.add(session, MadGlobals.application_args.status_name, cpu_usage, mem_usage, 0, unixnow)
             await session.commit()
+        compute_pool: Optional[ComputePool] = get_running_compute_pool()
+        if compute_pool:
+            metrics: ComputePoolMetrics = compute_pool.get_metrics()
+            logger.info("Compute pool: {} of {} workers busy, {} jobs queued, {} completed ({} failed), "
+                        "latency avg {:.2f}s max {:.2f}s, runtime avg {:.2f}s", metrics.running, metrics.workers,
+                        metrics.queued, metrics.completed, metrics.failed, metrics.avg_latency, metrics.max_latency,
+                        metrics.avg_runtime)
+        fort_cache_stats: Dict[str, Tuple[int, int]] = db_wrapper.proto_submit.get_fort_cache_stats()
+        if any(hits or misses for hits, misses in fort_cache_stats.values()):
+            logger.info("Fort fingerprint cache: {}", ", ".join(
+                "{} {}s unchanged, {} written".format(hits, fort_type, misses)
+                for fort_type, (hits, misses) in fort_cache_stats.items()))
+        if screen_classifier_metrics:
+            classifier_metrics: ScreenClassifierMetrics = screen_classifier_metrics()
+            logger.info("Screen classifier: {} of {} screens classified by {} templates (hit rate {:.1%}), "
+                        "latency avg {:.1f}ms max {:.1f}ms", classifier_metrics.hits, classifier_metrics.classified,
+                        classifier_metrics.templates, classifier_metrics.hit_rate,
+                        classifier_metrics.avg_latency * 1000, classifier_metrics.max_latency * 1000)
         await asyncio.sleep(MadGlobals.application_args.statistic_interval)
 
 
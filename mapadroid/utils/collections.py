@@ -34,6 +34,20 @@ class Location:
 
 Relation = collections.namedtuple(
     'Relation', ['other_event', 'distance', 'timedelta'])
+SpawnpointState = collections.namedtuple(
+    'SpawnpointState', ['spawndef', 'eventid', 'earliest_unseen', 'calc_endminsec'])
+ComputePoolMetrics = collections.namedtuple(
+    'ComputePoolMetrics', ['workers', 'running', 'queued', 'completed', 'failed', 'avg_latency', 'max_latency',
+                           'avg_runtime'])
+StatsFlushMetrics = collections.namedtuple(
+    'StatsFlushMetrics', ['flushes', 'failed', 'last_rows', 'last_duration', 'avg_duration', 'max_duration'])
+WebhookChunk = collections.namedtuple('WebhookChunk', ['data', 'stats', 'number', 'total'])
 ScreenCoordinates = collections.namedtuple('ScreenCoordinates', ['x', 'y'])
+# Encoded screenshot handed to the OCR processes in a block of shared memory
+SharedFrame = collections.namedtuple('SharedFrame', ['name', 'size'])
+ScreenClassifierMetrics = collections.namedtuple(
+    'ScreenClassifierMetrics', ['templates', 'classified', 'hits', 'hit_rate', 'avg_latency', 'max_latency'])
+# Serialized objects of a layer of the map of madmin located in a tile, version is a hash of data
+MapTile = collections.namedtuple('MapTile', ['counter', 'version', 'data'])
 Login_PTC = collections.namedtuple('PTC', ['username', 'password'])
 Login_GGL = collections.namedtuple('GGL', ['username'])
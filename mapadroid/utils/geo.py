@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from mapadroid.utils.collections import Location
 
 
@@ -57,3 +59,22 @@ def get_middle_of_coord_list(list_of_coords) -> Location:
     central_lat = math.atan2(coord_z, central_square_root)
 
     return Location(math.degrees(central_lat), math.degrees(central_lng))
+
+
+def get_unit_vectors(coordinates: np.ndarray) -> np.ndarray:
+    """
+    Transforms an array of shape (n, 2) of lat, lng (degrees) to cartesian vectors on the unit sphere.
+    The chord length between those vectors is monotonic to the great circle distance, i.e. spatial indexes built on
+    the vectors yield the nearest neighbours in terms of haversine distance.
+    """
+    lat = np.radians(coordinates[:, 0])
+    lng = np.radians(coordinates[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def get_chord_of_distance(distance_in_meters: float, earth_radius_in_meters: float = 6373000.0) -> float:
+    """
+    Chord length on the unit sphere of a great circle distance, see get_unit_vectors
+    """
+    return 2 * math.sin(min(distance_in_meters / (2 * earth_radius_in_meters), math.pi / 2))
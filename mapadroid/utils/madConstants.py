@@ -13,6 +13,14 @@ SECONDS_BEFORE_ARRIVAL_OF_WALK_BUFFER = 10
 STOP_SPIN_DISTANCE = 80
 
 # Parameters of routemanagers
+# Incremental mon spawn prioQs reread every spawnpoint of the area at this interval to catch removed or converted
+# spawnpoints. In between only spawnpoints changed since the last update (minus the overlap) are read.
+PRIOQ_SPAWN_FULL_SYNC_INTERVAL = 3600
+PRIOQ_SPAWN_DELTA_OVERLAP = 300
+# numpy arrays of at least this size are passed to jobs of the compute pool using shared memory
+COMPUTE_POOL_SHARED_MEMORY_MIN_BYTES = 65536
+# Amount of finished compute jobs the latency metrics are calculated of
+COMPUTE_POOL_LATENCY_SAMPLES = 100
 
 
 # Redis caching time.
@@ -25,3 +33,96 @@ REDIS_CACHETIME_CELLS = 60
 REDIS_CACHETIME_WEATHER = 900
 REDIS_CACHETIME_POKESTOP_DATA = 900
 REDIS_CACHETIME_ROUTE = 900
+
+# In-process caches of DbPogoProtoSubmit
+SPAWNPOINT_CACHE_SIZE = 250000
+# Spawnpoints are rewritten (including last_scanned) at the latest once their cached state expired
+SPAWNPOINT_CACHE_TTL = 900
+CURRENT_EVENT_CACHE_TTL = 60
+# Locations of the stops seen in GMOs, used to invalidate the map tiles of quests without querying the stop
+STOP_LOCATION_CACHE_SIZE = 100000
+STOP_LOCATION_CACHE_TTL = 3600
+
+# Maximum amount of MITM data queued up for each data processing process
+MITM_DATA_PROCESS_QUEUE_SIZE = 200
+
+# Maximum time a worker waits for a notification before checking its own state (stop, mappings) again. Also bounds
+# the delay of data missed by notifications, e.g. received in the same second as data already checked.
+MITM_WAIT_FOR_LATEST_MAX_BLOCK = 5
+
+# In-process cache of per-worker scalars (level, location, injection status) of the RedisMitmMapper. Entries are
+# invalidated through redis pubsub, the TTL bounds the staleness in case invalidations are missed.
+MITM_MAPPER_LOCAL_CACHE_SIZE = 10000
+MITM_MAPPER_LOCAL_CACHE_TTL = 30
+
+# Maximum amount of rows of stats written by a single (multi-row) statement
+STATS_SUBMIT_CHUNK_SIZE = 1000
+# Amount of stats submissions the duration metrics are calculated of
+STATS_FLUSH_DURATION_SAMPLES = 12
+
+# Changes written by the data processors are announced to the webhook worker through a redis stream
+WEBHOOK_CHANGE_FEED_KEY = "webhook_changes"
+# Seconds the entries are (approximately) kept in the stream, the webhook worker falls back to polling the DB if it
+# did not read the entries in time
+WEBHOOK_CHANGE_FEED_RETENTION = 300
+WEBHOOK_CHANGE_FEED_READ_COUNT = 500
+# Maximum amount of distinct changes held by a data processor between two flushes
+WEBHOOK_CHANGE_OUTBOX_SIZE = 100000
+WEBHOOK_CHANGE_OUTBOX_FLUSH_INTERVAL = 1
+
+# Timeout of a single request sent to a webhook receiver
+WEBHOOK_REQUEST_TIMEOUT = 5
+# Seconds waited before retrying to send a payload, doubled with every attempt
+WEBHOOK_RETRY_BACKOFF = 1
+WEBHOOK_RETRY_BACKOFF_MAX = 30
+
+# Size (in degrees) of the cells of the grid coordinates are looked up by to check whether they are located in an area
+# excluded from webhooks and the maximum amount of cells classified kept
+WEBHOOK_ROUTING_CELL_SIZE = 0.005
+WEBHOOK_ROUTING_CELL_CACHE_SIZE = 100000
+
+# Maximum amount of rows read by the webhook worker at once (and payloads sent per request if the payload size is not
+# limited)
+WEBHOOK_READ_BATCH_SIZE = 1000
+
+# Screenshots are handed to the OCR processes in slots of shared memory (per OCR process), larger screenshots are
+# pickled instead
+OCR_SHARED_FRAME_SLOTS_PER_PROCESS = 2
+OCR_SHARED_FRAME_SIZE = 16 * 1024 * 1024
+# Results of OCR are cached by a perceptual hash of the screenshot (grid of OCR_CACHE_HASH_SIZE^2 gradients, changes
+# of brightness up to OCR_CACHE_HASH_DEAD_ZONE are considered flat). Screenshots of the same size with hashes differing
+# by up to OCR_CACHE_HASH_TOLERANCE bits are considered identical.
+OCR_CACHE_SIZE = 256
+OCR_CACHE_HASH_SIZE = 64
+OCR_CACHE_HASH_DEAD_ZONE = 10
+OCR_CACHE_HASH_TOLERANCE = 3
+
+# Screenshots are classified by comparing a fingerprint (downscaled grayscale copy of SCREEN_FINGERPRINT_SIZE) to the
+# screens of the same resolution identified by OCR before, a correlation of at least SCREEN_CLASSIFIER_THRESHOLD is
+# considered a match
+SCREEN_FINGERPRINT_SIZE = (54, 96)
+SCREEN_CLASSIFIER_THRESHOLD = 0.99
+# Maximum amount of screens kept as templates per resolution
+SCREEN_CLASSIFIER_MAX_TEMPLATES = 32
+# Amount of classifications the latency metrics are calculated of
+SCREEN_CLASSIFIER_LATENCY_SAMPLES = 100
+
+# Maximum amount of commands of a batch awaiting a reply per websocket connection (further commands wait for a slot)
+WEBSOCKET_MAX_IN_FLIGHT_COMMANDS = 16
+# Message IDs are handed out in the range of 1 to WEBSOCKET_MAX_MESSAGE_ID (inclusive)
+WEBSOCKET_MAX_MESSAGE_ID = 99999
+# Binary replies (screenshots, logcat) are written to files in chunks of the given size rather than copied at once
+WEBSOCKET_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Objects shown on the map of madmin are served in slippy map tiles of the given zoom. Data processors count the
+# writes per tile and layer in redis (hashes of MAP_TILE_VERSIONS_KEY), the counters are incremented every
+# MAP_TILE_VERSIONS_FLUSH_INTERVAL seconds.
+MAP_TILE_ZOOM = 13
+MAP_TILE_VERSIONS_KEY = "map_tile_versions:{}"
+MAP_TILE_VERSIONS_FLUSH_INTERVAL = 2
+# Maximum amount of tiles serialized by madmin kept in memory and seconds a tile is served without being read again
+# even if it was not written to (e.g. mons despawning)
+MAP_TILE_CACHE_SIZE = 2048
+MAP_TILE_CACHE_TTL = 60
+# Maximum amount of tiles requested at once, larger viewports have to be loaded by the rectangle
+MAP_TILE_MAX_TILES_PER_REQUEST = 256
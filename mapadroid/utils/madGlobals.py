@@ -81,6 +81,7 @@ class TeamColours(Enum):
 class RoutecalculationTypes(Enum):
     TSP_QUICK = 0,
     OR_TOOLS = 1
+    CHRISTOFIDES = 2
 
 
 class MonSeenTypes(IntEnum):
@@ -0,0 +1,150 @@
+import asyncio
+import math
+from asyncio import Task
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from redis import Redis
+
+from mapadroid.utils.collections import Location
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import (MAP_TILE_VERSIONS_FLUSH_INTERVAL,
+                                          MAP_TILE_VERSIONS_KEY, MAP_TILE_ZOOM)
+
+logger = get_logger(LoggerEnums.database)
+
+# Latitudes covered by web mercator tiles
+_MAX_LATITUDE = 85.0511287798
+
+# Coordinates of exactly 0.0 are not considered by the helpers of the DB, rectangles are thus extended slightly
+_PADDING = 1e-9
+
+TileKey = str
+T = TypeVar("T")
+
+
+class MapTileLayer(Enum):
+    mons = "mons"
+    spawns = "spawns"
+    stops = "stops"
+    gyms = "gyms"
+    quests = "quests"
+
+
+def tile_of(lat: float, lng: float, zoom: int = MAP_TILE_ZOOM) -> Tuple[int, int]:
+    """
+    Returns: x and y of the slippy map tile of the given zoom the coordinate is located in
+    """
+    tiles: int = 2 ** zoom
+    lat = max(-_MAX_LATITUDE, min(_MAX_LATITUDE, lat))
+    tile_x: int = int((lng + 180.0) / 360.0 * tiles)
+    tile_y: int = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * tiles)
+    return min(max(tile_x, 0), tiles - 1), min(max(tile_y, 0), tiles - 1)
+
+
+def tile_key(tile_x: int, tile_y: int) -> TileKey:
+    return "{}/{}".format(tile_x, tile_y)
+
+
+def parse_tile_key(key: TileKey) -> Tuple[int, int]:
+    tile_x, tile_y = key.split("/", 1)
+    return int(tile_x), int(tile_y)
+
+
+def tile_bounds(tile_x: int, tile_y: int, zoom: int = MAP_TILE_ZOOM) -> Tuple[Location, Location]:
+    """
+    Returns: north-east and south-west corner of the tile
+    """
+    tiles: int = 2 ** zoom
+    north: float = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / tiles))))
+    south: float = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (tile_y + 1) / tiles))))
+    return Location(north, (tile_x + 1) / tiles * 360.0 - 180.0), Location(south, tile_x / tiles * 360.0 - 180.0)
+
+
+def tiles_in_rectangle(ne_corner: Location, sw_corner: Location, zoom: int = MAP_TILE_ZOOM) -> List[TileKey]:
+    max_x, min_y = tile_of(ne_corner.lat, ne_corner.lng, zoom)
+    min_x, max_y = tile_of(sw_corner.lat, sw_corner.lng, zoom)
+    return [tile_key(tile_x, tile_y) for tile_x in range(min_x, max_x + 1) for tile_y in range(min_y, max_y + 1)]
+
+
+def rectangle_of_tiles(tiles: Iterable[TileKey], zoom: int = MAP_TILE_ZOOM) -> Tuple[Location, Location]:
+    """
+    Returns: north-east and south-west corner of the smallest rectangle covering all the tiles given
+    """
+    corners: List[Tuple[Location, Location]] = [tile_bounds(*parse_tile_key(tile), zoom) for tile in tiles]
+    return (Location(max(ne.lat for ne, _ in corners) + _PADDING, max(ne.lng for ne, _ in corners) + _PADDING),
+            Location(min(sw.lat for _, sw in corners) - _PADDING, min(sw.lng for _, sw in corners) - _PADDING))
+
+
+def group_by_tile(items: Iterable[T], coordinates: Callable[[T], Tuple[float, float]],
+                  zoom: int = MAP_TILE_ZOOM) -> Dict[TileKey, List[T]]:
+    grouped: Dict[TileKey, List[T]] = {}
+    for item in items:
+        lat, lng = coordinates(item)
+        grouped.setdefault(tile_key(*tile_of(float(lat), float(lng), zoom)), []).append(item)
+    return grouped
+
+
+class MapTileVersions:
+    """
+    Counts the writes to the tiles of the layers of the map in redis. A data processing process records the
+    coordinates of the entities written, the counters of the tiles touched are incremented every flush_interval
+    seconds. Tiles are incremented again with the next flush as the writes are recorded before the transactions of
+    the data processors have been committed, a tile read in between is thus invalidated once more.
+    """
+
+    def __init__(self, cache: Redis, flush_interval: float = MAP_TILE_VERSIONS_FLUSH_INTERVAL):
+        self._cache: Redis = cache
+        self._flush_interval: float = flush_interval
+        self._touched: Dict[MapTileLayer, Set[TileKey]] = {}
+        self._flushed: Dict[MapTileLayer, Set[TileKey]] = {}
+        self._flush_task: Optional[Task] = None
+
+    def record(self, layer: MapTileLayer, lat: Optional[float], lng: Optional[float]) -> None:
+        if lat is None or lng is None:
+            return
+        self._touched.setdefault(layer, set()).add(tile_key(*tile_of(float(lat), float(lng))))
+        if not self._flush_task:
+            loop = asyncio.get_running_loop()
+            self._flush_task = loop.create_task(self.__flush_periodically())
+
+    async def __flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Returns: amount of tile counters incremented
+        """
+        touched, self._touched = self._touched, {}
+        to_increment: Dict[MapTileLayer, Set[TileKey]] = {
+            layer: tiles | self._flushed.get(layer, set()) for layer, tiles in touched.items()}
+        for layer, tiles in self._flushed.items():
+            to_increment.setdefault(layer, tiles)
+        if not to_increment:
+            return 0
+        try:
+            async with self._cache.pipeline(transaction=False) as pipe:
+                for layer, tiles in to_increment.items():
+                    for tile in tiles:
+                        pipe.hincrby(MAP_TILE_VERSIONS_KEY.format(layer.value), tile, 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Failed incrementing the versions of tiles of the map: {}", e)
+            # Incremented with the next flush
+            for layer, tiles in touched.items():
+                self._touched.setdefault(layer, set()).update(tiles)
+            return 0
+        self._flushed = touched
+        return sum(len(tiles) for tiles in to_increment.values())
+
+    @staticmethod
+    async def get(cache: Redis, layer: MapTileLayer, tiles: List[TileKey]) -> List[int]:
+        """
+        Returns: the counters of the tiles given, 0 for tiles never written to
+        """
+        if not tiles:
+            return []
+        counters: List[Optional[bytes]] = await cache.hmget(MAP_TILE_VERSIONS_KEY.format(layer.value), tiles)
+        return [int(counter) if counter is not None else 0 for counter in counters]
@@ -88,12 +88,27 @@ def parse_args():
                         help='Port to listen on for proto data (MITM data). Default: 8000')
     parser.add_argument('-mrdw', '--mitmreceiver_data_workers', type=int, default=2,
                         help='Amount of workers to work off the data that queues up. Default: 2')
+    parser.add_argument('-mrdp', '--mitmreceiver_data_processes', type=int, default=0,
+                        help='Amount of processes to work off the data that queues up. Each process runs '
+                             'mitmreceiver_data_workers workers and uses its own DB pool. Data of a device is always '
+                             'handled by the same process. Requires mitmmapper_type grpc or redis. '
+                             'Default: 0 (process data in the process of the MITMReceiver)')
+    parser.add_argument('-mrgbs', '--mitmreceiver_gmo_batch_size', type=int, default=1,
+                        help='Maximum amount of queued items a data worker drains at once. GMOs of a batch are '
+                             'merged and written in a single transaction per table. Default: 1 (no batching)')
+    parser.add_argument('-mrgbl', '--mitmreceiver_gmo_batch_latency', type=int, default=100,
+                        help='Maximum time in milliseconds a data worker waits for further items to fill a batch. '
+                             'Only used if mitmreceiver_gmo_batch_size is greater than 1. Default: 100')
     parser.add_argument('-miptt', '--mitm_ignore_proc_time_thresh', type=int, default=0,
                         help='Ignore MITM data having a timestamp too far in the past.'
                              'Specify in seconds. Default: 0 (off)')
     parser.add_argument('-mipb', '--mitm_ignore_pre_boot', type=bool,
                         action=argparse.BooleanOptionalAction,
                         help='Ignore MITM data having a timestamp pre MAD\'s startup time')
+    parser.add_argument('-mlfp', '--mitm_latest_full_payload', type=bool, default=False,
+                        action=argparse.BooleanOptionalAction,
+                        help='Keep the full payload of the protos received as latest data of workers instead of a '
+                             'summary of the data evaluated by workers. Default: False')
     parser.add_argument('-mspass', '--mitm_status_password', default='',
                         help='Header Authorization password for MITM /status/ page')
     parser.add_argument('-mitmus', '--mitm_unix_socket', required=False, default=None, type=str,
@@ -145,6 +160,15 @@ def parse_args():
     parser.add_argument('-statshcomp', '--statshandler_compression', type=bool,
                         action=argparse.BooleanOptionalAction,
                         help='Enable compression of data of the StatsHandler gRPC communication. Default: False')
+    parser.add_argument('-grpcbs', '--grpc_batch_size', required=False, default=100, type=int,
+                        help='Maximum amount of stats and MitmMapper updates submitted to the StatsHandler/MitmMapper '
+                             'gRPC APIs in one request. 0 or 1 submits every update on its own. Default: 100')
+    parser.add_argument('-grpcbl', '--grpc_batch_latency', required=False, default=0.05, type=float,
+                        help='Maximum time in seconds (floating point) updates are buffered before being submitted to '
+                             'the StatsHandler/MitmMapper gRPC APIs. Default: 0.05')
+    parser.add_argument('-grpcbb', '--grpc_batch_buffer', required=False, default=10000, type=int,
+                        help='Maximum amount of updates buffered for the StatsHandler/MitmMapper gRPC APIs each. '
+                             'The oldest updates are dropped once exceeded. Default: 10000')
 
     # Walk Settings
     parser.add_argument('--enable_worker_specific_extra_start_stop_handling', default=False,
@@ -172,7 +196,11 @@ def parse_args():
     parser.add_argument('-os', '--only_scan', action='store_true', default=True,
                         help='Use this instance only for scanning')
     parser.add_argument('-otc', '--ocr_thread_count', type=int, default=2,
-                        help='Amount of threads/processes to be used for screenshot-analysis. Default: 2')
+                        help='Amount of processes to be used for screenshot-analysis. The processes load tesseract '
+                             'once if tesserocr is installed. Default: 2')
+    parser.add_argument('-cpw', '--compute_pool_workers', type=int, default=None,
+                        help='Amount of processes of the pool running route calculations and clustering. '
+                             'Default: amount of CPUs, at most 4')
     parser.add_argument('-otl', '--omp_thread_limit', type=int, default=None,
                         help='Set the environment variable OMP_THREAD_LIMIT. This does not default, i.e., '
                              'it is not set at all. Some environments apparently require limitation to 1')
@@ -190,6 +218,9 @@ def parse_args():
                         help='The default despawn time left in minutes for Nearby Mons. Default: 15')
     parser.add_argument('-dut', '--default_unknown_timeleft', type=int, default=3,
                         help='The default despawn time left in minutes for Mons at unknown Spawnpoints. Default: 3')
+    parser.add_argument('-pqis', '--prioq_incremental_spawns', action='store_true', default=False,
+                        help='Keep the spawnpoints of mon areas in memory and only read changed spawnpoints when '
+                             'updating the prioQ. Default: False')
     parser.add_argument("-sn", "--status-name", default="mad",
                         help=("Enable status page database update using"
                               " STATUS_NAME as main worker name."))
@@ -224,8 +255,8 @@ def parse_args():
     parser.add_argument('--no_quest_titles', default=False, action='store_true',
                         help='Do not download quest title resources')
     parser.add_argument('-wfdsd', '--wait_for_data_sleep_duration', default='1.0', type=float,
-                        help=('Time in seconds (floating point) to sleep inbetween checks of data in workers. '
-                              'Default: 1.0'))
+                        help=('Time in seconds (floating point) to sleep inbetween checks of data in workers if '
+                              'the MitmMapper does not notify of new data. Default: 1.0'))
 
     # MADmin
     parser.add_argument('-dm', '--disable_madmin', action='store_true', default=False,
@@ -304,9 +335,23 @@ def parse_args():
     parser.add_argument('-whst', '--webhook_start_time', default=0,
                         help='Debug: Set initial timestamp to fetch changed elements from the DB to send via WH.')
     parser.add_argument('-whmps', '--webhook_max_payload_size', default=0, type=int,
-                        help='Split up the payload into chunks and send multiple requests. Default: 0 (unlimited)')
+                        help='Split up the payload into chunks and send multiple requests. Default: 0 (unlimited, '
+                             'payloads are read and sent in chunks of up to 1000 nonetheless)')
     parser.add_argument('-whwi', '--webhook_worker_interval', default=10, type=int,
                         help='Send webhook every X seconds (Default: 10 [seconds])')
+    parser.add_argument('-whc', '--webhook_concurrency', default=2, type=int,
+                        help='Maximum amount of requests sent to a single webhook receiver at the same time '
+                             '(Default: 2)')
+    parser.add_argument('-whqs', '--webhook_queue_size', default=100, type=int,
+                        help='Maximum amount of payloads queued for a single webhook receiver. The oldest payloads are '
+                             'dropped if a receiver does not keep up with the changes announced, polling the DB waits '
+                             'for the receivers instead (Default: 100)')
+    parser.add_argument('-whr', '--webhook_retries', default=3, type=int,
+                        help='Amount of retries of payloads failed to be sent due to connection errors or server '
+                             'errors, waiting 1, 2, 4, ... seconds in between (Default: 3)')
+    parser.add_argument('-whdcf', '--webhook_disable_change_feed', action='store_true', default=False,
+                        help='Poll the DB for all data changed within the last intervals rather than only reading the '
+                             'data announced by the MITM data processors (Default: False)')
 
     # Dynamic Rarity
     parser.add_argument('-rh', '--rarity_hours', type=int, default=72,
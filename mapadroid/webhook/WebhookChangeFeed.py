@@ -0,0 +1,192 @@
+import asyncio
+import time
+from asyncio import Task
+from enum import Enum
+from typing import Dict, List, Optional, Tuple, Union
+
+from orjson import orjson
+from redis import Redis
+
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import (WEBHOOK_CHANGE_FEED_KEY,
+                                          WEBHOOK_CHANGE_FEED_READ_COUNT,
+                                          WEBHOOK_CHANGE_FEED_RETENTION,
+                                          WEBHOOK_CHANGE_OUTBOX_FLUSH_INTERVAL,
+                                          WEBHOOK_CHANGE_OUTBOX_SIZE)
+
+logger = get_logger(LoggerEnums.webhook)
+
+EntityId = Union[int, str]
+
+
+class WebhookChangeType(Enum):
+    pokemon = "pokemon"
+    raid = "raid"
+    gym = "gym"
+    pokestop = "pokestop"
+    quest = "quest"
+    weather = "weather"
+
+
+class WebhookChangeOutbox:
+    """
+    Collects the IDs of entities written to the DB by a data processing process in order to announce them to the
+    webhook worker. Changes are deduplicated by type and entity ID, only the most recent version (epoch seconds of the
+    change) is kept. Every flush_interval seconds the changes collected are appended to a redis stream as a single
+    entry. At most max_size changes are held, further changes are dropped and the entry is flagged as overflowed to
+    have the webhook worker fall back to polling the DB.
+    """
+
+    def __init__(self, cache: Redis, max_size: int = WEBHOOK_CHANGE_OUTBOX_SIZE,
+                 flush_interval: float = WEBHOOK_CHANGE_OUTBOX_FLUSH_INTERVAL):
+        self._cache: Redis = cache
+        self._max_size: int = max_size
+        self._flush_interval: float = flush_interval
+        self._changes: Dict[Tuple[WebhookChangeType, EntityId], int] = {}
+        self._overflowed: bool = False
+        self._flush_task: Optional[Task] = None
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def record(self, change_type: WebhookChangeType, entity_id: EntityId, version: Union[int, float]) -> None:
+        key: Tuple[WebhookChangeType, EntityId] = (change_type, entity_id)
+        version = int(version)
+        known_version: Optional[int] = self._changes.get(key)
+        if known_version is None:
+            if len(self._changes) >= self._max_size:
+                self._overflowed = True
+                return
+            self._changes[key] = version
+        elif known_version < version:
+            self._changes[key] = version
+        if not self._flush_task:
+            loop = asyncio.get_running_loop()
+            self._flush_task = loop.create_task(self.__flush_periodically())
+
+    async def __flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Appends the changes collected to the stream
+
+        Returns: amount of changes appended
+        """
+        if not self._changes and not self._overflowed:
+            return 0
+        changes, self._changes = self._changes, {}
+        overflowed, self._overflowed = self._overflowed, False
+        entry: Dict[str, bytes] = {
+            "changes": orjson.dumps([(change_type.value, entity_id, version)
+                                     for (change_type, entity_id), version in changes.items()])
+        }
+        if overflowed:
+            logger.warning("More than {} changes to be announced to the webhook worker, dropped changes",
+                           self._max_size)
+            entry["overflow"] = b"1"
+        try:
+            await self._cache.xadd(WEBHOOK_CHANGE_FEED_KEY, entry,
+                                   minid=int((time.time() - WEBHOOK_CHANGE_FEED_RETENTION) * 1000),
+                                   approximate=True)
+        except Exception as e:
+            # The webhook worker detects the gap based on the flag of the next entry
+            logger.warning("Failed announcing {} changes to the webhook worker: {}", len(changes), e)
+            self._overflowed = True
+            return 0
+        return len(changes)
+
+
+class WebhookChangeFeedReader:
+    """
+    Reads the changes announced by the WebhookChangeOutbox of all data processing processes. Changes are recorded
+    once the transactions of the data processors have been committed, the entities are readable from the DB.
+    """
+
+    def __init__(self, cache: Redis):
+        self._cache: Redis = cache
+        self._last_id: Optional[str] = None
+
+    async def read(self) -> Optional[Dict[WebhookChangeType, Dict[EntityId, int]]]:
+        """
+        Returns: Dict of the types mapping the IDs of the entities changed since the last read to their most recent
+            version. None if changes may have been missed (initial read, trimmed stream, dropped changes or redis
+            errors), the DB has to be polled in that case.
+        """
+        try:
+            end_id: str = await self.__get_end_id()
+        except Exception as e:
+            logger.warning("Failed reading changes announced to the webhook worker: {}", e)
+            return None
+        if self._last_id is None:
+            self._last_id = end_id
+            return None
+        changes: Dict[WebhookChangeType, Dict[EntityId, int]] = {change_type: {}
+                                                                 for change_type in WebhookChangeType}
+        complete: bool = True
+        try:
+            if await self.__changes_trimmed():
+                logger.warning("Changes announced to the webhook worker have been trimmed before being read")
+                complete = False
+            while True:
+                entries: List[Tuple[bytes, Dict[bytes, bytes]]] = await self._cache.xrange(
+                    WEBHOOK_CHANGE_FEED_KEY, min=self.__next_id(self._last_id), max=end_id,
+                    count=WEBHOOK_CHANGE_FEED_READ_COUNT)
+                for entry_id, fields in entries:
+                    self._last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                    if fields.get(b"overflow"):
+                        complete = False
+                    for change_type, entity_id, version in orjson.loads(fields[b"changes"]):
+                        versions: Dict[EntityId, int] = changes[WebhookChangeType(change_type)]
+                        if versions.get(entity_id, -1) < version:
+                            versions[entity_id] = version
+                if len(entries) < WEBHOOK_CHANGE_FEED_READ_COUNT:
+                    break
+        except Exception as e:
+            logger.warning("Failed reading changes announced to the webhook worker: {}", e)
+            complete = False
+        if not complete:
+            # The DB is polled for all changes up to now, continue reading after the entries read
+            self._last_id = end_id
+            return None
+        return changes
+
+    async def __get_end_id(self) -> str:
+        """
+        Returns: ID of the most recent entry to be read. IDs of entries are based on the clock of the redis server,
+            entries appended after the current millisecond have a greater ID.
+        """
+        seconds, microseconds = await self._cache.time()
+        milliseconds: int = seconds * 1000 + microseconds // 1000 - 1
+        return "{}-{}".format(milliseconds, 2 ** 64 - 1)
+
+    async def __changes_trimmed(self) -> bool:
+        try:
+            info: Dict = await self._cache.xinfo_stream(WEBHOOK_CHANGE_FEED_KEY)
+        except Exception as e:
+            if "no such key" in str(e).lower():
+                return False
+            raise e
+        max_deleted_id = info.get("max-deleted-entry-id")
+        if max_deleted_id is not None:
+            return self.__id_key(max_deleted_id) > self.__id_key(self._last_id)
+        # Redis < 7 does not keep track of trimmed entries, the first entry appended after idle periods is
+        # considered a gap as well
+        first_entry = info.get("first-entry")
+        return first_entry is not None and self.__id_key(first_entry[0]) > self.__id_key(self._last_id)
+
+    @staticmethod
+    def __next_id(entry_id: str) -> str:
+        milliseconds, sequence = WebhookChangeFeedReader.__id_key(entry_id)
+        if sequence == 2 ** 64 - 1:
+            return "{}-0".format(milliseconds + 1)
+        return "{}-{}".format(milliseconds, sequence + 1)
+
+    @staticmethod
+    def __id_key(entry_id: Union[bytes, str]) -> Tuple[int, int]:
+        if isinstance(entry_id, bytes):
+            entry_id = entry_id.decode()
+        milliseconds, sequence = entry_id.split("-")
+        return int(milliseconds), int(sequence)
@@ -0,0 +1,83 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from mapadroid.utils.collections import WebhookChunk
+from mapadroid.utils.json_encoder import mad_orjson_dumps
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.webhook.WebhookReceiver import WebhookReceiver
+from mapadroid.webhook.WebhookRoutingIndex import WebhookRoutingIndex
+
+logger = get_logger(LoggerEnums.webhook)
+
+
+class WebhookDelivery:
+    """
+    Hands the payloads of an interval to the receivers without waiting for them to be sent. Every payload is
+    serialized once and bucketed to the groups of receivers accepting it by the routing index, all receivers of a
+    group are handed the same chunks.
+    Payloads submitted replace the oldest ones queued by receivers not keeping up, payloads put wait for the receivers
+    to have capacity instead.
+    """
+
+    def __init__(self, routing: WebhookRoutingIndex, max_payload_size: int):
+        self._routing: WebhookRoutingIndex = routing
+        self._max_payload_size: int = max_payload_size
+
+    def submit(self, payloads: List[Dict]) -> None:
+        for receiver, chunks in self.__route(payloads):
+            receiver.enqueue(chunks)
+
+    async def put(self, payloads: List[Dict]) -> None:
+        await asyncio.gather(*[receiver.put(chunks) for receiver, chunks in self.__route(payloads)])
+
+    def __route(self, payloads: List[Dict]) -> List[Tuple[WebhookReceiver, List[WebhookChunk]]]:
+        """
+        Returns: The receivers to be handed payloads along with their chunks
+        """
+        if len(payloads) == 0:
+            logger.debug2("Payload empty. Skip sending to webhook.")
+            return []
+        serialized: List[Optional[bytes]] = [self.__serialize(payload) for payload in payloads]
+        accepted: List[List[int]] = [[] for _ in self._routing.groups]
+        for index, payload in enumerate(payloads):
+            if serialized[index] is None:
+                continue
+            for group in self._routing.route(payload):
+                accepted[group].append(index)
+        routed: List[Tuple[WebhookReceiver, List[WebhookChunk]]] = []
+        for group, receivers in enumerate(self._routing.groups):
+            chunks: List[WebhookChunk] = self.__build_chunks(payloads, serialized, accepted[group])
+            for receiver in receivers:
+                if not chunks:
+                    logger.debug2("Payload empty. Skip sending to: {} (Filter: {})", receiver.url,
+                                  receiver.sub_types)
+                    continue
+                logger.debug2("Sending to webhook: {} (Filter: {})", receiver.url, receiver.sub_types)
+                routed.append((receiver, chunks))
+        return routed
+
+    @staticmethod
+    def __serialize(payload: Dict) -> Optional[bytes]:
+        try:
+            return mad_orjson_dumps(payload)
+        except TypeError as e:
+            logger.error("Failed serializing {} payload: {}", payload.get("type"), e)
+            return None
+
+    def __build_chunks(self, payloads: List[Dict], serialized: List[Optional[bytes]],
+                       accepted: List[int]) -> List[WebhookChunk]:
+        size: int = self._max_payload_size if self._max_payload_size > 0 else max(1, len(accepted))
+        parts: List[List[int]] = [accepted[start:start + size] for start in range(0, len(accepted), size)]
+        chunks: List[WebhookChunk] = []
+        for number, part in enumerate(parts, start=1):
+            stats: Dict[str, int] = {}
+            for index in part:
+                stats[payloads[index]["type"]] = stats.get(payloads[index]["type"], 0) + 1
+            data: bytes = b"[" + b",".join(serialized[index] for index in part) + b"]"
+            chunks.append(WebhookChunk(data, stats, number, len(parts)))
+        return chunks
+
+    async def stop(self) -> None:
+        for receivers in self._routing.groups:
+            for receiver in receivers:
+                await receiver.stop()
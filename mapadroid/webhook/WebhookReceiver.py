@@ -0,0 +1,125 @@
+import asyncio
+from asyncio import Task
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import ClientError
+
+from mapadroid.utils.collections import WebhookChunk
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import (WEBHOOK_REQUEST_TIMEOUT,
+                                          WEBHOOK_RETRY_BACKOFF,
+                                          WEBHOOK_RETRY_BACKOFF_MAX)
+
+logger = get_logger(LoggerEnums.webhook)
+
+
+class WebhookReceiver:
+    """
+    Sends chunks of payloads to a single webhook URL. Every receiver keeps its own pool of connections alive between
+    intervals and sends up to concurrency chunks at the same time. Chunks are queued until they are sent, at most
+    queue_size chunks are held. Chunks put wait for the queue to have capacity, chunks enqueued replace the oldest ones
+    if the receiver does not keep up.
+    Failed requests are retried with an exponential backoff.
+    """
+
+    def __init__(self, url: str, sub_types: Optional[List[str]], concurrency: int, queue_size: int, retries: int,
+                 timeout: float = WEBHOOK_REQUEST_TIMEOUT):
+        self.url: str = url
+        self.sub_types: Optional[List[str]] = sub_types
+        self._concurrency: int = max(1, concurrency)
+        self._queue_size: int = max(1, queue_size)
+        self._retries: int = max(0, retries)
+        self._timeout: float = timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: List[Task] = []
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def filter_key(self) -> Optional[Tuple[str, ...]]:
+        """
+        Receivers with the same key are sent the same payloads
+        """
+        return tuple(sorted(set(self.sub_types))) if self.sub_types is not None else None
+
+    def accepts(self, payload: Dict) -> bool:
+        return (self.sub_types is None or payload["type"] in self.sub_types
+                or payload["message"].get("seen_type", None) in self.sub_types)
+
+    def enqueue(self, chunks: List[WebhookChunk]) -> None:
+        """
+        Queues the chunks without waiting, the oldest chunks queued are dropped if the queue is full
+        """
+        self.__start_sending()
+        dropped: int = 0
+        for chunk in chunks:
+            if self._queue.full():
+                self._queue.get_nowait()
+                self._queue.task_done()
+                dropped += 1
+            self._queue.put_nowait(chunk)
+        if dropped:
+            logger.warning("Webhook destination {} does not keep up, dropped {} payloads queued", self.url, dropped)
+
+    async def put(self, chunks: List[WebhookChunk]) -> None:
+        """
+        Queues the chunks, waits for chunks to be sent if the queue is full
+        """
+        self.__start_sending()
+        for chunk in chunks:
+            await self._queue.put(chunk)
+
+    def __start_sending(self) -> None:
+        if not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._concurrency),
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+                headers={"Content-Type": "application/json"})
+            self._tasks = [loop.create_task(self.__send_queued()) for _ in range(self._concurrency)]
+
+    async def __send_queued(self) -> None:
+        while True:
+            chunk: WebhookChunk = await self._queue.get()
+            try:
+                await self.__send(chunk)
+            except Exception as e:
+                # The sender must keep running, only the chunk is lost
+                logger.exception("Failed sending payload to webhook {}, dropping it: {}", self.url, e)
+            finally:
+                self._queue.task_done()
+
+    async def __send(self, chunk: WebhookChunk) -> bool:
+        chunk_text = " [pl {}/{}]".format(chunk.number, chunk.total) if chunk.total > 1 else ""
+        logger.debug4("Payload{} for {}: {}", chunk_text, self.url, chunk.data)
+        for attempt in range(self._retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(min(WEBHOOK_RETRY_BACKOFF * 2 ** (attempt - 1), WEBHOOK_RETRY_BACKOFF_MAX))
+            try:
+                async with self._session.post(self.url, data=chunk.data, allow_redirects=True) as response:
+                    await response.read()
+                    if response.status == 200:
+                        logger.success("Successfully sent payload to webhook {}{}. Stats: {}", self.url, chunk_text,
+                                       chunk.stats)
+                        return True
+                    logger.warning("Webhook destination {} returned status code other than 200 OK: {}", self.url,
+                                   response.status)
+                    if response.status < 500 and response.status != 429:
+                        # Sending the same payload again is not going to help
+                        return False
+            except (ClientError, asyncio.TimeoutError) as e:
+                logger.warning("Exception occured while sending webhook to {}: {}", self.url, e)
+        logger.warning("Failed sending payload{} to webhook {} {} times, dropping it", chunk_text, self.url,
+                       self._retries + 1)
+        return False
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
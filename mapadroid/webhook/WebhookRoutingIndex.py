@@ -0,0 +1,94 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from mapadroid.geofence.geofenceHelper import GeofenceHelper
+from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import (WEBHOOK_ROUTING_CELL_CACHE_SIZE,
+                                          WEBHOOK_ROUTING_CELL_SIZE)
+from mapadroid.webhook.WebhookReceiver import WebhookReceiver
+
+logger = get_logger(LoggerEnums.webhook)
+
+
+class WebhookRoutingIndex:
+    """
+    Compiled once of the receivers and the areas excluded from webhooks.
+    Receivers with the same filter are grouped, the groups accepting a payload are looked up by (type, seen_type) of
+    the payload. Coordinates are checked against the excluded areas by the cell of a grid (cells of cell_size degrees)
+    they are located in. Cells are classified once as excluded, allowed or crossed by the border of an area. Only
+    coordinates of the latter are tested against the polygons.
+    """
+
+    def __init__(self, receivers: List[WebhookReceiver], excluded_areas: List[GeofenceHelper],
+                 cell_size: float = WEBHOOK_ROUTING_CELL_SIZE):
+        self._groups: List[List[WebhookReceiver]] = []
+        group_of_filter: Dict[Optional[Tuple[str, ...]], int] = {}
+        for receiver in receivers:
+            group: Optional[int] = group_of_filter.get(receiver.filter_key)
+            if group is None:
+                group = len(self._groups)
+                group_of_filter[receiver.filter_key] = group
+                self._groups.append([])
+            self._groups[group].append(receiver)
+        self._groups_of_type: Dict[Tuple[str, Optional[str]], Tuple[int, ...]] = {}
+
+        self._excluded_areas: List[GeofenceHelper] = excluded_areas
+        self._cell_size: float = cell_size
+        self._cells: Dict[Tuple[int, int], Optional[bool]] = {}
+        # Coordinates outside the bounding box of all excluded areas are not looked up at all
+        self._bounds: Optional[Tuple[float, float, float, float]] = None
+        if excluded_areas:
+            boxes = [gfh.get_bounding_box() for gfh in excluded_areas]
+            if all(box is not None for box in boxes):
+                self._bounds = (min(box[0] for box in boxes), min(box[1] for box in boxes),
+                                max(box[2] for box in boxes), max(box[3] for box in boxes))
+        else:
+            self._bounds = (0.0, 0.0, -1.0, -1.0)
+
+    @property
+    def groups(self) -> List[List[WebhookReceiver]]:
+        return self._groups
+
+    def route(self, payload: Dict) -> Tuple[int, ...]:
+        """
+        Returns: indices of the groups accepting the payload
+        """
+        key: Tuple[str, Optional[str]] = (payload["type"], payload["message"].get("seen_type", None))
+        groups: Optional[Tuple[int, ...]] = self._groups_of_type.get(key)
+        if groups is None:
+            groups = tuple(index for index, receivers in enumerate(self._groups) if receivers[0].accepts(payload))
+            self._groups_of_type[key] = groups
+        return groups
+
+    def is_excluded(self, lat: float, lng: float) -> bool:
+        if self._bounds is not None and not (self._bounds[0] <= lat <= self._bounds[2]
+                                             and self._bounds[1] <= lng <= self._bounds[3]):
+            return False
+        cell: Tuple[int, int] = (math.floor(lat / self._cell_size), math.floor(lng / self._cell_size))
+        if cell in self._cells:
+            state: Optional[bool] = self._cells[cell]
+        else:
+            state = self.__classify_cell(cell)
+        if state is not None:
+            return state
+        return any(gfh.is_coord_inside_include_geofence([lat, lng]) for gfh in self._excluded_areas)
+
+    def __classify_cell(self, cell: Tuple[int, int]) -> Optional[bool]:
+        # Padded to cover coordinates assigned to the cell despite rounding errors
+        rectangle: Tuple[float, float, float, float] = (cell[0] * self._cell_size - 1e-9,
+                                                        cell[1] * self._cell_size - 1e-9,
+                                                        (cell[0] + 1) * self._cell_size + 1e-9,
+                                                        (cell[1] + 1) * self._cell_size + 1e-9)
+        state: Optional[bool] = False
+        for gfh in self._excluded_areas:
+            gfh_state: Optional[bool] = gfh.classify_rectangle(*rectangle)
+            if gfh_state is True:
+                state = True
+                break
+            elif gfh_state is None:
+                state = None
+        if len(self._cells) >= WEBHOOK_ROUTING_CELL_CACHE_SIZE:
+            logger.debug("Resetting the cells of excluded areas cached")
+            self._cells.clear()
+        self._cells[cell] = state
+        return state
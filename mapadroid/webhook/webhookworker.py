@@ -2,7 +2,9 @@ import asyncio
 import json
 import time
 from asyncio import Task
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from mapadroid.db.DbWebhookReader import DbWebhookReader
 from mapadroid.db.DbWrapper import DbWrapper
@@ -10,12 +12,17 @@ from mapadroid.db.model import Pokestop, TrsQuest
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.mapping_manager import MappingManager
 from mapadroid.utils.gamemechanicutil import calculate_mon_level
-from mapadroid.utils.json_encoder import mad_json_dumps
 from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import WEBHOOK_READ_BATCH_SIZE
 from mapadroid.utils.madGlobals import MonSeenTypes, terminate_mad
 from mapadroid.utils.questGen import QuestGen
-from mapadroid.utils.RestHelper import RestApiResult, RestHelper
 from mapadroid.utils.s2Helper import S2Helper
+from mapadroid.webhook.WebhookChangeFeed import (EntityId,
+                                                 WebhookChangeFeedReader,
+                                                 WebhookChangeType)
+from mapadroid.webhook.WebhookDelivery import WebhookDelivery
+from mapadroid.webhook.WebhookReceiver import WebhookReceiver
+from mapadroid.webhook.WebhookRoutingIndex import WebhookRoutingIndex
 
 logger = get_logger(LoggerEnums.webhook)
 
@@ -30,10 +37,13 @@ class WebhookWorker:
         self.__db_wrapper: DbWrapper = db_wrapper
         self.__rarity = rarity
         self.__last_check = int(time.time())
-        self.__webhook_receivers = []
+        self.__webhook_receivers: List[WebhookReceiver] = []
+        self.__routing: Optional[WebhookRoutingIndex] = None
+        self.__delivery: Optional[WebhookDelivery] = None
         self.__webhook_types: Set[str] = set()
         self.__pokemon_types: Set[MonSeenTypes] = set()
         self.__mapping_manager: MappingManager = mapping_manager
+        self.__change_feed: Optional[WebhookChangeFeedReader] = None
         self.__valid_types: Set[str] = {
             'pokemon', 'raid', 'weather', 'quest', 'gym', 'pokestop'
         }
@@ -42,87 +52,8 @@ class WebhookWorker:
             MonSeenTypes.lure_wild, MonSeenTypes.lure_encounter
         }
 
-    def __payload_type_count(self, payload):
-        count = {}
-
-        for elem in payload:
-            count[elem["type"]] = count.get(elem["type"], 0) + 1
-
-        return count
-
-    def __payload_chunk(self, payload, size):
-        if size == 0:
-            return [payload]
-
-        return [payload[x: x + size] for x in range(0, len(payload), size)]
-
     def __is_in_excluded_area(self, coordinate):
-        for gfh in self.__excluded_areas:
-            if gfh.is_coord_inside_include_geofence(coordinate):
-                return True
-
-        return False
-
-    async def __send_webhook(self, payloads):
-        if len(payloads) == 0:
-            logger.debug2("Payload empty. Skip sending to webhook.")
-            return
-
-        current_wh_num = 1
-        for webhook in self.__webhook_receivers:
-            payload_to_send = []
-            sub_types = webhook.get('types')
-
-            if sub_types is not None:
-                for payload in payloads:
-                    if payload["type"] in sub_types or \
-                            (payload["message"].get("seen_type", None) in sub_types):
-                        payload_to_send.append(payload)
-            else:
-                payload_to_send = payloads
-
-            if len(payload_to_send) == 0:
-                logger.debug2("Payload empty. Skip sending to: {} (Filter: {})", webhook.get('url'), sub_types)
-                continue
-            else:
-                logger.debug2("Sending to webhook: {} (Filter: {})", webhook.get('url'), sub_types)
-
-            payload_list = self.__payload_chunk(
-                payload_to_send, self.__args.webhook_max_payload_size
-            )
-
-            current_pl_num = 1
-            for payload_chunk in payload_list:
-                logger.debug4("Python data for payload: {}", payload_chunk)
-                logger.debug4("Payload: {}", await mad_json_dumps(payload_chunk))
-
-                try:
-                    response: RestApiResult = await RestHelper.send_post(webhook.get('url'),
-                                                                         data=payload_chunk,
-                                                                         headers={"Content-Type": "application/json"},
-                                                                         params=None,
-                                                                         timeout=5)
-                    if response.status_code != 200:
-                        logger.warning("Webhook destination {} returned status code other than 200 OK: {}",
-                                       webhook.get('url'), response.status_code)
-                    else:
-                        if len(self.__webhook_receivers) > 1:
-                            whcount_text = " [wh {}/{}]".format(current_wh_num, len(self.__webhook_receivers))
-                        else:
-                            whcount_text = ""
-
-                        if len(payload_list) > 1:
-                            whchunk_text = " [pl {}/{}]".format(current_pl_num, len(payload_list))
-                        else:
-                            whchunk_text = ""
-
-                        logger.success("Successfully sent payload to webhook{}{}. Stats: {}", whchunk_text,
-                                       whcount_text, await mad_json_dumps(self.__payload_type_count(payload_chunk)))
-                except Exception as e:
-                    logger.warning("Exception occured while sending webhook: {}", e)
-
-                current_pl_num += 1
-            current_wh_num += 1
+        return self.__routing.is_excluded(coordinate[0], coordinate[1])
 
     async def __prepare_quest_data(self, quest_data: Dict[int, Tuple[Pokestop, Dict[int, TrsQuest]]]):
         ret = []
@@ -648,10 +579,10 @@ class WebhookWorker:
                 for valid_type in self.__valid_types:
                     self.__webhook_types.add(valid_type)
 
-            self.__webhook_receivers.append({
-                "url": url.replace(" ", ""),
-                "types": sub_types
-            })
+            self.__webhook_receivers.append(WebhookReceiver(url.replace(" ", ""), sub_types,
+                                                            concurrency=self.__args.webhook_concurrency,
+                                                            queue_size=self.__args.webhook_queue_size,
+                                                            retries=self.__args.webhook_retries))
 
     async def __build_excluded_areas(self):
         self.__excluded_areas: List[GeofenceHelper] = []
@@ -677,62 +608,100 @@ class WebhookWorker:
         if len(self.__excluded_areas) > 0:
             logger.info("Excluding {} areas from webhooks", len(self.__excluded_areas))
 
-    async def __create_payload(self):
-        logger.debug("Fetching data changed since {}", self.__last_check)
-
-        # the payload that is about to be sent
-        full_payload = []
+    async def __stream_payloads(self, changes: Optional[Dict[WebhookChangeType, Dict[EntityId, int]]]) \
+            -> AsyncGenerator:
+        """
+        Reads the data changed page by page rather than holding all payloads of the interval in memory
+        Args:
+            changes: The changes announced by the change feed. If None, all rows changed since the last check are
+                read from the DB.
+
+        Yields: Lists of payloads of the maximum payload size (or WEBHOOK_READ_BATCH_SIZE if unlimited), the last list
+            may be shorter
+        """
+        changed_ids: Dict[WebhookChangeType, Optional[List[EntityId]]] = {
+            change_type: list(changes[change_type].keys()) if changes is not None else None
+            for change_type in WebhookChangeType
+        }
+        if changes is None:
+            logger.debug("Fetching data changed since {}", self.__last_check)
+        else:
+            logger.debug("Fetching data of {} changes announced",
+                         sum(len(ids) for ids in changed_ids.values()))
+        batch_size: int = self.__args.webhook_max_payload_size if self.__args.webhook_max_payload_size > 0 \
+            else WEBHOOK_READ_BATCH_SIZE
+
+        # the payloads prepared but not yet handed over
+        pending: List[Dict] = []
         async with self.__db_wrapper as session, session:
             # TODO: Single transaction...
             try:
-                # raids
-                if 'raid' in self.__webhook_types:
-                    raids = self.__prepare_raid_data(
-                        await DbWebhookReader.get_raids_changed_since(session, self.__last_check)
-                    )
-                    full_payload += raids
-
-                # quests
-                if 'quest' in self.__webhook_types:
-                    quest = await self.__prepare_quest_data(
-                        await DbWebhookReader.get_quests_changed_since(session, self.__last_check)
-                    )
-                    full_payload += quest
-
-                # weather
-                if 'weather' in self.__webhook_types:
-                    weather = self.__prepare_weather_data(
-                        await DbWebhookReader.get_weather_changed_since(session, self.__last_check)
-                    )
-                    full_payload += weather
-
-                # gyms
-                if 'gym' in self.__webhook_types:
-                    gyms = self.__prepare_gyms_data(
-                        await DbWebhookReader.get_gyms_changed_since(session, self.__last_check)
-                    )
-                    full_payload += gyms
-
-                # stops
-                if 'pokestop' in self.__webhook_types:
-                    pokestops = self.__prepare_stops_data(
-                        await DbWebhookReader.get_stops_changed_since(session, self.__last_check)
-                    )
-                    full_payload += pokestops
-
-                # mon
-                if self.__pokemon_types:
-                    mon = self.__prepare_mon_data(
-                        await DbWebhookReader.get_mon_changed_since(session, self.__last_check, self.__pokemon_types)
-                    )
-                    full_payload += mon
+                async for payloads in self.__stream_prepared_data(session, changed_ids, batch_size):
+                    pending.extend(payloads)
+                    while len(pending) >= batch_size:
+                        yield pending[:batch_size]
+                        pending = pending[batch_size:]
             except Exception as e:
                 logger.exception(e)
                 logger.exception("Error while creating webhook payload")
+        if pending:
+            yield pending
 
         logger.debug("Done fetching data + building payload")
 
-        return full_payload
+    async def __stream_prepared_data(self, session: AsyncSession,
+                                     changed_ids: Dict[WebhookChangeType, Optional[List[EntityId]]],
+                                     batch_size: int) -> AsyncGenerator:
+        # raids
+        raid_ids = changed_ids[WebhookChangeType.raid]
+        if 'raid' in self.__webhook_types and self.__any_changed(raid_ids):
+            async for raids in DbWebhookReader.stream_raids_changed_since(session, self.__last_check,
+                                                                          gym_ids=raid_ids, batch_size=batch_size):
+                yield self.__prepare_raid_data(raids)
+
+        # quests
+        quest_ids = changed_ids[WebhookChangeType.quest]
+        if 'quest' in self.__webhook_types and self.__any_changed(quest_ids):
+            async for quests in DbWebhookReader.stream_quests_changed_since(session, self.__last_check,
+                                                                            pokestop_ids=quest_ids,
+                                                                            batch_size=batch_size):
+                yield await self.__prepare_quest_data(quests)
+
+        # weather
+        weather_ids = changed_ids[WebhookChangeType.weather]
+        if 'weather' in self.__webhook_types and self.__any_changed(weather_ids):
+            async for weather in DbWebhookReader.stream_weather_changed_since(session, self.__last_check,
+                                                                              s2_cell_ids=weather_ids,
+                                                                              batch_size=batch_size):
+                yield self.__prepare_weather_data(weather)
+
+        # gyms
+        gym_ids = changed_ids[WebhookChangeType.gym]
+        if 'gym' in self.__webhook_types and self.__any_changed(gym_ids):
+            async for gyms in DbWebhookReader.stream_gyms_changed_since(session, self.__last_check,
+                                                                        gym_ids=gym_ids, batch_size=batch_size):
+                yield self.__prepare_gyms_data(gyms)
+
+        # stops
+        pokestop_ids = changed_ids[WebhookChangeType.pokestop]
+        if 'pokestop' in self.__webhook_types and self.__any_changed(pokestop_ids):
+            async for pokestops in DbWebhookReader.stream_stops_changed_since(session, self.__last_check,
+                                                                              pokestop_ids=pokestop_ids,
+                                                                              batch_size=batch_size):
+                yield self.__prepare_stops_data(pokestops)
+
+        # mon
+        encounter_ids = changed_ids[WebhookChangeType.pokemon]
+        if self.__pokemon_types and self.__any_changed(encounter_ids):
+            async for mons in DbWebhookReader.stream_mon_changed_since(session, self.__last_check,
+                                                                       self.__pokemon_types,
+                                                                       encounter_ids=encounter_ids,
+                                                                       batch_size=batch_size):
+                yield self.__prepare_mon_data(mons)
+
+    @staticmethod
+    def __any_changed(ids: Optional[List[EntityId]]) -> bool:
+        return ids is None or len(ids) > 0
 
     async def start(self) -> Task:
         loop = asyncio.get_running_loop()
@@ -746,18 +715,35 @@ class WebhookWorker:
 
         if self.__args.webhook_start_time != 0:
             self.__last_check = int(self.__args.webhook_start_time)
+        if not self.__args.webhook_disable_change_feed:
+            self.__change_feed = WebhookChangeFeedReader(await self.__db_wrapper.get_cache())
+
+        self.__routing = WebhookRoutingIndex(self.__webhook_receivers, self.__excluded_areas)
+        self.__delivery = WebhookDelivery(self.__routing, self.__args.webhook_max_payload_size)
+        try:
+            while not terminate_mad.is_set():
+                # Always check modifications of intervals N - 6 to NOW given processing of queues may take some
+                # time...
+                preparing_timestamp = int(time.time()) - 6 * self.__worker_interval_sec
+
+                # Only the entities announced by the data processors are read. The DB is polled for all changes of the
+                # intervals if the feed is disabled or changes may have been missed (e.g., on startup)
+                changes: Optional[Dict[WebhookChangeType, Dict[EntityId, int]]] = None
+                if self.__change_feed is not None:
+                    changes = await self.__change_feed.read()
+                    if changes is None:
+                        logger.info("Polling the DB for changes since {} to be sent", self.__last_check)
+
+                # fetch data and hand the payloads to the receivers page by page, they are sent in the background
+                async for payloads in self.__stream_payloads(changes):
+                    if changes is None:
+                        # The backlog polled is not to be dropped, reading waits for the receivers to keep up
+                        await self.__delivery.put(payloads)
+                    else:
+                        self.__delivery.submit(payloads)
 
-        while not terminate_mad.is_set():
-            # Always check modifications of intervals N - 6 to NOW given processing of queues may take some time...
-            preparing_timestamp = int(time.time()) - 6 * self.__worker_interval_sec
-
-            # fetch data and create payload
-            full_payload = await self.__create_payload()
-
-            # send our payload
-            await self.__send_webhook(full_payload)
-
-            self.__last_check = preparing_timestamp
-            await asyncio.sleep(self.__worker_interval_sec)
-
-        logger.info("Stopping webhook worker thread")
+                self.__last_check = preparing_timestamp
+                await asyncio.sleep(self.__worker_interval_sec)
+        finally:
+            await self.__delivery.stop()
+            logger.info("Stopping webhook worker thread")
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 
 from mapadroid.utils.collections import Location
 from mapadroid.utils.CustomTypes import MessageTyping
@@ -115,6 +115,17 @@ class AbstractCommunicator(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_screenshot_data(self, quality: int = 70,
+                                  screenshot_type: ScreenshotType = ScreenshotType.JPEG) -> Optional[bytes]:
+        """
+
+        :param quality: of the screenshot (compression)
+        :param screenshot_type: whether it's jpeg or png
+        :return: the encoded screenshot as received from the device, None on failure
+        """
+        pass
+
     @abstractmethod
     async def back_button(self) -> bool:
         pass
@@ -174,6 +185,16 @@ class AbstractCommunicator(ABC):
         """
         pass
 
+    @abstractmethod
+    async def walk_route(self, locations: List[Location], speed: float) -> List[Optional[MessageTyping]]:
+        """
+        Walks along the locations given, the legs are sent at once rather than waiting for each leg to be walked
+        :param locations: the first location is the start of the route
+        :param speed: in km/h
+        :return: replies to the legs walked
+        """
+        pass
+
     @abstractmethod
     async def get_compressed_logcat(self, path: str) -> bool:
         """
@@ -1,12 +1,13 @@
 import asyncio
-import math
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 import websockets
 from loguru import logger
 
-from mapadroid.utils.CustomTypes import MessageTyping
+from mapadroid.utils.CustomTypes import MessageTyping, ResponseTyping
+from mapadroid.utils.madConstants import (WEBSOCKET_MAX_IN_FLIGHT_COMMANDS,
+                                          WEBSOCKET_MAX_MESSAGE_ID)
 from mapadroid.utils.madGlobals import (
     WebsocketWorkerConnectionClosedException, WebsocketWorkerRemovedException,
     WebsocketWorkerTimeoutException)
@@ -14,88 +15,137 @@ from mapadroid.worker.AbstractWorker import AbstractWorker
 from mapadroid.worker.WorkerState import WorkerState
 
 
-class ReceivedMessageEntry:
-    def __init__(self):
-        # TODO: consider timestamp of when the message was waited for to cleanup?
-        self.message: Optional[MessageTyping] = None
-        self.message_received_event: asyncio.Event = asyncio.Event()
-
-
 class WebsocketConnectedClientEntry:
     def __init__(self, origin: str, worker_instance: Optional[AbstractWorker],
                  websocket_client_connection: Optional[websockets.WebSocketClientProtocol],
-                 worker_state: WorkerState):
+                 worker_state: WorkerState, max_in_flight: int = WEBSOCKET_MAX_IN_FLIGHT_COMMANDS):
         self.origin: str = origin
         self.worker_instance: Optional[AbstractWorker] = worker_instance
         self.worker_state: WorkerState = worker_state
         self.websocket_client_connection: Optional[websockets.WebSocketClientProtocol] = websocket_client_connection
         self.fail_counter: int = 0
-        self.received_messages: Dict[int, ReceivedMessageEntry] = {}
-        self.received_mutex: asyncio.Lock = asyncio.Lock()
+        # Futures of the commands awaiting a reply by message ID. Only modified within the event loop without
+        # awaiting anything in between, hence no locks are needed.
+        self.received_messages: Dict[int, asyncio.Future] = {}
         self.message_id_counter: int = 0
-        self.message_id_mutex: asyncio.Lock = asyncio.Lock()
+        # Commands of madmin and the worker are sent one after another to keep the device from interleaving them,
+        # only the commands of a batch are pipelined
+        self.__command_lock: asyncio.Lock = asyncio.Lock()
+        self.__in_flight: asyncio.Semaphore = asyncio.Semaphore(max_in_flight)
         # store a timestamp in order to cleanup (soft-states)
         self.last_message_received_at: float = 0
 
-    async def set_message_response(self, message_id: int, message: MessageTyping) -> None:
-        async with self.received_mutex:
-            message_entry = self.received_messages.get(message_id, None)
-            if message_entry is not None:
-                message_entry.message = message
-                message_entry.message_received_event.set()
-                self.last_message_received_at = time.time()
+    def set_message_response(self, message_id: int, message: ResponseTyping) -> None:
+        response: Optional[asyncio.Future] = self.received_messages.get(message_id, None)
+        if response is not None and not response.done():
+            response.set_result(message)
+            self.last_message_received_at = time.time()
 
     async def send_and_wait(self, message: MessageTyping, timeout: float, worker_instance: AbstractWorker,
                             byte_command: Optional[int] = None) -> Optional[MessageTyping]:
+        response: Optional[ResponseTyping] = await self.send_and_wait_view(message, timeout, worker_instance,
+                                                                           byte_command)
+        return bytes(response) if isinstance(response, memoryview) else response
+
+    async def send_and_wait_view(self, message: MessageTyping, timeout: float, worker_instance: AbstractWorker,
+                                 byte_command: Optional[int] = None) -> Optional[ResponseTyping]:
+        """
+        Like send_and_wait, binary replies are returned as a view of the frame received rather than copied
+        """
+        self.__check_sendable(worker_instance)
+        async with self.__command_lock:
+            message_id, response = await self.__register()
+            try:
+                if isinstance(message, bytes):
+                    logger.debug("sending binary: {}", message[:10])
+                else:
+                    logger.debug("sending command: {}", message.strip())
+                # send message
+                await self.__send_message(message_id, message, byte_command)
+
+                # wait for it to trigger...
+                logger.debug2("Timeout towards: {}", timeout)
+                await asyncio.wait([response], timeout=timeout)
+                await self.__check_replied(1 if not response.done() else 0)
+                logger.debug("Done sending command")
+                return self.__get_response(response)
+            finally:
+                logger.debug2("Cleaning up received message.")
+                self.__unregister(message_id)
+
+    async def send_batch_and_wait(self, messages: List[str], timeout: float,
+                                  worker_instance: AbstractWorker) -> List[Optional[ResponseTyping]]:
+        """
+        Pipelines the commands: all commands are sent back-to-back without waiting for the reply of a command before
+        sending the next one. The replies are awaited together, other commands are sent once the batch is done.
+        Returns: the replies in the order of the commands, None for commands not replied to within the timeout
+        """
+        self.__check_sendable(worker_instance)
+        async with self.__command_lock:
+            registered: Dict[int, asyncio.Future] = {}
+            try:
+                for message in messages:
+                    message_id, response = await self.__register()
+                    registered[message_id] = response
+                    logger.debug("sending command: {}", message.strip())
+                    await self.__send_message(message_id, message)
+                logger.debug2("Timeout towards: {}", timeout)
+                await asyncio.wait(registered.values(), timeout=timeout)
+                await self.__check_replied(sum(1 for response in registered.values() if not response.done()))
+                logger.debug("Done sending {} commands", len(messages))
+                return [self.__get_response(response) for response in registered.values()]
+            finally:
+                for message_id in registered.keys():
+                    self.__unregister(message_id)
+
+    def __check_sendable(self, worker_instance: AbstractWorker) -> None:
         if not self.worker_instance or self.worker_instance != worker_instance and worker_instance != 'madmin':
             # TODO: consider changing this...
             raise WebsocketWorkerRemovedException("Invalid worker instance, removed worker")
         elif not self.websocket_client_connection.open:
             raise WebsocketWorkerConnectionClosedException("Connection closed, stopping")
 
-        # install new ReceivedMessageEntry
-        message_id: int = await self.__get_new_message_id()
-        new_entry = ReceivedMessageEntry()
-        async with self.received_mutex:
-            self.received_messages[message_id] = new_entry
-        try:
-            if isinstance(message, bytes):
-                logger.debug("sending binary: {}", message[:10])
-            else:
-                logger.debug("sending command: {}", message.strip())
-            # send message
-            await self.__send_message(message_id, message, byte_command)
-
-            # wait for it to trigger...
-            logger.debug2("Timeout towards: {}", timeout)
-            response = None
+    async def __register(self) -> Tuple[int, asyncio.Future]:
+        """
+        Waits for a free slot of the commands in flight and installs a future for the reply
+        """
+        await self.__in_flight.acquire()
+        message_id: int = self.__get_new_message_id()
+        response: asyncio.Future = asyncio.get_running_loop().create_future()
+        # The slot is freed as soon as the reply arrived or the command is cleaned up
+        response.add_done_callback(lambda _: self.__in_flight.release())
+        self.received_messages[message_id] = response
+        return message_id, response
+
+    def __unregister(self, message_id: int) -> None:
+        response: Optional[asyncio.Future] = self.received_messages.pop(message_id, None)
+        if response is not None and not response.done():
+            response.cancel()
+
+    async def __check_replied(self, timeouts: int) -> None:
+        if not timeouts:
+            self.fail_counter = 0
+            return
+        logger.warning("Timeout, increasing timeout-counter")
+        self.fail_counter += 1
+        if self.fail_counter > 5:
+            logger.error("5 consecutive timeouts or origin is no longer connected, cleanup")
             try:
-                event_triggered = await asyncio.wait_for(new_entry.message_received_event.wait(), timeout=timeout)
-                if event_triggered:
-                    logger.debug("Received answer in time, popping response")
-                    self.fail_counter = 0
-                    if isinstance(new_entry.message, str):
-                        logger.debug("Response: {}", new_entry.message.strip())
-                    else:
-                        logger.debug("Received binary data , starting with {}", new_entry.message[:10])
-                    response = new_entry.message
-            except asyncio.TimeoutError:
-                logger.warning("Timeout, increasing timeout-counter")
-                self.fail_counter += 1
-                if self.fail_counter > 5:
-                    logger.error("5 consecutive timeouts or origin is no longer connected, cleanup")
-                    try:
-                        await self.websocket_client_connection.close()
-                    except Exception as e:
-                        logger.info("Failed closing connection forcefully after 5 timeouts: {}", e)
-                    raise WebsocketWorkerTimeoutException("Multiple consecutive timeouts detected")
-
-            logger.debug("Done sending command")
-            return response
-        finally:
-            logger.debug2("Cleaning up received message.")
-            async with self.received_mutex:
-                del self.received_messages[message_id]
+                await self.websocket_client_connection.close()
+            except Exception as e:
+                logger.info("Failed closing connection forcefully after 5 timeouts: {}", e)
+            raise WebsocketWorkerTimeoutException("Multiple consecutive timeouts detected")
+
+    @staticmethod
+    def __get_response(response: asyncio.Future) -> Optional[ResponseTyping]:
+        if not response.done() or response.cancelled():
+            return None
+        message: ResponseTyping = response.result()
+        if isinstance(message, str):
+            logger.debug("Response: {}", message.strip())
+        else:
+            logger.debug("Received binary data of {} bytes, starting with {}", len(message), bytes(message[:10]))
+        return message
 
     async def __send_message(self, message_id: int, message: MessageTyping,
                              byte_command: Optional[int] = None) -> None:
@@ -113,11 +163,10 @@ class WebsocketConnectedClientEntry:
             return
         await self.websocket_client_connection.send(to_be_sent)
 
-    async def __get_new_message_id(self) -> int:
-        async with self.message_id_mutex:
-            self.message_id_counter += 1
-            self.message_id_counter = int(math.fmod(self.message_id_counter, 100000))
-            if self.message_id_counter == 100000:
-                self.message_id_counter = 1
-            new_message_id = self.message_id_counter
-        return new_message_id
+    def __get_new_message_id(self) -> int:
+        # Nothing is awaited while looking for an ID, it can thus not be handed out twice. IDs of commands still
+        # awaiting a reply are skipped when the counter wraps around.
+        while True:
+            self.message_id_counter = self.message_id_counter % WEBSOCKET_MAX_MESSAGE_ID + 1
+            if self.message_id_counter not in self.received_messages:
+                return self.message_id_counter
@@ -23,7 +23,7 @@ from mapadroid.mapping_manager.MappingManagerDevicemappingKey import \
     MappingManagerDevicemappingKey
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.utils.authHelper import check_auth, get_auths_for_levl
-from mapadroid.utils.CustomTypes import MessageTyping
+from mapadroid.utils.CustomTypes import MessageTyping, ResponseTyping
 from mapadroid.utils.logging import InterceptHandler, LoggerEnums, get_logger
 from mapadroid.utils.madGlobals import WebsocketAbortRegistrationException
 from mapadroid.utils.pogoevent import PogoEvent
@@ -360,7 +360,7 @@ class WebsocketServer(object):
 
     @staticmethod
     async def __on_message(client_entry: WebsocketConnectedClientEntry, message: MessageTyping) -> None:
-        response: Optional[MessageTyping] = None
+        response: Optional[ResponseTyping] = None
         try:
             if isinstance(message, str):
                 logger.debug("Receiving message: {}", message.strip())
@@ -370,11 +370,12 @@ class WebsocketServer(object):
             else:
                 logger.debug("Received binary values.")
                 message_id = int.from_bytes(message[:4], byteorder='big', signed=False)
-                response = message[4:]
+                # Screenshots and logcats may be large, the payload is not copied out of the frame
+                response = memoryview(message)[4:]
         except ValueError as e:
             logger.warning("Failed reading message ID of message received for {} ({})", client_entry.origin, repr(e))
             return
-        await client_entry.set_message_response(message_id, response)
+        client_entry.set_message_response(message_id, response)
 
     @staticmethod
     async def __close_websocket_client_connection(origin_of_worker: str,
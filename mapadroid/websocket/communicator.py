@@ -1,15 +1,15 @@
-import asyncio
 import re
 from ipaddress import IPv4Address, ip_address
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import websockets
 from aiofile import async_open
 
 from mapadroid.utils.collections import Location
-from mapadroid.utils.CustomTypes import MessageTyping
+from mapadroid.utils.CustomTypes import MessageTyping, ResponseTyping
 from mapadroid.utils.geo import get_distance_of_two_points_in_meters
 from mapadroid.utils.logging import LoggerEnums, get_logger
+from mapadroid.utils.madConstants import WEBSOCKET_STREAM_CHUNK_SIZE
 from mapadroid.utils.madGlobals import (
     MadGlobals, ScreenshotType, WebsocketWorkerConnectionClosedException,
     WebsocketWorkerTimeoutException)
@@ -30,7 +30,6 @@ class Communicator(AbstractCommunicator):
         self.worker_instance_ref: Optional[AbstractWorker] = worker_instance_ref
         self.websocket_client_entry = websocket_client_entry
         self.__command_timeout: float = command_timeout
-        self.__send_mutex = asyncio.Lock()
 
     async def is_alive(self) -> bool:
         if not self.websocket_client_entry or not self.websocket_client_entry.websocket_client_connection:
@@ -55,16 +54,29 @@ class Communicator(AbstractCommunicator):
         return await self.__run_and_ok_bytes(command, timeout)
 
     async def __run_get_gesponse(self, message: MessageTyping, timeout: float = None) -> Optional[MessageTyping]:
-        async with self.__send_mutex:
-            timeout = self.__command_timeout if timeout is None else timeout
-            return await self.websocket_client_entry.send_and_wait(message, timeout=timeout,
-                                                                   worker_instance=self.worker_instance_ref)
+        timeout = self.__command_timeout if timeout is None else timeout
+        return await self.websocket_client_entry.send_and_wait(message, timeout=timeout,
+                                                               worker_instance=self.worker_instance_ref)
 
     async def __run_and_ok_bytes(self, message, timeout: float, byte_command: int = None) -> bool:
-        async with self.__send_mutex:
-            result = await self.websocket_client_entry.send_and_wait(message, timeout, self.worker_instance_ref,
-                                                                     byte_command=byte_command)
-            return result is not None and "OK" == result.strip()
+        result = await self.websocket_client_entry.send_and_wait(message, timeout, self.worker_instance_ref,
+                                                                 byte_command=byte_command)
+        return result is not None and "OK" == result.strip()
+
+    async def __run_and_store(self, message: MessageTyping, path: str) -> Tuple[bool, Optional[str]]:
+        """
+        Stores a binary reply at the path given. The reply is written from the frame received in chunks rather than
+        copied as a whole.
+        Returns: whether a binary reply was stored and the reply if it was not binary
+        """
+        response: Optional[ResponseTyping] = await self.websocket_client_entry.send_and_wait_view(
+            message, self.__command_timeout, self.worker_instance_ref)
+        if response is None or isinstance(response, str):
+            return False, response
+        async with async_open(path, "wb") as fh:
+            for offset in range(0, len(response), WEBSOCKET_STREAM_CHUNK_SIZE):
+                await fh.write(bytes(response[offset:offset + WEBSOCKET_STREAM_CHUNK_SIZE]))
+        return True, None
 
     async def install_apk(self, timeout: float, filepath: str = None, data=None) -> bool:
         if not data:
@@ -141,33 +153,48 @@ class Communicator(AbstractCommunicator):
 
     async def get_screenshot(self, path: str, quality: int = 70,
                              screenshot_type: ScreenshotType = ScreenshotType.JPEG) -> bool:
+        command: Optional[str] = self.__screenshot_command(quality, screenshot_type)
+        if command is None:
+            return False
+        logger.debug("Storing screenshot...")
+        stored, response = await self.__run_and_store(command, path)
+        if response is not None:
+            self.__log_screenshot_failure(response)
+        elif stored:
+            logger.debug2("Done storing, returning")
+        return stored
+
+    async def get_screenshot_data(self, quality: int = 70,
+                                  screenshot_type: ScreenshotType = ScreenshotType.JPEG) -> Optional[bytes]:
+        command: Optional[str] = self.__screenshot_command(quality, screenshot_type)
+        if command is None:
+            return None
+        encoded = await self.__run_get_gesponse(command)
+        if encoded is None:
+            return None
+        elif isinstance(encoded, str):
+            self.__log_screenshot_failure(encoded)
+            return None
+        return encoded
+
+    @staticmethod
+    def __screenshot_command(quality: int, screenshot_type: ScreenshotType) -> Optional[str]:
         if quality < 10 or quality > 100:
             logger.error("Invalid quality value passed for screenshots")
-            return False
+            return None
 
         screenshot_type_str: str = "jpeg"
         if screenshot_type == ScreenshotType.PNG:
             screenshot_type_str = "png"
+        return "screen capture {} {}\r\n".format(screenshot_type_str, quality)
 
-        encoded = await self.__run_get_gesponse("screen capture {} {}\r\n".format(screenshot_type_str, quality))
-        if encoded is None:
-            return False
-        elif isinstance(encoded, str):
-            logger.debug2("Screenshot response not binary")
-            if "KO: " in encoded:
-                logger.error("get_screenshot: Could not retrieve screenshot. Make sure your RGC is updated.")
-                return False
-            elif "OK:" not in encoded:
-                logger.error("get_screenshot: response not OK")
-                return False
-            return False
-        else:
-            logger.debug("Storing screenshot...")
-            async with async_open(path, "wb") as fh:
-                await fh.write(encoded)
-            del encoded
-            logger.debug2("Done storing, returning")
-            return True
+    @staticmethod
+    def __log_screenshot_failure(response: str) -> None:
+        logger.debug2("Screenshot response not binary")
+        if "KO: " in response:
+            logger.error("get_screenshot: Could not retrieve screenshot. Make sure your RGC is updated.")
+        elif "OK:" not in response:
+            logger.error("get_screenshot: response not OK")
 
     async def back_button(self) -> bool:
         return await self.__run_and_ok("screen back\r\n", self.__command_timeout)
@@ -214,38 +241,49 @@ class Communicator(AbstractCommunicator):
     async def walk_from_to(self, location_from: Location, location_to: Location, speed: float) -> Optional[
         MessageTyping]:
         # calculate the time it will take to walk and add it to the timeout!
+        return await self.__run_get_gesponse(self.__walk_command(location_from, location_to, speed),
+                                             self.__command_timeout + self.__travel_time(location_from, location_to,
+                                                                                         speed))
+
+    async def walk_route(self, locations: List[Location], speed: float) -> List[Optional[MessageTyping]]:
+        legs = list(zip(locations, locations[1:]))
+        if not legs:
+            return []
+        # The legs are sent at once, the replies arrive once the device walked the whole route
+        travel_time: float = sum(self.__travel_time(location_from, location_to, speed)
+                                 for location_from, location_to in legs)
+        return await self.websocket_client_entry.send_batch_and_wait(
+            [self.__walk_command(location_from, location_to, speed) for location_from, location_to in legs],
+            self.__command_timeout + travel_time, self.worker_instance_ref)
+
+    @staticmethod
+    def __walk_command(location_from: Location, location_to: Location, speed: float) -> str:
+        return "geo walk {} {} {} {} {}\r\n".format(location_from.lat, location_from.lng,
+                                                    location_to.lat, location_to.lng, speed)
+
+    @staticmethod
+    def __travel_time(location_from: Location, location_to: Location, speed: float) -> float:
         distance = get_distance_of_two_points_in_meters(
             location_from.lat, location_from.lng,
             location_to.lat, location_to.lng)
         # speed is in kmph, distance in m
         # we want m/s -> speed / 3.6
         speed_meters = speed / 3.6
-        seconds_traveltime = distance / speed_meters
-        return await self.__run_get_gesponse("geo walk {} {} {} {} {}\r\n".format(location_from.lat, location_from.lng,
-                                                                                  location_to.lat, location_to.lng,
-                                                                                  speed),
-                                             self.__command_timeout + seconds_traveltime)
+        return distance / speed_meters
 
     # TODO: may require update for asyncio I/O
     async def get_compressed_logcat(self, path: str) -> bool:
-        encoded = await self.__run_get_gesponse("more logcat\r\n")
-        if encoded is None:
-            return False
-        elif isinstance(encoded, str):
+        stored, response = await self.__run_and_store("more logcat\r\n", path)
+        if response is not None:
             logger.debug("Logcat response not binary (expected a ZIP)")
-            if "KO: " in encoded:
+            if "KO: " in response:
                 logger.error(
                     "get_compressed_logcat: Could not retrieve logcat. Make sure your RGC is updated.")
-            elif "OK:" not in encoded:
+            elif "OK:" not in response:
                 logger.error("get_compressed_logcat: response not OK")
-            return False
-        else:
-            logger.debug("Storing logcat...")
-
-            async with async_open(path, "wb") as fh:
-                await fh.write(encoded)
+        elif stored:
             logger.debug("Done storing logcat, returning")
-            return True
+        return stored
 
     async def get_ptc_status(self) -> int:
         res: Optional[MessageTyping] = None
@@ -34,6 +34,8 @@ class WorkerState:
         self.login_error_count: int = 0
         self.last_transport_type: TransportType = TransportType.TELEPORT
         self.last_screenshot_taken_at: int = TIMESTAMP_NEVER
+        # Encoded screenshot last taken, analyzed in memory rather than stored in the temp directory
+        self.last_screenshot: Optional[bytes] = None
         self.last_screen_type: ScreenType = ScreenType.UNDEFINED
         self.current_sleep_duration: int = 0
         self.last_received_data_time: Optional[datetime] = None
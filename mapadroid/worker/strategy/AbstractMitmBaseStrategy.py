@@ -34,7 +34,8 @@ from mapadroid.utils.DatetimeWrapper import DatetimeWrapper
 from mapadroid.utils.geo import get_distance_of_two_points_in_meters
 from mapadroid.utils.madConstants import (
     FALLBACK_MITM_WAIT_TIMEOUT, MINIMUM_DISTANCE_ALLOWANCE_FOR_GMO,
-    SECONDS_BEFORE_ARRIVAL_OF_WALK_BUFFER, TIMESTAMP_NEVER)
+    MITM_WAIT_FOR_LATEST_MAX_BLOCK, SECONDS_BEFORE_ARRIVAL_OF_WALK_BUFFER,
+    TIMESTAMP_NEVER)
 from mapadroid.utils.madGlobals import (FortSearchResultTypes,
                                         InternalStopWorkerException,
                                         MadGlobals, PositionType,
@@ -164,6 +165,8 @@ class AbstractMitmBaseStrategy(AbstractWorkerStrategy, ABC):
                                                                        type_of_data_returned)
         if latest:
             last_time_received = latest.timestamp_of_data_retrieval
+        # Timestamp of the latest data checked already, waiting for data newer than that
+        data_checked_until: int = timestamp
         # Any data after timestamp + timeout should be valid!
         logger.debug("Waiting for data ({}) after {} with timeout of {}s.",
                      proto_to_wait_for, DatetimeWrapper.fromtimestamp(timestamp), timeout)
@@ -183,7 +186,9 @@ class AbstractMitmBaseStrategy(AbstractWorkerStrategy, ABC):
             elif latest:
                 last_time_received = latest.timestamp_of_data_retrieval
                 break
-            await asyncio.sleep(MadGlobals.application_args.wait_for_data_sleep_duration)
+            if latest and latest.timestamp_of_data_retrieval:
+                data_checked_until = max(data_checked_until, int(latest.timestamp_of_data_retrieval))
+            data_checked_until = await self._wait_for_new_data(key, data_checked_until, timestamp, timeout)
 
         if proto_to_wait_for in [ProtoIdentifier.GMO, ProtoIdentifier.ENCOUNTER]:
             if type_of_data_returned != ReceivedType.UNDEFINED:
@@ -206,6 +211,23 @@ class AbstractMitmBaseStrategy(AbstractWorkerStrategy, ABC):
         # await self.worker_stats()
         return type_of_data_returned, data, last_time_received
 
+    async def _wait_for_new_data(self, key: str, data_checked_until: int, timestamp: int, timeout: int) -> int:
+        """
+        Blocks until data of the given key newer than data_checked_until was received, the timeout of the data
+        requested passed or MITM_WAIT_FOR_LATEST_MAX_BLOCK seconds passed to check the state of the worker again.
+        Returns: The timestamp of the newest data received
+        """
+        max_block: float = MITM_WAIT_FOR_LATEST_MAX_BLOCK
+        if timeout != 0:
+            max_block = min(max_block, timestamp + timeout - time.time())
+        if max_block <= 0:
+            return data_checked_until
+        latest: Optional[LatestMitmDataEntry] = await self._mitm_mapper.wait_for_latest(
+            self._worker_state.origin, key, data_checked_until, max_block)
+        if latest and latest.timestamp_of_data_retrieval:
+            return max(data_checked_until, int(latest.timestamp_of_data_retrieval))
+        return data_checked_until
+
     async def _request_data(self, data, key, proto_to_wait_for, timestamp, type_of_data_returned):
         latest_location: Optional[Location] = await self._mitm_mapper.get_last_known_location(
             self._worker_state.origin)
@@ -4,6 +4,7 @@ import time
 from abc import ABC, abstractmethod
 from typing import Any, List, Optional
 
+from aiofile import async_open
 from loguru import logger
 
 from mapadroid.data_handler.stats.AbstractStatsHandler import \
@@ -178,18 +179,14 @@ class AbstractWorkerStrategy(ABC):
                                                        float(
                                                            self._worker_state.current_location.lat) + lat_offset,
                                                        float(self._worker_state.current_location.lng) + lng_offset)
-        logger.info("Walking roughly: {:.2f}m", to_walk)
+        logger.info("Walking roughly: {:.2f}m and back", to_walk)
         await asyncio.sleep(0.3)
-        await self._communicator.walk_from_to(self._worker_state.current_location,
-                                              Location(self._worker_state.current_location.lat + lat_offset,
-                                                       self._worker_state.current_location.lng + lng_offset),
-                                              WALK_AFTER_TELEPORT_SPEED)
-        logger.debug("Walking back")
-        await asyncio.sleep(0.3)
-        await self._communicator.walk_from_to(Location(self._worker_state.current_location.lat + lat_offset,
-                                                       self._worker_state.current_location.lng + lng_offset),
-                                              self._worker_state.current_location,
-                                              WALK_AFTER_TELEPORT_SPEED)
+        # Both legs are sent at once, the device walks back right after reaching the destination
+        await self._communicator.walk_route([self._worker_state.current_location,
+                                             Location(self._worker_state.current_location.lat + lat_offset,
+                                                      self._worker_state.current_location.lng + lng_offset),
+                                             self._worker_state.current_location],
+                                            WALK_AFTER_TELEPORT_SPEED)
         logger.debug("Done walking")
         return to_walk
 
@@ -527,13 +524,13 @@ class AbstractWorkerStrategy(ABC):
                 return False
         attempts = 0
 
-        screenshot_path = await self.get_screenshot_path()
-        if os.path.isdir(screenshot_path):
-            logger.error("_check_pogo_main_screen: screenshot.png/.jpg is not a file/corrupted")
+        if self._worker_state.last_screenshot is None:
+            logger.error("_check_pogo_main_screen: no screenshot available")
             return False
 
         logger.debug("_check_pogo_main_screen: checking mainscreen")
-        while not await self._pogo_windows_handler.check_pogo_mainscreen(screenshot_path, self._worker_state.origin):
+        while not await self._pogo_windows_handler.check_pogo_mainscreen(self._worker_state.last_screenshot,
+                                                                         self._worker_state.origin):
             logger.info("_check_pogo_main_screen: not on Mainscreen...")
             if attempts == max_attempts:
                 # could not reach raidtab in given max_attempts
@@ -542,20 +539,22 @@ class AbstractWorkerStrategy(ABC):
                 return False
 
             found: List[ScreenCoordinates] = await self._pogo_windows_handler.check_close_except_nearby_button(
-                await self.get_screenshot_path(), self._worker_state.origin, close_raid=True)
+                self._worker_state.last_screenshot, self._worker_state.origin, close_raid=True)
             if found:
                 logger.debug("_check_pogo_main_screen: Found (X) button (except nearby)")
                 await self._communicator.click(found[0].x, found[0].y)
                 await asyncio.sleep(2)
             else:
                 button_coords: Optional[ScreenCoordinates] = await self._pogo_windows_handler \
-                    .look_for_button(screenshot_path, 2.20, 3.01)
+                    .look_for_button(self._worker_state.last_screenshot, 2.20, 3.01,
+                                     identifier=self._worker_state.origin)
                 if button_coords:
                     logger.debug("_check_pogo_main_screen: Found button (small)")
                     await self._communicator.click(button_coords.x, button_coords.y)
                     await asyncio.sleep(2)
                     return True
-                button_coords = await self._pogo_windows_handler.look_for_button(screenshot_path, 1.05, 2.20)
+                button_coords = await self._pogo_windows_handler.look_for_button(
+                    self._worker_state.last_screenshot, 1.05, 2.20, identifier=self._worker_state.origin)
                 if button_coords:
                     logger.debug("_check_pogo_main_screen: Found button (big)")
                     await self._communicator.click(button_coords.x, button_coords.y)
@@ -584,8 +583,14 @@ class AbstractWorkerStrategy(ABC):
         screenshot_quality: int = await self.get_devicesettings_value(MappingManagerDevicemappingKey.SCREENSHOT_QUALITY,
                                                                       80)
 
-        take_screenshot = await self._communicator.get_screenshot(await self.get_screenshot_path(fileaddon=errorscreen),
-                                                                  screenshot_quality, screenshot_type)
+        screenshot: Optional[bytes] = await self._communicator.get_screenshot_data(screenshot_quality,
+                                                                                   screenshot_type)
+        take_screenshot: bool = screenshot is not None
+        if take_screenshot:
+            self._worker_state.last_screenshot = screenshot
+            if errorscreen:
+                async with async_open(await self.get_screenshot_path(fileaddon=True), "wb") as fh:
+                    await fh.write(screenshot)
 
         if self._worker_state.last_screenshot_taken_at and time_since_last_screenshot < 0.5:
             logger.info("screenshot taken recently, returning immediately")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compares the runtime of ClusteringHelper and SpatialClusteringHelper on random spawnpoints, verifying the clusters
+are identical:
+
+    python3 scripts/benchmark_clustering.py --sizes 1000 10000 50000 --legacy-limit 2000
+
+The legacy implementation is skipped above --legacy-limit spawnpoints as it scales quadratically.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.route.routecalc.ClusteringHelper import \
+    ClusteringHelper  # noqa: E402
+from mapadroid.route.routecalc.SpatialClusteringHelper import \
+    SpatialClusteringHelper  # noqa: E402
+from mapadroid.utils.collections import Location  # noqa: E402
+
+
+def random_spawnpoints(amount: int, seed: int, timed: bool) -> List[Tuple[int, Location]]:
+    rng = random.Random(seed)
+    # Density of spawnpoints roughly like a city, about 1000 per square kilometer
+    side = (amount / 1000) ** 0.5 / 111
+    return [(rng.randint(0, 3600) if timed else 0,
+             Location(52.5 + rng.random() * side, 13.4 + rng.random() * side * 1.6))
+            for _ in range(amount)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clustering of coords")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--legacy-limit", type=int, default=2000)
+    parser.add_argument("--radius", type=int, default=70)
+    parser.add_argument("--count", type=int, default=8)
+    parser.add_argument("--timedelta", type=int, default=0,
+                        help="max_timedelta_seconds, prio queues use e.g. 300 with random timestamps")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("{:>7} | {:<8} | {:>10} | {:>8}".format("coords", "engine", "runtime", "clusters"))
+    for size in args.sizes:
+        events = random_spawnpoints(size, args.seed, args.timedelta > 0)
+        results = {}
+        for name, helper_class in (("spatial", SpatialClusteringHelper), ("legacy", ClusteringHelper)):
+            if name == "legacy" and size > args.legacy_limit:
+                print("{:>7} | {:<8} | {:>10} | {:>8}".format(size, name, "skipped", "-"))
+                continue
+            helper = helper_class(max_radius=args.radius, max_count_per_circle=args.count,
+                                  max_timedelta_seconds=args.timedelta)
+            start = time.perf_counter()
+            results[name] = helper.get_clustered(events)
+            duration = time.perf_counter() - start
+            print("{:>7} | {:<8} | {:>9.2f}s | {:>8}".format(size, name, duration, len(results[name])))
+        if len(results) == 2 and results["spatial"] != results["legacy"]:
+            print("Clusters of the engines differ for {} coords".format(size))
+
+
+if __name__ == "__main__":
+    main()
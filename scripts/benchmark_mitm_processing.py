@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the MITM data processing of GMOs against the configured database, redis and gRPC setup.
+Synthetic GMOs are fed into the data processing manager for each amount of processes given and the throughput is
+reported in protos per second. Run it from the root of MAD with the usual config (e.g. -cf configs/config.ini) and
+a running MAD (for gRPC based MitmMapper/StatsHandler):
+
+    python3 scripts/benchmark_mitm_processing.py --processes 0 1 2 4 --protos 5000 --devices 20
+
+The data written consists of fake mons/spawnpoints located at lat/lng 0.0.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.account_handler import setup_account_handler  # noqa: E402
+from mapadroid.data_handler.grpc.MitmMapperClientConnector import \
+    MitmMapperClientConnector  # noqa: E402
+from mapadroid.data_handler.grpc.StatsHandlerClientConnector import \
+    StatsHandlerClientConnector  # noqa: E402
+from mapadroid.data_handler.mitm_data.MitmMapperType import MitmMapperType  # noqa: E402
+from mapadroid.data_handler.mitm_data.RedisMitmMapper import RedisMitmMapper  # noqa: E402
+from mapadroid.db.DbFactory import DbFactory  # noqa: E402
+from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
+    AbstractMitmDataProcessingManager  # noqa: E402
+from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
+    InProcessMitmDataProcessorManager  # noqa: E402
+from mapadroid.mitm_receiver.data_processing.ProcessMitmDataProcessingManager import \
+    ProcessMitmDataProcessingManager  # noqa: E402
+from mapadroid.utils.EnvironmentUtil import setup_loggers  # noqa: E402
+from mapadroid.utils.logging import init_logging  # noqa: E402
+from mapadroid.utils.madGlobals import MadGlobals  # noqa: E402
+from mapadroid.utils.questGen import QuestGen  # noqa: E402
+
+
+def build_gmo(cells: int, mons_per_cell: int) -> Dict:
+    timestamp_ms = int(time.time() * 1000)
+    map_cells: List[Dict] = []
+    for _ in range(cells):
+        wild_pokemon: List[Dict] = []
+        for _ in range(mons_per_cell):
+            wild_pokemon.append({
+                "encounter_id": random.getrandbits(63),
+                "spawnpoint_id": "%x" % random.getrandbits(40),
+                "latitude": random.uniform(-0.01, 0.01),
+                "longitude": random.uniform(-0.01, 0.01),
+                "time_till_hidden": random.randint(60000, 1800000),
+                "last_modified_ms": timestamp_ms,
+                "pokemon_data": {
+                    "id": random.randint(1, 800),
+                    "display": {"gender_value": 1, "costume_value": 0, "form_value": 0,
+                                "weather_boosted_value": 0}
+                }
+            })
+        map_cells.append({"id": random.getrandbits(63), "current_timestamp": timestamp_ms,
+                          "wild_pokemon": wild_pokemon, "forts": [], "nearby_pokemon": [],
+                          "catchable_pokemon": []})
+    return {"type": 106, "payload": {"cells": map_cells, "client_weather": []}}
+
+
+async def run_benchmark(manager: AbstractMitmDataProcessingManager, protos: int, devices: int, cells: int,
+                        mons_per_cell: int) -> float:
+    await manager.launch_processors()
+    queue: asyncio.Queue = manager.get_queue()
+    items = [(int(time.time()), build_gmo(cells, mons_per_cell), "benchmark%s" % str(i % devices))
+             for i in range(protos)]
+    start = time.perf_counter()
+    for item in items:
+        await queue.put(item)
+    for _ in range(MadGlobals.application_args.mitmreceiver_data_workers):
+        await queue.put(None)
+    await manager.shutdown()
+    return time.perf_counter() - start
+
+
+async def main(bench_args) -> None:
+    db_wrapper, db_exec = await DbFactory.get_wrapper(MadGlobals.application_args)
+    mitm_mapper_connector = None
+    if MadGlobals.application_args.mitmmapper_type == MitmMapperType.grpc:
+        mitm_mapper_connector = MitmMapperClientConnector()
+        await mitm_mapper_connector.start()
+        mitm_mapper = await mitm_mapper_connector.get_client()
+    else:
+        mitm_mapper = RedisMitmMapper(db_wrapper)
+        await mitm_mapper.start()
+    stats_handler_connector = StatsHandlerClientConnector()
+    await stats_handler_connector.start()
+    stats_handler = await stats_handler_connector.get_client()
+    await stats_handler.start()
+    quest_gen: QuestGen = QuestGen()
+    await quest_gen.setup()
+    account_handler = await setup_account_handler(db_wrapper)
+
+    results: Dict[int, float] = {}
+    for processes in bench_args.processes:
+        MadGlobals.application_args.mitmreceiver_data_processes = processes
+        if processes > 0:
+            manager = ProcessMitmDataProcessingManager()
+        else:
+            manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper, quest_gen,
+                                                        account_handler=account_handler)
+        duration = await run_benchmark(manager, bench_args.protos, bench_args.devices, bench_args.cells,
+                                       bench_args.mons)
+        results[processes] = duration
+        print("processes: {:>3} | workers/process: {:>3} | {:>8.2f}s | {:>10.1f} protos/s"
+              .format(processes, MadGlobals.application_args.mitmreceiver_data_workers, duration,
+                      bench_args.protos / duration))
+
+    if mitm_mapper_connector:
+        await mitm_mapper_connector.close()
+    await stats_handler_connector.close()
+    await db_exec.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MITM data processing")
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 1, 2, 4],
+                        help="Amounts of processes to benchmark, 0 processes the data in this process")
+    parser.add_argument("--protos", type=int, default=2000, help="Amount of GMOs to process per run")
+    parser.add_argument("--devices", type=int, default=20, help="Amount of distinct origins")
+    parser.add_argument("--cells", type=int, default=9, help="Cells per GMO")
+    parser.add_argument("--mons", type=int, default=3, help="Wild mons per cell")
+    benchmark_args, remaining = parser.parse_known_args()
+    # The remaining arguments are passed on to MAD's own argument parsing (config file etc)
+    sys.argv = [sys.argv[0]] + remaining
+    MadGlobals.load_args()
+    init_logging(MadGlobals.application_args)
+    setup_loggers()
+    asyncio.run(main(benchmark_args))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Measures the operations per second of the RedisMitmMapper against a running redis:
+
+    python3 scripts/benchmark_redis_mitm_mapper.py --host 127.0.0.1 --port 6379 --workers 50 --ops 20000
+
+The keys of the benchmark workers (benchmark_worker_*) are removed afterwards.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from redis import asyncio as aioredis
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.data_handler.mitm_data.RedisMitmMapper import \
+    RedisMitmMapper  # noqa: E402
+from mapadroid.utils.collections import Location  # noqa: E402
+
+
+class CacheProvider:
+    """
+    Provides the redis connection like the DbWrapper does
+    """
+
+    def __init__(self, cache: aioredis.Redis):
+        self._cache: aioredis.Redis = cache
+
+    async def get_cache(self) -> aioredis.Redis:
+        return self._cache
+
+
+def gmo_summary(rng: random.Random) -> Dict:
+    cell_base = rng.randint(0, 2 ** 40)
+    return {"cells": [{"id": cell_base + cell,
+                       "forts": [{"id": "{:x}.16".format(rng.getrandbits(64)), "latitude": 52.5, "longitude": 13.4,
+                                  "type": 1, "enabled": True, "cooldown_complete_ms": 0} for _ in range(3)],
+                       "wild_pokemon": [{"encounter_id": rng.getrandbits(63), "spawnpoint_id": "47C0D3F1",
+                                         "latitude": 52.5, "longitude": 13.4, "pokemon_data": {"id": 16}}],
+                       "nearby_pokemon": []} for cell in range(9)]}
+
+
+async def run_operations(name: str, amount: int, concurrency: int,
+                         operation: Callable[[int], Awaitable]) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int):
+        async with semaphore:
+            await operation(index)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(index) for index in range(amount)))
+    duration = time.perf_counter() - start
+    print("{:<24} | {:>8} | {:>8.2f}s | {:>10.0f}".format(name, amount, duration, amount / duration))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RedisMitmMapper")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=0)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    cache: aioredis.Redis = aioredis.Redis(host=args.host, port=args.port, db=args.db, password=args.password)
+    mitm_mapper: RedisMitmMapper = RedisMitmMapper(CacheProvider(cache))
+    await mitm_mapper.start()
+    rng = random.Random(args.seed)
+    workers: List[str] = ["benchmark_worker_{}".format(worker) for worker in range(args.workers)]
+    gmos: List[Dict] = [gmo_summary(rng) for _ in range(100)]
+    start_timestamp: int = int(time.time())
+
+    def worker_of(index: int) -> str:
+        return workers[index % len(workers)]
+
+    async def update_gmo(index: int):
+        await mitm_mapper.update_latest(worker_of(index), "106", gmos[index % len(gmos)],
+                                        start_timestamp + index, start_timestamp + index,
+                                        Location(52.5 + index * 1e-6, 13.4))
+
+    async def update_fort_search(index: int):
+        await mitm_mapper.update_latest(worker_of(index), "101", {"result": 1, "fort_id": "a.16",
+                                                                  "items_awarded": [{}, {}]},
+                                        start_timestamp + index, start_timestamp + index)
+
+    async def request_latest(index: int):
+        await mitm_mapper.request_latest(worker_of(index), "106")
+
+    async def get_level(index: int):
+        await mitm_mapper.get_level(worker_of(index))
+
+    async def get_location(index: int):
+        await mitm_mapper.get_last_known_location(worker_of(index))
+
+    print("{:<24} | {:>8} | {:>9} | {:>10}".format("operation", "ops", "runtime", "ops/s"))
+    try:
+        await run_operations("update_latest (GMO)", args.ops, args.concurrency, update_gmo)
+        await run_operations("update_latest (101)", args.ops, args.concurrency, update_fort_search)
+        await run_operations("request_latest", args.ops, args.concurrency, request_latest)
+        # Start listening for invalidations, values are cached locally afterwards
+        await get_level(0)
+        await asyncio.sleep(0.5)
+        await run_operations("get_level", args.ops, args.concurrency, get_level)
+        await run_operations("get_last_known_location", args.ops, args.concurrency, get_location)
+    finally:
+        await mitm_mapper.shutdown()
+        keys = [key async for key in cache.scan_iter(match="*benchmark_worker_*")]
+        if keys:
+            await cache.delete(*keys)
+        await cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compares tour length and runtime of the route calculation algorithms available to MAD on random coordinates:
+
+    python3 scripts/benchmark_routecalc.py --sizes 500 2000 10000 --quick-limit 3000
+
+The quick (pure python) algorithm is skipped above --quick-limit coordinates, OR-Tools is skipped if not installed.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.route.routecalc.calculate_route_all import (  # noqa: E402
+    is_or_tools_available, route_calc_ortools)
+from mapadroid.route.routecalc.calculate_route_christofides import (  # noqa: E402
+    get_tour_length, route_calc_christofides)
+from mapadroid.route.routecalc.calculate_route_quick import \
+    route_calc_impl  # noqa: E402
+
+
+def random_coords(amount: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Roughly the size of a city, half of the coords are clustered around a couple of centers
+    uniform = np.column_stack((52.4 + rng.random(amount - amount // 2) * 0.2,
+                               13.3 + rng.random(amount - amount // 2) * 0.3))
+    centers = uniform[rng.integers(0, len(uniform), 10)]
+    clustered = centers[rng.integers(0, 10, amount // 2)] + rng.normal(0, 0.003, (amount // 2, 2))
+    return np.concatenate((uniform, clustered))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark route calculation algorithms")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 5000, 10000])
+    parser.add_argument("--quick-limit", type=int, default=3000,
+                        help="Maximum amount of coords to run the quick algorithm for")
+    parser.add_argument("--ortools-limit", type=int, default=5000,
+                        help="Maximum amount of coords to run OR-Tools for")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    algorithms = [("christofides", route_calc_christofides, None), ("quick", route_calc_impl, args.quick_limit)]
+    if is_or_tools_available():
+        algorithms.append(("ortools", route_calc_ortools, args.ortools_limit))
+
+    print("{:>7} | {:<12} | {:>10} | {:>14}".format("coords", "algorithm", "runtime", "tour length"))
+    for size in args.sizes:
+        coords = random_coords(size, args.seed)
+        for name, method, limit in algorithms:
+            if limit is not None and size > limit:
+                print("{:>7} | {:<12} | {:>10} | {:>14}".format(size, name, "skipped", "-"))
+                continue
+            start = time.perf_counter()
+            route = method(coords, "benchmark")
+            duration = time.perf_counter() - start
+            print("{:>7} | {:<12} | {:>9.2f}s | {:>13.0f}m".format(size, name, duration,
+                                                                    get_tour_length(coords, route)))
+
+
+if __name__ == "__main__":
+    main()
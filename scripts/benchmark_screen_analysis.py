@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Compares the screens analysed per second (and per core of the process pool) of the in-memory screenshot pipeline
+of PogoWindows with the previous way of storing the screenshot in the temp directory and running every cv2 call as
+a separate hop to the process pool:
+
+    python3 scripts/benchmark_screen_analysis.py --screens 50 --processes 1
+
+Every screen is checked for the close button (X), other buttons and the mainscreen like the workers do. The screens
+are synthesized (1080x1920 JPEG with a close button and button lines), the results of both paths are verified to be
+identical.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from aiofile import async_open
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.ocr.pogoWindows import PogoWindows  # noqa: E402
+from mapadroid.ocr.utils import _check_lines, check_pogo_mainscreen  # noqa: E402
+from mapadroid.utils.AsyncioCv2 import AsyncioCv2  # noqa: E402
+from mapadroid.utils.collections import ScreenCoordinates  # noqa: E402
+
+
+def synthesize_screen(seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    screen = np.full((1920, 1080, 3), 230, dtype=np.uint8)
+    screen += rng.integers(0, 20, screen.shape, dtype=np.uint8)
+    # Close button (X) at the bottom center
+    cv2.circle(screen, (540, 1750), 52, (90, 110, 40), 6)
+    cv2.line(screen, (515, 1725), (565, 1775), (90, 110, 40), 6)
+    cv2.line(screen, (565, 1725), (515, 1775), (90, 110, 40), 6)
+    # Edges of a button in the lower half
+    top: int = int(rng.integers(1100, 1300))
+    cv2.rectangle(screen, (300, top), (780, top + 120), (40, 180, 120), -1)
+    _, encoded = cv2.imencode(".jpg", screen, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return encoded.tobytes()
+
+
+async def legacy_read_circles(executor, filename, ratio) -> List[ScreenCoordinates]:
+    circles_found: List[ScreenCoordinates] = []
+    screenshot_read = await AsyncioCv2.imread(filename, executor=executor)
+    height, width, _ = screenshot_read.shape
+    screenshot_read = screenshot_read[int(height) - int(int(height / 4)):int(height),
+                                      int(int(width) / 2) - int(int(width) / 8):int(int(width) / 2) + int(
+                                          int(width) / 8)]
+    gray = await AsyncioCv2.cvtColor(screenshot_read, cv2.COLOR_BGR2GRAY, executor=executor)
+    radius_min = int((width / float(ratio) - 3) / 2)
+    radius_max = int((width / float(ratio) + 3) / 2)
+    gaussian = await AsyncioCv2.GaussianBlur(gray, (3, 3), 0, executor=executor)
+    gray = await AsyncioCv2.Canny(gaussian, 100, 50, apertureSize=3, executor=executor)
+    circles = await AsyncioCv2.HoughCircles(gray, cv2.HOUGH_GRADIENT, 1, width / 8, param1=100, param2=15,
+                                            minRadius=radius_min, maxRadius=radius_max, executor=executor)
+    if circles is not None:
+        for (_, pos_y, _) in np.round(circles[0, :]).astype("int"):
+            circles_found.append(ScreenCoordinates(width / 2, (int(height) - int(height / 4.5)) + pos_y))
+    return circles_found
+
+
+async def legacy_check_raid_line(executor, filename, left_side=False) -> Optional[ScreenCoordinates]:
+    screenshot_read = await AsyncioCv2.imread(filename, executor=executor)
+    if len(await legacy_read_circles(executor, filename, 11)) == 0:
+        return None
+    height, width, _ = screenshot_read.shape
+    screenshot_partial = screenshot_read[int(height / 2) - int(height / 3):int(height / 2) + int(height / 3),
+                                         int(0):int(width)]
+    gray = await AsyncioCv2.cvtColor(screenshot_partial, cv2.COLOR_BGR2GRAY, executor=executor)
+    gaussian = await AsyncioCv2.GaussianBlur(gray, (5, 5), 0, executor=executor)
+    edges = await AsyncioCv2.Canny(gaussian, 50, 150, apertureSize=3, executor=executor)
+    max_line_length = width / 3.30 + width * 0.03
+    min_line_length = width / 6.35 - width * 0.03
+    lines = cv2.HoughLinesP(edges, rho=1, theta=math.pi / 180, threshold=70, minLineLength=min_line_length,
+                            maxLineGap=2)
+    if lines is None:
+        return None
+    for line in lines:
+        for x1, y1, x2, y2 in line:
+            if y1 == y2 and min_line_length <= x2 - x1 <= max_line_length and y1 < height / 2:
+                if not left_side and x1 > width / 2 and x2 > width / 2:
+                    return ScreenCoordinates(0, 0)
+                elif left_side and x1 < width / 2:
+                    return ScreenCoordinates(int(width - (x2 - x1)),
+                                             int((int(height / 2) - int(height / 3) + y1) * 0.9))
+    return None
+
+
+async def legacy_look_for_button(executor, filename, ratiomin, ratiomax) -> Optional[ScreenCoordinates]:
+    screenshot_read = await AsyncioCv2.imread(filename, executor=executor)
+    gray = await AsyncioCv2.cvtColor(screenshot_read, cv2.COLOR_BGR2GRAY, executor=executor)
+    height, width = gray.shape
+    gaussian = await AsyncioCv2.GaussianBlur(gray, (3, 3), 0, executor=executor)
+    edges = await AsyncioCv2.Canny(gaussian, 50, 200, apertureSize=3, executor=executor)
+    max_line_length = (width / ratiomin) + (width * 0.18)
+    min_line_length = (width / ratiomax) - (width * 0.02)
+    gradient_of_edges_found = cv2.morphologyEx(edges, cv2.MORPH_GRADIENT, np.ones((2, 2), np.uint8))
+    lines = cv2.HoughLinesP(gradient_of_edges_found, rho=1, theta=math.pi / 180, threshold=90,
+                            minLineLength=min_line_length, maxLineGap=5)
+    if lines is None:
+        return None
+    loop = asyncio.get_running_loop()
+    with concurrent.futures.ThreadPoolExecutor() as pool:
+        lines_processed = await loop.run_in_executor(pool, _check_lines, lines, height)
+    num_lines = 0
+    _last_y = _x1 = _x2 = click_y = 0
+    for x1, y1, x2, y2 in lines_processed:
+        if y1 == y2 and max_line_length >= x2 - x1 >= min_line_length and y1 > height / 3 \
+                and width / 2 + 50 > (x2 - x1) / 2 + x1 > width / 2 - 50:
+            num_lines += 1
+            click_y = _last_y + ((y1 - _last_y) / 2)
+            _last_y, _x1, _x2 = y1, x1, x2
+    if 1 < num_lines <= 6:
+        return ScreenCoordinates(int((width - _x2) + ((_x2 - _x1) / 2)), int(click_y))
+    elif num_lines > 6:
+        return ScreenCoordinates(int(width - (width / 7.2)), int(height - (height / 12.19)))
+    return None
+
+
+async def legacy_analyze(executor, path: str, screen: bytes) -> Tuple:
+    async with async_open(path, "wb") as fh:
+        await fh.write(screen)
+    close: List[ScreenCoordinates] = []
+    if not (await legacy_check_raid_line(executor, path)
+            or await legacy_check_raid_line(executor, path, left_side=True)):
+        close = await legacy_read_circles(executor, path, 10)
+    button = await legacy_look_for_button(executor, path, 2.20, 3.01)
+    loop = asyncio.get_running_loop()
+    mainscreen = await loop.run_in_executor(executor, check_pogo_mainscreen, path, "benchmark")
+    return close, button, mainscreen
+
+
+async def in_memory_analyze(pogo_windows: PogoWindows, screen: bytes) -> Tuple:
+    close = await pogo_windows.check_close_except_nearby_button(screen, "benchmark")
+    button = await pogo_windows.look_for_button(screen, 2.20, 3.01, identifier="benchmark")
+    mainscreen = await pogo_windows.check_pogo_mainscreen(screen, "benchmark")
+    return close, button, mainscreen
+
+
+async def benchmark(screens: List[bytes], processes: int, temp_dir: str) -> None:
+    pogo_windows = PogoWindows(temp_dir, processes)
+    executor = concurrent.futures.ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+    # Warm up the worker processes
+    await legacy_analyze(executor, os.path.join(temp_dir, "warmup.jpg"), screens[0])
+    await in_memory_analyze(pogo_windows, screens[0])
+
+    start = time.perf_counter()
+    legacy_results = [await legacy_analyze(executor, os.path.join(temp_dir, "screenshot_benchmark.jpg"), screen)
+                      for screen in screens]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [await in_memory_analyze(pogo_windows, screen) for screen in screens]
+    in_memory_time = time.perf_counter() - start
+
+    executor.shutdown()
+    await pogo_windows.shutdown()
+    assert results == legacy_results, "Results of the pipelines differ"
+    for name, elapsed in (("file + per-op executor hops", legacy_time), ("in-memory fused job", in_memory_time)):
+        print("{:<30} {:>8.2f} screens/s  {:>8.2f} screens/s per core  ({:.1f} ms per screen)".format(
+            name, len(screens) / elapsed, len(screens) / elapsed / processes, elapsed * 1000 / len(screens)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysing screenshots")
+    parser.add_argument("--screens", type=int, default=50)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    screens: List[bytes] = [synthesize_screen(seed) for seed in range(args.screens)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        asyncio.run(benchmark(screens, args.processes, temp_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Measures the memory held by the stats handler per encounter tracked between two submissions of stats:
+
+    python3 scripts/benchmark_stats_holder_memory.py --encounters 200000
+
+"object per encounter" mimics the previous representation (an ORM instance holding datetimes per encounter),
+"columnar" the StatsDetectSeenTypeHolder/WildMonStatsHolder.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mapadroid.data_handler.stats.holder.stats_detect_seen.StatsDetectSeenTypeHolder import \
+    StatsDetectSeenTypeHolder  # noqa: E402
+from mapadroid.data_handler.stats.holder.wild_mon_stats.WildMonStatsHolder import \
+    WildMonStatsHolder  # noqa: E402
+from mapadroid.db.model import (TrsStatsDetectSeenType,  # noqa: E402
+                                TrsStatsDetectWildMonRaw)
+from mapadroid.utils.madGlobals import MonSeenTypes  # noqa: E402
+
+
+def seen_type_objects(encounter_ids: List[int], seen_types: List[MonSeenTypes], times: List[datetime]) -> Dict:
+    entries: Dict[int, TrsStatsDetectSeenType] = {}
+    for encounter_id, seen_type, time_of_scan in zip(encounter_ids, seen_types, times):
+        entry = entries.get(encounter_id)
+        if entry is None:
+            entry = TrsStatsDetectSeenType()
+            entry.encounter_id = encounter_id
+            for column in MonSeenTypes:
+                setattr(entry, column.name, None)
+            entries[encounter_id] = entry
+        setattr(entry, seen_type.name, time_of_scan)
+    return entries
+
+
+def seen_type_columnar(encounter_ids: List[int], seen_types: List[MonSeenTypes],
+                       times: List[datetime]) -> StatsDetectSeenTypeHolder:
+    holder = StatsDetectSeenTypeHolder()
+    for encounter_id, seen_type, time_of_scan in zip(encounter_ids, seen_types, times):
+        holder.add(encounter_id, seen_type, time_of_scan)
+    return holder
+
+
+def wild_mon_objects(encounter_ids: List[int], seen_types: List[MonSeenTypes], times: List[datetime]) -> Dict:
+    entries: Dict[int, TrsStatsDetectWildMonRaw] = {}
+    for encounter_id, time_of_scan in zip(encounter_ids, times):
+        entry = entries.get(encounter_id)
+        if entry is None:
+            entry = TrsStatsDetectWildMonRaw()
+            entry.worker = "benchmark_worker"
+            entry.encounter_id = encounter_id
+            entry.count = 0
+            entry.is_shiny = False
+            entry.first_scanned = time_of_scan
+            entry.last_scanned = time_of_scan
+            entries[encounter_id] = entry
+        else:
+            entry.count += 1
+            entry.last_scanned = time_of_scan
+    return entries
+
+
+def wild_mon_columnar(encounter_ids: List[int], seen_types: List[MonSeenTypes],
+                      times: List[datetime]) -> WildMonStatsHolder:
+    holder = WildMonStatsHolder("benchmark_worker")
+    for encounter_id, time_of_scan in zip(encounter_ids, times):
+        holder.add(encounter_id, time_of_scan)
+    return holder
+
+
+def measure(name: str, encounters: int, build: Callable, *args) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = build(*args)
+    duration = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<36} | {:>10.1f} MiB | {:>12.1f} | {:>8.2f}s".format(name, size / 2 ** 20, size / encounters,
+                                                                   duration))
+    del held
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory of stats holders")
+    parser.add_argument("--encounters", type=int, default=200000)
+    parser.add_argument("--sightings", type=int, default=3, help="Average amount of sightings per encounter")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Encounter IDs are 64 bit values
+    known_ids: List[int] = [rng.getrandbits(64) for _ in range(args.encounters)]
+    sightings: int = args.encounters * args.sightings
+    encounter_ids: List[int] = known_ids + [rng.choice(known_ids) for _ in range(sightings - args.encounters)]
+    seen_types: List[MonSeenTypes] = [rng.choice(list(MonSeenTypes)) for _ in range(sightings)]
+    start = datetime.now(timezone.utc)
+    times: List[datetime] = [start + timedelta(seconds=rng.randint(0, 300)) for _ in range(sightings)]
+
+    print("{:<36} | {:>14} | {:>12} | {:>9}".format("representation", "memory", "B/encounter", "runtime"))
+    measure("seen type: object per encounter", args.encounters, seen_type_objects, encounter_ids, seen_types,
+            times)
+    measure("seen type: columnar", args.encounters, seen_type_columnar, encounter_ids, seen_types, times)
+    measure("wild mon: object per encounter", args.encounters, wild_mon_objects, encounter_ids, seen_types, times)
+    measure("wild mon: columnar", args.encounters, wild_mon_columnar, encounter_ids, seen_types, times)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,12 +26,18 @@ from mapadroid.mad_apk import get_storage_obj
 from mapadroid.madmin.madmin import MADmin
 from mapadroid.mapping_manager.MappingManager import MappingManager
 from mapadroid.mapping_manager.MappingManagerServer import MappingManagerServer
+from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
+    AbstractMitmDataProcessingManager
 from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
     InProcessMitmDataProcessorManager
+from mapadroid.mitm_receiver.data_processing.ProcessMitmDataProcessingManager import \
+    ProcessMitmDataProcessingManager
 from mapadroid.mitm_receiver.MITMReceiver import MITMReceiver
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.plugins.pluginBase import PluginCollection
 from mapadroid.updater.updater import DeviceUpdater
+from mapadroid.utils.ComputePool import (get_compute_pool,
+                                         shutdown_compute_pool)
 from mapadroid.utils.EnvironmentUtil import setup_loggers, setup_runtime
 from mapadroid.utils.logging import LoggerEnums, get_logger, init_logging
 from mapadroid.utils.madGlobals import MadGlobals, terminate_mad
@@ -94,6 +100,8 @@ async def start():
     mapping_manager: MappingManager = MappingManager(db_wrapper,
                                                      account_handler=account_handler,
                                                      configmode=MadGlobals.application_args.config_mode)
+    # Started before the mapping manager to have route calculations of all areas share the pool
+    get_compute_pool()
     await mapping_manager.setup()
     # Start MappingManagerServer in order to attach more mitmreceivers (minor scalability)
     mapping_manager_grpc_server = MappingManagerServer(mapping_manager)
@@ -130,8 +138,16 @@ async def start():
     stats_handler: StatsHandlerServer = StatsHandlerServer(db_wrapper)
     await stats_handler.start()
 
-    mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper, quest_gen,
-                                                                    account_handler=account_handler)
+    mitm_data_processor_manager: AbstractMitmDataProcessingManager
+    if (MadGlobals.application_args.mitmreceiver_data_processes > 0
+            and ProcessMitmDataProcessingManager.is_supported()):
+        mitm_data_processor_manager = ProcessMitmDataProcessingManager()
+    else:
+        if MadGlobals.application_args.mitmreceiver_data_processes > 0:
+            logger.warning("mitmreceiver_data_processes requires mitmmapper_type grpc or redis, processing MITM data "
+                           "within the MITMReceiver process")
+        mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper,
+                                                                        quest_gen, account_handler=account_handler)
     await mitm_data_processor_manager.launch_processors()
 
     mitm_receiver = MITMReceiver(mitm_mapper, mapping_manager, db_wrapper,
@@ -195,7 +211,8 @@ async def start():
     if MadGlobals.application_args.statistic:
         logger.info("Starting statistics collector")
         loop = asyncio.get_running_loop()
-        t_usage = loop.create_task(get_system_infos(db_wrapper))
+        t_usage = loop.create_task(get_system_infos(
+            db_wrapper, pogo_win_manager.get_classifier_metrics if pogo_win_manager else None))
 
     db_cleanup: DbCleanup = DbCleanup(db_wrapper)
     await db_cleanup.start()
@@ -217,8 +234,8 @@ async def start():
                 await mitm_receiver.shutdown()
                 await mitm_receiver_task.shutdown()
                 logger.debug("MITMReceiver joined")
-            # if mitm_data_processor_manager is not None:
-            #       await mitm_data_processor_manager.shutdown()
+            if mitm_data_processor_manager is not None:
+                await mitm_data_processor_manager.shutdown()
             if webhook_task:
                 logger.info("Stopping webhook task")
                 webhook_task.cancel()
@@ -244,6 +261,7 @@ async def start():
                 logger.debug("Done shutting down db_pool_manager")
             if pogo_win_manager:
                 await pogo_win_manager.shutdown()
+            shutdown_compute_pool()
         except Exception:
             logger.opt(exception=True).critical("An unhandled exception occurred during shutdown!")
         logger.info("Done shutting down")
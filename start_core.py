@@ -64,6 +64,8 @@ async def start():
     webhook_task: Optional[Task] = None  # Thread for WebHooks
     webhook_worker: Optional[WebhookWorker] = None
     t_usage: Optional[Task] = None
+    mitm_mapper_connector: Optional[MitmMapperClientConnector] = None
+    stats_handler_connector: Optional[StatsHandlerClientConnector] = None
 
     setup_runtime()
     if MadGlobals.application_args.config_mode:
@@ -183,7 +185,8 @@ async def start():
     if MadGlobals.application_args.statistic:
         logger.info("Starting statistics collector")
         loop = asyncio.get_running_loop()
-        t_usage = loop.create_task(get_system_infos(db_wrapper))
+        t_usage = loop.create_task(get_system_infos(
+            db_wrapper, pogo_win_manager.get_classifier_metrics if pogo_win_manager else None))
 
     db_cleanup: DbCleanup = DbCleanup(db_wrapper)
     await db_cleanup.start()
@@ -219,6 +222,11 @@ async def start():
             #    storage_manager.shutdown()
             if event_task:
                 event_task.cancel()
+            # Submit the updates still buffered by the clients
+            if mitm_mapper_connector:
+                await mitm_mapper_connector.close()
+            if stats_handler_connector:
+                await stats_handler_connector.close()
             if db_exec is not None:
                 logger.debug("Calling db_pool_manager shutdown")
                 cache: aioredis.Redis = await db_wrapper.get_cache()
@@ -24,8 +24,12 @@ from mapadroid.mapping_manager.AbstractMappingManager import \
     AbstractMappingManager
 from mapadroid.mapping_manager.MappingManagerClientConnector import \
     MappingManagerClientConnector
+from mapadroid.mitm_receiver.data_processing.AbstractMitmDataProcessingManager import \
+    AbstractMitmDataProcessingManager
 from mapadroid.mitm_receiver.data_processing.InProcessMitmDataProcessorManager import \
     InProcessMitmDataProcessorManager
+from mapadroid.mitm_receiver.data_processing.ProcessMitmDataProcessingManager import \
+    ProcessMitmDataProcessingManager
 from mapadroid.mitm_receiver.MITMReceiver import MITMReceiver
 from mapadroid.utils.EnvironmentUtil import setup_loggers, setup_runtime
 from mapadroid.utils.logging import LoggerEnums, get_logger, init_logging
@@ -54,6 +58,7 @@ async def start():
     t_usage: Optional[Task] = None
     t_reporting: Optional[Task] = None
     mitm_mapper_connector: Optional[MitmMapperClientConnector] = None
+    stats_handler_connector: Optional[StatsHandlerClientConnector] = None
     setup_runtime()
     if MadGlobals.application_args.config_mode and MadGlobals.application_args.only_routes:
         logger.error('Unable to run with config_mode and only_routes.  Only use one option')
@@ -86,8 +91,16 @@ async def start():
     await quest_gen.setup()
     account_handler: AbstractAccountHandler = await setup_account_handler(db_wrapper)
 
-    mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper, quest_gen,
-                                                                    account_handler=account_handler)
+    mitm_data_processor_manager: AbstractMitmDataProcessingManager
+    if (MadGlobals.application_args.mitmreceiver_data_processes > 0
+            and ProcessMitmDataProcessingManager.is_supported()):
+        mitm_data_processor_manager = ProcessMitmDataProcessingManager()
+    else:
+        if MadGlobals.application_args.mitmreceiver_data_processes > 0:
+            logger.warning("mitmreceiver_data_processes requires mitmmapper_type grpc or redis, processing MITM data "
+                           "within the MITMReceiver process")
+        mitm_data_processor_manager = InProcessMitmDataProcessorManager(mitm_mapper, stats_handler, db_wrapper,
+                                                                        quest_gen, account_handler=account_handler)
     await mitm_data_processor_manager.launch_processors()
 
     mapping_manager_connector = MappingManagerClientConnector()
@@ -121,6 +134,7 @@ async def start():
     finally:
         await mitm_receiver_task.shutdown()
         await mitm_receiver.shutdown()
+        await mitm_data_processor_manager.shutdown()
         await storage_elem.shutdown()
         try:
             logger.success("Stop called")
@@ -132,6 +146,8 @@ async def start():
                 t_reporting.cancel()
             if mitm_mapper_connector:
                 await mitm_mapper_connector.close()
+            if stats_handler_connector:
+                await stats_handler_connector.close()
             if db_exec is not None:
                 logger.debug("Calling db_pool_manager shutdown")
                 cache: aioredis.Redis = await db_wrapper.get_cache()
@@ -152,6 +152,8 @@ const leaflet_data = {
     stops: {}
 };
 
+// versions of the tiles of the layers received from get_map_tiles, passed along to only receive tiles changed since
+const mapTileVersions = {};
 const mouseEventsIgnore = {
     ignoreCount: 0,
     enableIgnore() {
@@ -258,6 +260,7 @@ new Vue({
     watch: {
         "layers.stat.gyms": function (newVal, oldVal) {
             if (newVal && !init) {
+                delete mapTileVersions["gyms"];
                 this.map_fetch_gyms(this.buildUrlFilter(true, true));
             }
 
@@ -273,6 +276,7 @@ new Vue({
         },
         "layers.stat.quests": function (newVal, oldVal) {
             if (newVal && !init) {
+                delete mapTileVersions["quests"];
                 this.map_fetch_quests(this.buildUrlFilter(true, true));
             }
 
@@ -280,6 +284,7 @@ new Vue({
         },
         "layers.stat.stops": function (newVal, oldVal) {
             if (newVal && !init) {
+                delete mapTileVersions["stops"];
                 this.map_fetch_stops(this.buildUrlFilter(true, true));
             }
 
@@ -287,6 +292,7 @@ new Vue({
         },
         "layers.stat.mons": function (newVal, oldVal) {
             if (newVal && !init) {
+                delete mapTileVersions["mons"];
                 this.map_fetch_mons(this.buildUrlFilter(true, true));
             }
 
@@ -429,7 +435,7 @@ new Vue({
                 return;
             }
 
-            this.mapGuardedFetch("gyms", "get_gymcoords" + urlFilter, function (res) {
+            this.mapGuardedTileFetch("gyms", "gyms", "get_gymcoords" + urlFilter, function (res) {
                 res.data.forEach(function (gym) {
 
                     let color;
@@ -647,7 +653,7 @@ new Vue({
             });
         },
         map_fetch_spawns(urlFilter) {
-            this.mapGuardedFetch("spawns", "get_spawns" + urlFilter, function (res) {
+            this.mapGuardedTileFetch("spawns", "spawns", "get_spawns" + urlFilter, function (res) {
                 res.data.forEach(function (spawns) {
                     const eventName = spawns["EVENT"];
 
@@ -742,7 +748,7 @@ new Vue({
                 return;
             }
 
-            this.mapGuardedFetch("quests", "get_quests" + urlFilter, function (res) {
+            this.mapGuardedTileFetch("quests", "quests", "get_quests" + urlFilter, function (res) {
                 res.data.forEach(function (quest) {
                     const id = quest["pokestop_id"];
 
@@ -780,7 +786,7 @@ new Vue({
                 return;
             }
 
-            this.mapGuardedFetch("stops", "get_stops" + urlFilter, function(res) {
+            this.mapGuardedTileFetch("stops", "stops", "get_stops" + urlFilter, function(res) {
                 res.data.forEach(function(stop) {
                     const id = stop["pokestop_id"];
 
@@ -849,7 +855,7 @@ new Vue({
                 return;
             }
 
-            this.mapGuardedFetch("mons", "get_map_mons" + urlFilter, function (res) {
+            this.mapGuardedTileFetch("mons", "mons", "get_map_mons" + urlFilter, function (res) {
                 res.data.forEach(function (mon) {
                     const id = mon["encounter_id"];
 
@@ -944,6 +950,46 @@ new Vue({
                 .then(onSuccess.bind(this))
                 .finally(function () { this.fetchers[guardName] = false; }.bind(this));
         },
+        mapGuardedTileFetch(guardName, layer, legacyUrl, onSuccess) {
+            if (this.fetchers[guardName]) {
+                return;
+            }
+
+            this.fetchers[guardName] = true;
+
+            if (!mapTileVersions[layer]) {
+                mapTileVersions[layer] = {};
+            }
+            const versions = mapTileVersions[layer];
+            const request = {
+                "layer": layer,
+                "neLat": this.getStoredSetting("neLat", null),
+                "neLon": this.getStoredSetting("neLon", null),
+                "swLat": this.getStoredSetting("swLat", null),
+                "swLon": this.getStoredSetting("swLon", null),
+                "tiles": versions
+            };
+
+            // only tiles changed are returned, their objects are handed over like the response of the legacy url
+            const onTiles = function (res) {
+                const data = [];
+                Object.keys(res.data.tiles).forEach(function (tile) {
+                    versions[tile] = res.data.tiles[tile]["version"];
+                    res.data.tiles[tile]["data"].forEach(function (entry) {
+                        data.push(entry);
+                    });
+                });
+                onSuccess.call(this, {"data": data});
+            };
+            // e.g. viewports covering too many tiles are loaded by the rectangle
+            const onTilesFailed = function () {
+                return axios.get(legacyUrl).then(onSuccess.bind(this));
+            };
+
+            axios.post("get_map_tiles", request)
+                .then(onTiles.bind(this), onTilesFailed.bind(this))
+                .finally(function () { this.fetchers[guardName] = false; }.bind(this));
+        },
         mapAddGeofence(geofence, show) {
             const id = geofence.id;
 